@@ -17,9 +17,14 @@ public interface EvaluationResultRepository extends JpaRepository<EvaluationResu
     List<EvaluationResult> findByBatchIdOrderByRankPositionAsc(@Param("batchId") String batchId);
     
     /**
-     * Lấy batch_id mới nhất
+     * Lấy batch_id mới nhất (bỏ qua batch chưa công bố trong analysis_batch)
      */
-    @Query(value = "SELECT batch_id FROM evaluation_result ORDER BY created_at DESC LIMIT 1", nativeQuery = true)
+    @Query(value = """
+        SELECT er.batch_id FROM evaluation_result er
+        WHERE NOT EXISTS (SELECT 1 FROM analysis_batch ab
+                          WHERE ab.batch_id = er.batch_id AND ab.status <> 'PUBLISHED')
+        ORDER BY er.created_at DESC LIMIT 1
+        """, nativeQuery = true)
     String findLatestBatchId();
     
     /**
@@ -27,7 +32,12 @@ public interface EvaluationResultRepository extends JpaRepository<EvaluationResu
      */
     @Query(value = """
         SELECT er.* FROM evaluation_result er
-        WHERE er.batch_id = (SELECT batch_id FROM evaluation_result ORDER BY created_at DESC LIMIT 1)
+        WHERE er.batch_id = (
+            SELECT latest.batch_id FROM evaluation_result latest
+            WHERE NOT EXISTS (SELECT 1 FROM analysis_batch ab
+                              WHERE ab.batch_id = latest.batch_id AND ab.status <> 'PUBLISHED')
+            ORDER BY latest.created_at DESC LIMIT 1
+        )
         ORDER BY er.rank_position ASC
         LIMIT :limit
         """, nativeQuery = true)
@@ -40,7 +50,9 @@ public interface EvaluationResultRepository extends JpaRepository<EvaluationResu
         SELECT er.* FROM evaluation_result er
         INNER JOIN (
             SELECT site_id, MAX(created_at) as max_date
-            FROM evaluation_result
+            FROM evaluation_result visible
+            WHERE NOT EXISTS (SELECT 1 FROM analysis_batch ab
+                              WHERE ab.batch_id = visible.batch_id AND ab.status <> 'PUBLISHED')
             GROUP BY site_id
         ) latest ON er.site_id = latest.site_id AND er.created_at = latest.max_date
         ORDER BY er.topsis_score DESC
@@ -1,34 +1,84 @@
-from .base_algorithm import BaseAlgorithm
-from .topsis import TopsisAlgorithm
+from importlib import import_module
+from typing import TYPE_CHECKING
+import logging
+
+if TYPE_CHECKING:
+    from .base_algorithm import BaseAlgorithm
+
+logger = logging.getLogger(__name__)
+
 
 class AlgorithmFactory:
     """Factory class to create algorithm instances"""
-    
+
+    # Algorithms are registered as "module:ClassName" paths and imported on
+    # first use, so importing the factory does not pull in pandas/NumPy.
     _algorithms = {
-        'topsis': TopsisAlgorithm,
+        'topsis': 'algorithms.topsis:TopsisAlgorithm',
+        'fuzzy_topsis': 'algorithms.fuzzy_topsis:FuzzyTopsisAlgorithm',
         # Future algorithms can be added here:
-        # 'ahp': AHPAlgorithm,
-        # 'electre': ElectreAlgorithm,
-        # 'promethee': PrometheeAlgorithm,
+        # 'ahp': 'algorithms.ahp:AHPAlgorithm',
+        # 'electre': 'algorithms.electre:ElectreAlgorithm',
+        # 'promethee': 'algorithms.promethee:PrometheeAlgorithm',
     }
-    
+
     @classmethod
-    def create(cls, algorithm_name: str) -> BaseAlgorithm:
-        """Create an algorithm instance by name"""
+    def _resolve(cls, algorithm_name: str) -> type:
+        """Return the algorithm class, importing its module if needed"""
+        algorithm_class = cls._algorithms[algorithm_name]
+
+        if isinstance(algorithm_class, str):
+            module_name, class_name = algorithm_class.split(':')
+            algorithm_class = getattr(import_module(module_name), class_name)
+            cls._algorithms[algorithm_name] = algorithm_class
+
+        return algorithm_class
+
+    @classmethod
+    def create(cls, algorithm_name: str, **options) -> 'BaseAlgorithm':
+        """Create an algorithm instance by name (options go to its constructor)"""
         algorithm_name = algorithm_name.lower()
-        
+
         if algorithm_name not in cls._algorithms:
             raise ValueError(f"Unknown algorithm: {algorithm_name}")
-        
-        algorithm_class = cls._algorithms[algorithm_name]
-        return algorithm_class()
-    
+
+        algorithm_class = cls._resolve(algorithm_name)
+        return algorithm_class(**options)
+
     @classmethod
-    def register(cls, name: str, algorithm_class: type):
-        """Register a new algorithm"""
+    def register(cls, name: str, algorithm_class):
+        """Register a new algorithm (a class or a "module:ClassName" path)"""
         cls._algorithms[name.lower()] = algorithm_class
-    
+
     @classmethod
     def get_supported_algorithms(cls) -> list:
         """Get list of supported algorithm names"""
         return list(cls._algorithms.keys())
+
+    @classmethod
+    def warm_up(cls) -> dict:
+        """
+        Import every registered algorithm and run it once on a tiny matrix
+
+        Returns:
+            Dictionary of algorithm name -> warm-up time in milliseconds
+        """
+        import time
+        import pandas as pd
+
+        cost_criteria = ['c1']
+        benefit_criteria = ['b1']
+        weights = {'c1': 0.5, 'b1': 0.5}
+        sample = pd.DataFrame({'c1': [1.0, 2.0, 3.0], 'b1': [3.0, 1.0, 2.0]})
+
+        timings = {}
+        for name in cls.get_supported_algorithms():
+            start = time.perf_counter()
+            try:
+                cls.create(name).analyze(sample, weights, cost_criteria, benefit_criteria)
+            except Exception as e:
+                logger.warning(f"Warm-up of algorithm '{name}' failed: {e}")
+                continue
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+        return timings
@@ -1,13 +1,48 @@
 from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
+from config import Config
+from .normalization import ColumnStatistics, get_normalization, statistics_cache
 
 
 class BaseAlgorithm(ABC):
     """Abstract base class for MCDM algorithms"""
     
-    def __init__(self, name: str):
+    # True when a site that dominates another (at least as good on every
+    # criterion) always scores at least as high, given the column statistics
+    # of the full data; only then may a skyline pre-filter drop sites
+    dominance_monotone = False
+    
+    # True when scores depend on the data only through its ColumnStatistics,
+    # so shards scored with merged statistics match one run over all sites
+    shardable = False
+    
+    # True when score_matrix is implemented (consensus, bootstrap and
+    # ranking snapshots score NumPy matrices directly)
+    supports_matrix_scoring = False
+    
+    def __init__(self, name: str, normalization: str = None):
         self.name = name
+        self.normalization = get_normalization(normalization or Config.DEFAULT_NORMALIZATION)
+    
+    def column_statistics(self, data: pd.DataFrame, criteria: list,
+                          matrix: np.ndarray) -> ColumnStatistics:
+        """
+        Column statistics of the decision matrix, cached per site-data version
+        
+        DataService.load_sites tags its DataFrame with attrs['data_version'];
+        untagged data is always reduced from scratch. A pre-filtered subset
+        carries the statistics of the full data in attrs['column_stats'] as
+        a (criteria, ColumnStatistics) pair.
+        """
+        column_stats = data.attrs.get('column_stats')
+        if column_stats is not None and list(column_stats[0]) == list(criteria):
+            return column_stats[1]
+        return statistics_cache.get_or_compute(data.attrs.get('data_version'), criteria, matrix)
+    
+    def required_columns(self, criteria: list) -> list:
+        """Site columns analyze() reads for these criteria (for column projection)"""
+        return list(criteria)
     
     @abstractmethod
     def analyze(self, data: pd.DataFrame, weights: dict, 
@@ -26,6 +61,91 @@ class BaseAlgorithm(ABC):
         """
         pass
     
+    def matrix_options(self, data: pd.DataFrame, criteria: list) -> dict:
+        """
+        Keyword arguments the score_matrix* methods need besides the matrix
+        
+        Args:
+            data: Site rows the matrix was built from (same order)
+            criteria: Column names of the matrix
+        
+        Returns:
+            Dictionary passed as **options (empty for crisp algorithms)
+        """
+        return {}
+    
+    def score_matrix(self, matrix: np.ndarray, weights: np.ndarray,
+                     n_cost: int, stats: ColumnStatistics = None) -> np.ndarray:
+        """
+        Score a raw decision matrix without going through pandas
+        
+        Used where only NumPy arrays are available (e.g. process-pool
+        workers reading a shared-memory matrix). Only algorithms with
+        supports_matrix_scoring implement it.
+        
+        Args:
+            matrix: (n_sites, n_criteria) array, cost criteria first
+            weights: (n_criteria,) weight array in the same column order
+            n_cost: Number of leading cost columns
+            stats: Precomputed column statistics of `matrix` (optional)
+        
+        Returns:
+            (n_sites,) array of scores, higher is better
+        
+        Raises:
+            ValueError: The algorithm does not support matrix scoring
+        """
+        raise ValueError(f"{self.name} does not support matrix scoring")
+    
+    def score_matrix_batch(self, matrix: np.ndarray, weights: np.ndarray,
+                           n_cost: int, stats: ColumnStatistics = None,
+                           **options) -> np.ndarray:
+        """
+        Score one matrix under several weight vectors
+        
+        Args:
+            matrix: (n_sites, n_criteria) array, cost criteria first
+            weights: (n_weightings, n_criteria) array, one weight vector per row
+            n_cost: Number of leading cost columns
+            stats: Precomputed column statistics of `matrix` (optional)
+            **options: matrix_options of the rows, passed to score_matrix
+        
+        Returns:
+            (n_sites, n_weightings) array of scores
+        """
+        if stats is None:
+            stats = ColumnStatistics.from_matrix(matrix)
+        return np.column_stack([self.score_matrix(matrix, w, n_cost, stats, **options) for w in weights])
+    
+    def score_matrix_stack(self, stack: np.ndarray, weights: np.ndarray,
+                           n_cost: int, **options) -> np.ndarray:
+        """
+        Score several decision matrices of the same sites (e.g. resamples)
+        
+        Every matrix is scored against its own column statistics.
+        
+        Args:
+            stack: (n_matrices, n_sites, n_criteria) array, cost criteria first
+            weights: (n_criteria,) weight array
+            n_cost: Number of leading cost columns
+            **options: matrix_options of the rows, passed to score_matrix
+        
+        Returns:
+            (n_matrices, n_sites) array of scores
+        """
+        return np.stack([self.score_matrix(matrix, weights, n_cost, **options) for matrix in stack])
+    
+    def analyze_grouped(self, data: pd.DataFrame, weights: dict,
+                        cost_criteria: list, benefit_criteria: list,
+                        group_column: str) -> pd.DataFrame:
+        """
+        Run the algorithm separately inside each group of `group_column`
+        
+        Returns:
+            DataFrame with 'score' and per-group 'rank_position' columns
+        """
+        raise ValueError(f"{self.name} does not support grouped analysis")
+    
     @abstractmethod
     def validate_inputs(self, data: pd.DataFrame, weights: dict,
                        cost_criteria: list, benefit_criteria: list) -> bool:
@@ -0,0 +1,268 @@
+"""
+Bootstrap confidence intervals of site scores and ranks
+
+Survey attributes carry measurement error. Every replicate perturbs the
+decision matrix with a per-criterion error model, is rescored (against its
+own column statistics) and ranked; the spread of a site's scores and ranks
+over the replicates gives its confidence intervals.
+
+Work is split in two process-pool phases around shared memory:
+
+1. replicate chunks: each task reads the matrix from shared memory, scores
+   its replicates in small cache-sized vectorized batches
+   (BaseAlgorithm.score_matrix_stack) and writes scores and ranks into
+   (replicates, sites) shared outputs
+2. site chunks: each task reduces its columns of the outputs to quantiles
+
+Replicate r always draws from a generator seeded with (seed, r), so results
+do not depend on how the work is chunked or on the number of workers.
+"""
+from dataclasses import dataclass
+import time
+import numpy as np
+from .consensus import rank_from_scores
+
+ERROR_MODEL_KINDS = ('relative', 'absolute', 'poisson')
+
+
+@dataclass(frozen=True)
+class ErrorModel:
+    """Measurement error of one criterion"""
+    kind: str
+    scale: float
+
+
+def parse_error_models(spec: str, criteria: list) -> dict:
+    """
+    Parse a BOOTSTRAP_ERROR_MODELS value
+
+    Args:
+        spec: Comma-separated criterion=kind:scale pairs
+        criteria: Known criteria names
+
+    Returns:
+        Dictionary of criterion -> ErrorModel (criteria not listed are exact)
+    """
+    models = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        criterion, sep, model = item.partition('=')
+        kind, _, scale = model.partition(':')
+        criterion, kind = criterion.strip(), kind.strip().lower()
+        if not sep or criterion not in criteria:
+            raise ValueError(f"Invalid error model entry (expected criterion=kind:scale): {item}")
+        if kind not in ERROR_MODEL_KINDS:
+            raise ValueError(f"Unknown error model: {kind}. Supported: {list(ERROR_MODEL_KINDS)}")
+        try:
+            scale = float(scale) if scale.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid error model scale: {item}")
+        if scale < 0:
+            raise ValueError(f"Error model scale must be non-negative: {item}")
+        models[criterion] = ErrorModel(kind, scale)
+    return models
+
+
+def noise_arrays(models: dict, criteria: list) -> tuple:
+    """
+    Per-column (relative_sd, absolute_sd, poisson_columns) in matrix order
+
+    The arrays are what the pool tasks receive; ErrorModel stays on the
+    caller's side.
+    """
+    relative = np.zeros(len(criteria))
+    absolute = np.zeros(len(criteria))
+    poisson = []
+    for column, criterion in enumerate(criteria):
+        model = models.get(criterion)
+        if model is None:
+            continue
+        if model.kind == 'relative':
+            relative[column] = model.scale
+        elif model.kind == 'absolute':
+            absolute[column] = model.scale
+        else:
+            poisson.append(column)
+    return relative, absolute, np.array(poisson, dtype=np.int64)
+
+
+def perturb(columns: np.ndarray, relative: np.ndarray, absolute: np.ndarray,
+            poisson: np.ndarray, rng, out: np.ndarray) -> np.ndarray:
+    """
+    One noisy copy of a criterion-major (n_criteria, n_sites) matrix, into `out`
+
+    x' = x + z * (relative * x + absolute) with z ~ N(0, 1); poisson rows
+    are redrawn as Poisson(x). Values are clipped at 0 (every criterion is
+    a non-negative quantity).
+    """
+    noise = rng.standard_normal(columns.shape)
+    np.multiply(columns, relative[:, None], out=out)
+    out += absolute[:, None]
+    out *= noise
+    out += columns
+    if len(poisson):
+        out[poisson] = rng.poisson(np.maximum(columns[poisson], 0.0))
+    np.maximum(out, 0.0, out=out)
+    return out
+
+
+def score_replicates(algorithm_name: str, normalization: str, matrix_spec: dict,
+                     weights: np.ndarray, n_cost: int, noise: tuple, seed: int,
+                     start: int, stop: int, scores_spec: dict, ranks_spec: dict,
+                     batch_values: int, options: dict = None) -> float:
+    """
+    Process-pool entry point: score replicates [start, stop)
+
+    Replicates are built criterion-major, (batch, n_criteria, n_sites), and
+    scored through a (batch, n_sites, n_criteria) view: column reductions
+    then run over contiguous memory.
+
+    Args:
+        algorithm_name: Name registered in AlgorithmFactory
+        normalization: Normalization strategy name
+        matrix_spec: SharedArray.spec of the (n_sites, n_criteria) matrix
+        weights: Weight array in matrix column order
+        n_cost: Number of leading cost columns
+        noise: (relative, absolute, poisson) from noise_arrays
+        seed: Base seed; replicate r uses (seed, r)
+        start, stop: Replicate range of this task
+        scores_spec, ranks_spec: SharedArray.spec of the (replicates, n_sites)
+            float32 score and int32 rank outputs
+        batch_values: Matrix cells scored per vectorized batch
+        options: The algorithm's matrix_options for the matrix rows
+
+    Returns:
+        Execution time in milliseconds
+    """
+    from algorithms import AlgorithmFactory
+    from utils.shared_array import SharedArray
+
+    begin = time.perf_counter()
+    matrix = SharedArray.attach(matrix_spec)
+    scores = SharedArray.attach(scores_spec, readonly=False)
+    ranks = SharedArray.attach(ranks_spec, readonly=False)
+    try:
+        algo = AlgorithmFactory.create(algorithm_name, normalization=normalization)
+        relative, absolute, poisson = noise
+        columns = np.ascontiguousarray(matrix.array.T)
+        batch = max(1, batch_values // columns.size)
+        planes = np.empty((min(batch, stop - start),) + columns.shape)
+
+        for first in range(start, stop, batch):
+            last = min(first + batch, stop)
+            for offset, replicate in enumerate(range(first, last)):
+                perturb(columns, relative, absolute, poisson,
+                        np.random.default_rng((seed, replicate)), planes[offset])
+            stack = planes[:last - first].transpose(0, 2, 1)
+            batch_scores = algo.score_matrix_stack(stack, weights, n_cost, **(options or {}))
+            scores.array[first:last] = batch_scores
+            ranks.array[first:last] = rank_from_scores(batch_scores)
+    finally:
+        matrix.close()
+        scores.close()
+        ranks.close()
+
+    return round((time.perf_counter() - begin) * 1000, 2)
+
+
+def summarize_replicates(scores_spec: dict, ranks_spec: dict, start: int, stop: int,
+                         confidence: float, top_n: int) -> dict:
+    """
+    Process-pool entry point: interval bounds of sites [start, stop)
+
+    Returns:
+        Dictionary of (stop - start,) arrays: score_low, score_high,
+        score_mean, score_std, rank_low, rank_median, rank_high and
+        top_n_share (fraction of replicates ranking the site in the top N)
+    """
+    from utils.shared_array import SharedArray
+
+    scores = SharedArray.attach(scores_spec)
+    ranks = SharedArray.attach(ranks_spec)
+    try:
+        # Contiguous copies of the columns: quantiles sort along axis 0
+        site_scores = np.array(scores.array[:, start:stop], dtype=np.float64)
+        site_ranks = np.array(ranks.array[:, start:stop])
+    finally:
+        scores.close()
+        ranks.close()
+
+    alpha = (1 - confidence) / 2
+    score_low, score_high = np.quantile(site_scores, [alpha, 1 - alpha], axis=0)
+    # Rank bounds are observed ranks, not interpolated ones
+    rank_low, rank_median, rank_high = np.quantile(
+        site_ranks, [alpha, 0.5, 1 - alpha], axis=0, method='inverted_cdf')
+    return {
+        'score_low': score_low,
+        'score_high': score_high,
+        'score_mean': site_scores.mean(axis=0),
+        'score_std': site_scores.std(axis=0),
+        'rank_low': rank_low.astype(np.int64),
+        'rank_median': rank_median.astype(np.int64),
+        'rank_high': rank_high.astype(np.int64),
+        'top_n_share': (site_ranks <= top_n).mean(axis=0)
+    }
+
+
+def bootstrap_intervals(matrix: np.ndarray, algorithm_name: str, weights: np.ndarray,
+                        n_cost: int, noise: tuple, replicates: int, seed: int,
+                        executor, tasks: int, normalization: str = None,
+                        confidence: float = 0.95, top_n: int = 10,
+                        batch_values: int = 262144, options: dict = None) -> dict:
+    """
+    Score and rank intervals of every site over noisy replicates
+
+    Args:
+        matrix: (n_sites, n_criteria) decision matrix, cost criteria first
+        algorithm_name: Name registered in AlgorithmFactory
+        weights: Weight array in matrix column order
+        n_cost: Number of leading cost columns
+        noise: (relative, absolute, poisson) from noise_arrays
+        replicates: Number of perturbed matrices
+        seed: Base seed of the replicates
+        executor: Process pool running the tasks
+        tasks: Tasks per phase (a small multiple of the pool's workers)
+        normalization: Normalization strategy name
+        confidence: Two-sided interval coverage
+        top_n: Rank threshold of top_n_share
+        batch_values: Matrix cells scored per vectorized batch
+        options: The algorithm's matrix_options for the matrix rows
+
+    Returns:
+        Dictionary of (n_sites,) arrays (see summarize_replicates) plus
+        'scoring_ms' and 'summary_ms' wall times
+    """
+    from utils.shared_array import SharedArray
+
+    n_sites = len(matrix)
+    timings = {}
+    with SharedArray.from_array(np.asarray(matrix, dtype=np.float64)) as shared, \
+            SharedArray.empty((replicates, n_sites), np.float32) as scores, \
+            SharedArray.empty((replicates, n_sites), np.int32) as ranks:
+        start = time.perf_counter()
+        bounds = np.linspace(0, replicates, min(tasks, replicates) + 1).astype(int)
+        futures = [
+            executor.submit(score_replicates, algorithm_name, normalization, shared.spec,
+                            weights, n_cost, noise, seed, int(first), int(last),
+                            scores.spec, ranks.spec, batch_values, options)
+            for first, last in zip(bounds[:-1], bounds[1:])
+        ]
+        for future in futures:
+            future.result()
+        timings['scoring_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        start = time.perf_counter()
+        bounds = np.linspace(0, n_sites, min(tasks, n_sites) + 1).astype(int)
+        futures = [
+            executor.submit(summarize_replicates, scores.spec, ranks.spec,
+                            int(first), int(last), confidence, top_n)
+            for first, last in zip(bounds[:-1], bounds[1:])
+        ]
+        parts = [future.result() for future in futures]
+        timings['summary_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    result = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    result.update(timings)
+    return result
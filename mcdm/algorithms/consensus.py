@@ -0,0 +1,176 @@
+"""
+Consensus ranking: merge the rankings produced by several MCDM algorithms
+"""
+import numpy as np
+
+CONSENSUS_METHODS = ['borda', 'copeland', 'kemeny']
+
+
+def score_shared_matrix(algorithm_name: str, matrix_spec: dict,
+                        weights: np.ndarray, n_cost: int,
+                        normalization: str = None, stats=None,
+                        options: dict = None) -> tuple:
+    """
+    Process-pool entry point: score a decision matrix held in shared memory
+
+    Args:
+        algorithm_name: Name registered in AlgorithmFactory
+        matrix_spec: SharedArray.spec of the (n_sites, n_criteria) matrix
+        weights: Weight array in matrix column order
+        n_cost: Number of leading cost columns
+        normalization: Normalization strategy name
+        stats: ColumnStatistics of the matrix, computed once by the caller
+        options: The algorithm's matrix_options for the matrix rows
+
+    Returns:
+        Tuple (algorithm_name, scores, execution_time_ms)
+    """
+    import time
+    from algorithms import AlgorithmFactory
+    from utils.shared_array import SharedArray
+
+    start = time.perf_counter()
+    shared = SharedArray.attach(matrix_spec)
+    try:
+        algo = AlgorithmFactory.create(algorithm_name, normalization=normalization)
+        scores = np.array(algo.score_matrix(shared.array, weights, n_cost, stats, **(options or {})), dtype=np.float64)
+    finally:
+        shared.close()
+
+    return algorithm_name, scores, round((time.perf_counter() - start) * 1000, 2)
+
+
+def rank_from_scores(scores: np.ndarray) -> np.ndarray:
+    """
+    Competition ranks (1 = best, ties share the lowest rank) along the last axis
+
+    Matches pandas rank(ascending=False, method='min') used by the algorithms.
+    """
+    scores = np.atleast_2d(scores)
+    order = np.argsort(-scores, axis=-1, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=-1)
+
+    n = scores.shape[-1]
+    positions = np.broadcast_to(np.arange(n), scores.shape)
+    is_new = np.ones(scores.shape, dtype=bool)
+    is_new[:, 1:] = sorted_scores[:, 1:] != sorted_scores[:, :-1]
+    # Each element takes the position of the first element of its tie run
+    sorted_ranks = np.maximum.accumulate(np.where(is_new, positions, 0), axis=-1) + 1
+
+    ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=-1)
+    return ranks
+
+
+def borda(ranks: np.ndarray) -> np.ndarray:
+    """
+    Borda count: each method gives (n - rank) points to every site
+
+    Args:
+        ranks: (n_methods, n_sites) rank matrix
+
+    Returns:
+        (n_sites,) consensus scores, higher is better
+    """
+    n_sites = ranks.shape[1]
+    return (n_sites - ranks).sum(axis=0).astype(np.float64)
+
+
+def copeland(ranks: np.ndarray, block_cells: int = 1 << 22) -> np.ndarray:
+    """
+    Copeland: pairwise majority wins minus losses for every site
+
+    The majority relation compares every pair of sites, so time is
+    O(n_methods x n_sites^2); callers cap the number of sites (see
+    Config.CONSENSUS_COPELAND_MAX_SITES). Memory is bounded: pairs are
+    evaluated in row blocks of about `block_cells` pairs, one method at a
+    time, with a few bytes per pair.
+
+    Args:
+        ranks: (n_methods, n_sites) rank matrix
+        block_cells: Pairs (block rows x n_sites) evaluated at once
+
+    Returns:
+        (n_sites,) consensus scores, higher is better
+    """
+    n_methods, n_sites = ranks.shape
+    if n_methods > 127:
+        raise ValueError("Copeland consensus supports at most 127 methods")
+    scores = np.zeros(n_sites, dtype=np.float64)
+    block_size = max(1, block_cells // max(n_sites, 1))
+
+    for start in range(0, n_sites, block_size):
+        block = ranks[:, start:start + block_size]
+        # margin[b, j] = methods ranking block site b above site j minus
+        # methods ranking it below
+        margin = np.zeros((block.shape[1], n_sites), dtype=np.int8)
+        for k in range(n_methods):
+            margin += block[k][:, None] < ranks[k]
+            margin -= block[k][:, None] > ranks[k]
+        scores[start:start + block_size] = (margin > 0).sum(axis=1) - (margin < 0).sum(axis=1)
+
+    return scores
+
+
+def kemeny_approx(ranks: np.ndarray, max_passes: int = 50) -> np.ndarray:
+    """
+    Kemeny approximation: Borda order refined by local Kemenization
+
+    Starting from the Borda order, neighbouring sites are swapped whenever a
+    majority of methods prefers the lower one. Swaps are applied in
+    alternating odd/even passes so each pass is a single vectorized step.
+
+    Args:
+        ranks: (n_methods, n_sites) rank matrix
+        max_passes: Upper bound on odd/even passes
+
+    Returns:
+        (n_sites,) consensus scores, higher is better
+    """
+    n_sites = ranks.shape[1]
+    order = np.argsort(-borda(ranks), kind='stable')
+
+    for _ in range(max_passes):
+        swapped = False
+        for offset in (0, 1):
+            left = order[offset:n_sites - 1:2]
+            right = order[offset + 1:n_sites:2]
+            if len(right) == 0:
+                continue
+            left = left[:len(right)]
+            prefer_right = (ranks[:, right] < ranks[:, left]).sum(axis=0)
+            prefer_left = (ranks[:, left] < ranks[:, right]).sum(axis=0)
+            swap = prefer_right > prefer_left
+            if swap.any():
+                swapped = True
+                idx = np.arange(offset, offset + 2 * len(right), 2)[swap]
+                order[idx], order[idx + 1] = order[idx + 1], order[idx]
+        if not swapped:
+            break
+
+    scores = np.empty(n_sites, dtype=np.float64)
+    scores[order] = np.arange(n_sites, 0, -1)
+    return scores
+
+
+def aggregate(ranks: np.ndarray, method: str) -> np.ndarray:
+    """Dispatch to the requested consensus method"""
+    method = method.lower()
+    if method == 'borda':
+        return borda(ranks)
+    if method == 'copeland':
+        return copeland(ranks)
+    if method == 'kemeny':
+        return kemeny_approx(ranks)
+    raise ValueError(f"Unknown consensus method: {method}. Supported: {CONSENSUS_METHODS}")
+
+
+def kendall_tau(ranks_a: np.ndarray, ranks_b: np.ndarray) -> float:
+    """Kendall tau-b between two rankings (O(n log n) via SciPy)"""
+    from scipy.stats import kendalltau
+
+    if len(ranks_a) < 2:
+        return 1.0
+    tau = kendalltau(ranks_a, ranks_b).statistic
+    # Undefined when one ranking is constant (all sites tied)
+    return 0.0 if np.isnan(tau) else float(tau)
@@ -0,0 +1,279 @@
+import pandas as pd
+import numpy as np
+from config import Config
+from .base_algorithm import BaseAlgorithm
+from .topsis import TopsisAlgorithm
+from .normalization import safe_divide
+from .grouped import Segments, rank_within_groups
+
+
+class FuzzyTopsisAlgorithm(TopsisAlgorithm):
+    """
+    Fuzzy TOPSIS with triangular fuzzy numbers (l, m, u) per criterion
+
+    Estimated criteria (Config.FUZZY_CRITERIA) take their bounds from the
+    optional <criterion>_lower / <criterion>_upper columns of potential_site,
+    falling back to m * (1 -/+ Config.FUZZY_SPREAD). Other criteria are crisp
+    (l = m = u). All steps work on (n_sites, n_criteria, 3) arrays.
+    """
+
+    # Fuzzy ideals come from the bounds of the scored rows themselves
+    dominance_monotone = False
+    shardable = False
+
+    def __init__(self, normalization: str = None, spread: float = None):
+        if normalization not in (None, Config.DEFAULT_NORMALIZATION):
+            raise ValueError("Fuzzy TOPSIS uses its own linear fuzzy normalization")
+        super().__init__()
+        self.name = 'FUZZY_TOPSIS'
+        self.spread = Config.FUZZY_SPREAD if spread is None else spread
+
+    def required_columns(self, criteria: list) -> list:
+        """Criteria plus the stored bounds of the estimated criteria"""
+        columns = list(criteria)
+        for criterion in criteria:
+            if criterion in Config.FUZZY_CRITERIA:
+                columns += [criterion + '_lower', criterion + '_upper']
+        return columns
+
+    def analyze(self, data: pd.DataFrame, weights: dict,
+                cost_criteria: list, benefit_criteria: list) -> pd.DataFrame:
+        """
+        Run Fuzzy TOPSIS analysis
+        """
+
+        # Validate inputs
+        self.validate_inputs(data, weights, cost_criteria, benefit_criteria)
+
+        df = data.copy(deep=False)
+        all_criteria = cost_criteria + benefit_criteria
+
+        # Step 1: Build the triangular fuzzy decision matrix
+        fuzzy_matrix = self._build_fuzzy_matrix(df, all_criteria)
+        weights_array = np.array([weights[c] for c in all_criteria])
+
+        # Steps 2-6: Normalize, weight, fuzzy ideals and closeness
+        scores = self.score_fuzzy(fuzzy_matrix, weights_array, len(cost_criteria))
+
+        df['topsis_score'] = scores
+        df['rank_position'] = pd.Series(scores).rank(ascending=False, method='min').astype(int).to_numpy()
+
+        return df
+
+    def analyze_grouped(self, data: pd.DataFrame, weights: dict,
+                        cost_criteria: list, benefit_criteria: list,
+                        group_column: str) -> pd.DataFrame:
+        """
+        Run Fuzzy TOPSIS independently inside every group, in a single pass
+
+        The fuzzy column bounds (and with them normalization and ideal
+        points) are segment reductions over the group-sorted rows, so scores
+        match separate per-group runs.
+
+        Returns:
+            DataFrame sorted by group with 'topsis_score' and the rank
+            inside the group in 'rank_position'
+        """
+        self.validate_inputs(data, weights, cost_criteria, benefit_criteria)
+        if group_column not in data.columns:
+            raise ValueError(f"Group column not found in data: {group_column}")
+
+        all_criteria = cost_criteria + benefit_criteria
+        segments = Segments.from_groups(data[group_column].to_numpy())
+
+        df = data.iloc[segments.order].reset_index(drop=True)
+        fuzzy_matrix = self._build_fuzzy_matrix(df, all_criteria)
+        weights_array = np.array([weights[c] for c in all_criteria])
+
+        scores = self.score_fuzzy(fuzzy_matrix, weights_array, len(cost_criteria), segments)
+
+        df['topsis_score'] = scores
+        df['rank_position'] = rank_within_groups(scores, segments)
+
+        return df
+
+    def matrix_options(self, data: pd.DataFrame, criteria: list) -> dict:
+        """Criteria names and stored bounds, so matrix scoring fuzzifies as analyze() does"""
+        return {'criteria': list(criteria), 'bounds': self._stored_bounds(data, criteria)}
+
+    def score_matrix(self, matrix: np.ndarray, weights: np.ndarray,
+                     n_cost: int, stats=None, criteria: list = None,
+                     bounds: dict = None) -> np.ndarray:
+        """
+        Fuzzy TOPSIS for a crisp matrix, fuzzified as in analyze()
+
+        Args:
+            matrix: (n_sites, n_criteria) array, cost criteria first
+            weights: (n_criteria,) weight array in the same column order
+            n_cost: Number of leading cost columns
+            stats: Unused; fuzzy bounds come from the fuzzy matrix itself
+            criteria: Column names of `matrix`; only Config.FUZZY_CRITERIA
+                among them get (l, m, u) bounds
+            bounds: {criterion: (lower, upper)} stored bound arrays of the
+                same rows (see matrix_options); missing bounds use the spread
+        """
+        fuzzy_matrix = self._matrix_fuzzy(matrix, criteria, bounds)
+        return self.score_fuzzy(fuzzy_matrix, weights, n_cost)
+
+    def score_matrix_batch(self, matrix: np.ndarray, weights: np.ndarray,
+                           n_cost: int, stats=None, criteria: list = None,
+                           bounds: dict = None) -> np.ndarray:
+        """One weighting at a time over a single fuzzy matrix: the crisp TOPSIS batch kernel does not apply"""
+        fuzzy_matrix = self._matrix_fuzzy(matrix, criteria, bounds)
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        return np.column_stack([self.score_fuzzy(fuzzy_matrix, w, n_cost) for w in weights])
+
+    def score_matrix_stack(self, stack: np.ndarray, weights: np.ndarray,
+                           n_cost: int, **options) -> np.ndarray:
+        """One matrix at a time: the crisp TOPSIS stacked kernel does not apply"""
+        return BaseAlgorithm.score_matrix_stack(self, stack, weights, n_cost, **options)
+
+    def score_fuzzy(self, fuzzy_matrix: np.ndarray, weights: np.ndarray,
+                    n_cost: int, segments: Segments = None) -> np.ndarray:
+        """
+        Fuzzy TOPSIS closeness coefficients
+
+        Args:
+            fuzzy_matrix: (n_sites, n_criteria, 3) array of (l, m, u)
+            weights: (n_criteria,) crisp weights
+            n_cost: Number of leading cost columns
+            segments: Group segments of the (group-sorted) rows; column
+                bounds and ideal points are then per group
+
+        Returns:
+            (n_sites,) closeness coefficients, higher is better
+        """
+        # (3, n_criteria, n_sites) view: with the layout built by
+        # _allocate_planes every (criterion, vertex) row is contiguous
+        planes = fuzzy_matrix.transpose(2, 1, 0)
+        is_cost = (np.arange(planes.shape[1]) < n_cost)[:, None]
+        weights = np.asarray(weights, dtype=np.float64)[:, None]
+
+        # Column bounds as (n_criteria, 1), or (n_criteria, n_sites) with
+        # each site's group bounds
+        if segments is None:
+            col_min = planes[0].min(axis=1, keepdims=True)
+            col_max = planes[2].max(axis=1, keepdims=True)
+        else:
+            col_min = np.minimum.reduceat(planes[0], segments.starts, axis=1)[:, segments.group_index]
+            col_max = np.maximum.reduceat(planes[2], segments.starts, axis=1)[:, segments.group_index]
+
+        # Cost columns with values <= 0 are shifted to a minimum of 1 so the
+        # min l / x ratios stay finite
+        shift = np.where(is_cost & (col_min <= 0), 1.0 - col_min, 0.0)
+        col_min = col_min + shift
+        col_max = col_max + shift
+
+        # Step 2: Weighted linear fuzzy normalization
+        #   benefit: w * (l, m, u) / max u     cost: w * min l / (u, m, l)
+        weighted = self._normalize_fuzzy(planes, weights, n_cost, shift, col_min, col_max)
+
+        # Step 3: Fuzzy ideal points, read off the column bounds: the best
+        # vertex is max u (benefit) or min l (cost), the worst the opposite
+        benefit_scale = safe_divide(weights, col_max)
+        ideal_best = np.where(is_cost, weights, col_max * benefit_scale)
+        ideal_worst = np.where(is_cost, safe_divide(weights * col_min, col_max), col_min * benefit_scale)
+
+        # Step 4: Vertex distances summed over criteria
+        dist_to_best, dist_to_worst = self._vertex_distances(weighted, ideal_best, ideal_worst)
+
+        # Step 5: Closeness coefficient
+        return safe_divide(dist_to_worst, dist_to_best + dist_to_worst)
+
+    def _build_fuzzy_matrix(self, df: pd.DataFrame, criteria: list) -> np.ndarray:
+        """(l, m, u) per site and criterion from bound columns or the spread"""
+        middle = df[criteria].to_numpy(dtype=np.float64)
+        return self._fuzzy_matrix(middle, criteria, self._stored_bounds(df, criteria))
+
+    def _matrix_fuzzy(self, matrix: np.ndarray, criteria: list, bounds: dict) -> np.ndarray:
+        """Fuzzy matrix for the matrix-only entry points, which need the column names"""
+        if criteria is None:
+            raise ValueError(f"{self.name} matrix scoring needs the criteria names (see matrix_options)")
+        return self._fuzzy_matrix(np.asarray(matrix, dtype=np.float64), criteria, bounds or {})
+
+    def _fuzzy_matrix(self, middle: np.ndarray, criteria: list, bounds: dict) -> np.ndarray:
+        """(n_sites, n_criteria, 3) fuzzy matrix; only Config.FUZZY_CRITERIA are fuzzified"""
+        planes = self._allocate_planes(middle)
+
+        for j, criterion in enumerate(criteria):
+            if criterion not in Config.FUZZY_CRITERIA:
+                continue
+            values = planes[1, j]
+            lower, upper = bounds.get(criterion, (None, None))
+            # Keep l <= m <= u even when stored bounds are inconsistent
+            planes[0, j] = np.minimum(self._bound(lower, values * (1 - self.spread)), values)
+            planes[2, j] = np.maximum(self._bound(upper, values * (1 + self.spread)), values)
+
+        return planes.transpose(2, 1, 0)
+
+    def _stored_bounds(self, df: pd.DataFrame, criteria: list) -> dict:
+        """{criterion: (lower, upper)} stored bound columns (None where absent)"""
+        def stored(column):
+            if column not in df.columns:
+                return None
+            return df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        return {
+            criterion: (stored(criterion + '_lower'), stored(criterion + '_upper'))
+            for criterion in criteria if criterion in Config.FUZZY_CRITERIA
+        }
+
+    def _allocate_planes(self, middle: np.ndarray) -> np.ndarray:
+        """
+        Crisp (vertex, criterion, site) planes with l = m = u
+
+        score_fuzzy works on the (n_sites, n_criteria, 3) transpose of this
+        array; keeping each criterion's vertex values contiguous over sites
+        makes its column reductions and sums over criteria fast row operations.
+        """
+        planes = np.empty((3,) + middle.T.shape)
+        planes[:] = middle.T
+        return planes
+
+    def _bound(self, stored: np.ndarray, default: np.ndarray) -> np.ndarray:
+        """Stored bound values where present and non-NULL, else `default`"""
+        if stored is None:
+            return default
+        return np.where(np.isnan(stored), default, stored)
+
+    def _normalize_fuzzy(self, planes: np.ndarray, weights: np.ndarray,
+                         n_cost: int, shift: np.ndarray,
+                         col_min: np.ndarray, col_max: np.ndarray) -> np.ndarray:
+        """
+        Weighted normalized (3, n_criteria, n_sites) planes, one pass per part
+
+        weights, shift and the bounds are (n_criteria, 1) columns, or
+        (n_criteria, n_sites) for per-group bounds.
+        """
+        weighted = np.empty(planes.shape)
+
+        np.multiply(planes[:, n_cost:, :],
+                    safe_divide(weights, col_max)[n_cost:],
+                    out=weighted[:, n_cost:, :])
+
+        if n_cost > 0:
+            # Reversed vertex order keeps l <= m <= u after inversion
+            cost = planes[::-1, :n_cost, :]
+            if shift.any():
+                cost = cost + shift[:n_cost]
+            np.divide((weights * col_min)[:n_cost], cost, out=weighted[:, :n_cost, :])
+
+        return weighted
+
+    def _vertex_distances(self, weighted: np.ndarray, ideal_best: np.ndarray,
+                          ideal_worst: np.ndarray) -> tuple:
+        """
+        sum_j sqrt(mean_k (v_ijk - ideal_j)^2) for both ideal points
+
+        Uses mean_k (v_k - a)^2 = (mean_v - a)^2 + var_v, so the vertex
+        mean and variance are computed once and shared by both ideals.
+        """
+        mean = weighted.sum(axis=0) / 3.0
+        deviation = weighted - mean
+        variance = np.einsum('kjn,kjn->jn', deviation, deviation) / 3.0
+
+        def distance(ideal):
+            gap = mean - ideal
+            return np.sqrt(gap * gap + variance).sum(axis=0)
+
+        return distance(ideal_best), distance(ideal_worst)
@@ -0,0 +1,117 @@
+"""
+Sorted-segment helpers for running an algorithm per group in a single pass
+
+Rows are sorted by group once; every per-group reduction is then a single
+np.<ufunc>.reduceat call over the contiguous segments, with no Python loop
+over groups.
+"""
+from dataclasses import dataclass
+import numpy as np
+from .normalization import ColumnStatistics, shift_for_log
+
+
+@dataclass
+class Segments:
+    """Row order and segment boundaries of a matrix sorted by group"""
+    order: np.ndarray        # permutation that sorts rows by group
+    starts: np.ndarray       # (n_groups,) first sorted row of each group
+    counts: np.ndarray       # (n_groups,) rows per group
+    keys: np.ndarray         # (n_groups,) group value of each segment
+    group_index: np.ndarray  # (n_rows,) segment number of each sorted row
+
+    @classmethod
+    def from_groups(cls, groups: np.ndarray) -> 'Segments':
+        groups = np.asarray(groups)
+        order = np.argsort(groups, kind='stable')
+        sorted_groups = groups[order]
+
+        is_start = np.ones(len(sorted_groups), dtype=bool)
+        is_start[1:] = sorted_groups[1:] != sorted_groups[:-1]
+        starts = np.flatnonzero(is_start)
+
+        return cls(
+            order=order,
+            starts=starts,
+            counts=np.diff(np.append(starts, len(sorted_groups))),
+            keys=sorted_groups[starts],
+            group_index=np.cumsum(is_start) - 1
+        )
+
+
+def segment_statistics(sorted_matrix: np.ndarray, segments: Segments) -> ColumnStatistics:
+    """
+    ColumnStatistics per group, as (n_groups, n_criteria) arrays
+
+    Every strategy in normalization.py works elementwise, so these arrays
+    can be passed to Normalization.normalize either as they are (one row per
+    group) or indexed by Segments.group_index (one row per site).
+    """
+    starts = segments.starts
+    sorted_matrix = np.asarray(sorted_matrix, dtype=np.float64)
+
+    col_min = np.minimum.reduceat(sorted_matrix, starts, axis=0)
+    log_shift = shift_for_log(col_min)
+
+    return ColumnStatistics(
+        count=segments.counts[:, None],
+        sum=np.add.reduceat(sorted_matrix, starts, axis=0),
+        sum_sq=np.add.reduceat(sorted_matrix * sorted_matrix, starts, axis=0),
+        min=col_min,
+        max=np.maximum.reduceat(sorted_matrix, starts, axis=0),
+        log_shift=log_shift,
+        sum_log=np.add.reduceat(np.log(sorted_matrix + log_shift[segments.group_index]), starts, axis=0)
+    )
+
+
+def expand_statistics(stats: ColumnStatistics, group_index: np.ndarray) -> ColumnStatistics:
+    """Per-row view of per-group statistics (row i gets its group's values)"""
+    return ColumnStatistics(
+        count=stats.count[group_index],
+        sum=stats.sum[group_index],
+        sum_sq=stats.sum_sq[group_index],
+        min=stats.min[group_index],
+        max=stats.max[group_index],
+        log_shift=stats.log_shift[group_index],
+        sum_log=stats.sum_log[group_index]
+    )
+
+
+def rank_within_groups(sorted_scores: np.ndarray, segments: Segments) -> np.ndarray:
+    """
+    Competition rank (1 = best, ties share the lowest rank) inside each group
+
+    Args:
+        sorted_scores: Scores of the rows in group-sorted order
+        segments: Segments of those rows
+
+    Returns:
+        (n_rows,) ranks in the same group-sorted order
+    """
+    n = len(sorted_scores)
+    group_index = segments.group_index
+
+    # Order by (group, score descending); groups are already contiguous
+    order = np.lexsort((-sorted_scores, group_index))
+    scores = sorted_scores[order]
+    groups = group_index[order]
+
+    is_new = np.ones(n, dtype=bool)
+    is_new[1:] = (scores[1:] != scores[:-1]) | (groups[1:] != groups[:-1])
+    run_start = np.maximum.accumulate(np.where(is_new, np.arange(n), 0))
+
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order] = run_start - segments.starts[groups] + 1
+    return ranks
+
+
+def top_n_mask(sorted_ranks: np.ndarray, segments: Segments, top_n: int) -> np.ndarray:
+    """
+    Boolean mask of the best `top_n` rows of each group (ties broken by position)
+    """
+    n = len(sorted_ranks)
+    order = np.lexsort((sorted_ranks, segments.group_index))
+    position = np.arange(n) - segments.starts[segments.group_index[order]]
+
+    mask = np.empty(n, dtype=bool)
+    mask[order] = position < top_n
+    return mask
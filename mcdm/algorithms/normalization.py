@@ -0,0 +1,332 @@
+"""
+Normalization strategies shared by all MCDM algorithms
+
+Every strategy works from per-column statistics (ColumnStatistics) instead of
+reducing the matrix itself, so statistics computed once for a given site-data
+version can be reused by repeated analyses and by multi-strategy runs.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from config import Config
+import threading
+import numpy as np
+
+
+# eq=False: compared by identity (array fields have no truth value), which
+# also lets instances sit in DataFrame.attrs
+@dataclass(eq=False)
+class ColumnStatistics:
+    """Per-column sufficient statistics of a decision matrix"""
+    count: int
+    sum: np.ndarray
+    sum_sq: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    # Sum of ln(x + log_shift); the shift is 0 for columns with min >= 1 and
+    # (1 - min) otherwise (see log_shift), so every logarithm is >= 0
+    log_shift: np.ndarray
+    sum_log: np.ndarray
+    # Objective weighting (weighting.py): sum of y ln(y) with y = x + xlog_shift
+    # (entropy; 0 ln 0 = 0, the shift is 0 unless a column has negative
+    # values, see shift_for_entropy) and the cross products sum(x_j * x_k)
+    # (correlations). Only from_matrix and merge fill them; None elsewhere
+    sum_xlog: np.ndarray = None
+    xlog_shift: np.ndarray = None
+    cross: np.ndarray = None
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray) -> 'ColumnStatistics':
+        """Compute all statistics of an (n_sites, n_criteria) matrix"""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        col_min = matrix.min(axis=0)
+        log_shift = shift_for_log(col_min)
+        logs = np.log(matrix + log_shift)
+        xlog_shift = shift_for_entropy(col_min)
+        return cls(
+            count=matrix.shape[0],
+            sum=matrix.sum(axis=0),
+            sum_sq=np.einsum('ij,ij->j', matrix, matrix),
+            min=col_min,
+            max=matrix.max(axis=0),
+            log_shift=log_shift,
+            sum_log=logs.sum(axis=0),
+            sum_xlog=_sum_xlogx(matrix, col_min, xlog_shift, logs),
+            xlog_shift=xlog_shift,
+            cross=matrix.T @ matrix
+        )
+
+    @classmethod
+    def from_stack(cls, stack: np.ndarray, logs: bool = True) -> 'ColumnStatistics':
+        """
+        Statistics of every matrix in a (n_matrices, n_sites, n_criteria) stack
+
+        Arrays have shape (n_matrices, 1, n_criteria), so normalizing the
+        stack broadcasts each matrix against its own statistics. With
+        logs=False the (costly) log-sums are left NaN, which only the
+        logarithmic normalization reads.
+        """
+        stack = np.asarray(stack, dtype=np.float64)
+        col_min = stack.min(axis=1, keepdims=True)
+        log_shift = shift_for_log(col_min)
+        sum_log = np.log(stack + log_shift).sum(axis=1, keepdims=True) if logs \
+            else np.full(col_min.shape, np.nan)
+        return cls(
+            count=stack.shape[1],
+            sum=stack.sum(axis=1, keepdims=True),
+            sum_sq=np.einsum('bij,bij->bj', stack, stack)[:, None, :],
+            min=col_min,
+            max=stack.max(axis=1, keepdims=True),
+            log_shift=log_shift,
+            sum_log=sum_log
+        )
+
+    @classmethod
+    def merge(cls, parts: list) -> 'ColumnStatistics':
+        """Combine statistics of disjoint row sets (e.g. shards or chunks)"""
+        parts = [p for p in parts if p.count > 0]
+        if not parts:
+            raise ValueError("Cannot merge empty statistics")
+        # Log-sums only add up when every part used the same shift
+        log_shift = parts[0].log_shift
+        same_shift = np.all([p.log_shift == log_shift for p in parts], axis=0)
+        complete = all(p.sum_xlog is not None and p.cross is not None for p in parts)
+        if complete:
+            xlog_shift = parts[0].xlog_shift
+            same_xlog_shift = np.all([p.xlog_shift == xlog_shift for p in parts], axis=0)
+        return cls(
+            count=sum(p.count for p in parts),
+            sum=np.sum([p.sum for p in parts], axis=0),
+            sum_sq=np.sum([p.sum_sq for p in parts], axis=0),
+            min=np.min([p.min for p in parts], axis=0),
+            max=np.max([p.max for p in parts], axis=0),
+            log_shift=log_shift,
+            sum_log=np.where(same_shift, np.sum([p.sum_log for p in parts], axis=0), np.nan),
+            sum_xlog=np.where(same_xlog_shift, np.sum([p.sum_xlog for p in parts], axis=0), np.nan)
+            if complete else None,
+            xlog_shift=xlog_shift if complete else None,
+            cross=np.sum([p.cross for p in parts], axis=0) if complete else None
+        )
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.sum / self.count
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation"""
+        variance = self.sum_sq / self.count - self.mean ** 2
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    @property
+    def norm(self) -> np.ndarray:
+        """Euclidean column norm"""
+        return np.sqrt(self.sum_sq)
+
+    @property
+    def correlation(self) -> np.ndarray:
+        """Pearson correlation matrix of the columns (0 against a constant column)"""
+        covariance = self.cross / self.count - np.outer(self.mean, self.mean)
+        return np.clip(safe_divide(covariance, np.outer(self.std, self.std)), -1.0, 1.0)
+
+
+def shift_for_log(col_min: np.ndarray) -> np.ndarray:
+    """
+    Per-column shift moving every value to >= 1
+
+    Logarithms of the shifted values are then >= 0, so ln(y) / sum(ln y) is
+    increasing in y and bounded by 1; the sum is 0 only for a constant column.
+    """
+    return np.where(col_min >= 1, 0.0, 1.0 - col_min)
+
+
+def shift_for_entropy(col_min: np.ndarray) -> np.ndarray:
+    """
+    Per-column shift making every value >= 0 for entropy shares
+
+    0 for non-negative columns, so their shares are the plain x / sum(x);
+    only columns with negative values are moved to a minimum of 0.
+    """
+    return np.where(col_min >= 0, 0.0, -col_min)
+
+
+def _sum_xlogx(matrix: np.ndarray, col_min: np.ndarray, xlog_shift: np.ndarray,
+               logs: np.ndarray) -> np.ndarray:
+    """
+    Column sums of y ln(y), y = x + xlog_shift, with 0 ln 0 = 0
+
+    Columns with min >= 1 reuse `logs` (their log_shift is 0 as well).
+    """
+    result = np.einsum('ij,ij->j', matrix, logs)
+    redo = np.flatnonzero(col_min < 1)
+    if len(redo):
+        values = matrix[:, redo] + xlog_shift[redo]
+        values_log = np.log(values, out=np.zeros_like(values), where=values > 0)
+        result[redo] = np.einsum('ij,ij->j', values, values_log)
+    return result
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Divide column-wise; degenerate (zero) denominators give 0 instead of inf/NaN"""
+    denominator = np.asarray(denominator, dtype=np.float64)
+    safe = np.where(denominator != 0, denominator, 1.0)
+    return np.where(denominator != 0, numerator / safe, 0.0)
+
+
+class Normalization(ABC):
+    """Base class of normalization strategies (all monotone increasing per column)"""
+
+    name = None
+
+    @abstractmethod
+    def normalize(self, matrix: np.ndarray, stats: ColumnStatistics) -> np.ndarray:
+        """Normalized values of `matrix` (or of a row of it) given its column statistics"""
+
+    def scale(self, stats: ColumnStatistics):
+        """
+        Per-column divisor for strategies of the form (x - offset) / scale
+
+        Differences of normalized values then only depend on the scale.
+        None for strategies that are not affine per column.
+        """
+        return None
+
+
+class VectorNormalization(Normalization):
+    """x / ||x||"""
+
+    name = 'vector'
+
+    def normalize(self, matrix, stats):
+        return safe_divide(matrix, stats.norm)
+
+    def scale(self, stats):
+        return stats.norm
+
+
+class MinMaxNormalization(Normalization):
+    """(x - min) / (max - min)"""
+
+    name = 'minmax'
+
+    def normalize(self, matrix, stats):
+        return safe_divide(matrix - stats.min, stats.max - stats.min)
+
+    def scale(self, stats):
+        return stats.max - stats.min
+
+
+class ZScoreNormalization(Normalization):
+    """(x - mean) / std"""
+
+    name = 'zscore'
+
+    def normalize(self, matrix, stats):
+        return safe_divide(matrix - stats.mean, stats.std)
+
+    def scale(self, stats):
+        return stats.std
+
+
+class MaxNormalization(Normalization):
+    """x / max|x|"""
+
+    name = 'max'
+
+    def normalize(self, matrix, stats):
+        return safe_divide(matrix, self.scale(stats))
+
+    def scale(self, stats):
+        return np.maximum(np.abs(stats.min), np.abs(stats.max))
+
+
+class LogarithmicNormalization(Normalization):
+    """
+    ln(x) / ln(prod x)
+
+    Columns with values below 1 are shifted by ColumnStatistics.log_shift
+    first; without the shift, logarithms of values in (0, 1) are negative and
+    dividing by a negative (or near-zero) sum would invert (or blow up) the
+    column, breaking the increasing order the ideal points rely on.
+    """
+
+    name = 'log'
+
+    def normalize(self, matrix, stats):
+        if np.isnan(stats.sum_log).any():
+            raise ValueError("Logarithmic normalization is undefined for merged "
+                             "statistics with differently shifted columns")
+        shifted = np.maximum(matrix + stats.log_shift, np.finfo(np.float64).tiny)
+        return safe_divide(np.log(shifted), stats.sum_log)
+
+
+NORMALIZATIONS = {
+    strategy.name: strategy
+    for strategy in (
+        VectorNormalization(),
+        MinMaxNormalization(),
+        ZScoreNormalization(),
+        MaxNormalization(),
+        LogarithmicNormalization(),
+    )
+}
+
+
+def get_normalization(name: str) -> Normalization:
+    """Look up a normalization strategy by name"""
+    name = (name or 'vector').lower()
+    if name not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization: {name}. Supported: {list(NORMALIZATIONS)}")
+    return NORMALIZATIONS[name]
+
+
+class StatisticsCache:
+    """
+    LRU cache of ColumnStatistics keyed by (site-data version, criteria)
+
+    A new data version naturally misses the cache; old versions age out.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, data_version, criteria: list,
+                       matrix: np.ndarray) -> ColumnStatistics:
+        """
+        Return cached statistics, computing them from `matrix` on a miss
+
+        Args:
+            data_version: Version token of the site data (None disables caching)
+            criteria: Column names of `matrix`, in order
+            matrix: Decision matrix the statistics describe
+        """
+        if data_version is None:
+            return ColumnStatistics.from_matrix(matrix)
+
+        key = (data_version, tuple(criteria))
+        with self._lock:
+            stats = self._entries.get(key)
+            if stats is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return stats
+            self.misses += 1
+
+        stats = ColumnStatistics.from_matrix(matrix)
+
+        with self._lock:
+            self._entries[key] = stats
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+statistics_cache = StatisticsCache(max_entries=Config.COLUMN_STATS_CACHE_SIZE)
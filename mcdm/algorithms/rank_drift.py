@@ -0,0 +1,126 @@
+"""
+Rank drift between two analysis batches
+
+Each batch is held as arrays sorted by site_id (BatchRanking); the sites
+present in both are aligned with one merge (np.intersect1d) and every
+statistic is a vectorized pass over the aligned arrays.
+"""
+import numpy as np
+from .consensus import kendall_tau, rank_from_scores
+
+
+class BatchRanking:
+    """
+    Scores and competition ranks of one batch, sorted by site_id
+
+    Args:
+        site_ids: (n,) site id of every result
+        scores: (n,) score of every result, higher is better
+    """
+
+    def __init__(self, site_ids, scores):
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(site_ids, kind='stable')
+        self.site_ids = site_ids[order]
+        self.scores = scores[order]
+        self.ranks = rank_from_scores(self.scores)[0] if len(scores) else np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.site_ids)
+
+    def top(self, n: int) -> np.ndarray:
+        """Site ids ranked n or better (ties at rank n included)"""
+        return self.site_ids[self.ranks <= n]
+
+
+def _movers(order: np.ndarray, base: BatchRanking, target: BatchRanking,
+            base_positions: np.ndarray, target_positions: np.ndarray) -> dict:
+    """{field: array} of the aligned sites at `order`"""
+    b, t = base_positions[order], target_positions[order]
+    return {
+        'site_id': base.site_ids[b],
+        'base_rank': base.ranks[b],
+        'target_rank': target.ranks[t],
+        'rank_change': base.ranks[b] - target.ranks[t],
+        'base_score': np.round(base.scores[b], 4),
+        'target_score': np.round(target.scores[t], 4)
+    }
+
+
+def compare_rankings(base: BatchRanking, target: BatchRanking,
+                     top_n: int = 10, limit: int = 10) -> dict:
+    """
+    Rank changes from `base` to `target`
+
+    Ranks are the competition ranks within each whole batch; rank_change is
+    base_rank - target_rank, so positive values moved up. Correlations are
+    over the sites present in both batches.
+
+    Args:
+        base: Earlier (reference) batch
+        target: Later batch
+        top_n: Cut-off of the top-N overlap
+        limit: Number of biggest climbers and fallers to list
+
+    Returns:
+        Dictionary of statistics; 'climbers', 'fallers', 'entered_top_n'
+        and 'left_top_n' hold {field: array} columns
+    """
+    common, base_positions, target_positions = np.intersect1d(
+        base.site_ids, target.site_ids, assume_unique=True, return_indices=True)
+
+    change = base.ranks[base_positions] - target.ranks[target_positions]
+    magnitude = np.abs(change)
+
+    if len(common) >= 2:
+        from scipy.stats import spearmanr
+        spearman = spearmanr(base.scores[base_positions], target.scores[target_positions]).statistic
+        spearman = 0.0 if np.isnan(spearman) else float(spearman)
+        tau = kendall_tau(base.scores[base_positions], target.scores[target_positions])
+    else:
+        spearman = tau = 1.0
+
+    # Biggest movers: partial selection, then a sort of the selected few
+    # (ties broken by site_id, as the aligned arrays are sorted by it)
+    k = min(limit, len(common))
+    climbers = fallers = np.zeros(0, dtype=np.int64)
+    if k > 0:
+        up = np.argpartition(-change, k - 1)[:k]
+        climbers = up[np.lexsort((up, -change[up]))]
+        climbers = climbers[change[climbers] > 0]
+        down = np.argpartition(change, k - 1)[:k]
+        fallers = down[np.lexsort((down, change[down]))]
+        fallers = fallers[change[fallers] < 0]
+
+    base_top, target_top = base.top(top_n), target.top(top_n)
+    overlap = np.intersect1d(base_top, target_top, assume_unique=True)
+    union = len(base_top) + len(target_top) - len(overlap)
+    entered = np.setdiff1d(target_top, base_top, assume_unique=True)
+    left = np.setdiff1d(base_top, target_top, assume_unique=True)
+
+    return {
+        'common_sites': len(common),
+        'only_in_base': len(base) - len(common),
+        'only_in_target': len(target) - len(common),
+        'kendall_tau': round(tau, 6),
+        'spearman': round(spearman, 6),
+        'rank_change': {
+            'sites_moved': int(np.count_nonzero(change)),
+            'mean_abs': round(float(magnitude.mean()), 3) if len(common) else 0.0,
+            'median_abs': round(float(np.median(magnitude)), 1) if len(common) else 0.0,
+            'p90_abs': round(float(np.percentile(magnitude, 90)), 1) if len(common) else 0.0,
+            'max_abs': int(magnitude.max()) if len(common) else 0
+        },
+        'top_n': {
+            'n': top_n,
+            'overlap': len(overlap),
+            'jaccard': round(len(overlap) / union, 4) if union else 1.0
+        },
+        'entered_top_n': entered[np.argsort(target.ranks[np.searchsorted(target.site_ids, entered)],
+                                            kind='stable')][:limit],
+        'left_top_n': left[np.argsort(base.ranks[np.searchsorted(base.site_ids, left)],
+                                      kind='stable')][:limit],
+        'climbers': _movers(climbers, base, target, base_positions, target_positions),
+        'fallers': _movers(fallers, base, target, base_positions, target_positions)
+    }
@@ -0,0 +1,130 @@
+"""
+Scoring sites that live in several shards as one global ranking
+
+Column statistics are additive (see ColumnStatistics.merge), so every shard
+reduces its own matrix, the parts are merged into the global statistics and
+each shard is scored against them. For algorithms whose scores depend on
+the data only through those statistics (BaseAlgorithm.shardable) this gives
+the same scores as one run over all sites. Global ranks are counted over
+the per-shard sorted scores, and the global top k is a heap merge of the
+per-shard top k lists.
+"""
+import heapq
+from itertools import islice
+import numpy as np
+import pandas as pd
+from .normalization import ColumnStatistics
+
+
+def shard_statistics(frames: list, criteria: list, executor) -> ColumnStatistics:
+    """
+    Global column statistics of several site frames, reduced in parallel
+
+    Args:
+        frames: Site DataFrames, one per shard (empty frames are skipped)
+        criteria: Criteria columns in matrix order
+        executor: concurrent.futures executor running the per-shard reductions
+
+    Returns:
+        Merged ColumnStatistics
+    """
+    parts = executor.map(
+        lambda df: ColumnStatistics.from_matrix(df[criteria].to_numpy(dtype=np.float64)),
+        [df for df in frames if len(df)]
+    )
+    return ColumnStatistics.merge(list(parts))
+
+
+def global_ranks(shard_scores: list) -> list:
+    """
+    Competition ranks (1 = best) of every score among all shards' scores
+
+    Args:
+        shard_scores: (n_i,) score arrays, one per shard
+
+    Returns:
+        List of (n_i,) int arrays, matching rank(method='min') over the
+        concatenated scores
+    """
+    ascending = [np.sort(scores) for scores in shard_scores]
+    ranks = []
+    for scores in shard_scores:
+        above = np.zeros(len(scores), dtype=np.int64)
+        for other in ascending:
+            above += len(other) - np.searchsorted(other, scores, side='right')
+        ranks.append(above + 1)
+    return ranks
+
+
+def merge_top_k(shard_scores: list, shard_ids: list, k: int) -> list:
+    """
+    The k best results over all shards
+
+    Each shard contributes its own top k in (score descending, site id)
+    order; heapq.merge then reads the lists lazily, so only k entries of the
+    merged stream are produced.
+
+    Args:
+        shard_scores: (n_i,) score arrays, one per shard
+        shard_ids: (n_i,) site id arrays in the same order
+        k: Number of results
+
+    Returns:
+        List of (shard_index, row_position) pairs, best first
+    """
+    streams = []
+    for index, (scores, ids) in enumerate(zip(shard_scores, shard_ids)):
+        scores = np.asarray(scores)
+        ids = np.asarray(ids)
+        if len(scores) > k:
+            # Unordered top k first, then sort just those
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            threshold = scores[candidates].min()
+            # Ties at the threshold: keep every tied row so the id order holds
+            candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.lexsort((ids[candidates], -scores[candidates]))][:k]
+        streams.append([(-float(scores[row]), int(ids[row]), index, int(row)) for row in order])
+
+    merged = heapq.merge(*streams)
+    return [(index, row) for _, _, index, row in islice(merged, k)]
+
+
+def score_shards(frames: list, algo, weights: dict, cost_criteria: list,
+                 benefit_criteria: list, executor) -> tuple:
+    """
+    Score every shard against the global statistics, in parallel
+
+    Args:
+        frames: Site DataFrames, one per shard
+        algo: Algorithm with shardable = True
+        weights: Criterion weights
+        cost_criteria: Cost criterion names
+        benefit_criteria: Benefit criterion names
+        executor: concurrent.futures executor running the per-shard steps
+
+    Returns:
+        Tuple (list of result DataFrames whose rank_position is the global
+        rank, global ColumnStatistics)
+    """
+    if not algo.shardable:
+        raise ValueError(f"{algo.name} does not support sharded analysis")
+
+    all_criteria = cost_criteria + benefit_criteria
+    stats = shard_statistics(frames, all_criteria, executor)
+
+    def score(df: pd.DataFrame) -> pd.DataFrame:
+        if len(df) == 0:
+            return df.assign(topsis_score=pd.Series(dtype=float), rank_position=pd.Series(dtype=int))
+        df = df.copy()
+        df.attrs['column_stats'] = (tuple(all_criteria), stats)
+        return algo.analyze(df, weights, cost_criteria, benefit_criteria)
+
+    results = list(executor.map(score, frames))
+
+    ranks = global_ranks([df['topsis_score'].to_numpy() for df in results])
+    for df, rank in zip(results, ranks):
+        df['rank_position'] = rank
+
+    return results, stats
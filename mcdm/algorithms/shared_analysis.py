@@ -0,0 +1,64 @@
+"""
+Whole-algorithm analyses on the compute pool (see utils/compute_pool.py)
+
+The request thread ships the columns the algorithm reads as one float64
+matrix in shared memory; the worker rebuilds a DataFrame from it, runs
+analyze / analyze_grouped and returns only the score and rank arrays.
+"""
+import time
+import numpy as np
+
+# Row number of each site in the shipped matrix: analyze_grouped reorders
+# rows, and the caller maps the results back through it
+POSITION_COLUMN = '_position'
+
+
+def analyze_shared(algorithm_name: str, normalization: str, columns: list,
+                   matrix_spec: dict, weights: dict, cost_criteria: list,
+                   benefit_criteria: list, attrs: dict = None,
+                   group_by: str = None) -> tuple:
+    """
+    Process-pool entry point: analyze a site matrix held in shared memory
+
+    Args:
+        algorithm_name: Name registered in AlgorithmFactory
+        normalization: Normalization strategy name
+        columns: Column names of the (n_sites, n_columns) matrix
+        matrix_spec: SharedArray.spec of the matrix
+        weights: Dictionary of weights for each criterion
+        cost_criteria: Cost criterion names
+        benefit_criteria: Benefit criterion names
+        attrs: DataFrame attrs of the loaded sites (data_version keys the
+            worker's column statistics cache, column_stats carries the
+            statistics of a pre-filtered subset)
+        group_by: Rank inside each group of this column (analyze_grouped)
+
+    Returns:
+        Tuple (positions, scores, ranks, execution_time_ms); positions is
+        the matrix row of every result row, None when rows keep their order
+    """
+    import pandas as pd
+    from algorithms import AlgorithmFactory
+    from utils.shared_array import SharedArray
+
+    start = time.perf_counter()
+    shared = SharedArray.attach(matrix_spec)
+    try:
+        data = pd.DataFrame(shared.array.copy(), columns=columns)
+    finally:
+        shared.close()
+    data.attrs.update(attrs or {})
+
+    algo = AlgorithmFactory.create(algorithm_name, normalization=normalization)
+    positions = None
+    if group_by is None:
+        results = algo.analyze(data, weights, cost_criteria, benefit_criteria)
+    else:
+        data[POSITION_COLUMN] = np.arange(len(data))
+        results = algo.analyze_grouped(data, weights, cost_criteria, benefit_criteria, group_by)
+        positions = results[POSITION_COLUMN].to_numpy()
+
+    return (positions,
+            results['topsis_score'].to_numpy(dtype=np.float64),
+            results['rank_position'].to_numpy(),
+            round((time.perf_counter() - start) * 1000, 2))
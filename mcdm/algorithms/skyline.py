@@ -0,0 +1,150 @@
+"""
+Pareto skyline / k-skyband pre-filter (Sort-Filter-Skyline)
+
+A site dominates another when it is at least as good on every criterion and
+strictly better on one. With non-negative weights, TOPSIS (under any of the
+strategies in normalization.py, with ideals taken from the full data) is
+monotone under dominance, so a site dominated by k or more others can never
+be in the top k. The k-skyband (sites dominated by fewer than k others)
+therefore keeps every possible top-k site; k = 1 is the skyline.
+"""
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 256
+
+
+def _oriented(matrix: np.ndarray, n_cost: int) -> np.ndarray:
+    """Copy of the matrix where smaller is better on every column"""
+    oriented = np.array(matrix, dtype=np.float64)
+    oriented[:, n_cost:] *= -1
+    return oriented
+
+
+def _sort_key(oriented: np.ndarray) -> np.ndarray:
+    """
+    Strictly monotone score (sum of min-max scaled columns)
+
+    If a dominates b then key(a) < key(b), so after sorting by the key a site
+    can only be dominated by sites before it.
+    """
+    low = oriented.min(axis=0)
+    span = oriented.max(axis=0) - low
+    span[span == 0] = 1.0
+    return ((oriented - low) / span).sum(axis=1)
+
+
+def _dominator_counts(window: np.ndarray, candidates: np.ndarray,
+                      limit: int, block_size: int) -> np.ndarray:
+    """
+    Number of rows of `window` dominating each candidate, counted up to `limit`
+
+    The window is scanned in blocks, best first; candidates that reach the
+    limit drop out of the remaining comparisons.
+    """
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    alive = np.arange(len(candidates))
+
+    for start in range(0, len(window), block_size):
+        if len(alive) == 0:
+            break
+        block = window[start:start + block_size]
+        targets = candidates[alive]
+
+        # (block, alive) dominance matrix, one criterion at a time
+        not_worse = np.ones((len(block), len(alive)), dtype=bool)
+        better = np.zeros((len(block), len(alive)), dtype=bool)
+        for j in range(window.shape[1]):
+            column = block[:, j, None]
+            target = targets[None, :, j]
+            not_worse &= column <= target
+            better |= column < target
+
+        counts[alive] += (not_worse & better).sum(axis=0)
+        alive = alive[counts[alive] < limit]
+
+    return counts
+
+
+def skyband_mask(matrix: np.ndarray, n_cost: int, k: int = 1,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_fraction: float = None) -> np.ndarray:
+    """
+    Boolean mask of the k-skyband (sites dominated by fewer than k sites)
+
+    Sort-Filter-Skyline: sites are visited in order of a monotone score in
+    blocks; each block is checked against the skyband found so far and then
+    against itself, with vectorized dominance tests.
+
+    Args:
+        matrix: (n_sites, n_criteria) raw decision matrix, cost criteria first
+        n_cost: Number of leading cost columns
+        k: Skyband depth (1 = skyline)
+        block_size: Sites compared per vectorized step
+        max_fraction: Give up once the band holds more than this fraction
+            of the sites (optional)
+
+    Returns:
+        (n_sites,) boolean mask in the original row order, or None when
+        max_fraction was exceeded
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+
+    oriented = _oriented(matrix, n_cost)
+    n_sites = len(oriented)
+    order = np.argsort(_sort_key(oriented), kind='stable')
+    ordered = oriented[order]
+
+    # Skyband members are appended to `window` in visiting order
+    window = np.empty_like(ordered)
+    window_size = 0
+    in_band = np.zeros(n_sites, dtype=bool)
+    max_size = n_sites if max_fraction is None else max_fraction * n_sites
+
+    for start in range(0, n_sites, block_size):
+        block = ordered[start:start + block_size]
+
+        counts = _dominator_counts(window[:window_size], block, k, block_size)
+        survivors = np.flatnonzero(counts < k)
+
+        # Dominators inside the block: every true dominator is counted at
+        # most once and every skyband dominator survived the window step, so
+        # the total reaches k exactly when the site is outside the band
+        survivor_rows = block[survivors]
+        counts[survivors] += _dominator_counts(survivor_rows, survivor_rows, k, block_size)
+        members = survivors[counts[survivors] < k]
+
+        window[window_size:window_size + len(members)] = block[members]
+        window_size += len(members)
+        in_band[start + members] = True
+
+        if window_size > max_size:
+            return None
+
+    mask = np.zeros(n_sites, dtype=bool)
+    mask[order[in_band]] = True
+    return mask
+
+
+def skyline_mask(matrix: np.ndarray, n_cost: int,
+                 block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+    """Boolean mask of the non-dominated sites (the 1-skyband)"""
+    return skyband_mask(matrix, n_cost, k=1, block_size=block_size)
+
+
+def estimate_skyband_fraction(matrix: np.ndarray, n_cost: int, k: int = 1,
+                              sample_size: int = 2000, seed: int = 0) -> float:
+    """
+    Fraction of sites in the k-skyband, estimated on a random sample
+
+    The sample uses a proportionally smaller k. Skyline fractions shrink as
+    the number of sites grows, so the estimate errs on the high side.
+    """
+    n_sites = len(matrix)
+    if n_sites <= sample_size:
+        return float(skyband_mask(matrix, n_cost, k).mean())
+
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(matrix)[rng.choice(n_sites, sample_size, replace=False)]
+    sample_k = max(1, int(round(k * sample_size / n_sites)))
+    return float(skyband_mask(sample, n_cost, sample_k).mean())
@@ -1,14 +1,25 @@
 import pandas as pd
 import numpy as np
 from .base_algorithm import BaseAlgorithm
+from .normalization import ColumnStatistics, safe_divide
+from .grouped import Segments, expand_statistics, rank_within_groups, segment_statistics
 
 class TopsisAlgorithm(BaseAlgorithm):
     """
     TOPSIS: Technique for Order Preference by Similarity to Ideal Solution
     """
     
-    def __init__(self):
-        super().__init__('TOPSIS')
+    # Ideal points come from the column statistics, so a dominating site is
+    # never farther from A+ nor closer to A-
+    dominance_monotone = True
+    
+    # Normalization and ideal points only read the column statistics
+    shardable = True
+    
+    supports_matrix_scoring = True
+    
+    def __init__(self, normalization: str = None):
+        super().__init__('TOPSIS', normalization)
     
     def validate_inputs(self, data: pd.DataFrame, weights: dict,
                        cost_criteria: list, benefit_criteria: list) -> bool:
@@ -42,66 +53,170 @@ class TopsisAlgorithm(BaseAlgorithm):
         # Validate inputs
         self.validate_inputs(data, weights, cost_criteria, benefit_criteria)
         
-        # Create a copy to avoid modifying original data
-        df = data.copy()
+        # Only columns are added: a shallow copy leaves the input untouched
+        # without duplicating its (possibly shared, read-only) columns
+        df = data.copy(deep=False)
         
         # Get all criteria in order
         all_criteria = cost_criteria + benefit_criteria
         
         # Step 1: Extract decision matrix
         decision_matrix = df[all_criteria].values
+        weights_array = np.array([weights[c] for c in all_criteria])
         
-        # Step 2: Normalize the decision matrix (Vector Normalization)
-        norm_matrix = self._normalize_matrix(decision_matrix)
+        # Steps 2-6: Normalize, weight, find ideals and closeness
+        stats = self.column_statistics(data, all_criteria, decision_matrix)
+        scores = self.score_matrix(decision_matrix, weights_array, len(cost_criteria), stats)
         
-        # Step 3: Calculate weighted normalized matrix
+        # Add scores and ranks to dataframe
+        df['topsis_score'] = scores
+        df['rank_position'] = pd.Series(scores).rank(ascending=False, method='min').astype(int).to_numpy()
+        
+        return df
+    
+    def analyze_grouped(self, data: pd.DataFrame, weights: dict,
+                        cost_criteria: list, benefit_criteria: list,
+                        group_column: str) -> pd.DataFrame:
+        """
+        Run TOPSIS independently inside every group, in a single pass
+        
+        Rows are sorted by group; column statistics come from segment
+        reductions and are broadcast back to the rows, so normalization,
+        ideal points and ranks are per group without a loop over groups.
+        Scores match separate per-group runs up to floating-point
+        summation order.
+        
+        Returns:
+            DataFrame sorted by group with 'topsis_score' and the rank
+            inside the group in 'rank_position'
+        """
+        
+        self.validate_inputs(data, weights, cost_criteria, benefit_criteria)
+        if group_column not in data.columns:
+            raise ValueError(f"Group column not found in data: {group_column}")
+        
+        all_criteria = cost_criteria + benefit_criteria
+        segments = Segments.from_groups(data[group_column].to_numpy())
+        
+        df = data.iloc[segments.order].reset_index(drop=True)
+        decision_matrix = df[all_criteria].to_numpy(dtype=np.float64)
         weights_array = np.array([weights[c] for c in all_criteria])
-        weighted_matrix = norm_matrix * weights_array
         
-        # Step 4: Determine ideal and negative-ideal solutions
-        ideal_best, ideal_worst = self._get_ideal_solutions(
-            weighted_matrix,
-            len(cost_criteria),
-            len(benefit_criteria)
+        group_stats = segment_statistics(decision_matrix, segments)
+        scores = self.score_matrix(
+            decision_matrix, weights_array, len(cost_criteria),
+            expand_statistics(group_stats, segments.group_index)
         )
         
+        df['topsis_score'] = scores
+        df['rank_position'] = rank_within_groups(scores, segments)
+        
+        return df
+    
+    def score_matrix(self, matrix: np.ndarray, weights: np.ndarray,
+                     n_cost: int, stats: ColumnStatistics = None) -> np.ndarray:
+        """
+        TOPSIS relative closeness for a raw decision matrix
+        
+        `stats` may also hold one row of statistics per site (see
+        analyze_grouped); ideal points are then per row as well.
+        """
+        if stats is None:
+            stats = ColumnStatistics.from_matrix(matrix)
+        
+        # Step 2: Normalize the decision matrix (configured strategy)
+        norm_matrix = self.normalization.normalize(matrix, stats)
+        
+        # Step 3: Calculate weighted normalized matrix
+        weighted_matrix = norm_matrix * weights
+        
+        # Step 4: Determine ideal and negative-ideal solutions
+        ideal_best, ideal_worst = self._get_ideal_solutions(stats, weights, n_cost)
+        
         # Step 5: Calculate separation measures
         dist_to_best = self._calculate_distance(weighted_matrix, ideal_best)
         dist_to_worst = self._calculate_distance(weighted_matrix, ideal_worst)
         
         # Step 6: Calculate relative closeness to ideal solution
-        scores = dist_to_worst / (dist_to_best + dist_to_worst)
-        
-        # Add scores and ranks to dataframe
-        df['topsis_score'] = scores
-        df['rank_position'] = pd.Series(scores).rank(ascending=False, method='min').astype(int)
+        # (0 when every site is identical and both distances vanish)
+        return safe_divide(dist_to_worst, dist_to_best + dist_to_worst)
+    
+    def score_matrix_batch(self, matrix: np.ndarray, weights: np.ndarray,
+                           n_cost: int, stats: ColumnStatistics = None) -> np.ndarray:
+        """
+        TOPSIS closeness under several weight vectors in one pass
         
-        return df
+        With non-negative weights the weighted ideals are the weighted
+        normalized ideals, so (w * (x - a))^2 summed over criteria is
+        ((x - a)^2) @ w^2: the matrix is normalized once and every
+        weighting costs one matrix product.
+        """
+        if stats is None:
+            stats = ColumnStatistics.from_matrix(matrix)
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        
+        norm_matrix = self.normalization.normalize(matrix, stats)
+        lows = self.normalization.normalize(stats.min, stats)
+        highs = self.normalization.normalize(stats.max, stats)
+        is_cost = np.arange(norm_matrix.shape[1]) < n_cost
+        best = np.where(is_cost, lows, highs)
+        worst = np.where(is_cost, highs, lows)
+        
+        squared_weights = (weights ** 2).T
+        dist_to_best = np.sqrt(((norm_matrix - best) ** 2) @ squared_weights)
+        dist_to_worst = np.sqrt(((norm_matrix - worst) ** 2) @ squared_weights)
+        
+        return safe_divide(dist_to_worst, dist_to_best + dist_to_worst)
     
-    def _normalize_matrix(self, matrix: np.ndarray) -> np.ndarray:
-        """Vector normalization"""
-        return matrix / np.sqrt((matrix ** 2).sum(axis=0))
+    def score_matrix_stack(self, stack: np.ndarray, weights: np.ndarray,
+                           n_cost: int) -> np.ndarray:
+        """
+        TOPSIS closeness of a stack of matrices in one vectorized pass
+        
+        The statistics of the stack keep a singleton site axis, so every
+        matrix is scored against its own ideals. For affine normalizations
+        (x - offset) / scale the weighted distance to an ideal is
+        |(x - ideal_raw) * w / scale|, computed on the raw values without
+        materializing the normalized stack.
+        """
+        stack = np.asarray(stack, dtype=np.float64)
+        stats = ColumnStatistics.from_stack(stack, logs=False)
+        scale = self.normalization.scale(stats)
+        if scale is None:
+            return self.score_matrix(stack, weights, n_cost, ColumnStatistics.from_stack(stack))
+        
+        factor = safe_divide(weights, scale)
+        is_cost = np.arange(stack.shape[-1]) < n_cost
+        
+        def distance(ideal):
+            gap = stack - ideal
+            gap *= factor
+            return np.sqrt(np.einsum('bij,bij->bi', gap, gap))
+        
+        dist_to_best = distance(np.where(is_cost, stats.min, stats.max))
+        dist_to_worst = distance(np.where(is_cost, stats.max, stats.min))
+        return safe_divide(dist_to_worst, dist_to_best + dist_to_worst)
     
-    def _get_ideal_solutions(self, weighted_matrix: np.ndarray,
-                            n_cost: int, n_benefit: int) -> tuple:
+    def _get_ideal_solutions(self, stats: ColumnStatistics, weights: np.ndarray,
+                            n_cost: int) -> tuple:
         """
         Get ideal best (A+) and ideal worst (A-) solutions
+        
+        All normalization strategies are monotone increasing per column, so
+        the extremes of the weighted matrix are the normalized column
+        min/max from the statistics; no pass over the matrix is needed.
         """
-        ideal_best = np.zeros(weighted_matrix.shape[1])
-        ideal_worst = np.zeros(weighted_matrix.shape[1])
+        lows = self.normalization.normalize(stats.min, stats) * weights
+        highs = self.normalization.normalize(stats.max, stats) * weights
         
         # For cost criteria (first n_cost columns): min is best
-        if n_cost > 0:
-            ideal_best[:n_cost] = weighted_matrix[:, :n_cost].min(axis=0)
-            ideal_worst[:n_cost] = weighted_matrix[:, :n_cost].max(axis=0)
-        
         # For benefit criteria (remaining columns): max is best
-        if n_benefit > 0:
-            ideal_best[n_cost:] = weighted_matrix[:, n_cost:].max(axis=0)
-            ideal_worst[n_cost:] = weighted_matrix[:, n_cost:].min(axis=0)
+        is_cost = np.arange(len(weights)) < n_cost
+        ideal_best = np.where(is_cost, lows, highs)
+        ideal_worst = np.where(is_cost, highs, lows)
         
         return ideal_best, ideal_worst
     
     def _calculate_distance(self, matrix: np.ndarray, ideal: np.ndarray) -> np.ndarray:
         """Calculate Euclidean distance from each alternative to ideal solution"""
-        return np.sqrt(((matrix - ideal) ** 2).sum(axis=1))
+        return np.sqrt(((matrix - ideal) ** 2).sum(axis=-1))
@@ -0,0 +1,112 @@
+"""
+Objective criteria weights derived from the site data
+
+Instead of (or blended with) the weights of an expert_criteria_config row,
+the weight of a criterion can follow from how much information its column
+carries across the sites:
+
+    entropy   1 - normalized Shannon entropy of the column's value shares
+    std       standard deviation of the min-max scaled column
+    critic    CRITIC: that standard deviation times the column's conflict
+              with the others, sum_k (1 - r_jk) over correlations r of the
+              direction-oriented columns
+
+All three read the decision matrix only through its ColumnStatistics, which
+already hold the sums they need (sum_xlog, cross); weights cost O(criteria^2)
+once the statistics exist, and the statistics are the ones cached per
+site-data version, merged across shards or chunks.
+"""
+import numpy as np
+from .normalization import ColumnStatistics, safe_divide
+
+OBJECTIVE_WEIGHTINGS = ('entropy', 'critic', 'std')
+
+
+def _to_weights(values: np.ndarray) -> np.ndarray:
+    """Scale non-negative values to sum to 1 (uniform when all are 0)"""
+    values = np.maximum(np.asarray(values, dtype=np.float64), 0.0)
+    total = values.sum()
+    return values / total if total > 0 else np.full(values.shape, 1.0 / values.size)
+
+
+def _require(stats: ColumnStatistics, method: str):
+    if stats.sum_xlog is None or stats.cross is None:
+        raise ValueError(f"{method} weighting needs statistics from ColumnStatistics.from_matrix or merge")
+
+
+def entropy_weights(stats: ColumnStatistics) -> np.ndarray:
+    """
+    Shannon entropy weights
+
+    Shares are p_i = y_i / S with S = sum(y) and y = x for non-negative
+    columns; a column with negative values is shifted to a minimum of 0
+    first (ColumnStatistics.xlog_shift). Then -sum(p ln p) = ln S -
+    sum(y ln y) / S. A column where every site has the same value has
+    entropy ln(n) and gets weight 0, as does an all-zero column.
+    """
+    _require(stats, 'entropy')
+    if np.isnan(stats.sum_xlog).any():
+        raise ValueError("Entropy weighting is undefined for merged statistics "
+                         "with differently shifted columns")
+    if stats.count < 2:
+        return _to_weights(np.zeros_like(stats.sum))
+    total = stats.sum + stats.count * stats.xlog_shift
+    entropy = np.where(
+        total > 0,
+        (np.log(np.where(total > 0, total, 1.0)) - safe_divide(stats.sum_xlog, total)) / np.log(stats.count),
+        1.0
+    )
+    return _to_weights(1.0 - entropy)
+
+
+def std_weights(stats: ColumnStatistics) -> np.ndarray:
+    """Weights proportional to the standard deviation of the min-max scaled columns"""
+    return _to_weights(safe_divide(stats.std, stats.max - stats.min))
+
+
+def critic_weights(stats: ColumnStatistics, n_cost: int) -> np.ndarray:
+    """
+    CRITIC (Criteria Importance Through Intercriteria Correlation) weights
+
+    Cost columns are scaled as (max - x) / (max - min), which flips the sign
+    of their correlation with benefit columns.
+    """
+    _require(stats, 'critic')
+    orientation = np.where(np.arange(stats.sum.shape[-1]) < n_cost, -1.0, 1.0)
+    correlation = stats.correlation * np.outer(orientation, orientation)
+    contrast = safe_divide(stats.std, stats.max - stats.min)
+    return _to_weights(contrast * (1.0 - correlation).sum(axis=1))
+
+
+def objective_weights(method: str, stats: ColumnStatistics, n_cost: int) -> np.ndarray:
+    """
+    Weights of one of OBJECTIVE_WEIGHTINGS
+
+    Args:
+        method: 'entropy', 'critic' or 'std'
+        stats: Statistics of the decision matrix, cost columns first
+        n_cost: Number of leading cost columns
+
+    Returns:
+        (n_criteria,) array summing to 1
+    """
+    if method == 'entropy':
+        return entropy_weights(stats)
+    if method == 'std':
+        return std_weights(stats)
+    if method == 'critic':
+        return critic_weights(stats, n_cost)
+    raise ValueError(f"Unknown weighting: {method}. Supported: {list(OBJECTIVE_WEIGHTINGS)}")
+
+
+def blend_weights(expert: np.ndarray, objective: np.ndarray, blend: float) -> np.ndarray:
+    """
+    Multiplicative expert x objective weights: expert^(1 - blend) * objective^blend
+
+    blend = 1 gives the objective weights, 0 the (normalized) expert weights;
+    in between, a criterion the expert weighted 0 keeps weight 0.
+    """
+    if not 0.0 <= blend <= 1.0:
+        raise ValueError("weighting_blend must be between 0 and 1")
+    expert = np.asarray(expert, dtype=np.float64)
+    return _to_weights(np.power(expert, 1.0 - blend) * np.power(objective, blend))
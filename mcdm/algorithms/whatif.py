@@ -0,0 +1,195 @@
+"""
+In-memory TOPSIS model for hypothetical ("what-if") site edits
+
+For every strategy of the form (x - offset) / scale, the weighted distance of
+site i to an ideal point only depends on the raw gaps to the ideal raw values:
+
+    d_i^2 = sum_j (w_j / scale_j)^2 * (x_ij - ideal_j)^2
+
+The model keeps the squared gaps per column, so an edit only recomputes
+what it invalidates: the column statistics (incrementally), the
+coefficients (w_j / scale_j)^2 and the gap columns whose ideal value moved.
+"""
+import numpy as np
+from config import Config
+from .normalization import ColumnStatistics, get_normalization, safe_divide
+
+
+class TopsisWhatIfModel:
+    """
+    TOPSIS scores of a decision matrix with cheap re-scoring of edited rows
+
+    Args:
+        matrix: (n_sites, n_criteria) raw decision matrix, cost criteria first
+        weights: (n_criteria,) weights in the same column order
+        n_cost: Number of leading cost columns
+        normalization: Normalization strategy (None = Config.DEFAULT_NORMALIZATION)
+        stats: Precomputed column statistics of `matrix` (optional)
+    """
+
+    def __init__(self, matrix: np.ndarray, weights: np.ndarray, n_cost: int,
+                 normalization: str = None, stats: ColumnStatistics = None):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.n_cost = n_cost
+        self.normalization = get_normalization(normalization or Config.DEFAULT_NORMALIZATION)
+        self.stats = stats if stats is not None else ColumnStatistics.from_matrix(self.matrix)
+        self.is_cost = np.arange(self.matrix.shape[1]) < n_cost
+
+        # Row order of every column, for column min/max without edited rows
+        self._order = np.argsort(self.matrix, axis=0, kind='stable')
+
+        scale = self.normalization.scale(self.stats)
+        self.affine = scale is not None
+        if self.affine:
+            self.coef = safe_divide(self.weights, scale) ** 2
+            self.best, self.worst = self._ideal_values(self.stats)
+            self._sq_best = (self.matrix - self.best) ** 2
+            self._sq_worst = (self.matrix - self.worst) ** 2
+            self.scores = self._closeness(self._sq_best @ self.coef, self._sq_worst @ self.coef)
+        else:
+            from .topsis import TopsisAlgorithm
+            self._topsis = TopsisAlgorithm(self.normalization.name)
+            self.scores = self._topsis.score_matrix(self.matrix, self.weights, n_cost, self.stats)
+
+        self.sorted_scores = np.sort(self.scores)
+
+    @property
+    def n_sites(self) -> int:
+        return self.matrix.shape[0]
+
+    def rank_of_score(self, score) -> np.ndarray:
+        """Competition rank (1 = best) a score would get among the current sites"""
+        return self.n_sites - np.searchsorted(self.sorted_scores, score, side='right') + 1
+
+    def evaluate(self, rows: np.ndarray, new_values: np.ndarray) -> tuple:
+        """
+        Score and rank of edited rows, leaving the model unchanged
+
+        Args:
+            rows: (k,) distinct row indices of the edited sites
+            new_values: (k, n_criteria) hypothetical raw values of those rows
+
+        Returns:
+            Tuple (scores, ranks) of the edited rows after the edit
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        new_values = np.asarray(new_values, dtype=np.float64).reshape(len(rows), -1)
+
+        if not self.affine:
+            return self._evaluate_full(rows, new_values)
+
+        stats = self._updated_statistics(rows, new_values)
+        coef = safe_divide(self.weights, self.normalization.scale(stats)) ** 2
+        best, worst = self._ideal_values(stats)
+
+        new_scores = self._closeness(
+            ((new_values - best) ** 2) @ coef,
+            ((new_values - worst) ** 2) @ coef
+        )
+
+        if (np.array_equal(coef, self.coef) and np.array_equal(best, self.best)
+                and np.array_equal(worst, self.worst)):
+            # Nothing global moved: the other sites keep their scores, so
+            # ranks come from a binary search of the cached sorted scores
+            return new_scores, self._ranks_with_unchanged_others(rows, new_scores)
+
+        dist_sq_best = self._distances_sq(self._sq_best, self.best, best, coef)
+        dist_sq_worst = self._distances_sq(self._sq_worst, self.worst, worst, coef)
+        scores = self._closeness(dist_sq_best, dist_sq_worst)
+        scores[rows] = new_scores
+
+        return new_scores, self._ranks_in(scores, new_scores)
+
+    def _ideal_values(self, stats: ColumnStatistics) -> tuple:
+        """Raw ideal best/worst values: min is best for cost, max for benefit"""
+        best = np.where(self.is_cost, stats.min, stats.max)
+        worst = np.where(self.is_cost, stats.max, stats.min)
+        return best, worst
+
+    def _closeness(self, dist_sq_best: np.ndarray, dist_sq_worst: np.ndarray) -> np.ndarray:
+        """Relative closeness from squared distances (0 where both are 0), in place"""
+        dist_to_worst = np.sqrt(dist_sq_worst, out=dist_sq_worst)
+        total = np.sqrt(dist_sq_best, out=dist_sq_best)
+        total += dist_to_worst
+        scores = np.zeros_like(total)
+        np.divide(dist_to_worst, total, out=scores, where=total != 0)
+        return scores
+
+    def _distances_sq(self, cached_sq: np.ndarray, cached_ideal: np.ndarray,
+                      ideal: np.ndarray, coef: np.ndarray) -> np.ndarray:
+        """Squared distances of all rows, recomputing only columns whose ideal moved"""
+        moved = cached_ideal != ideal
+        if not moved.any():
+            return cached_sq @ coef
+
+        dist_sq = cached_sq @ np.where(moved, 0.0, coef)
+        for j in np.flatnonzero(moved):
+            gap = self.matrix[:, j] - ideal[j]
+            dist_sq += coef[j] * (gap * gap)
+        return dist_sq
+
+    def _updated_statistics(self, rows: np.ndarray, new_values: np.ndarray) -> ColumnStatistics:
+        """Column statistics with `rows` replaced, without a pass over the matrix"""
+        old_values = self.matrix[rows]
+        col_min, col_max = self._extremes_without(rows)
+
+        return ColumnStatistics(
+            count=self.stats.count,
+            sum=self.stats.sum + (new_values - old_values).sum(axis=0),
+            sum_sq=self.stats.sum_sq + (new_values * new_values - old_values * old_values).sum(axis=0),
+            min=np.fmin(col_min, new_values.min(axis=0)),
+            max=np.fmax(col_max, new_values.max(axis=0)),
+            # Only used by the logarithmic strategy, which is re-scored in full
+            log_shift=self.stats.log_shift,
+            sum_log=self.stats.sum_log
+        )
+
+    def _extremes_without(self, rows: np.ndarray) -> tuple:
+        """
+        Column min and max over the rows not in `rows` (NaN if none are left)
+
+        With k edited rows, the first k + 1 entries of each column's sort
+        order always contain a row that was not edited.
+        """
+        n_sites, n_criteria = self.matrix.shape
+        k = len(rows)
+        if k >= n_sites:
+            nan = np.full(n_criteria, np.nan)
+            return nan, nan
+
+        columns = np.arange(n_criteria)
+
+        def first_unedited(candidates):
+            keep = ~np.isin(candidates, rows)
+            picked = candidates[keep.argmax(axis=0), columns]
+            return self.matrix[picked, columns]
+
+        return (first_unedited(self._order[:k + 1]),
+                first_unedited(self._order[::-1][:k + 1]))
+
+    def _ranks_with_unchanged_others(self, rows: np.ndarray, new_scores: np.ndarray) -> np.ndarray:
+        """Ranks of the edited rows when all other scores are unchanged"""
+        greater = self.n_sites - np.searchsorted(self.sorted_scores, new_scores, side='right')
+        # Swap the edited rows' old scores for their new ones (binary searches,
+        # so large edits such as a new warehouse stay O(k log k))
+        greater -= self._count_greater(self.scores[rows], new_scores)
+        greater += self._count_greater(new_scores, new_scores)
+        return greater + 1
+
+    @staticmethod
+    def _count_greater(values: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+        """Number of `values` greater than each threshold"""
+        return len(values) - np.searchsorted(np.sort(values), thresholds, side='right')
+
+    def _ranks_in(self, scores: np.ndarray, new_scores: np.ndarray) -> np.ndarray:
+        """Competition ranks of `new_scores` within the full score array"""
+        return self._count_greater(scores, new_scores) + 1
+
+    def _evaluate_full(self, rows: np.ndarray, new_values: np.ndarray) -> tuple:
+        """Non-affine strategies: re-score an edited copy of the matrix"""
+        matrix = self.matrix.copy()
+        matrix[rows] = new_values
+        scores = self._topsis.score_matrix(matrix, self.weights, self.n_cost)
+        new_scores = scores[rows]
+        return new_scores, self._ranks_in(scores, new_scores)
@@ -1,25 +1,95 @@
 from flask import Blueprint, jsonify, request
-from services.analysis_service import AnalysisService
-from models.analysis_request import AnalysisRequest
-from models.analysis_response import AnalysisResponse
+from api.http_cache import REVALIDATE, conditional, make_etag, store
+from api.transport import ARROW, negotiate, not_acceptable, respond
+from utils.compute_pool import ComputePoolSaturated
+from utils.single_flight import AnalysisInProgress, IdempotencyKeyReused
 import logging
 
+# AnalysisService (pandas, NumPy, MySQL connector) is imported inside the
+# handlers so that registering this blueprint stays cheap at startup.
+
 logger = logging.getLogger(__name__)
 
 analysis_bp = Blueprint('analysis', __name__)
 
 
+def pool_saturated(error: ComputePoolSaturated):
+    """429 response for a request the compute pool had no room for"""
+    logger.warning(str(error))
+    response = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+
+def analysis_in_progress(error: AnalysisInProgress):
+    """409 response for a retry whose first attempt is still running"""
+    logger.info(str(error))
+    response = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 409
+
+
+def idempotency_key_reused(error: IdempotencyKeyReused):
+    """422 response for an idempotency key reused with other parameters"""
+    logger.info(str(error))
+    return jsonify({
+        'success': False,
+        'error': str(error)
+    }), 422
+
+
+def saved_at(dates):
+    """Latest of the ISO timestamps in `dates` as a datetime (None if none parse)"""
+    from datetime import datetime
+    try:
+        return max(datetime.fromisoformat(str(value)) for value in dates)
+    except ValueError:
+        return None
+
+
+def results_saved_at(result: dict):
+    """When the results of a get_batch_results() response were saved"""
+    results = result['results']
+    if isinstance(results, dict):
+        return saved_at(results['analysis_date'])
+    return saved_at(row['analysis_date'] for row in results)
+
+
 @analysis_bp.route('/analyze', methods=['POST'])
 def run_analysis():
     """
     Run MCDM analysis and save to evaluation_result table
     
+    Headers:
+        Idempotency-Key: Optional client-chosen key (max 100 characters).
+            A retry with the same key returns the first attempt's response
+            with "idempotent_replay": true instead of analyzing again, or
+            409 with Retry-After while that attempt is still running, and
+            422 when the key was first used with different parameters.
+    
     Request Body:
     {
         "algorithm": "topsis",  // Optional, default: topsis
         "config_id": 1,         // Optional, use active config if not provided
         "user_id": 1,           // Optional, user performing analysis
-        "top_n": 10             // Optional, number of top results to return
+        "top_n": 10,            // Optional, number of top results to return
+        "normalization": "vector",  // Optional: vector, minmax, zscore, max, log
+        "group_by": "district_id",  // Optional, rank inside each district
+        "prefilter": "skyband",     // Optional, score only possible top_n sites
+        "filters": {                // Optional, applied in SQL
+            "district_id": [1, 3, 5],
+            "has_parking": true,
+            "rent_cost": {"lt": 40}
+        },
+        "weighting": "critic",      // Optional: expert (default), entropy, critic, std
+        "weighting_blend": 0.5      // Optional, objective share blended with the
+                                    // config's weights (1 = objective only)
     }
     
     Response:
@@ -35,8 +105,21 @@ def run_analysis():
         "config_id": 1,
         "user_id": 1,
         "score_statistics": {...},
-        "top_sites": [...]
+        "top_sites": [...],
+        "weighting": {...},     // with an objective weighting: method, blend,
+                                // objective_weights and the weights used
+        "coalesced": false,     // true when an identical concurrent request
+                                // ran the analysis and this one shares its batch
+        "idempotent_replay": false  // only with Idempotency-Key
     }
+    
+    With group_by, "top_sites" is replaced by
+    "groups": [{"group_key", "district_name", "sites_in_group", "top_sites"}]
+    with top_n sites per group.
+    
+    Accept: application/vnd.apache.arrow.stream returns top_sites as an
+    Arrow IPC stream (not with group_by), application/msgpack the response
+    in MessagePack; see api/transport.py.
     """
     try:
         # Parse request
@@ -46,8 +129,19 @@ def run_analysis():
         config_id = data.get('config_id', None)
         user_id = data.get('user_id', None)
         top_n = data.get('top_n', 10)
+        normalization = data.get('normalization', None)
+        group_by = data.get('group_by', None)
+        prefilter = data.get('prefilter', None)
+        filters = data.get('filters', None)
+        weighting = data.get('weighting', None)
+        weighting_blend = data.get('weighting_blend', None)
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        
+        logger.info(f"Analysis request: algorithm={algorithm}, config_id={config_id}, user_id={user_id}, top_n={top_n}, normalization={normalization}, group_by={group_by}, filters={filters}, weighting={weighting}")
         
-        logger.info(f"Analysis request: algorithm={algorithm}, config_id={config_id}, user_id={user_id}, top_n={top_n}")
+        media_type = negotiate(tabular=group_by is None)
+        if media_type is None:
+            return not_acceptable(tabular=group_by is None)
         
         # Validate algorithm
         from config import Config
@@ -58,16 +152,61 @@ def run_analysis():
                 'supported_algorithms': Config.SUPPORTED_ALGORITHMS
             }), 400
         
+        if filters is not None and not isinstance(filters, dict):
+            return jsonify({
+                'success': False,
+                'error': 'filters must be an object of column conditions'
+            }), 400
+        
+        if group_by is not None and group_by not in Config.SUPPORTED_GROUP_BY:
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported group_by: {group_by}',
+                'supported_group_by': Config.SUPPORTED_GROUP_BY
+            }), 400
+        
+        if weighting is not None and (not isinstance(weighting, str)
+                                      or weighting.lower() not in Config.SUPPORTED_WEIGHTINGS):
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported weighting: {weighting}',
+                'supported_weightings': Config.SUPPORTED_WEIGHTINGS
+            }), 400
+        
+        if weighting_blend is not None and (isinstance(weighting_blend, bool)
+                                            or not isinstance(weighting_blend, (int, float))
+                                            or not 0 <= weighting_blend <= 1):
+            return jsonify({
+                'success': False,
+                'error': 'weighting_blend must be a number between 0 and 1'
+            }), 400
+        
+        if idempotency_key is not None and (not isinstance(idempotency_key, str)
+                                            or not 0 < len(idempotency_key) <= 100):
+            return jsonify({
+                'success': False,
+                'error': 'Idempotency-Key must be a string of 1 to 100 characters'
+            }), 400
+        
         # Run analysis
+        from services.analysis_service import AnalysisService
         service = AnalysisService()
         result = service.run_analysis(
             algorithm=algorithm,
             config_id=config_id,
             user_id=user_id,
-            top_n=top_n
+            top_n=top_n,
+            normalization=normalization,
+            group_by=group_by,
+            prefilter=prefilter,
+            filters=filters,
+            columnar=media_type == ARROW,
+            idempotency_key=idempotency_key,
+            weighting=weighting,
+            weighting_blend=weighting_blend
         )
         
-        return jsonify(result), 200
+        return respond(result, media_type, table='top_sites')
         
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -76,6 +215,15 @@ def run_analysis():
             'error': str(e)
         }), 400
         
+    except ComputePoolSaturated as e:
+        return pool_saturated(e)
+        
+    except AnalysisInProgress as e:
+        return analysis_in_progress(e)
+        
+    except IdempotencyKeyReused as e:
+        return idempotency_key_reused(e)
+        
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}", exc_info=True)
         return jsonify({
@@ -84,6 +232,268 @@ def run_analysis():
         }), 500
 
 
+@analysis_bp.route('/analyze/consensus', methods=['POST'])
+def run_consensus_analysis():
+    """
+    Run several algorithms on the same data and merge their rankings
+    
+    Request Body:
+    {
+        "algorithms": ["topsis", "fuzzy_topsis"],  // Required, at least two
+        "method": "borda",      // Optional: borda (default), copeland, kemeny
+        "normalization": "vector",  // Optional, shared by all algorithms
+        "config_id": 1,         // Optional
+        "user_id": 1,           // Optional
+        "top_n": 10             // Optional
+    }
+    
+    Response: same shape as /analyze, plus
+    {
+        "consensus_method": "borda",
+        "algorithms": [
+            {"algorithm": "TOPSIS", "execution_time_ms": 35.2, "kendall_tau": 0.91},
+            ...
+        ]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        
+        algorithms = data.get('algorithms', [])
+        method = data.get('method', 'borda')
+        
+        if not isinstance(algorithms, list):
+            return jsonify({
+                'success': False,
+                'error': 'algorithms must be a list of algorithm names'
+            }), 400
+        
+        logger.info(f"Consensus request: algorithms={algorithms}, method={method}")
+        
+        from services.analysis_service import AnalysisService
+        service = AnalysisService()
+        result = service.run_consensus(
+            algorithms=algorithms,
+            method=method,
+            config_id=data.get('config_id'),
+            user_id=data.get('user_id'),
+            top_n=data.get('top_n', 10),
+            normalization=data.get('normalization')
+        )
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except ComputePoolSaturated as e:
+        return pool_saturated(e)
+        
+    except Exception as e:
+        logger.error(f"Consensus analysis error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Consensus analysis failed: {str(e)}'
+        }), 500
+
+
+@analysis_bp.route('/analyze/sharded', methods=['POST'])
+def run_sharded_analysis():
+    """
+    Rank the sites of every configured shard (one per city) as one ranking
+    
+    Request Body:
+    {
+        "algorithm": "topsis",      // Optional, must be shardable
+        "normalization": "vector",  // Optional
+        "config_id": 1,             // Optional
+        "user_id": 1,               // Optional
+        "top_n": 10,                // Optional
+        "filters": {...},           // Optional, same spec as /analyze
+        "shards": ["hcm", "hn"]     // Optional, default all of SHARD_DSNS
+    }
+    
+    Response: same shape as /analyze; every top site carries its "shard"
+    and "shards" lists the sites analyzed per shard
+    """
+    try:
+        data = request.get_json() or {}
+        
+        shards = data.get('shards')
+        if shards is not None and not isinstance(shards, list):
+            return jsonify({
+                'success': False,
+                'error': 'shards must be a list of shard names'
+            }), 400
+        
+        logger.info(f"Sharded analysis request: algorithm={data.get('algorithm', 'topsis')}, shards={shards}")
+        
+        from config import Config
+        from services.analysis_service import AnalysisService
+        service = AnalysisService()
+        result = service.run_sharded_analysis(
+            algorithm=data.get('algorithm', Config.DEFAULT_ALGORITHM).lower(),
+            config_id=data.get('config_id'),
+            user_id=data.get('user_id'),
+            top_n=data.get('top_n', 10),
+            normalization=data.get('normalization'),
+            filters=data.get('filters'),
+            shards=shards
+        )
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"Sharded analysis error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Sharded analysis failed: {str(e)}'
+        }), 500
+
+
+@analysis_bp.route('/analyze/whatif', methods=['POST'])
+def run_whatif_analysis():
+    """
+    Score hypothetical changes to sites without saving anything
+    
+    Request Body:
+    {
+        "changes": [            // Required, applied together
+            {
+                "site_code": "HCM-Q3-014",     // or "site_id": 14
+                "set": {"front_width": 8.5},   // Optional, new values
+                "adjust_pct": {"rent_cost": -20}  // Optional, relative change in %
+            }
+        ],
+        "config_id": 1,         // Optional, use active config if not provided
+        "normalization": "vector"  // Optional
+    }
+    
+    Response:
+    {
+        "success": true,
+        "algorithm": "TOPSIS",
+        "sites_analyzed": 100000,
+        "execution_time_ms": 1.7,
+        "results": [
+            {
+                "site_code": "HCM-Q3-014",
+                "changes": {"rent_cost": {"from": 45.0, "to": 36.0}},
+                "baseline_score": 0.5123, "baseline_rank": 42,
+                "score": 0.5391, "rank": 17, "rank_change": 25
+            }
+        ]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        
+        from services.whatif_service import WhatIfService
+        service = WhatIfService()
+        result = service.evaluate(
+            changes=data.get('changes', []),
+            config_id=data.get('config_id'),
+            normalization=data.get('normalization')
+        )
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"What-if analysis error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'What-if analysis failed: {str(e)}'
+        }), 500
+
+
+@analysis_bp.route('/analyze/bootstrap', methods=['POST'])
+def run_bootstrap_analysis():
+    """
+    Score and rank confidence intervals under survey measurement error
+    
+    Request Body:
+    {
+        "algorithm": "topsis",  // Optional: topsis (default), fuzzy_topsis
+        "replicates": 1000,     // Optional, perturbed matrices to score
+        "confidence": 0.95,     // Optional, two-sided interval coverage
+        "seed": 42,             // Optional, for reproducible intervals
+        "config_id": 1,         // Optional, use active config if not provided
+        "normalization": "vector",  // Optional
+        "top_n": 10             // Optional, sites returned (best baseline rank first)
+    }
+    
+    Response:
+    {
+        "success": true,
+        "replicates": 1000,
+        "seed": 42,
+        "scoring_time_ms": 812.4,
+        "interval_statistics": {"mean_score_width": 0.041, "mean_rank_width": 37.5, ...},
+        "sites": [
+            {
+                "site_code": "HCM-Q1-003", "score": 0.7421, "score_low": 0.7188,
+                "score_high": 0.7630, "rank": 1, "rank_low": 1, "rank_high": 4,
+                "top_n_share": 0.998, ...
+            }
+        ]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        
+        logger.info(f"Bootstrap request: algorithm={data.get('algorithm', 'topsis')}, "
+                    f"replicates={data.get('replicates')}, seed={data.get('seed')}")
+        
+        from services.analysis_service import AnalysisService
+        service = AnalysisService()
+        result = service.run_bootstrap(
+            algorithm=data.get('algorithm', 'topsis'),
+            config_id=data.get('config_id'),
+            replicates=data.get('replicates'),
+            confidence=data.get('confidence'),
+            seed=data.get('seed'),
+            top_n=data.get('top_n', 10),
+            normalization=data.get('normalization')
+        )
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except ComputePoolSaturated as e:
+        return pool_saturated(e)
+        
+    except Exception as e:
+        logger.error(f"Bootstrap analysis error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Bootstrap analysis failed: {str(e)}'
+        }), 500
+
+
 @analysis_bp.route('/analyze/<algorithm>', methods=['POST'])
 def run_specific_analysis(algorithm):
     """
@@ -117,20 +527,56 @@ def run_specific_analysis(algorithm):
 @analysis_bp.route('/results/latest', methods=['GET'])
 def get_latest_batch_results():
     """
-    Get results from the latest analysis batch
+    Get the latest top results
+    
+    Served from the materialized ranking of the active config when
+    snapshots are enabled (response has "source": "snapshot" and
+    "staleness_seconds"), otherwise from the latest analysis batch.
     
     Query Parameters:
     - limit: Number of top results (default: 10)
     
     Example: GET /api/results/latest?limit=20
+    
+    Also served as Arrow IPC (results as columns) or MessagePack, see
+    api/transport.py.
+    
+    Latest-batch responses carry an ETag (latest batch id and site data
+    version) and Last-Modified; a matching If-None-Match gets 304 and
+    repeated polls are answered from the response cache (api/http_cache.py).
+    Snapshot responses are already served from memory and are not cached.
     """
     try:
+        from config import Config
         limit = request.args.get('limit', 10, type=int)
+        media_type = negotiate()
+        if media_type is None:
+            return not_acceptable()
+        columnar = media_type == ARROW
         
+        if Config.SNAPSHOT_REFRESH_ENABLED:
+            from services.snapshot_service import SnapshotService
+            try:
+                result = SnapshotService().get_latest(limit=limit, columnar=columnar)
+            except Exception as e:
+                logger.warning(f"Ranking snapshot unavailable, reading latest batch: {e}")
+                result = None
+            if result is not None:
+                return respond(result, media_type, table='results')
+        
+        from services.analysis_service import AnalysisService
         service = AnalysisService()
-        result = service.get_batch_results(batch_id=None, limit=limit)
+        tag = make_etag('latest', service.get_results_version(), limit, media_type)
+        cached = conditional(tag, REVALIDATE)
+        if cached is not None:
+            return cached
         
-        return jsonify(result), 200
+        result = service.get_batch_results(batch_id=None, limit=limit, columnar=columnar)
+        response = respond(result, media_type, table='results')
+        if not result.get('success'):
+            return response
+        
+        return store(response, tag, REVALIDATE, results_saved_at(result))
         
     except Exception as e:
         logger.error(f"Error getting latest results: {str(e)}", exc_info=True)
@@ -140,6 +586,245 @@ def get_latest_batch_results():
         }), 500
 
 
+@analysis_bp.route('/rankings/<int:config_id>', methods=['GET'])
+def get_config_ranking(config_id):
+    """
+    Materialized ranking of a config, kept up to date in the background
+    
+    Query Parameters:
+    - limit: Number of sites (default: 10, max TOP_RESULTS_LIMIT)
+    - offset: Number of ranked sites to skip (default: 0)
+    
+    Example: GET /api/rankings/2?limit=20&offset=40
+    
+    Response:
+    {
+        "success": true,
+        "config_id": 2,
+        "strategy_name": "...",
+        "total_results": 80,
+        "source": "snapshot",
+        "refreshed_at": "2026-01-17T14:30:22",
+        "staleness_seconds": 4.2,
+        "results": [{"rank": 41, "site_id": 12, "site_code": "HCM-Q3-012", ...}]
+    }
+    """
+    try:
+        from config import Config
+        from services.snapshot_service import SnapshotService
+        
+        limit = min(request.args.get('limit', 10, type=int), Config.TOP_RESULTS_LIMIT)
+        offset = request.args.get('offset', 0, type=int)
+        if limit < 1 or offset < 0:
+            return jsonify({
+                'success': False,
+                'error': 'limit must be positive and offset non-negative'
+            }), 400
+        media_type = negotiate()
+        if media_type is None:
+            return not_acceptable()
+        
+        result = SnapshotService().get_ranking(
+            config_id, limit=limit, offset=offset, columnar=media_type == ARROW
+        )
+        return respond(result, media_type, table='results')
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+        
+    except Exception as e:
+        logger.error(f"Error getting ranking of config {config_id}: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@analysis_bp.route('/results/latest/rank/<int:site_id>', methods=['GET'])
+def get_latest_site_rank(site_id):
+    """
+    Rank and percentile of a site in the latest batch
+    
+    Example: GET /api/results/latest/rank/123
+    
+    Response:
+    {
+        "success": true,
+        "batch_id": "TOPSIS_20260117_143022_a1b2c3d4",
+        "total_results": 80,
+        "site_id": 123,
+        "site_code": "HCM-Q1-001",
+        "score": 0.8756,
+        "rank": 3,
+        "position": 3,
+        "percentile": 97.5
+    }
+    """
+    try:
+        media_type = negotiate(tabular=False)
+        if media_type is None:
+            return not_acceptable(tabular=False)
+        
+        from services.ranking_service import RankingService
+        service = RankingService()
+        result = service.get_site_rank(site_id)
+        
+        return respond(result, media_type)
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"Error getting site rank: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@analysis_bp.route('/results/latest/range', methods=['GET'])
+def get_latest_score_range():
+    """
+    Sites of the latest batch within a score range, best first
+    
+    Query Parameters:
+    - min_score: Lower bound, inclusive (default: 0)
+    - max_score: Upper bound, inclusive (default: 1)
+    - limit: Number of sites to list (default: 50)
+    - offset: Number of matching sites to skip (default: 0)
+    
+    Example: GET /api/results/latest/range?min_score=0.6&max_score=0.7
+    """
+    try:
+        from config import Config
+        from services.ranking_service import RankingService
+        
+        limit = min(request.args.get('limit', 50, type=int), Config.TOP_RESULTS_LIMIT)
+        media_type = negotiate()
+        if media_type is None:
+            return not_acceptable()
+        
+        service = RankingService()
+        result = service.get_score_range(
+            min_score=request.args.get('min_score', 0.0, type=float),
+            max_score=request.args.get('max_score', 1.0, type=float),
+            limit=max(limit, 0),
+            offset=max(request.args.get('offset', 0, type=int), 0),
+            columnar=media_type == ARROW
+        )
+        
+        return respond(result, media_type, table='sites')
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"Error getting score range: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@analysis_bp.route('/results/latest/neighbors/<int:site_id>', methods=['GET'])
+def get_latest_neighbors(site_id):
+    """
+    Sites ranked directly above and below a site in the latest batch
+    
+    Query Parameters:
+    - k: Number of neighbors on each side (default: 5)
+    
+    Example: GET /api/results/latest/neighbors/123?k=3
+    """
+    try:
+        from config import Config
+        from services.ranking_service import RankingService
+        
+        k = min(max(request.args.get('k', 5, type=int), 0), Config.TOP_RESULTS_LIMIT)
+        media_type = negotiate(tabular=False)
+        if media_type is None:
+            return not_acceptable(tabular=False)
+        
+        service = RankingService()
+        result = service.get_neighbors(site_id, k)
+        
+        return respond(result, media_type)
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"Error getting ranking neighbors: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@analysis_bp.route('/results/compare', methods=['GET'])
+def compare_batches():
+    """
+    Rank drift between two analysis batches
+    
+    Query Parameters:
+    - base: Reference batch ID, or 'latest' (required)
+    - target: Compared batch ID, or 'latest' (required)
+    - top_n: Cut-off of the top-N overlap (default: 10)
+    - limit: Number of climbers, fallers and top-N entries/exits (default: 10)
+    
+    Example: GET /api/results/compare?base=TOPSIS_20260117_143022_a1b2c3d4&target=latest
+    """
+    try:
+        from config import Config
+        from services.ranking_service import RankingService
+        
+        base = request.args.get('base', '').strip()
+        target = request.args.get('target', '').strip()
+        if not base or not target:
+            return jsonify({
+                'success': False,
+                'error': "Query parameters 'base' and 'target' are required"
+            }), 400
+        
+        top_n = request.args.get('top_n', 10, type=int)
+        if not 1 <= top_n <= Config.COMPARE_MAX_TOP_N:
+            raise ValueError(f"top_n must be between 1 and {Config.COMPARE_MAX_TOP_N}")
+        limit = min(max(request.args.get('limit', 10, type=int), 0), Config.TOP_RESULTS_LIMIT)
+        media_type = negotiate(tabular=False)
+        if media_type is None:
+            return not_acceptable(tabular=False)
+        
+        service = RankingService()
+        result = service.compare_batches(base, target, top_n=top_n, limit=limit)
+        
+        return respond(result, media_type)
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"Error comparing batches: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @analysis_bp.route('/results/batch/<batch_id>', methods=['GET'])
 def get_batch_results(batch_id):
     """
@@ -149,14 +834,34 @@ def get_batch_results(batch_id):
     - limit: Number of results (default: 10)
     
     Example: GET /api/results/batch/TOPSIS_20260117_143022_a1b2c3d4?limit=20
+    
+    Saved scores and ranks never change, but the response also joins the
+    current site columns (address, rent, district, ...). The ETag is derived
+    from the batch id and the site data version, so revalidations and
+    repeated reads are answered without querying the batch, and clients
+    revalidate (Cache-Control: no-cache) instead of keeping stale site data.
     """
     try:
         limit = request.args.get('limit', 10, type=int)
+        media_type = negotiate()
+        if media_type is None:
+            return not_acceptable()
         
+        from services.analysis_service import AnalysisService
         service = AnalysisService()
-        result = service.get_batch_results(batch_id=batch_id, limit=limit)
+        tag = make_etag('batch', batch_id, service.get_site_version(), limit, media_type)
+        cached = conditional(tag, REVALIDATE)
+        if cached is not None:
+            return cached
         
-        return jsonify(result), 200
+        result = service.get_batch_results(
+            batch_id=batch_id, limit=limit, columnar=media_type == ARROW
+        )
+        response = respond(result, media_type, table='results')
+        if not result.get('success'):
+            return response
+        
+        return store(response, tag, REVALIDATE, results_saved_at(result))
         
     except Exception as e:
         logger.error(f"Error getting batch results: {str(e)}", exc_info=True)
@@ -169,15 +874,21 @@ def get_batch_results(batch_id):
 @analysis_bp.route('/site/<int:site_id>/history', methods=['GET'])
 def get_site_evaluation_history(site_id):
     """
-    Get evaluation history for a specific site
+    Get evaluation history for a specific site, newest first
     
-    Example: GET /api/site/123/history
+    Query Parameters:
+    - limit: Evaluations (or periods) per page (default: 100, max: 1000)
+    - cursor: next_cursor of the previous page
+    - resolution: day or month, one aggregated point per period (for charts)
+    
+    Example: GET /api/site/123/history?limit=50
+             GET /api/site/123/history?resolution=day&limit=90
     
     Response:
     {
         "success": true,
         "site_id": 123,
-        "total_evaluations": 5,
+        "total_evaluations": 50,
         "history": [
             {
                 "evaluation_id": 1001,
@@ -190,14 +901,54 @@ def get_site_evaluation_history(site_id):
                 "batch_id": "TOPSIS_20260117_143022_a1b2c3d4"
             },
             ...
-        ]
+        ],
+        "next_cursor": "WyJoaXN0b3J5Ii..."   // null on the last page
     }
+    
+    With a resolution, history holds {"period": "2026-01-17", "evaluations",
+    "avg_score", "avg_rank", "best_rank", "worst_rank",
+    "last_evaluation_date"} points and total_evaluations their sum.
+    
+    The ETag follows the latest batch id (a site's history only grows when
+    a batch is saved); a matching If-None-Match gets 304.
     """
     try:
+        from config import Config
+        
+        limit = request.args.get('limit', Config.HISTORY_PAGE_SIZE, type=int)
+        if not 1 <= limit <= Config.HISTORY_MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {Config.HISTORY_MAX_PAGE_SIZE}")
+        cursor = request.args.get('cursor') or None
+        resolution = request.args.get('resolution') or None
+        if resolution is not None and resolution not in Config.SUPPORTED_HISTORY_RESOLUTIONS:
+            raise ValueError(
+                f"resolution must be one of {', '.join(Config.SUPPORTED_HISTORY_RESOLUTIONS)}"
+            )
+        
+        from services.analysis_service import AnalysisService
         service = AnalysisService()
-        result = service.get_site_evaluation_history(site_id)
+        tag = make_etag('history', site_id, service.get_results_version(include_sites=False),
+                        limit, cursor, resolution)
+        cached = conditional(tag, REVALIDATE)
+        if cached is not None:
+            return cached
         
-        return jsonify(result), 200
+        result = service.get_site_evaluation_history(
+            site_id, limit=limit, cursor=cursor, resolution=resolution
+        )
+        response = jsonify(result)
+        if not result.get('success') or not result['history']:
+            return response, 200
+        
+        date_field = 'last_evaluation_date' if resolution else 'evaluation_date'
+        latest = saved_at(entry[date_field] for entry in result['history'])
+        return store(response, tag, REVALIDATE, latest), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
         
     except Exception as e:
         logger.error(f"Error getting site history: {str(e)}", exc_info=True)
@@ -1,9 +1,9 @@
-from flask import Blueprint, jsonify, request
-from services.analysis_service import AnalysisService
-from models.analysis_request import AnalysisRequest
-from models.analysis_response import AnalysisResponse
+from flask import Blueprint, Response, jsonify, request
 import logging
 
+# Keep this module free of pandas/NumPy imports: the probes below must answer
+# quickly even while the worker is still cold.
+
 logger = logging.getLogger(__name__)
 
 health_bp = Blueprint('health', __name__)
@@ -19,12 +19,74 @@ def health_check():
     }), 200
 
 
+@health_bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """
+    Liveness probe: the process is up and serving requests
+
+    Does not touch the database, so a MySQL outage does not get the
+    container restarted.
+    """
+    return jsonify({
+        'status': 'alive'
+    }), 200
+
+
+@health_bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: the worker can reach MySQL through its connection pool
+
+    Returns 503 while the database is unreachable.
+    """
+    from utils.db_connector import check_pool_health
+
+    database = check_pool_health()
+    ready = database['healthy']
+
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'database': database
+    }), 200 if ready else 503
+
+
+@health_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Counters of this worker process
+
+    Query Parameters:
+    - format: json (default) or prometheus
+
+    Example: GET /api/metrics
+    {
+        "pid": 12,
+        "metrics": {
+            "analysis_requests": {"outcome=coalesced_thread": 31, "outcome=executed": 2}
+        }
+    }
+    """
+    import os
+    from utils.metrics import metrics
+
+    if request.args.get('format') == 'prometheus':
+        return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return jsonify({
+        'pid': os.getpid(),
+        'metrics': metrics.snapshot()
+    }), 200
+
+
 @health_bp.route('/algorithms', methods=['GET'])
 def list_algorithms():
     """List all available MCDM algorithms"""
     from config import Config
     return jsonify({
         'supported_algorithms': Config.SUPPORTED_ALGORITHMS,
-        'default_algorithm': Config.DEFAULT_ALGORITHM
+        'default_algorithm': Config.DEFAULT_ALGORITHM,
+        'supported_normalizations': Config.SUPPORTED_NORMALIZATIONS,
+        'default_normalization': Config.DEFAULT_NORMALIZATION,
+        'supported_weightings': Config.SUPPORTED_WEIGHTINGS,
+        'default_weighting': Config.DEFAULT_WEIGHTING
     }), 200
-
@@ -0,0 +1,151 @@
+"""
+Conditional GET and a per-worker response cache for result endpoints
+
+Handlers compute an entity tag from what the response is derived from (the
+batch id or the latest batch id, and the site data version joined into the
+rows) before querying the results, then:
+
+    cached = conditional(tag, cache_control)
+    if cached is not None:
+        return cached              # 304, or the stored body of this URL and tag
+    response = respond(...)
+    return store(response, tag, cache_control, last_modified)
+
+Bodies are kept in an LRU keyed by (URL, tag): a new batch or data version
+gives a new tag, so entries never need invalidating; stale ones age out.
+Only successful 200 responses are stored. Hits, misses and 304s are counted
+in the http_cache metric; http_cache_hit_ratio is the share answered without
+building the response.
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone
+from hashlib import sha1
+from flask import Response, request
+from config import Config
+from utils.metrics import metrics
+import threading
+
+# Result responses join live site columns: clients keep the body but revalidate
+REVALIDATE = 'no-cache'
+
+_responses = OrderedDict()
+_responses_lock = threading.Lock()
+
+
+class _Entry:
+    __slots__ = ('body', 'content_type', 'last_modified')
+
+    def __init__(self, body: bytes, content_type: str, last_modified: datetime):
+        self.body = body
+        self.content_type = content_type
+        self.last_modified = last_modified
+
+
+def make_etag(*parts) -> str:
+    """Entity tag (unquoted) of a response derived from `parts`"""
+    return sha1('|'.join(str(part) for part in parts).encode()).hexdigest()[:24]
+
+
+def _headers(response: Response, tag: str, cache_control: str, last_modified: datetime):
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = cache_control
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.vary.add('Accept')
+    return response
+
+
+def _not_modified(entry: _Entry) -> bool:
+    if request.if_none_match:
+        # Checked by the caller; If-Modified-Since is ignored alongside it
+        return False
+    since = request.if_modified_since
+    if since is None or entry is None or entry.last_modified is None:
+        return False
+    # HTTP dates have whole seconds
+    return entry.last_modified.replace(microsecond=0) <= since
+
+
+def conditional(tag: str, cache_control: str):
+    """
+    Answer the current request without building its response, if possible
+
+    Args:
+        tag: make_etag() of the response
+        cache_control: Cache-Control header value
+
+    Returns:
+        A 304 when the client's If-None-Match (or If-Modified-Since) matches,
+        the stored body of this URL and tag, or None on a miss (always
+        None when Config.HTTP_CACHE_ENABLED is off)
+    """
+    if not Config.HTTP_CACHE_ENABLED:
+        return None
+
+    key = (request.full_path, tag)
+    with _responses_lock:
+        entry = _responses.get(key)
+        if entry is not None:
+            _responses.move_to_end(key)
+
+    if request.if_none_match.contains_weak(tag) or _not_modified(entry):
+        metrics.increment('http_cache', outcome='not_modified')
+        return _headers(Response(status=304), tag, cache_control,
+                        entry.last_modified if entry is not None else None)
+
+    if entry is None:
+        metrics.increment('http_cache', outcome='miss')
+        return None
+
+    metrics.increment('http_cache', outcome='hit')
+    response = Response(entry.body, status=200, content_type=entry.content_type)
+    return _headers(response, tag, cache_control, entry.last_modified)
+
+
+def store(response: Response, tag: str, cache_control: str, last_modified: datetime = None):
+    """
+    Add validators and caching headers to a freshly built response and keep it
+
+    Args:
+        response: 200 response of a successful lookup
+        tag: make_etag() passed to conditional()
+        cache_control: Cache-Control header value
+        last_modified: When the underlying results were saved (naive = UTC)
+
+    Returns:
+        The response, with ETag, Cache-Control and Last-Modified set
+    """
+    if not Config.HTTP_CACHE_ENABLED:
+        return response
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    _headers(response, tag, cache_control, last_modified)
+
+    body = response.get_data()
+    if len(body) > Config.HTTP_CACHE_MAX_BODY_BYTES:
+        return response
+
+    key = (request.full_path, tag)
+    with _responses_lock:
+        _responses[key] = _Entry(body, response.content_type, last_modified)
+        _responses.move_to_end(key)
+        while len(_responses) > Config.HTTP_CACHE_SIZE:
+            _responses.popitem(last=False)
+    return response
+
+
+def hit_ratio() -> float:
+    """Share of cacheable requests answered from the cache or with a 304"""
+    hits = metrics.value('http_cache', outcome='hit') + metrics.value('http_cache', outcome='not_modified')
+    total = hits + metrics.value('http_cache', outcome='miss')
+    return round(hits / total, 4) if total else 0.0
+
+
+def clear():
+    """Drop every stored response"""
+    with _responses_lock:
+        _responses.clear()
+
+
+metrics.register_gauge('http_cache_entries', lambda: len(_responses))
+metrics.register_gauge('http_cache_hit_ratio', hit_ratio)
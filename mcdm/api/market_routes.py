@@ -0,0 +1,57 @@
+from flask import Blueprint, jsonify
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Create blueprint
+market_bp = Blueprint('market', __name__)
+
+
+@market_bp.route('/market/competitors', methods=['GET'])
+def list_competitors():
+    """List the competitor stores used by the Huff market capture model"""
+    try:
+        from services.market_service import MarketCaptureService
+        return jsonify(MarketCaptureService().list_competitors()), 200
+    
+    except Exception as e:
+        logger.error(f"Error listing competitors: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@market_bp.route('/market/capture/recompute', methods=['POST'])
+def recompute_market_capture():
+    """
+    Recompute every site's market_capture criterion (Huff model)
+    
+    Response:
+    {
+        "success": true,
+        "grid": {"rows": 1000, "columns": 1000, "cell_km": 0.1, "total_demand": 8.1e6},
+        "competitors": 2000,
+        "sites": 50000,
+        "sites_updated": 49812,
+        "compute_time_ms": 3120.5,
+        ...
+    }
+    """
+    try:
+        from services.market_service import MarketCaptureService
+        return jsonify(MarketCaptureService().recompute()), 200
+    
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Market capture recompute error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Market capture recompute failed: {str(e)}'
+        }), 500
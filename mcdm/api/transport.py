@@ -0,0 +1,143 @@
+"""
+Response content negotiation for result endpoints
+
+JSON stays the default. Clients (the Spring Boot manager) may ask for:
+
+- application/vnd.apache.arrow.stream: one Arrow IPC stream holding the
+  result list as a columnar record batch, encoded from the service's
+  {field: array} columns without per-row dicts. The rest of the response
+  (success, batch_id, ...) travels as JSON in the schema metadata under
+  "response".
+- application/msgpack (or application/x-msgpack): the JSON document in
+  MessagePack encoding.
+
+pyarrow and msgpack are optional: formats whose library is missing are not
+offered, so a client accepting only those gets 406. Error responses are
+always JSON.
+"""
+from importlib.util import find_spec
+from flask import Response, jsonify, request
+import json
+
+JSON = 'application/json'
+ARROW = 'application/vnd.apache.arrow.stream'
+MSGPACK = 'application/msgpack'
+MSGPACK_X = 'application/x-msgpack'
+
+ARROW_METADATA_KEY = b'response'
+
+_available = {}
+
+
+def _installed(module: str) -> bool:
+    if module not in _available:
+        _available[module] = find_spec(module) is not None
+    return _available[module]
+
+
+def _default(value):
+    # NumPy arrays/scalars, datetimes; anything else as text (like json default=str)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def offered_types(tabular: bool = True) -> list:
+    """Media types this worker can produce, JSON first"""
+    offers = [JSON]
+    if _installed('msgpack'):
+        offers += [MSGPACK, MSGPACK_X]
+    if tabular and _installed('pyarrow'):
+        offers.append(ARROW)
+    return offers
+
+
+def negotiate(tabular: bool = True) -> str:
+    """
+    Media type to answer the current request with
+
+    Args:
+        tabular: The response has a single result list Arrow can carry
+
+    Returns:
+        One of the offered media types, or None when the client accepts
+        only binary formats that cannot be produced (answer 406)
+    """
+    accept = request.accept_mimetypes
+    if not accept:
+        return JSON
+    best = accept.best_match(offered_types(tabular))
+    if best is not None:
+        return best
+    # Unmatched Accept headers (e.g. a browser's text/html) keep getting JSON
+    if any(accept.quality(media_type) for media_type in (ARROW, MSGPACK, MSGPACK_X)):
+        return None
+    return JSON
+
+
+def not_acceptable(tabular: bool = True):
+    """406 response listing the media types that can be produced"""
+    response = jsonify({
+        'success': False,
+        'error': f"Not acceptable: {request.headers.get('Accept')}",
+        'supported_media_types': offered_types(tabular)
+    })
+    response.status_code = 406
+    response.vary.add('Accept')
+    return response
+
+
+def encode_msgpack(payload: dict) -> bytes:
+    import msgpack
+    return msgpack.packb(payload, default=_default)
+
+
+def encode_arrow(payload: dict, table: str) -> bytes:
+    """
+    Arrow IPC stream of payload[table], other fields as schema metadata
+
+    payload[table] is {field: array} (or a list of row dicts, converted).
+    """
+    import pyarrow as pa
+    from utils.columns import columns_from_rows
+
+    columns = payload[table]
+    if not isinstance(columns, dict):
+        columns = columns_from_rows(columns)
+    meta = {key: value for key, value in payload.items() if key != table}
+
+    batch = pa.RecordBatch.from_pydict(
+        {name: pa.array(values) for name, values in columns.items()},
+        metadata={ARROW_METADATA_KEY: json.dumps(meta, default=_default).encode()}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def respond(payload: dict, media_type: str, table: str = None, status: int = 200):
+    """
+    Encode a response in the negotiated media type
+
+    Args:
+        payload: Response document
+        media_type: Result of negotiate()
+        table: Key of the result list carried as Arrow columns
+        status: HTTP status
+    """
+    if media_type == ARROW and table in payload:
+        body = encode_arrow(payload, table)
+    elif media_type in (MSGPACK, MSGPACK_X):
+        body = encode_msgpack(payload)
+    else:
+        response = jsonify(payload)
+        response.status_code = status
+        response.vary.add('Accept')
+        return response
+
+    response = Response(body, status=status, mimetype=media_type)
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,183 @@
+from flask import Blueprint, jsonify, request
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Create blueprint
+warehouse_bp = Blueprint('warehouse', __name__)
+
+
+@warehouse_bp.route('/warehouses', methods=['GET'])
+def list_warehouses():
+    """
+    List warehouse locations
+    
+    Query Parameters:
+        active_only: Only active warehouses (default: false)
+    """
+    try:
+        from services.warehouse_service import WarehouseService
+        active_only = request.args.get('active_only', 'false').lower() == 'true'
+        
+        return jsonify(WarehouseService().list_warehouses(active_only=active_only)), 200
+    
+    except Exception as e:
+        logger.error(f"Error listing warehouses: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@warehouse_bp.route('/warehouses', methods=['POST'])
+def add_warehouse():
+    """
+    Add a warehouse and recompute every site's nearest-warehouse distance
+    
+    Request Body:
+    {
+        "code": "KHO-TD",               // Required, unique
+        "name": "Kho Thủ Đức",          // Required
+        "x_coordinate": 106.7700,       // Required, longitude
+        "y_coordinate": 10.8500,        // Required, latitude
+        "recompute": true               // Optional, default true
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        
+        from services.warehouse_service import WarehouseService
+        result = WarehouseService().add_warehouse(
+            code=data.get('code'),
+            name=data.get('name'),
+            x_coordinate=data.get('x_coordinate'),
+            y_coordinate=data.get('y_coordinate'),
+            recompute=bool(data.get('recompute', True))
+        )
+        
+        return jsonify(result), 201
+    
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Error adding warehouse: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Adding warehouse failed: {str(e)}'
+        }), 500
+
+
+@warehouse_bp.route('/warehouses/recompute', methods=['POST'])
+def recompute_distances():
+    """
+    Recompute every site's distance to its nearest active warehouse
+    
+    Request Body (optional):
+    {
+        "metric": "haversine"   // or "road" (Config.WAREHOUSE_ROAD_MATRIX_PATH)
+    }
+    
+    Response:
+    {
+        "success": true,
+        "metric": "haversine",
+        "warehouses": 100,
+        "sites": 1000000,
+        "sites_updated": 48211,
+        "compute_time_ms": 812.4,
+        ...
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        from services.warehouse_service import WarehouseService
+        result = WarehouseService().recompute_distances(metric=data.get('metric'))
+        
+        return jsonify(result), 200
+    
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Warehouse distance recompute error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Warehouse distance recompute failed: {str(e)}'
+        }), 500
+
+
+@warehouse_bp.route('/warehouses/whatif', methods=['POST'])
+def run_warehouse_whatif():
+    """
+    Re-score the sites a hypothetical new warehouse would be nearest to
+    
+    Nothing is saved. Only sites nearer to the new warehouse than to their
+    current nearest one change distance_to_warehouse.
+    
+    Request Body:
+    {
+        "x_coordinate": 106.7700,   // Required, longitude
+        "y_coordinate": 10.8500,    // Required, latitude
+        "config_id": 1,             // Optional, use active config if not provided
+        "normalization": "vector",  // Optional
+        "metric": "haversine",      // Optional
+        "limit": 20                 // Optional, changed sites to list
+    }
+    
+    Response:
+    {
+        "success": true,
+        "sites_analyzed": 100000,
+        "sites_changed": 8123,
+        "mean_distance_saved": 3.412,
+        "results": [
+            {
+                "site_code": "HCM-Q2-031",
+                "distance_from": 14.2, "distance_to": 2.9,
+                "baseline_rank": 812, "rank": 95, "rank_change": 717, ...
+            }
+        ]
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        
+        limit = int(data.get('limit', 20))
+        if limit < 0 or limit > 1000:
+            raise ValueError("limit must be between 0 and 1000")
+        
+        from services.whatif_service import WhatIfService
+        result = WhatIfService().evaluate_warehouse(
+            x_coordinate=data.get('x_coordinate'),
+            y_coordinate=data.get('y_coordinate'),
+            config_id=data.get('config_id'),
+            normalization=data.get('normalization'),
+            metric=data.get('metric'),
+            limit=limit
+        )
+        
+        return jsonify(result), 200
+    
+    except ValueError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Warehouse what-if error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Warehouse what-if analysis failed: {str(e)}'
+        }), 500
@@ -27,17 +27,65 @@ def create_app(config_class=Config):
     # Register blueprints
     from api.health_routes import health_bp
     from api.analysis_routes import analysis_bp
+    from api.warehouse_routes import warehouse_bp
+    from api.market_routes import market_bp
     
     app.register_blueprint(health_bp, url_prefix='/api')
     app.register_blueprint(analysis_bp, url_prefix='/api')
+    app.register_blueprint(warehouse_bp, url_prefix='/api')
+    app.register_blueprint(market_bp, url_prefix='/api')
+    
+    if config_class.WARM_UP_ON_START:
+        warm_up()
     
     logger.info("Flask MCDM Service initialized successfully")
     
     return app
 
 
+def warm_up():
+    """
+    Pay the one-off startup costs ahead of the first request
+    
+    Imports and runs every registered algorithm kernel, checks that the
+    database pool can be opened and publishes the shared site matrix. Under
+    gunicorn with preload_app this runs once in the master, so forked
+    workers inherit the imported modules.
+    """
+    from algorithms import AlgorithmFactory
+    from utils.db_connector import check_pool_health, reset_pool
+    
+    timings = AlgorithmFactory.warm_up()
+    logger.info(f"Warmed up algorithm kernels: {timings}")
+    
+    database = check_pool_health()
+    if database['healthy']:
+        logger.info(f"Database pool ready ({database['latency_ms']} ms)")
+        if Config.SITE_MATRIX_ENABLED:
+            # Publish the shared site matrix once, before any worker needs it
+            from services.data_service import DataService
+            matrix = DataService().try_load_site_matrix()
+            if matrix is not None:
+                logger.info(f"Site matrix {matrix.generation} ready ({len(matrix)} sites)")
+    else:
+        logger.warning(f"Database not reachable during warm-up: {database['error']}")
+    
+    # Close the connections opened above: they must not be shared with
+    # forked workers, which build their own pool on first use.
+    reset_pool()
+
+
 if __name__ == '__main__':
     app = create_app()
+    if Config.SNAPSHOT_REFRESH_ENABLED:
+        from services.snapshot_service import start_refresher
+        start_refresher()
+    if Config.BATCH_SWEEP_ENABLED:
+        from services.batch_sweeper import start_sweeper
+        start_sweeper()
+    if Config.COMPUTE_POOL_ENABLED and Config.COMPUTE_POOL_PRESTART:
+        from services.analysis_service import get_process_pool
+        get_process_pool().start()
     app.run(
         host='0.0.0.0',
         port=5000,
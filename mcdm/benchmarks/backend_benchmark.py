@@ -0,0 +1,136 @@
+"""
+============================================================================
+Database backend benchmark
+Per-request database overhead of the embedded SQLite backend, and of MySQL
+when --mysql is given and the server in Config is reachable
+============================================================================
+
+Each backend gets the same generated sites and one saved analysis batch;
+then every operation runs --repeat times and its p50/p95 is reported:
+DataService calls the request paths make, and full requests through the
+Flask test client (no HTTP socket, so only app + database time counts).
+
+The MySQL run replaces potential_site in the configured database, like
+load_test --seed-sites.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.backend_benchmark
+    python -m benchmarks.backend_benchmark --sites 10000 --repeat 200 --mysql
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import numpy as np
+from config import Config
+from benchmarks.load_test import seed_sites
+
+
+def percentiles(fn, repeat: int) -> tuple:
+    """(p50, p95) wall time of fn() in ms"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 95))
+
+
+def measure(backend: str, args) -> dict:
+    """Seed the backend's database and time each operation"""
+    from app import create_app
+    from algorithms import AlgorithmFactory
+    from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA, WEIGHT_COLUMNS
+    from services.data_service import DataService
+    from utils.db_connector import get_db_connection, reset_pool
+
+    Config.DB_BACKEND = backend
+    reset_pool()
+    seed_sites(args.sites)
+
+    service = DataService()
+    config = service.load_config()
+    sites = service.load_sites()
+    algo = AlgorithmFactory.create('topsis')
+    weights = {criterion: config[column] for criterion, column in WEIGHT_COLUMNS.items()}
+    results = algo.analyze(sites, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+    service.save_results(results, config['id'])
+    site_id = int(sites['id'].iloc[0])
+
+    def round_trip():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        cursor.close()
+        conn.close()
+
+    client = create_app().test_client()
+
+    def get(path):
+        response = client.get(path)
+        assert response.status_code == 200, f"{path}: {response.status_code}"
+
+    operations = [
+        ('connect + SELECT 1', round_trip, args.repeat),
+        ('get_data_version', service.get_data_version, args.repeat),
+        ('load_config', service.load_config, args.repeat),
+        ('get_latest_batch_results', lambda: service.get_latest_batch_results(10), args.repeat),
+        ('get_evaluation_history', lambda: service.get_evaluation_history_by_site(site_id), args.repeat),
+        ('load_sites', service.load_sites, max(args.repeat // 10, 5)),
+        ('save_results', lambda: service.save_results(results, config['id']), max(args.repeat // 10, 5)),
+        ('GET /api/results/latest', lambda: get('/api/results/latest?limit=10'), args.repeat),
+        ('GET /api/site/<id>/history', lambda: get(f"/api/site/{site_id}/history"), args.repeat),
+    ]
+    return {name: percentiles(fn, repeat) for name, fn, repeat in operations}
+
+
+def mysql_reachable() -> bool:
+    from utils.db_connector import test_connection
+    Config.DB_BACKEND = 'mysql'
+    try:
+        return test_connection()
+    except ImportError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-request overhead of the database backends')
+    parser.add_argument('--sites', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--mysql', action='store_true', help='also measure the MySQL server in Config')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    # Read the database on every /results/latest instead of the snapshot
+    Config.SNAPSHOT_REFRESH_ENABLED = False
+    Config.SINGLE_FLIGHT_CROSS_WORKER = False
+
+    reports = {}
+    with tempfile.TemporaryDirectory() as directory:
+        Config.DB_PATH = os.path.join(directory, 'retail_dss.db')
+        reports['sqlite'] = measure('sqlite', args)
+        if args.mysql:
+            if mysql_reachable():
+                reports['mysql'] = measure('mysql', args)
+            else:
+                print(f"MySQL at {Config.DB_HOST}:{Config.DB_PORT} not reachable, skipped")
+        Config.DB_BACKEND = 'sqlite'
+        from utils.db_connector import reset_pool
+        reset_pool()
+
+    backends = list(reports)
+    print("=" * 78)
+    print("DATABASE BACKEND BENCHMARK")
+    print("=" * 78)
+    print(f"Sites: {args.sites}   repeat: {args.repeat}   times in ms (p50 / p95)")
+    print(f"{'operation':30}" + ''.join(f"{backend:>24}" for backend in backends))
+    for name in reports['sqlite']:
+        cells = ''.join(f"{reports[b][name][0]:>13.3f} / {reports[b][name][1]:<8.3f}" for b in backends)
+        print(f"{name:30}{cells}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+============================================================================
+Bootstrap interval benchmark
+Score/rank confidence intervals of N sites over R noisy replicates (see
+algorithms/bootstrap.py), on process pools of increasing size
+============================================================================
+
+Reported:
+- the stacked TOPSIS kernel against scoring the same replicates one by one
+- wall time of the scoring and summary phases per pool size, with speedup
+  and parallel efficiency against one worker (pools are started before
+  timing, so worker start-up is excluded)
+- that every pool size gives identical intervals (replicate seeds do not
+  depend on the chunking)
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.bootstrap_benchmark
+    python -m benchmarks.bootstrap_benchmark --sites 10000 --replicates 2000 --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from algorithms import AlgorithmFactory
+from algorithms.bootstrap import bootstrap_intervals, noise_arrays, parse_error_models, perturb
+from config import Config
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+
+
+def default_workers() -> list:
+    """1, 2, 4, ... up to the CPU count"""
+    cpus = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= cpus:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cpus:
+        workers.append(cpus)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bootstrap intervals')
+    parser.add_argument('--sites', type=int, default=10000)
+    parser.add_argument('--replicates', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    parser.add_argument('--batch-values', type=int, default=Config.BOOTSTRAP_BATCH_VALUES)
+    args = parser.parse_args()
+
+    criteria = COST_CRITERIA + BENEFIT_CRITERIA
+    matrix = make_sites(args.sites)[criteria].to_numpy(dtype=np.float64)
+    weights = np.array([WEIGHTS[c] for c in criteria])
+    noise = noise_arrays(parse_error_models(Config.BOOTSTRAP_ERROR_MODELS, criteria), criteria)
+    n_cost = len(COST_CRITERIA)
+
+    print("=" * 78)
+    print("BOOTSTRAP INTERVAL BENCHMARK")
+    print("=" * 78)
+    print(f"Sites: {args.sites:,}   replicates: {args.replicates:,}   CPUs: {os.cpu_count()}")
+
+    # Kernel: the stacked criterion-major batches against scoring the same
+    # replicates one (site-major) matrix at a time
+    algo = AlgorithmFactory.create('topsis')
+    count = max(1, min(args.replicates, 2_000_000 // matrix.size))
+    batch = max(1, args.batch_values // matrix.size)
+    columns = np.ascontiguousarray(matrix.T)
+    planes = np.empty((count,) + columns.shape)
+    for r in range(count):
+        perturb(columns, *noise, np.random.default_rng((0, r)), planes[r])
+    replicates = [np.ascontiguousarray(p.T) for p in planes]
+
+    start = time.perf_counter()
+    stacked = np.vstack([algo.score_matrix_stack(planes[i:i + batch].transpose(0, 2, 1), weights, n_cost)
+                         for i in range(0, count, batch)])
+    stacked_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    looped = np.stack([algo.score_matrix(m, weights, n_cost) for m in replicates])
+    looped_ms = (time.perf_counter() - start) * 1000
+    print(f"\nScoring {count} replicates: batches of {batch} {stacked_ms:.1f} ms, one by one "
+          f"{looped_ms:.1f} ms ({looped_ms / stacked_ms:.1f}x), "
+          f"{'OK' if np.allclose(stacked, looped, atol=1e-12) else 'MISMATCH'}")
+
+    print(f"\n{'workers':>8} {'scoring ms':>12} {'summary ms':>12} {'speedup':>9} {'efficiency':>11}")
+    reference = None
+    base_ms = None
+    context = multiprocessing.get_context(Config.PROCESS_POOL_START_METHOD)
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            # Start every worker and import the algorithms before timing
+            list(pool.map(AlgorithmFactory.create, ['topsis'] * workers))
+            result = bootstrap_intervals(
+                matrix, 'topsis', weights, n_cost, noise, args.replicates, seed=7,
+                executor=pool, tasks=2 * workers, batch_values=args.batch_values
+            )
+        total_ms = result['scoring_ms'] + result['summary_ms']
+        base_ms = base_ms or total_ms
+        speedup = base_ms / total_ms
+        print(f"{workers:>8} {result['scoring_ms']:>12.1f} {result['summary_ms']:>12.1f} "
+              f"{speedup:>8.2f}x {speedup / workers * args.workers[0]:>10.0%}")
+
+        if reference is None:
+            reference = result
+        elif not all(np.array_equal(reference[k], result[k]) for k in ('score_low', 'rank_high')):
+            print("  intervals differ from the first run: MISMATCH")
+
+    width = reference['rank_high'] - reference['rank_low']
+    print(f"\nMean score interval width:  {np.mean(reference['score_high'] - reference['score_low']):.4f}")
+    print(f"Median rank interval width: {np.median(width):.0f} ranks")
+
+
+if __name__ == '__main__':
+    main()
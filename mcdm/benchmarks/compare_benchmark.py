@@ -0,0 +1,87 @@
+"""
+============================================================================
+Batch comparison benchmark
+Target: rank drift between two 100k-site batches well under 1 s
+============================================================================
+
+Two synthetic batches share most sites: the target drops a few, adds new
+ones and rescores every site with noise. Reported are the time to build each
+BatchRanking (sort + ranks, done once per batch and cached) and the time of
+compare_rankings itself.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.compare_benchmark
+    python -m benchmarks.compare_benchmark --sites 200000 --churn 0.05 --repeat 20
+"""
+
+import argparse
+import time
+import numpy as np
+from algorithms.rank_drift import BatchRanking, compare_rankings
+
+
+def make_batches(n_sites: int, churn: float, rng: np.random.Generator) -> tuple:
+    """(base site_ids, scores), (target site_ids, scores) in saved (score) order"""
+    base_ids = rng.permutation(n_sites).astype(np.int64) + 1
+    base_scores = rng.beta(2, 2, n_sites)
+
+    n_churn = int(n_sites * churn)
+    kept = rng.random(n_sites) >= churn
+    target_ids = np.concatenate([base_ids[kept], np.arange(n_churn, dtype=np.int64) + n_sites + 1])
+    target_scores = np.concatenate([
+        np.clip(base_scores[kept] + rng.normal(0, 0.05, kept.sum()), 0, 1),
+        rng.beta(2, 2, n_churn)
+    ])
+
+    # Rows come back from evaluation_result best first
+    base_order = np.argsort(-base_scores)
+    target_order = np.argsort(-target_scores)
+    return ((base_ids[base_order], base_scores[base_order]),
+            (target_ids[target_order], target_scores[target_order]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure batch comparison latency')
+    parser.add_argument('--sites', type=int, default=100000)
+    parser.add_argument('--churn', type=float, default=0.02)
+    parser.add_argument('--top-n', type=int, default=100)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    base_rows, target_rows = make_batches(args.sites, args.churn, rng)
+
+    start = time.perf_counter()
+    base = BatchRanking(*base_rows)
+    target = BatchRanking(*target_rows)
+    build_ms = (time.perf_counter() - start) * 1000 / 2
+
+    # First call includes the lazy scipy import
+    start = time.perf_counter()
+    drift = compare_rankings(base, target, top_n=args.top_n, limit=args.limit)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        compare_rankings(base, target, top_n=args.top_n, limit=args.limit)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print("=" * 70)
+    print("BATCH COMPARISON BENCHMARK")
+    print("=" * 70)
+    print(f"Sites:              {args.sites:,} (churn {args.churn:.0%})")
+    print(f"Common sites:       {drift['common_sites']:,}")
+    print(f"Kendall tau:        {drift['kendall_tau']:.4f}")
+    print(f"Spearman:           {drift['spearman']:.4f}")
+    print(f"Top-N overlap:      {drift['top_n']['overlap']} (jaccard {drift['top_n']['jaccard']})")
+    print(f"Mean |rank change|: {drift['rank_change']['mean_abs']}")
+    print(f"\nBatchRanking build: {build_ms:.1f} ms per batch")
+    print(f"First comparison:   {first_ms:.1f} ms")
+    print(f"Comparison p50:     {np.percentile(timings, 50):.1f} ms")
+    print(f"Comparison max:     {max(timings):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
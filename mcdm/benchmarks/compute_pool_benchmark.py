@@ -0,0 +1,103 @@
+"""
+============================================================================
+Compute pool benchmark
+Latency of /api/health on a worker that is running large analyses, with
+the algorithm kernels on the request thread vs on the compute pool
+============================================================================
+
+A background thread runs back-to-back analyses of N synthetic sites
+(AnalysisService._analyze, no database needed) while the main thread probes
+GET /api/health through the Flask test client. Kernels on the request
+thread hold the GIL between the probes; on the pool only the shared-memory
+copy and the result attach do.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.compute_pool_benchmark
+    python -m benchmarks.compute_pool_benchmark --sites 200000 --duration 10 --algorithm fuzzy_topsis
+"""
+
+import argparse
+import logging
+import threading
+import time
+import numpy as np
+from algorithms import AlgorithmFactory
+from config import Config
+from services.analysis_service import AnalysisService, get_process_pool
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+
+
+def probe(client, duration: float, busy: threading.Event, stop: threading.Event) -> tuple:
+    """Health-check latencies (ms) while the analysis thread runs, and their count"""
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        client.get('/api/health')
+        if busy.is_set():
+            timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    stop.set()
+    return timings
+
+
+def run(label: str, client, service, algo, algorithm: str, df, duration: float):
+    stop = threading.Event()
+    busy = threading.Event()
+    analyses = []
+
+    def analyze():
+        while not stop.is_set():
+            busy.set()
+            start = time.perf_counter()
+            service._analyze(algorithm, algo, df, WEIGHTS)
+            analyses.append((time.perf_counter() - start) * 1000)
+
+    worker = threading.Thread(target=analyze, daemon=True)
+    worker.start()
+    timings = probe(client, duration, busy, stop)
+    worker.join()
+
+    print(f"{label:<14} {len(analyses):>9} {np.median(analyses):>12.1f} "
+          f"{np.percentile(timings, 50):>10.2f} {np.percentile(timings, 99):>10.2f} {max(timings):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure probe latency during analyses')
+    parser.add_argument('--sites', type=int, default=100000)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--algorithm', default='topsis')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from app import create_app
+    client = create_app().test_client()
+
+    df = make_sites(args.sites)
+    algo = AlgorithmFactory.create(args.algorithm)
+    service = AnalysisService()
+
+    # Start and warm the pool before timing
+    pool = get_process_pool()
+    pool.start()
+    Config.COMPUTE_MIN_SITES = 0
+    Config.COMPUTE_POOL_ENABLED = True
+    service._analyze(args.algorithm, algo, df, WEIGHTS)
+
+    print("=" * 72)
+    print("COMPUTE POOL BENCHMARK")
+    print("=" * 72)
+    print(f"Sites: {args.sites:,}   algorithm: {args.algorithm}   pool workers: {pool.workers}")
+    print(f"\n{'kernels':<14} {'analyses':>9} {'analysis ms':>12} "
+          f"{'probe p50':>10} {'probe p99':>10} {'probe max':>10}")
+
+    Config.COMPUTE_POOL_ENABLED = False
+    run('request thread', client, service, algo, args.algorithm, df, args.duration)
+    Config.COMPUTE_POOL_ENABLED = True
+    run('compute pool', client, service, algo, args.algorithm, df, args.duration)
+
+    print(f"\nPool: {pool.stats()}")
+
+
+if __name__ == '__main__':
+    main()
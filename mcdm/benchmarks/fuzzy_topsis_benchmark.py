@@ -0,0 +1,79 @@
+"""
+============================================================================
+Fuzzy TOPSIS vs crisp TOPSIS runtime benchmark
+Target: Fuzzy TOPSIS within 2x of crisp TOPSIS at 100k sites
+============================================================================
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.fuzzy_topsis_benchmark
+    python -m benchmarks.fuzzy_topsis_benchmark --sites 100000 200000 --repeat 10
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from algorithms import AlgorithmFactory
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+
+WEIGHTS = {
+    'rent_cost': 0.08, 'renovation_cost': 0.07,
+    'competitor_count': 0.10, 'distance_to_warehouse': 0.05,
+    'floor_area': 0.12, 'front_width': 0.10,
+    'traffic_score': 0.25, 'population_density': 0.23,
+    'market_capture': 0.0
+}
+
+
+def make_sites(n_sites: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic sites in the value ranges used by generate_data.py"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'rent_cost': rng.uniform(15, 60, n_sites),
+        'renovation_cost': rng.uniform(30, 400, n_sites),
+        'competitor_count': rng.integers(0, 16, n_sites),
+        'distance_to_warehouse': rng.uniform(1, 25, n_sites),
+        'floor_area': rng.uniform(40, 200, n_sites),
+        'front_width': rng.uniform(4, 15, n_sites),
+        'traffic_score': rng.integers(3, 11, n_sites),
+        'population_density': rng.uniform(5000, 40000, n_sites),
+        'market_capture': rng.uniform(0, 50000, n_sites),
+    })
+    # Half of the sites carry surveyed bounds for traffic_score
+    surveyed = rng.random(n_sites) < 0.5
+    df['traffic_score_lower'] = np.where(surveyed, df['traffic_score'] - 1, np.nan)
+    df['traffic_score_upper'] = np.where(surveyed, df['traffic_score'] + 1, np.nan)
+    return df
+
+
+def time_algorithm(name: str, df: pd.DataFrame, repeat: int) -> float:
+    """Median wall time of analyze() in milliseconds"""
+    algo = AlgorithmFactory.create(name)
+    algo.analyze(df, WEIGHTS, COST_CRITERIA, BENEFIT_CRITERIA)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        algo.analyze(df, WEIGHTS, COST_CRITERIA, BENEFIT_CRITERIA)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Fuzzy TOPSIS and TOPSIS runtime')
+    parser.add_argument('--sites', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("FUZZY TOPSIS BENCHMARK")
+    print("=" * 70)
+    print(f"{'sites':>10} {'topsis ms':>12} {'fuzzy ms':>12} {'ratio':>8}")
+    for n_sites in args.sites:
+        df = make_sites(n_sites)
+        crisp = time_algorithm('topsis', df, args.repeat)
+        fuzzy = time_algorithm('fuzzy_topsis', df, args.repeat)
+        print(f"{n_sites:>10} {crisp:>12.1f} {fuzzy:>12.1f} {fuzzy / crisp:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
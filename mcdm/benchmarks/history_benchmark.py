@@ -0,0 +1,123 @@
+"""
+============================================================================
+Site history benchmark
+Target: latency of a history page independent of the history length
+============================================================================
+
+A temporary SQLite database gets sites whose histories hold 100 to 100k
+evaluations (spread over two years). For each length, reported are the
+previous single query (every row, er.* and both joins), the first keyset
+page, a page deep in the history (resumed from its cursor) and one page of
+day-resolution points, all through AnalysisService as the endpoint calls it.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.history_benchmark
+    python -m benchmarks.history_benchmark --lengths 1000 100000 --limit 50 --repeat 20
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from config import Config
+from benchmarks.load_test import seed_sites
+
+# get_evaluation_history_by_site before keyset pagination
+FULL_HISTORY_QUERY = """
+    SELECT
+        er.*,
+        ec.strategy_name,
+        u.full_name as evaluated_by
+    FROM evaluation_result er
+    LEFT JOIN expert_criteria_config ec ON er.config_id = ec.id
+    LEFT JOIN users u ON er.user_id = u.id
+    WHERE er.site_id = %s
+    ORDER BY er.created_at DESC
+"""
+
+
+def add_history(conn, site_id: int, length: int, rng: random.Random):
+    """Insert `length` evaluations of a site at random times over two years"""
+    start = datetime(2024, 1, 1)
+    rows = [
+        (1, site_id, 'TOPSIS', rng.random(), rng.randint(1, 10000),
+         (start + timedelta(seconds=rng.randint(0, 2 * 365 * 86400))).strftime('%Y-%m-%d %H:%M:%S'),
+         f"BENCH_{site_id}_{i}")
+        for i in range(length)
+    ]
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO evaluation_result (config_id, site_id, algorithm_used, topsis_score, "
+        "rank_position, created_at, batch_id) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        rows
+    )
+    conn.commit()
+    cursor.close()
+
+
+def timed(fn, repeat: int) -> float:
+    """Median milliseconds of fn()"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure site history page latency')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        Config.DB_BACKEND = 'sqlite'
+        Config.DB_PATH = os.path.join(directory, 'retail_dss.db')
+        seed_sites(max(len(args.lengths), 10))
+
+        from services.analysis_service import AnalysisService
+        from utils.db_connector import get_db_connection
+        service = AnalysisService()
+        conn = get_db_connection()
+        rng = random.Random(7)
+        for site_id, length in enumerate(args.lengths, start=1):
+            add_history(conn, site_id, length, rng)
+
+        print("=" * 72)
+        print("SITE HISTORY BENCHMARK")
+        print("=" * 72)
+        print(f"Page size: {args.limit}   repeat: {args.repeat}")
+        print(f"\n{'evaluations':>11} {'full ms':>9} {'first page':>11} {'deep page':>10} {'day points':>11}")
+
+        for site_id, length in enumerate(args.lengths, start=1):
+            full_ms = timed(lambda: pd.read_sql(FULL_HISTORY_QUERY, conn, params=(site_id,)), args.repeat)
+            first_ms = timed(lambda: service.get_site_evaluation_history(site_id, limit=args.limit),
+                             args.repeat)
+
+            # Walk to the middle of the history once, then time that page
+            cursor = None
+            for _ in range(length // (2 * args.limit)):
+                cursor = service.get_site_evaluation_history(
+                    site_id, limit=args.limit, cursor=cursor
+                )['next_cursor']
+            deep_ms = timed(lambda: service.get_site_evaluation_history(
+                site_id, limit=args.limit, cursor=cursor
+            ), args.repeat)
+
+            day_ms = timed(lambda: service.get_site_evaluation_history(
+                site_id, limit=args.limit, resolution='day'
+            ), args.repeat)
+            print(f"{length:>11,} {full_ms:>9.2f} {first_ms:>11.2f} {deep_ms:>10.2f} {day_ms:>11.2f}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+============================================================================
+HTTP cache benchmark
+Latency of the manager UI's polling of result endpoints, with and without
+conditional GET and the response cache (api/http_cache.py)
+============================================================================
+
+A temporary SQLite database is seeded with N sites and a few analysis
+batches. Simulated UI clients then poll /results/latest, /results/batch/<id>
+of a random saved batch and /site/<id>/history of a random site through the
+Flask test client; a client that already has a response sends its ETag in
+If-None-Match, as browsers do. Reported per endpoint: p50/p99 latency with
+the cache off and on, and the hit ratio (cache hits plus 304s).
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.http_cache_benchmark
+    python -m benchmarks.http_cache_benchmark --sites 100000 --requests 3000 --limit 50
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from config import Config
+from benchmarks.load_test import seed_sites
+
+
+def poll(client, urls: list, requests: int, revalidate: bool, seed: int) -> dict:
+    """{endpoint: [latency ms]} of `requests` random GETs of `urls`"""
+    rng = random.Random(seed)
+    etags = {}
+    timings = {}
+    for _ in range(requests):
+        endpoint, url = rng.choice(urls)
+        headers = {'If-None-Match': etags[url]} if revalidate and url in etags else {}
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        timings.setdefault(endpoint, []).append((time.perf_counter() - start) * 1000)
+        if response.headers.get('ETag'):
+            etags[url] = response.headers['ETag']
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure result polling with HTTP caching')
+    parser.add_argument('--sites', type=int, default=20000)
+    parser.add_argument('--batches', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--history-sites', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        Config.DB_BACKEND = 'sqlite'
+        Config.DB_PATH = os.path.join(directory, 'retail_dss.db')
+        Config.SITE_MATRIX_DIR = os.path.join(directory, 'site_matrix')
+        Config.SNAPSHOT_REFRESH_ENABLED = False
+        seed_sites(args.sites)
+
+        from app import create_app
+        from api.http_cache import clear, hit_ratio
+        from utils.metrics import metrics
+        client = create_app().test_client()
+
+        batch_ids = [client.post('/api/analyze', json={'top_n': 1}).get_json()['batch_id']
+                     for _ in range(args.batches)]
+        urls = [('latest', f'/api/results/latest?limit={args.limit}')]
+        urls += [('batch', f'/api/results/batch/{batch_id}?limit={args.limit}') for batch_id in batch_ids]
+        urls += [('history', f'/api/site/{site_id}/history')
+                 for site_id in range(1, args.history_sites + 1)]
+
+        print("=" * 72)
+        print("HTTP CACHE BENCHMARK")
+        print("=" * 72)
+        print(f"Sites: {args.sites:,}   batches: {args.batches}   requests: {args.requests:,}   "
+              f"limit: {args.limit}")
+        print(f"\n{'endpoint':<10} {'off p50':>9} {'off p99':>9} {'on p50':>9} {'on p99':>9} {'on+INM p50':>11}")
+
+        Config.HTTP_CACHE_ENABLED = False
+        off = poll(client, urls, args.requests, False, 1)
+        Config.HTTP_CACHE_ENABLED = True
+        clear()
+        on = poll(client, urls, args.requests, False, 1)
+        clear()
+        before = {outcome: metrics.value('http_cache', outcome=outcome)
+                  for outcome in ('hit', 'miss', 'not_modified')}
+        revalidated = poll(client, urls, args.requests, True, 1)
+
+        for endpoint in ('latest', 'batch', 'history'):
+            print(f"{endpoint:<10} {np.percentile(off[endpoint], 50):>9.2f} {np.percentile(off[endpoint], 99):>9.2f} "
+                  f"{np.percentile(on[endpoint], 50):>9.2f} {np.percentile(on[endpoint], 99):>9.2f} "
+                  f"{np.percentile(revalidated[endpoint], 50):>11.2f}")
+
+        counts = {outcome: metrics.value('http_cache', outcome=outcome) - before[outcome]
+                  for outcome in before}
+        print(f"\nRevalidating run: {counts['hit']} hits, {counts['not_modified']} not modified, "
+              f"{counts['miss']} misses")
+        print(f"Hit ratio (both cached runs, http_cache_hit_ratio): {hit_ratio():.1%}")
+
+
+if __name__ == '__main__':
+    main()
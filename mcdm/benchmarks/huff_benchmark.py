@@ -0,0 +1,110 @@
+"""
+============================================================================
+Huff market capture benchmark
+Captured demand of N candidate sites over a demand grid of ~M cells, with
+C competitor stores (see utils/huff.py)
+============================================================================
+
+District centroids with random densities are spread over a square region
+around Ho Chi Minh City and rasterized into the grid. Reported: the
+rasterization time, the competitor potential time, the candidate scoring
+time, and the size of one scoring block. A sample of candidates is checked
+against a brute-force evaluation over every grid cell.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.huff_benchmark
+    python -m benchmarks.huff_benchmark --candidates 50000 --cells 1000000 --cutoff-km 3
+"""
+
+import argparse
+import time
+import numpy as np
+from utils.huff import DemandGrid, HuffModel
+
+CENTER = (106.70, 10.78)
+
+
+def random_points(n: int, half_km: float, rng) -> tuple:
+    """Uniform points in a square of side 2 * half_km around CENTER"""
+    lon = CENTER[0] + rng.uniform(-1, 1, n) * half_km / (111.32 * np.cos(np.radians(CENTER[1])))
+    lat = CENTER[1] + rng.uniform(-1, 1, n) * half_km / 110.574
+    return lon, lat
+
+
+def brute_force(model: HuffModel, lon: float, lat: float, attractiveness: float) -> float:
+    """Captured demand of one candidate, visiting every cell"""
+    grid = model.grid
+    x, y = grid.project(lon, lat)
+    rows, columns = np.indices(grid.shape)
+    distance = np.hypot((columns + 0.5) * grid.cell_km - x, (rows + 0.5) * grid.cell_km - y).ravel()
+    utility = attractiveness / np.maximum(distance, model.min_distance_km) ** model.decay
+    utility[distance > model.cutoff_km] = 0.0
+    total = model.competition + utility
+    share = np.divide(utility, total, out=np.zeros_like(utility), where=total > 0)
+    return float((grid.demand.ravel() * share).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Huff market capture')
+    parser.add_argument('--candidates', type=int, default=50000)
+    parser.add_argument('--cells', type=int, default=1000000, help='approximate grid cells')
+    parser.add_argument('--competitors', type=int, default=2000)
+    parser.add_argument('--districts', type=int, default=200)
+    parser.add_argument('--cell-km', type=float, default=0.1)
+    parser.add_argument('--cutoff-km', type=float, default=3.0)
+    parser.add_argument('--check', type=int, default=10, help='candidates checked by brute force')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    half_km = np.sqrt(args.cells) * args.cell_km / 2
+
+    district_lon, district_lat = random_points(args.districts, half_km, rng)
+    densities = rng.uniform(2000, 40000, args.districts)
+    competitor_lon, competitor_lat = random_points(args.competitors, half_km, rng)
+    competitor_area = rng.uniform(80, 400, args.competitors)
+    candidate_lon, candidate_lat = random_points(args.candidates, half_km, rng)
+    candidate_area = rng.uniform(40, 200, args.candidates)
+
+    print("=" * 78)
+    print("HUFF MARKET CAPTURE BENCHMARK")
+    print("=" * 78)
+
+    start = time.perf_counter()
+    geometry = DemandGrid.covering(
+        np.concatenate([district_lon, competitor_lon, candidate_lon]),
+        np.concatenate([district_lat, competitor_lat, candidate_lat]),
+        margin_km=0.0, cell_km=args.cell_km, max_cells=args.cells
+    )
+    grid = DemandGrid.from_districts(district_lon, district_lat, densities, *geometry)
+    raster_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = HuffModel(grid, competitor_lon, competitor_lat, competitor_area,
+                      cutoff_km=args.cutoff_km)
+    competition_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    capture = model.capture(candidate_lon, candidate_lat, candidate_area)
+    capture_s = time.perf_counter() - start
+
+    block_rows = max(1, model.block_pairs // model.stencil_size)
+    print(f"Grid:            {grid.shape[0]} x {grid.shape[1]} = {grid.n_cells:,} cells "
+          f"of {grid.cell_km:.3f} km, {grid.demand.sum():,.0f} people")
+    print(f"Candidates:      {args.candidates:,}   competitors: {args.competitors:,}   "
+          f"cutoff: {args.cutoff_km} km ({model.stencil_size:,} cells)")
+    print(f"Block:           {block_rows:,} stores x {model.stencil_size:,} cells "
+          f"(~{block_rows * model.stencil_size * 8 / 2**20:.0f} MiB per array)")
+    print(f"\nRasterize demand:       {raster_s:8.2f} s")
+    print(f"Competitor potential:   {competition_s:8.2f} s")
+    print(f"Candidate capture:      {capture_s:8.2f} s")
+    print(f"Capture range:          {capture.min():,.0f} .. {capture.max():,.0f} people")
+
+    sample = rng.choice(args.candidates, min(args.check, args.candidates), replace=False)
+    expected = np.array([brute_force(model, candidate_lon[i], candidate_lat[i], candidate_area[i])
+                         for i in sample])
+    ok = np.allclose(expected, capture[sample], rtol=1e-9, atol=1e-6)
+    print(f"Brute-force check ({len(sample)} candidates): {'OK' if ok else 'MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+============================================================================
+Load-test harness
+Drives a mixed workload against the MCDM service with N concurrent clients
+and reports throughput and p50/p95/p99 latency per endpoint
+============================================================================
+
+Targets:
+    in-process (default)  starts create_app() on a local port with a threaded
+                          WSGI server, using the database configured in Config
+                          (DB_BACKEND=sqlite runs it without a MySQL server)
+    --url URL             an already running service (e.g. gunicorn in Docker)
+
+Workload (--mix, relative weights):
+    analyze   POST /api/analyze
+    latest    GET  /api/results/latest
+    history   GET  /api/site/<id>/history   (random active site)
+
+--seed-sites N replaces potential_site with N sites from the data generator
+(generate_data.generate_correlated_site_data) before the run. It deletes the
+existing sites and, through the foreign key, their evaluation results.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.load_test --concurrency 16 --duration 30
+    python -m benchmarks.load_test --seed-sites 10000 --mix analyze=1,latest=10,history=5 --output before.json
+    python -m benchmarks.load_test --output after.json --compare before.json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+import numpy as np
+
+ENDPOINTS = ['analyze', 'latest', 'history']
+DEFAULT_MIX = 'analyze=1,latest=8,history=4'
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(spec: str) -> dict:
+    """'analyze=1,latest=8' -> {'analyze': 1.0, 'latest': 8.0}"""
+    mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}. Supported: {ENDPOINTS}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The mix needs at least one positive weight")
+    return mix
+
+
+def build_request(endpoint: str, site_ids: list, rng: random.Random, args) -> tuple:
+    """(method, path, body) of one request"""
+    if endpoint == 'analyze':
+        body = {'algorithm': args.algorithm, 'top_n': 10}
+        return 'POST', '/api/analyze', json.dumps(body)
+    if endpoint == 'latest':
+        return 'GET', '/api/results/latest?limit=10', None
+    return 'GET', f"/api/site/{rng.choice(site_ids)}/history", None
+
+
+def seed_sites(n_sites: int, seed: int = 42):
+    """Replace potential_site with n_sites generated sites"""
+    from generate_data import SITE_CODE_PREFIX, generate_correlated_site_data
+    from utils.db_connector import get_db_connection
+
+    random.seed(seed)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, name, x_coordinate, y_coordinate, population_density FROM district")
+        columns = [c[0] for c in cursor.description]
+        districts = [
+            {k: float(v) if k in ('x_coordinate', 'y_coordinate') else v for k, v in zip(columns, row)}
+            for row in cursor.fetchall()
+        ]
+        if not districts:
+            raise ValueError("No districts found; load the schema sample data first")
+
+        fields = [
+            'address', 'district_id', 'x_coordinate', 'y_coordinate',
+            'rent_cost', 'renovation_cost', 'competitor_count', 'distance_to_warehouse',
+            'floor_area', 'front_width', 'traffic_score', 'population_density',
+            'has_parking', 'is_corner_lot', 'near_school', 'near_market', 'status'
+        ]
+        rows = []
+        for i in range(n_sites):
+            district = random.choice(districts)
+            site = generate_correlated_site_data(district, float(district['population_density']))
+            rows.append((f"{SITE_CODE_PREFIX}-LT-{i + 1:06d}",) + tuple(site[f] for f in fields))
+
+        cursor.execute("DELETE FROM potential_site")
+        query = f"""
+            INSERT INTO potential_site (site_code, {', '.join(fields)})
+            VALUES ({', '.join(['%s'] * (len(fields) + 1))})
+        """
+        for start in range(0, len(rows), 1000):
+            cursor.executemany(query, rows[start:start + 1000])
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def start_server():
+    """Serve create_app() from a background thread; returns (server, base_url)"""
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='load-test-server', daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def client(base_url: str, mix: dict, site_ids: list, seed: int, args,
+           start_at: float, stop_at: float, budget, records: list):
+    """One simulated client: send requests until stop_at or the budget is used up"""
+    url = urlparse(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=args.timeout)
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    headers = {'Content-Type': 'application/json'}
+
+    while time.perf_counter() < stop_at and budget.take():
+        endpoint = rng.choices(names, weights)[0]
+        method, path, body = build_request(endpoint, site_ids, rng, args)
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            status = 0
+        end = time.perf_counter()
+        # Requests started during the warm-up are not measured
+        if start >= start_at:
+            records.append((endpoint, status, end - start, end))
+    conn.close()
+
+
+class _Budget:
+    """Shared request budget (unlimited when total is None)"""
+
+    def __init__(self, total: int = None):
+        self.remaining = total
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.remaining is None:
+            return True
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def summarize(records: list, elapsed: float) -> dict:
+    """Per-endpoint and overall throughput, errors and latency percentiles"""
+    def stats(rows):
+        latencies = np.array([row[2] for row in rows]) * 1000
+        statuses = {}
+        for row in rows:
+            statuses[str(row[1])] = statuses.get(str(row[1]), 0) + 1
+        summary = {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if not 200 <= row[1] < 300),
+            'throughput_rps': round(len(rows) / elapsed, 2) if elapsed > 0 else None,
+            'status_codes': statuses,
+            'latency_ms': None
+        }
+        if len(rows):
+            summary['latency_ms'] = {
+                **{f"p{p}": round(float(np.percentile(latencies, p)), 3) for p in PERCENTILES},
+                'mean': round(float(latencies.mean()), 3),
+                'max': round(float(latencies.max()), 3)
+            }
+        return summary
+
+    endpoints = {
+        name: stats([row for row in records if row[0] == name])
+        for name in ENDPOINTS if any(row[0] == name for row in records)
+    }
+    return {'overall': stats(records), 'endpoints': endpoints}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict):
+    print("=" * 78)
+    print("LOAD TEST")
+    print("=" * 78)
+    meta = report['meta']
+    print(f"Target: {meta['target']}  concurrency: {meta['concurrency']}  "
+          f"measured: {meta['measured_seconds']:.1f}s  sites: {meta['sites']}")
+    print(f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(report['results']['endpoints'].items()) + [('overall', report['results']['overall'])]
+    for name, summary in rows:
+        latency = summary['latency_ms'] or {}
+        print(f"{name:<10}{summary['requests']:>10}{summary['errors']:>8}"
+              f"{summary['throughput_rps'] or 0:>10.1f}"
+              + ''.join(f"{latency.get(key, float('nan')):>10.1f}" for key in ('p50', 'p95', 'p99', 'max')))
+
+
+def print_comparison(report: dict, baseline: dict):
+    """Relative change of throughput and latency percentiles against a baseline run"""
+    print("-" * 78)
+    print(f"Compared with {baseline['meta'].get('git_commit')} ({baseline['meta'].get('timestamp')}):")
+    current = dict(report['results']['endpoints'], overall=report['results']['overall'])
+    previous = dict(baseline['results']['endpoints'], overall=baseline['results']['overall'])
+
+    def change(new, old):
+        if new is None or not old:
+            return '     n/a'
+        return f"{(new - old) / old * 100:+7.1f}%"
+
+    print(f"{'endpoint':<10}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, summary in current.items():
+        if name not in previous:
+            continue
+        old = previous[name]
+        latency = summary['latency_ms'] or {}
+        old_latency = old['latency_ms'] or {}
+        print(f"{name:<10}{change(summary['throughput_rps'], old['throughput_rps']):>10}"
+              + ''.join(f"{change(latency.get(p), old_latency.get(p)):>10}" for p in ('p50', 'p95', 'p99')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mixed-workload load test of the MCDM service')
+    parser.add_argument('--url', help='test a running service instead of starting create_app()')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds to measure')
+    parser.add_argument('--requests', type=int, help='stop after this many requests instead')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds run before measuring')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--algorithm', default='topsis')
+    parser.add_argument('--seed-sites', type=int, help='replace potential_site with N generated sites')
+    parser.add_argument('--no-prime', action='store_true',
+                        help='skip the initial /analyze that gives latest/history something to read')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON report to compare with')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.seed_sites:
+        print(f"Seeding {args.seed_sites} sites...")
+        seed_sites(args.seed_sites, args.seed)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = start_server()
+
+    try:
+        from services.data_service import DataService
+        site_ids = DataService().load_sites(columns=[])['id'].tolist()
+        if not site_ids and mix.get('history'):
+            raise ValueError("No active sites to request history for")
+
+        if not args.no_prime:
+            url = urlparse(base_url)
+            conn = http.client.HTTPConnection(url.hostname, url.port, timeout=args.timeout)
+            conn.request('POST', '/api/analyze', body=json.dumps({'algorithm': args.algorithm}),
+                         headers={'Content-Type': 'application/json'})
+            conn.getresponse().read()
+            conn.close()
+
+        records = []
+        record_lists = [[] for _ in range(args.concurrency)]
+        budget = _Budget(args.requests)
+        start_at = time.perf_counter() + args.warmup
+        stop_at = start_at + (args.duration if args.requests is None else float('inf'))
+        threads = [
+            threading.Thread(target=client, args=(
+                base_url, mix, site_ids, args.seed + i, args,
+                start_at, stop_at, budget, record_lists[i]
+            ))
+            for i in range(args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for rows in record_lists:
+            records.extend(rows)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    measured = (max(row[3] for row in records) - start_at) if records else 0.0
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'target': args.url or 'in-process',
+            'concurrency': args.concurrency,
+            'mix': mix,
+            'algorithm': args.algorithm,
+            'sites': len(site_ids),
+            'measured_seconds': round(measured, 3)
+        },
+        'results': summarize(records, measured)
+    }
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
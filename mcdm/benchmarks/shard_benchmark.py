@@ -0,0 +1,145 @@
+"""
+============================================================================
+Sharded analysis benchmark
+Scores sites spread over several SQLite stand-in shards (one per city) and
+checks the result against one TOPSIS run over all sites
+============================================================================
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.shard_benchmark
+    python -m benchmarks.shard_benchmark --shards 4 --sites 50000 --top-n 20
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from algorithms import AlgorithmFactory
+from algorithms.sharded import merge_top_k, score_shards
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA, get_shard_pool
+from services.data_service import DataService, new_batch_id
+from utils.shards import Shard
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+
+CITIES = ['HCM', 'HN', 'DN', 'CT', 'HP', 'NT', 'BD', 'DL']
+
+# Subset of mysql/init/01-schema.sql that load_sites/save_results touch
+SQLITE_SCHEMA = """
+CREATE TABLE evaluation_result (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    config_id INTEGER,
+    site_id INTEGER,
+    algorithm_used TEXT,
+    topsis_score REAL,
+    rank_position INTEGER,
+    created_at TEXT,
+    execution_time_ms INTEGER,
+    batch_id TEXT,
+    group_key TEXT
+);
+CREATE INDEX idx_batch_id ON evaluation_result (batch_id);
+CREATE TABLE analysis_batch (
+    batch_id TEXT PRIMARY KEY,
+    request_key TEXT,
+    idempotency_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'PUBLISHED',
+    algorithm_used TEXT NOT NULL,
+    config_id INTEGER,
+    response_json TEXT,
+    created_at TEXT,
+    published_at TEXT
+);
+"""
+
+
+def create_sqlite_shard(path: str, city: str, sites: pd.DataFrame):
+    """SQLite file with a potential_site table holding `sites` and an empty evaluation_result"""
+    sites = sites.copy()
+    sites.insert(0, 'id', np.arange(1, len(sites) + 1))
+    sites['site_code'] = [f"{city}-{i:06d}" for i in sites['id']]
+    sites['address'] = [f"{i} Demo Street, {city}" for i in sites['id']]
+    sites['district_id'] = sites['id'] % 10 + 1
+    sites['status'] = 'ACTIVE'
+    sites['updated_at'] = '2026-01-01 00:00:00'
+
+    conn = sqlite3.connect(path)
+    try:
+        sites.to_sql('potential_site', conn, index=False)
+        conn.executescript(SQLITE_SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure sharded analysis on SQLite shards')
+    parser.add_argument('--shards', type=int, default=4, choices=range(1, len(CITIES) + 1))
+    parser.add_argument('--sites', type=int, default=25000, help='sites per shard')
+    parser.add_argument('--top-n', type=int, default=10)
+    args = parser.parse_args()
+
+    algo = AlgorithmFactory.create('topsis')
+    pool = get_shard_pool()
+
+    with tempfile.TemporaryDirectory() as directory:
+        shards = []
+        for i, city in enumerate(CITIES[:args.shards]):
+            path = os.path.join(directory, f"{city.lower()}.db")
+            # Cities differ in level, so merged statistics matter
+            sites = make_sites(args.sites, seed=42 + i)
+            sites['rent_cost'] *= 1 + 0.2 * i
+            create_sqlite_shard(path, city, sites)
+            shards.append(Shard(city.lower(), f"sqlite:///{path}"))
+        services = [DataService(shard) for shard in shards]
+        columns = algo.required_columns(COST_CRITERIA + BENEFIT_CRITERIA)
+
+        frames, load_ms = timed(lambda: list(pool.map(
+            lambda service: service.load_sites(columns=columns), services)))
+        (results, _), score_ms = timed(lambda: score_shards(
+            frames, algo, WEIGHTS, COST_CRITERIA, BENEFIT_CRITERIA, pool))
+        top, merge_ms = timed(lambda: merge_top_k(
+            [df['topsis_score'].to_numpy() for df in results],
+            [df['id'].to_numpy() for df in results], args.top_n))
+
+        batch_id = new_batch_id('TOPSIS')
+        _, save_ms = timed(lambda: list(pool.map(
+            lambda item: item[0].save_results(item[1], 1, batch_id=batch_id),
+            zip(services, results))))
+
+        # Reference: one run over the concatenated sites
+        combined = pd.concat(frames, ignore_index=True)
+        reference, single_ms = timed(lambda: algo.analyze(
+            combined, WEIGHTS, COST_CRITERIA, BENEFIT_CRITERIA))
+
+    sharded_scores = np.concatenate([df['topsis_score'].to_numpy() for df in results])
+    sharded_ranks = np.concatenate([df['rank_position'].to_numpy() for df in results])
+    assert np.allclose(sharded_scores, reference['topsis_score'].to_numpy()), "sharded scores differ"
+    assert (sharded_ranks == reference['rank_position'].to_numpy()).all(), "sharded ranks differ"
+    top_scores = [results[index]['topsis_score'].iloc[row] for index, row in top]
+    assert np.allclose(top_scores, np.sort(reference['topsis_score'].to_numpy())[::-1][:args.top_n]), \
+        "merged top-k differs"
+
+    print("=" * 70)
+    print("SHARDED ANALYSIS BENCHMARK")
+    print("=" * 70)
+    print(f"Shards:             {args.shards} x {args.sites} sites (SQLite)")
+    print(f"Parallel load:      {load_ms:.0f} ms")
+    print(f"Stats + scoring:    {score_ms:.1f} ms")
+    print(f"Top-{args.top_n} merge:       {merge_ms:.2f} ms")
+    print(f"Per-shard save:     {save_ms:.0f} ms")
+    print(f"Single-run TOPSIS:  {single_ms:.1f} ms (reference)")
+    print("Scores, global ranks and top-k match the single run")
+
+
+if __name__ == '__main__':
+    main()
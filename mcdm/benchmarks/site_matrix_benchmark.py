@@ -0,0 +1,119 @@
+"""
+============================================================================
+Shared site matrix benchmark
+Memory held and load time per worker: load_sites() querying potential_site
+(SITE_MATRIX_ENABLED off) vs building the DataFrame on the shared site matrix
+============================================================================
+
+K worker processes (spawned, like gunicorn workers after the import) each
+warm up with a small filtered load, then call DataService.load_sites() and
+hold the DataFrame until all K have loaded; the proportional set size (PSS, /proc/<pid>/smaps_rollup) they added
+is summed. With the matrix, id and the numeric columns are views of the
+mapped pages, whose PSS is split between the workers; only the text columns
+(site_code, address) are private to each worker. Uses a temporary SQLite
+database.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.site_matrix_benchmark
+    python -m benchmarks.site_matrix_benchmark --sites 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from config import Config
+from benchmarks.load_test import seed_sites
+
+
+def pss_kb() -> int:
+    """Proportional set size of this process in kB (0 when unavailable)"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def worker(settings: dict, shared: bool, barrier, results):
+    """Load the sites, report PSS added and load time, hold until all loaded"""
+    for name, value in settings.items():
+        setattr(Config, name, value)
+    Config.SITE_MATRIX_ENABLED = shared
+    logging.disable(logging.INFO)
+    from services.data_service import DataService
+
+    service = DataService()
+    # Warm up lazy imports with a small filtered load (always a query), so
+    # only what the full load holds is measured
+    service.load_sites(filters={'rent_cost': {'lt': 40}}).select_dtypes('number').sum()
+    before = pss_kb()
+    start = time.perf_counter()
+    held = service.load_sites()
+    # Touch every numeric value, as scoring does
+    held.select_dtypes('number').sum()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    barrier.wait()
+    results.put((pss_kb() - before, load_ms))
+    barrier.wait()
+    del held
+
+
+def run(settings: dict, shared: bool, workers: int) -> tuple:
+    """(total PSS added in MB, mean load ms) of `workers` processes"""
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(settings, shared, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return sum(r[0] for r in reports) / 1024, sum(r[1] for r in reports) / workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-worker site data memory')
+    parser.add_argument('--sites', type=int, default=50000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        settings = {
+            'DB_BACKEND': 'sqlite',
+            'DB_PATH': os.path.join(directory, 'retail_dss.db'),
+            'SITE_MATRIX_DIR': os.path.join(directory, 'site_matrix')
+        }
+        for name, value in settings.items():
+            setattr(Config, name, value)
+        seed_sites(args.sites)
+
+        # Publish the generation once, as the first worker would
+        from services.data_service import DataService
+        start = time.perf_counter()
+        matrix = DataService().load_site_matrix()
+        publish_ms = (time.perf_counter() - start) * 1000
+
+        print("=" * 72)
+        print("SHARED SITE MATRIX BENCHMARK")
+        print("=" * 72)
+        print(f"Sites: {args.sites:,}   matrix: {matrix.values.nbytes / 2**20:.1f} MB numeric, "
+              f"published in {publish_ms:.0f} ms")
+        print(f"\n{'workers':>8} {'query MB':>10} {'load ms':>9} {'matrix MB':>11} {'load ms':>9}")
+        for workers in args.workers:
+            own_mb, own_ms = run(settings, False, workers)
+            shared_mb, shared_ms = run(settings, True, workers)
+            print(f"{workers:>8} {own_mb:>10.1f} {own_ms:>9.1f} {shared_mb:>11.1f} {shared_ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
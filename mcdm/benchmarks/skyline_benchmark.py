@@ -0,0 +1,164 @@
+"""
+============================================================================
+Skyline pre-filter benchmark
+Reports k-skyband size, reduction ratio and end-to-end speedup of top-k
+TOPSIS runs (one strategy and several strategies) on generated sites
+============================================================================
+
+Datasets:
+    generated   - sites from generate_data.generate_correlated_site_data
+                  (rent rises with density/traffic/area: strong trade-offs)
+    correlated  - sites driven by one latent quality factor, so good sites
+                  tend to be good on every criterion
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.skyline_benchmark
+    python -m benchmarks.skyline_benchmark --dataset correlated --sites 200000 --k 10
+    python -m benchmarks.skyline_benchmark --exact   # no early give-up
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+import pandas as pd
+from algorithms import AlgorithmFactory
+from algorithms.skyline import estimate_skyband_fraction, skyband_mask
+from config import Config
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS
+from generate_data import generate_correlated_site_data
+
+# Districts of mysql/init/01-schema.sql (name, population_density)
+SAMPLE_DISTRICTS = [
+    ('Quận 1', 38000), ('Quận 2', 12000), ('Quận 3', 32000), ('Quận 4', 28000),
+    ('Quận 5', 35000), ('Quận 6', 25000), ('Quận 7', 15000), ('Quận 8', 20000),
+    ('Quận 10', 30000), ('Quận 11', 27000)
+]
+
+STRATEGIES = 8
+
+
+def generated_sites(n_sites: int, seed: int = 42) -> pd.DataFrame:
+    """Sites from the data generator used to seed the database"""
+    random.seed(seed)
+    districts = [
+        {'id': i + 1, 'name': name, 'x_coordinate': 0.0, 'y_coordinate': 0.0,
+         'population_density': density}
+        for i, (name, density) in enumerate(SAMPLE_DISTRICTS)
+    ]
+    rows = []
+    for _ in range(n_sites):
+        district = random.choice(districts)
+        rows.append(generate_correlated_site_data(district, district['population_density']))
+    return pd.DataFrame(rows)
+
+
+def correlated_sites(n_sites: int, seed: int = 42) -> pd.DataFrame:
+    """Sites whose criteria all follow a latent quality factor plus noise"""
+    rng = np.random.default_rng(seed)
+    quality = rng.random(n_sites)
+
+    def criterion(low, high, better_high, noise=0.3):
+        level = (quality if better_high else 1 - quality) + rng.normal(0, noise, n_sites)
+        level = (level - level.min()) / (level.max() - level.min())
+        return low + (high - low) * level
+
+    return pd.DataFrame({
+        'rent_cost': criterion(15, 60, False),
+        'renovation_cost': criterion(30, 400, False),
+        'competitor_count': np.round(criterion(0, 15, False)),
+        'distance_to_warehouse': criterion(1, 25, False),
+        'floor_area': criterion(40, 200, True),
+        'front_width': criterion(4, 15, True),
+        'traffic_score': np.round(criterion(3, 10, True)),
+        'population_density': criterion(5000, 40000, True),
+        'market_capture': criterion(0, 50000, True),
+    })
+
+
+def strategy_weights(count: int, seed: int = 7) -> list:
+    """The default weights plus random weight vectors summing to 1"""
+    rng = np.random.default_rng(seed)
+    criteria = COST_CRITERIA + BENEFIT_CRITERIA
+    weights = [WEIGHTS]
+    for _ in range(count - 1):
+        values = rng.dirichlet(np.ones(len(criteria)))
+        weights.append(dict(zip(criteria, values)))
+    return weights
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the skyline pre-filter')
+    parser.add_argument('--dataset', choices=['generated', 'correlated'], default='generated')
+    parser.add_argument('--sites', type=int, default=100000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--exact', action='store_true',
+                        help='compute the full skyband even when it is large')
+    args = parser.parse_args()
+
+    df = generated_sites(args.sites) if args.dataset == 'generated' else correlated_sites(args.sites)
+    criteria = COST_CRITERIA + BENEFIT_CRITERIA
+    matrix = df[criteria].to_numpy(dtype=np.float64)
+    n_cost = len(COST_CRITERIA)
+    algo = AlgorithmFactory.create('topsis')
+    stats = algo.column_statistics(df, criteria, matrix)
+    strategies = strategy_weights(STRATEGIES)
+
+    print("=" * 70)
+    print("SKYLINE PRE-FILTER BENCHMARK")
+    print("=" * 70)
+    print(f"Dataset:            {args.dataset} ({args.sites} sites)")
+    print(f"k (top-k):          {args.k}")
+
+    estimate, estimate_ms = timed(lambda: estimate_skyband_fraction(
+        matrix, n_cost, args.k, Config.SKYLINE_SAMPLE_SIZE))
+    print(f"Sampled estimate:   {estimate:.1%} of sites in the {args.k}-skyband ({estimate_ms:.0f} ms)")
+
+    max_fraction = None if args.exact else Config.SKYLINE_MAX_FRACTION
+    if max_fraction is not None and estimate > max_fraction:
+        print(f"Skyband:            estimate above {max_fraction:.0%}, the service skips the "
+              f"pre-filter (use --exact for the full band)")
+        return
+
+    mask, filter_ms = timed(lambda: skyband_mask(matrix, n_cost, args.k, max_fraction=max_fraction))
+    if mask is None:
+        print(f"Skyband:            gave up above {max_fraction:.0%} of sites after {filter_ms:.0f} ms")
+        return
+
+    skyline, skyline_ms = timed(lambda: skyband_mask(matrix, n_cost, 1))
+    print(f"Skyline (k=1):      {skyline.sum()} sites ({skyline.mean():.1%}) in {skyline_ms:.0f} ms")
+    print(f"{args.k}-skyband:         {mask.sum()} sites ({mask.mean():.1%}) in {filter_ms:.0f} ms")
+    print(f"Reduction ratio:    {1 - mask.mean():.1%}")
+
+    reduced = df[mask].copy()
+    reduced.attrs['column_stats'] = (tuple(criteria), stats)
+
+    full_ms = reduced_ms = 0.0
+    for weights in strategies:
+        full, elapsed = timed(lambda: algo.analyze(df, weights, COST_CRITERIA, BENEFIT_CRITERIA))
+        full_ms += elapsed
+        part, elapsed = timed(lambda: algo.analyze(reduced, weights, COST_CRITERIA, BENEFIT_CRITERIA))
+        reduced_ms += elapsed
+
+        # Same top-k sites and scores with and without the pre-filter
+        top_full = full.nsmallest(args.k, 'rank_position')['topsis_score'].to_numpy()
+        top_part = part.nsmallest(args.k, 'rank_position')['topsis_score'].to_numpy()
+        assert np.allclose(top_full, top_part), "pre-filtered top-k differs"
+
+    single = full_ms / STRATEGIES
+    print(f"TOPSIS full:        {single:.1f} ms per strategy")
+    print(f"TOPSIS reduced:     {reduced_ms / STRATEGIES:.1f} ms per strategy")
+    print(f"Speedup, 1 run:     {single / (filter_ms + reduced_ms / STRATEGIES):.2f}x (filter included)")
+    print(f"Speedup, {STRATEGIES} runs:    {full_ms / (filter_ms + reduced_ms):.2f}x (filter paid once)")
+    print(f"Speedup, cached:    {full_ms / reduced_ms:.2f}x (mask reused for the same data version)")
+
+
+if __name__ == '__main__':
+    main()
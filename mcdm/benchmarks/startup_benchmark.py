@@ -0,0 +1,116 @@
+"""
+============================================================================
+Startup-time benchmark for Flask MCDM Service
+Measures import time per module and time until the first probe answers
+============================================================================
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --warm-up --top 30 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+MCDM_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so nothing is already imported
+STARTUP_SCRIPT = """
+import time
+t0 = time.perf_counter()
+from app import create_app
+app = create_app()
+t1 = time.perf_counter()
+client = app.test_client()
+response = client.get('/api/health/live')
+t2 = time.perf_counter()
+import sys, json
+heavy = [m for m in ('pandas', 'numpy', 'mysql.connector') if m in sys.modules]
+print(json.dumps({
+    'create_app_ms': round((t1 - t0) * 1000, 2),
+    'first_probe_ms': round((t2 - t1) * 1000, 2),
+    'probe_status': response.status_code,
+    'heavy_modules_loaded': heavy
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse the output of `python -X importtime`
+
+    Returns:
+        List of dicts (module, self_us, cumulative_us), slowest first
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            _, timings = line.split(':', 1)
+            self_us, cumulative_us, module = timings.split('|', 2)
+            modules.append({
+                'module': module.strip(),
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us)
+            })
+        except ValueError:
+            continue
+    return sorted(modules, key=lambda m: m['cumulative_us'], reverse=True)
+
+
+def run_once(warm_up: bool) -> dict:
+    """Start the app in a fresh interpreter and collect timings"""
+    env = dict(os.environ)
+    env['WARM_UP_ON_START'] = 'True' if warm_up else 'False'
+
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=MCDM_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup script failed:\n{proc.stderr[-2000:]}")
+
+    summary = json.loads(proc.stdout.strip().splitlines()[-1])
+    summary['modules'] = parse_importtime(proc.stderr)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure MCDM service startup time')
+    parser.add_argument('--runs', type=int, default=3, help='Number of cold starts')
+    parser.add_argument('--top', type=int, default=20, help='Modules to print')
+    parser.add_argument('--warm-up', action='store_true',
+                        help='Include algorithm/DB warm-up (preload mode)')
+    parser.add_argument('--output', help='Write the full report as JSON')
+    args = parser.parse_args()
+
+    runs = [run_once(args.warm_up) for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r['create_app_ms'])
+
+    print("=" * 70)
+    print("MCDM SERVICE STARTUP BENCHMARK")
+    print("=" * 70)
+    print(f"Runs               : {args.runs} (warm-up: {args.warm_up})")
+    print(f"create_app()       : best {best['create_app_ms']:.1f} ms, "
+          f"all {[r['create_app_ms'] for r in runs]}")
+    print(f"First /health/live : {best['first_probe_ms']:.1f} ms "
+          f"(status {best['probe_status']})")
+    print(f"Heavy modules      : {best['heavy_modules_loaded'] or 'none'}")
+    print(f"\nTop {args.top} imports by cumulative time:")
+    for module in best['modules'][:args.top]:
+        print(f"  {module['cumulative_us'] / 1000:9.2f} ms  "
+              f"(self {module['self_us'] / 1000:7.2f} ms)  {module['module']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'warm_up': args.warm_up, 'runs': runs}, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+============================================================================
+Result transport benchmark
+Payload size and encode/decode time of an /analyze response carrying N
+ranked sites, as JSON, MessagePack and Arrow IPC (see api/transport.py)
+============================================================================
+
+Encode times start from the service's {field: array} result columns, so
+JSON and MessagePack include building the per-row dicts. Arrow is decoded
+to a table (what a columnar client reads); JSON and MessagePack to Python
+objects. Formats whose library is not installed are skipped.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.transport_benchmark
+    python -m benchmarks.transport_benchmark --sites 10000 100000 500000 --repeat 10
+"""
+
+import argparse
+import gzip
+import json
+import time
+from importlib.util import find_spec
+import numpy as np
+from flask import Flask
+from algorithms import AlgorithmFactory
+from api.transport import encode_arrow, encode_msgpack
+from services.analysis_service import AnalysisService, COST_CRITERIA, BENEFIT_CRITERIA
+from utils.columns import rows_from_columns
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+
+
+def make_payload(n_sites: int) -> dict:
+    """/analyze response with every site in top_sites, as columns"""
+    df = make_sites(n_sites)
+    df.insert(0, 'id', np.arange(1, n_sites + 1))
+    df['site_code'] = [f"HCM-Q1-{i:06d}" for i in df['id']]
+    df['address'] = [f"{i} Nguyễn Huệ, Quận 1" for i in df['id']]
+    results = AlgorithmFactory.create('topsis').analyze(df, WEIGHTS, COST_CRITERIA, BENEFIT_CRITERIA)
+    return {
+        'success': True,
+        'algorithm': 'TOPSIS',
+        'batch_id': 'TOPSIS_20260101_000000_bench000',
+        'sites_analyzed': n_sites,
+        'top_sites': AnalysisService()._top_site_columns(results.sort_values('rank_position'))
+    }
+
+
+def median_ms(fn, repeat: int) -> tuple:
+    """(result of the last call, median wall time in ms)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, float(np.median(timings))
+
+
+def formats() -> list:
+    """(name, encode(columnar payload) -> bytes, decode(bytes)) of each available format"""
+    provider = Flask(__name__).json
+
+    def as_rows(payload):
+        return {**payload, 'top_sites': rows_from_columns(payload['top_sites'])}
+
+    available = [('JSON', lambda p: provider.dumps(as_rows(p)).encode(), json.loads)]
+    if find_spec('msgpack'):
+        import msgpack
+        available.append(('MessagePack', lambda p: encode_msgpack(as_rows(p)), msgpack.unpackb))
+    if find_spec('pyarrow'):
+        import pyarrow as pa
+        available.append(('Arrow IPC', lambda p: encode_arrow(p, 'top_sites'),
+                          lambda body: pa.ipc.open_stream(body).read_all()))
+    return available
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare result payload formats')
+    parser.add_argument('--sites', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    available = formats()
+    print("=" * 78)
+    print("RESULT TRANSPORT BENCHMARK")
+    print("=" * 78)
+    missing = [name for name, module in (('MessagePack', 'msgpack'), ('Arrow IPC', 'pyarrow'))
+               if not find_spec(module)]
+    if missing:
+        print(f"Skipped (library not installed): {', '.join(missing)}")
+
+    for n_sites in args.sites:
+        payload = make_payload(n_sites)
+        print(f"\n{n_sites} rows")
+        print(f"{'format':14}{'bytes':>14}{'gzip bytes':>14}{'encode ms':>12}{'decode ms':>12}")
+        for name, encode, decode in available:
+            body, encode_ms = median_ms(lambda: encode(payload), args.repeat)
+            _, decode_ms = median_ms(lambda: decode(body), args.repeat)
+            print(f"{name:14}{len(body):>14,}{len(gzip.compress(body, 6)):>14,}"
+                  f"{encode_ms:>12.1f}{decode_ms:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+============================================================================
+Nearest-warehouse benchmark
+Bulk nearest-depot distances for N sites x M warehouses (see
+utils/warehouse_index.py), and the "add warehouse D" what-if re-scoring
+============================================================================
+
+Sites and warehouses are spread uniformly over Vietnam's bounding box.
+Reported:
+- KD-tree build and bulk nearest query, great-circle and road (a matrix
+  covering part of the sites, the rest falling back to the circuity factor)
+- an exact check of the KD-tree answer against brute force on a sample
+- adding one warehouse: distance of every site to it, then re-scoring only
+  the sites it is nearer to (TopsisWhatIfModel.evaluate), checked against a
+  full TOPSIS run on the edited matrix
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.warehouse_benchmark
+    python -m benchmarks.warehouse_benchmark --sites 1000000 --warehouses 100 --repeat 3
+"""
+
+import argparse
+import time
+import numpy as np
+from algorithms.topsis import TopsisAlgorithm
+from algorithms.whatif import TopsisWhatIfModel
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from utils.warehouse_index import RoadDistanceMatrix, WarehouseIndex, haversine_km
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+
+# Longitude / latitude bounds of Vietnam
+LON_RANGE = (102.1, 109.5)
+LAT_RANGE = (8.6, 23.4)
+
+
+def random_points(n: int, rng) -> tuple:
+    return rng.uniform(*LON_RANGE, n), rng.uniform(*LAT_RANGE, n)
+
+
+def median_ms(fn, repeat: int) -> tuple:
+    """(result of the last call, median wall time in ms)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark nearest-warehouse distances')
+    parser.add_argument('--sites', type=int, default=1_000_000)
+    parser.add_argument('--warehouses', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', type=int, default=20000, help='brute-force sample size')
+    parser.add_argument('--road-fraction', type=float, default=0.2,
+                        help='share of sites covered by the synthetic road matrix')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    site_ids = np.arange(1, args.sites + 1, dtype=np.int64)
+    site_lons, site_lats = random_points(args.sites, rng)
+    warehouse_ids = np.arange(1, args.warehouses + 1, dtype=np.int64)
+    warehouse_lons, warehouse_lats = random_points(args.warehouses, rng)
+
+    print("=" * 78)
+    print("NEAREST-WAREHOUSE BENCHMARK")
+    print("=" * 78)
+    print(f"Sites: {args.sites:,}   warehouses: {args.warehouses}   repeat: {args.repeat}")
+
+    index, build_ms = median_ms(
+        lambda: WarehouseIndex(warehouse_ids, warehouse_lons, warehouse_lats), args.repeat)
+    (nearest_ids, nearest_km), query_ms = median_ms(
+        lambda: index.nearest(site_ids, site_lons, site_lats), args.repeat)
+    print(f"\nKD-tree build:                     {build_ms:10.2f} ms")
+    print(f"Nearest warehouse (haversine):     {query_ms:10.1f} ms")
+
+    sample = rng.choice(args.sites, min(args.check, args.sites), replace=False)
+    brute = np.stack([haversine_km(site_lons[sample], site_lats[sample], lon, lat)
+                      for lon, lat in zip(warehouse_lons, warehouse_lats)], axis=1)
+    exact = np.allclose(brute.min(axis=1), nearest_km[sample], atol=1e-6)
+    print(f"Brute-force check ({len(sample):,} sites):     {'OK' if exact else 'MISMATCH'}")
+
+    # Road matrix over part of the sites: great-circle x 1.2..1.6 detours
+    covered = site_ids[:int(args.sites * args.road_fraction)]
+    gc = np.stack([haversine_km(site_lons[covered - 1], site_lats[covered - 1], lon, lat)
+                   for lon, lat in zip(warehouse_lons, warehouse_lats)], axis=1)
+    road = RoadDistanceMatrix(covered, warehouse_ids,
+                              (gc * rng.uniform(1.2, 1.6, gc.shape)).astype(np.float32),
+                              circuity=1.3, candidates=8)
+    _, road_ms = median_ms(lambda: index.nearest(site_ids, site_lons, site_lats, road), args.repeat)
+    print(f"Nearest warehouse (road, k=8):     {road_ms:10.1f} ms"
+          f"   ({len(covered):,} sites in matrix)")
+
+    # What-if: the decision matrix carries the computed nearest distances
+    all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+    column = all_criteria.index('distance_to_warehouse')
+    df = make_sites(args.sites)
+    df['distance_to_warehouse'] = np.round(nearest_km, 2)
+    matrix = df[all_criteria].to_numpy(dtype=np.float64)
+    weights = np.array([WEIGHTS[c] for c in all_criteria])
+
+    start = time.perf_counter()
+    model = TopsisWhatIfModel(matrix, weights, len(COST_CRITERIA))
+    model_ms = (time.perf_counter() - start) * 1000
+
+    new_lon, new_lat = random_points(1, rng)
+
+    def add_warehouse():
+        new_km = np.round(WarehouseIndex.distances_to(
+            -1, new_lon[0], new_lat[0], site_ids, site_lons, site_lats), 2)
+        rows = np.flatnonzero(new_km < matrix[:, column])
+        new_values = matrix[rows].copy()
+        new_values[:, column] = new_km[rows]
+        return rows, new_values, model.evaluate(rows, new_values)
+
+    (rows, new_values, (scores, ranks)), whatif_ms = median_ms(add_warehouse, args.repeat)
+
+    edited = matrix.copy()
+    edited[rows] = new_values
+    full = TopsisAlgorithm().score_matrix(edited, weights, len(COST_CRITERIA))
+    full_ranks = np.array([np.count_nonzero(full > s) + 1 for s in full[rows[:1000]]])
+    matches = (np.allclose(full[rows], scores, atol=1e-9)
+               and np.array_equal(full_ranks, ranks[:1000]))
+
+    print(f"\nWhat-if model build:               {model_ms:10.1f} ms")
+    print(f"Add warehouse + re-score:          {whatif_ms:10.1f} ms"
+          f"   ({len(rows):,} sites nearer to it)")
+    print(f"Matches full TOPSIS re-run:        {'OK' if matches else 'MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+============================================================================
+Objective weighting benchmark
+Target: entropy, CRITIC and std-dev weights on 1M sites from column statistics
+============================================================================
+
+For each size, reported are the single pass building ColumnStatistics (the
+one TOPSIS needs anyway, plus the entropy and cross-product sums), the same
+statistics streamed in chunks and merged, each weighting computed from the
+statistics, and a direct computation over the normalized matrix (share
+matrix for entropy, pandas correlation for CRITIC) that the weights are
+checked against.
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.weighting_benchmark
+    python -m benchmarks.weighting_benchmark --sites 100000 1000000 --chunk 250000 --repeat 5
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from algorithms.normalization import ColumnStatistics
+from algorithms.weighting import OBJECTIVE_WEIGHTINGS, objective_weights
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from benchmarks.fuzzy_topsis_benchmark import make_sites
+
+
+def direct_weights(matrix: np.ndarray, n_cost: int) -> dict:
+    """Textbook weights from the full matrix (reference)"""
+    low, high = matrix.min(axis=0), matrix.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    is_cost = np.arange(matrix.shape[1]) < n_cost
+    scaled = np.where(is_cost, (high - matrix) / span, (matrix - low) / span)
+
+    shifted = matrix + np.where(low >= 0, 0.0, -low)
+    shares = shifted / shifted.sum(axis=0)
+    share_logs = np.log(shares, out=np.zeros_like(shares), where=shares > 0)
+    entropy = -(shares * share_logs).sum(axis=0) / np.log(len(matrix))
+
+    contrast = scaled.std(axis=0)
+    correlation = np.nan_to_num(pd.DataFrame(scaled).corr().to_numpy())
+    critic = contrast * (1.0 - correlation).sum(axis=1)
+    return {
+        'entropy': (1 - entropy) / (1 - entropy).sum(),
+        'critic': critic / critic.sum(),
+        'std': contrast / contrast.sum()
+    }
+
+
+def timed(fn, repeat: int) -> tuple:
+    """(last result, median milliseconds) of fn()"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure objective weighting methods')
+    parser.add_argument('--sites', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--chunk', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    criteria = COST_CRITERIA + BENEFIT_CRITERIA
+    n_cost = len(COST_CRITERIA)
+
+    print("=" * 72)
+    print("OBJECTIVE WEIGHTING BENCHMARK")
+    print("=" * 72)
+    print(f"Criteria: {len(criteria)}   chunk: {args.chunk:,}   repeat: {args.repeat}")
+
+    for n_sites in args.sites:
+        matrix = make_sites(n_sites)[criteria].to_numpy(dtype=np.float64)
+
+        stats, stats_ms = timed(lambda: ColumnStatistics.from_matrix(matrix), args.repeat)
+        streamed, stream_ms = timed(lambda: ColumnStatistics.merge([
+            ColumnStatistics.from_matrix(matrix[start:start + args.chunk])
+            for start in range(0, n_sites, args.chunk)
+        ]), args.repeat)
+        reference, direct_ms = timed(lambda: direct_weights(matrix, n_cost), 1)
+
+        print(f"\n{n_sites:,} sites")
+        print(f"  column statistics, one pass: {stats_ms:9.1f} ms")
+        print(f"  column statistics, streamed: {stream_ms:9.1f} ms")
+        print(f"  direct (all three methods):  {direct_ms:9.1f} ms")
+        for method in OBJECTIVE_WEIGHTINGS:
+            weights, weights_ms = timed(lambda: objective_weights(method, stats, n_cost), args.repeat)
+            assert np.allclose(weights, reference[method]), f"{method} weights differ from the direct computation"
+            assert np.allclose(objective_weights(method, streamed, n_cost), weights), \
+                f"{method} weights differ on streamed statistics"
+            print(f"  {method:<8} from statistics:     {weights_ms:9.3f} ms   "
+                  f"{np.array2string(weights, precision=3, max_line_width=200)}")
+
+    print("\nWeights match the direct computation, in one pass and streamed")
+
+
+if __name__ == '__main__':
+    main()
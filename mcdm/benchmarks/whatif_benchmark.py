@@ -0,0 +1,66 @@
+"""
+============================================================================
+What-if scoring latency benchmark
+Target: p99 under 5 ms per what-if request at 100k sites
+============================================================================
+
+Usage (from the mcdm/ directory):
+    python -m benchmarks.whatif_benchmark
+    python -m benchmarks.whatif_benchmark --sites 100000 --requests 2000 --normalization minmax
+"""
+
+import argparse
+import time
+import numpy as np
+from algorithms.whatif import TopsisWhatIfModel
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+
+
+def random_edit(model: TopsisWhatIfModel, rng: np.random.Generator) -> tuple:
+    """1-3 sites with one criterion changed by -30%..+30%"""
+    rows = rng.choice(model.n_sites, size=rng.integers(1, 4), replace=False)
+    new_values = model.matrix[rows].copy()
+    column = rng.integers(model.matrix.shape[1])
+    new_values[:, column] *= rng.uniform(0.7, 1.3)
+    return rows, new_values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure what-if scoring latency')
+    parser.add_argument('--sites', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--normalization', default='vector')
+    args = parser.parse_args()
+
+    criteria = COST_CRITERIA + BENEFIT_CRITERIA
+    matrix = make_sites(args.sites)[criteria].to_numpy(dtype=np.float64)
+    weights = np.array([WEIGHTS[c] for c in criteria])
+
+    start = time.perf_counter()
+    model = TopsisWhatIfModel(matrix, weights, len(COST_CRITERIA), args.normalization)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(7)
+    edits = [random_edit(model, rng) for _ in range(args.requests)]
+
+    timings = []
+    for rows, new_values in edits:
+        start = time.perf_counter()
+        model.evaluate(rows, new_values)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print("=" * 70)
+    print("WHAT-IF BENCHMARK")
+    print("=" * 70)
+    print(f"Sites:          {args.sites}")
+    print(f"Normalization:  {args.normalization}")
+    print(f"Model build:    {build_ms:.1f} ms")
+    print(f"Requests:       {args.requests}")
+    print(f"p50 latency:    {np.percentile(timings, 50):.2f} ms")
+    print(f"p99 latency:    {np.percentile(timings, 99):.2f} ms")
+    print(f"max latency:    {max(timings):.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
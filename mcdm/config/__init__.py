@@ -9,20 +9,205 @@ class Config:
     DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
     # Database configuration
+    # 'mysql' (networked server) or 'sqlite' (embedded file at DB_PATH, see
+    # utils/embedded_db.py); DB_HOST..DB_POOL_SIZE only apply to MySQL
+    SUPPORTED_DB_BACKENDS = ['mysql', 'sqlite']
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+    DB_PATH = os.getenv('DB_PATH', 'data/retail_dss.db')
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_PORT = int(os.getenv('DB_PORT', 3306))
     DB_NAME = os.getenv('DB_NAME', 'retail_dss')
     DB_USER = os.getenv('DB_USER', 'root')
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'your_password')
     DB_CHARSET = 'utf8mb4'
+    DB_POOL_NAME = os.getenv('DB_POOL_NAME', 'mcdm_pool')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    
+    # Startup configuration
+    # Import algorithm modules, run each kernel once and open the DB pool
+    # while creating the app (gunicorn preload mode does this before forking)
+    WARM_UP_ON_START = os.getenv('WARM_UP_ON_START', 'False').lower() == 'true'
     
     # Supported algorithms
-    SUPPORTED_ALGORITHMS = ['topsis', 'ahp', 'electre', 'promethee']
+    SUPPORTED_ALGORITHMS = ['topsis', 'fuzzy_topsis', 'ahp', 'electre', 'promethee']
     DEFAULT_ALGORITHM = 'topsis'
     
+    # Normalization (see algorithms/normalization.py)
+    SUPPORTED_NORMALIZATIONS = ['vector', 'minmax', 'zscore', 'max', 'log']
+    DEFAULT_NORMALIZATION = 'vector'
+    COLUMN_STATS_CACHE_SIZE = int(os.getenv('COLUMN_STATS_CACHE_SIZE', 16))
+    
+    # Criteria weighting (see algorithms/weighting.py): 'expert' uses the
+    # expert_criteria_config weights, the others derive weights from the site
+    # data and blend them with the expert weights as
+    # expert^(1 - WEIGHTING_BLEND) * objective^WEIGHTING_BLEND
+    SUPPORTED_WEIGHTINGS = ['expert', 'entropy', 'critic', 'std']
+    DEFAULT_WEIGHTING = os.getenv('DEFAULT_WEIGHTING', 'expert')
+    WEIGHTING_BLEND = float(os.getenv('WEIGHTING_BLEND', 1.0))
+    
+    # Columns /analyze accepts as group_by (rank inside each group)
+    SUPPORTED_GROUP_BY = ['district_id']
+    
+    # Fuzzy TOPSIS: estimated criteria and their default relative spread
+    # (used when potential_site has no <criterion>_lower/_upper values)
+    FUZZY_CRITERIA = ['renovation_cost', 'traffic_score', 'population_density']
+    FUZZY_SPREAD = float(os.getenv('FUZZY_SPREAD', 0.1))
+    
+    # Skyline pre-filter for top-N analyses (see algorithms/skyline.py):
+    # skipped when a sample suggests the k-skyband keeps more than
+    # SKYLINE_MAX_FRACTION of the sites
+    SUPPORTED_PREFILTERS = ['skyband']
+    SKYLINE_MAX_FRACTION = float(os.getenv('SKYLINE_MAX_FRACTION', 0.3))
+    SKYLINE_SAMPLE_SIZE = int(os.getenv('SKYLINE_SAMPLE_SIZE', 2000))
+    
+    # What-if scoring (in-memory model per worker, see services/whatif_service.py)
+    WHATIF_VERSION_TTL_SECONDS = float(os.getenv('WHATIF_VERSION_TTL_SECONDS', 5))
+    WHATIF_MAX_MODELS = int(os.getenv('WHATIF_MAX_MODELS', 4))
+    WHATIF_MAX_SITES = 50
+    
+    # Nearest-warehouse distances (see services/warehouse_service.py):
+    # great-circle ('haversine') or from a road-distance matrix ('road'), an
+    # .npz with site_ids, warehouse_ids and distances (km). Pairs missing from
+    # the matrix use great-circle x WAREHOUSE_ROAD_CIRCUITY; the nearest depot
+    # by road is searched among the WAREHOUSE_ROAD_CANDIDATES nearest by air
+    SUPPORTED_WAREHOUSE_DISTANCES = ['haversine', 'road']
+    WAREHOUSE_DISTANCE_METRIC = os.getenv('WAREHOUSE_DISTANCE_METRIC', 'haversine').lower()
+    WAREHOUSE_ROAD_MATRIX_PATH = os.getenv('WAREHOUSE_ROAD_MATRIX_PATH', '')
+    WAREHOUSE_ROAD_CIRCUITY = float(os.getenv('WAREHOUSE_ROAD_CIRCUITY', 1.3))
+    WAREHOUSE_ROAD_CANDIDATES = int(os.getenv('WAREHOUSE_ROAD_CANDIDATES', 8))
+    
+    # Huff market capture (see utils/huff.py): demand grid cells of
+    # HUFF_CELL_KM (coarser if the area needs more than HUFF_MAX_CELLS),
+    # stores draw from cells within HUFF_CUTOFF_KM, scored in blocks of at
+    # most HUFF_BLOCK_PAIRS (store, cell) pairs (2 MiB arrays stay in cache)
+    HUFF_CELL_KM = float(os.getenv('HUFF_CELL_KM', 0.1))
+    HUFF_MAX_CELLS = int(os.getenv('HUFF_MAX_CELLS', 4000000))
+    HUFF_CUTOFF_KM = float(os.getenv('HUFF_CUTOFF_KM', 3.0))
+    HUFF_DISTANCE_DECAY = float(os.getenv('HUFF_DISTANCE_DECAY', 2.0))
+    HUFF_MIN_DISTANCE_KM = float(os.getenv('HUFF_MIN_DISTANCE_KM', 0.05))
+    HUFF_ATTRACTIVENESS_EXPONENT = float(os.getenv('HUFF_ATTRACTIVENESS_EXPONENT', 1.0))
+    HUFF_DISTRICT_RADIUS_KM = float(os.getenv('HUFF_DISTRICT_RADIUS_KM', 5.0))
+    HUFF_BLOCK_PAIRS = int(os.getenv('HUFF_BLOCK_PAIRS', 262144))
+    
+    # Bootstrap score/rank intervals (see algorithms/bootstrap.py): survey
+    # error of each criterion as criterion=kind:scale pairs, kind one of
+    # relative (sd = scale x value), absolute (sd = scale) or poisson (counts).
+    # Replicates are scored in batches of about BOOTSTRAP_BATCH_VALUES matrix
+    # cells (2 MiB stays in cache); replicates x sites is capped at
+    # BOOTSTRAP_MAX_VALUES
+    BOOTSTRAP_ERROR_MODELS = os.getenv(
+        'BOOTSTRAP_ERROR_MODELS',
+        'rent_cost=relative:0.05,renovation_cost=relative:0.15,competitor_count=poisson:1,'
+        'distance_to_warehouse=relative:0.05,floor_area=relative:0.03,front_width=relative:0.05,'
+        'traffic_score=absolute:1,population_density=relative:0.10,market_capture=relative:0.20'
+    )
+    BOOTSTRAP_REPLICATES = int(os.getenv('BOOTSTRAP_REPLICATES', 1000))
+    BOOTSTRAP_MAX_REPLICATES = int(os.getenv('BOOTSTRAP_MAX_REPLICATES', 10000))
+    BOOTSTRAP_CONFIDENCE = float(os.getenv('BOOTSTRAP_CONFIDENCE', 0.95))
+    BOOTSTRAP_BATCH_VALUES = int(os.getenv('BOOTSTRAP_BATCH_VALUES', 262144))
+    BOOTSTRAP_MAX_VALUES = int(os.getenv('BOOTSTRAP_MAX_VALUES', 50000000))
+    
+    # Shared site matrix (see utils/site_matrix.py): unfiltered site loads are
+    # served from memory-mapped files under SITE_MATRIX_DIR, written once per
+    # data version by the first worker to need them and mapped read-only by
+    # every worker; SITE_MATRIX_KEEP_GENERATIONS are kept for slow readers.
+    # When the directory is full or unwritable, loads query the database and
+    # the matrix is retried after SITE_MATRIX_RETRY_SECONDS. A generation
+    # takes about 8 MB per 20k sites: size /dev/shm (shm_size) accordingly
+    SITE_MATRIX_ENABLED = os.getenv('SITE_MATRIX_ENABLED', 'True').lower() == 'true'
+    SITE_MATRIX_DIR = os.getenv(
+        'SITE_MATRIX_DIR', '/dev/shm/mcdm-site-matrix' if os.path.isdir('/dev/shm') else 'data/site_matrix'
+    )
+    SITE_MATRIX_KEEP_GENERATIONS = int(os.getenv('SITE_MATRIX_KEEP_GENERATIONS', 2))
+    SITE_MATRIX_RETRY_SECONDS = float(os.getenv('SITE_MATRIX_RETRY_SECONDS', 60))
+    
+    # Rows per transaction when writing recomputed site columns
+    # (distance_to_warehouse, market_capture)
+    SITE_UPDATE_CHUNK = int(os.getenv('SITE_UPDATE_CHUNK', 5000))
+    
+    # Rank index of the latest batch: seconds between checks for a newer batch
+    RANK_INDEX_TTL_SECONDS = float(os.getenv('RANK_INDEX_TTL_SECONDS', 5))
+    
+    # Batch comparison (/results/compare): batches are immutable, so loaded
+    # rankings and finished comparisons are kept per worker in LRU caches
+    COMPARE_BATCH_CACHE_SIZE = int(os.getenv('COMPARE_BATCH_CACHE_SIZE', 8))
+    COMPARE_RESULT_CACHE_SIZE = int(os.getenv('COMPARE_RESULT_CACHE_SIZE', 64))
+    COMPARE_MAX_TOP_N = 1000
+    
+    # Site evaluation history (/site/<id>/history): keyset-paginated pages of
+    # HISTORY_PAGE_SIZE rows by default, or one aggregated point per day/month
+    HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', 100))
+    HISTORY_MAX_PAGE_SIZE = 1000
+    SUPPORTED_HISTORY_RESOLUTIONS = ['day', 'month']
+    
+    # Conditional GET on /results/batch, /results/latest and site histories
+    # (see api/http_cache.py): ETag/Last-Modified validators, 304s and a per
+    # worker LRU of response bodies keyed by URL and ETag. The site data
+    # version in the result ETags is re-read at most every
+    # HTTP_CACHE_VERSION_TTL_SECONDS; the latest batch id on every request
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'True').lower() == 'true'
+    HTTP_CACHE_SIZE = int(os.getenv('HTTP_CACHE_SIZE', 256))
+    HTTP_CACHE_MAX_BODY_BYTES = int(os.getenv('HTTP_CACHE_MAX_BODY_BYTES', 1024 * 1024))
+    HTTP_CACHE_VERSION_TTL_SECONDS = float(os.getenv('HTTP_CACHE_VERSION_TTL_SECONDS', 5))
+    
+    # Materialized rankings of every config (see services/snapshot_service.py):
+    # recomputed when potential_site or expert_criteria_config changes, checked
+    # every SNAPSHOT_REFRESH_SECONDS; /results/latest reads the active config's.
+    # One worker at a time recomputes them under a MySQL GET_LOCK; the others
+    # wait up to SNAPSHOT_LOCK_TIMEOUT seconds and load the stored rankings
+    SNAPSHOT_REFRESH_ENABLED = os.getenv('SNAPSHOT_REFRESH_ENABLED', 'True').lower() == 'true'
+    SNAPSHOT_REFRESH_SECONDS = float(os.getenv('SNAPSHOT_REFRESH_SECONDS', 30))
+    SNAPSHOT_ALGORITHM = os.getenv('SNAPSHOT_ALGORITHM', 'topsis')
+    SNAPSHOT_LOCK_TIMEOUT = int(os.getenv('SNAPSHOT_LOCK_TIMEOUT', 120))
+    
+    # Single-flight coalescing of identical concurrent /analyze requests:
+    # per worker always, across workers through a MySQL GET_LOCK when enabled
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+    SINGLE_FLIGHT_CROSS_WORKER = os.getenv('SINGLE_FLIGHT_CROSS_WORKER', 'False').lower() == 'true'
+    SINGLE_FLIGHT_LOCK_TIMEOUT = int(os.getenv('SINGLE_FLIGHT_LOCK_TIMEOUT', 60))
+    # A batch saved this recently by another worker for the same key is shared
+    SINGLE_FLIGHT_REUSE_SECONDS = int(os.getenv('SINGLE_FLIGHT_REUSE_SECONDS', 5))
+    
+    # Staged batch writes: results are saved under a PENDING analysis_batch
+    # header and published with one update. Every worker sweeps batches left
+    # pending longer than PENDING_BATCH_TIMEOUT_SECONDS (see
+    # services/batch_sweeper.py), deleting BATCH_DELETE_CHUNK rows per statement
+    BATCH_SWEEP_ENABLED = os.getenv('BATCH_SWEEP_ENABLED', 'True').lower() == 'true'
+    BATCH_SWEEP_INTERVAL_SECONDS = float(os.getenv('BATCH_SWEEP_INTERVAL_SECONDS', 300))
+    PENDING_BATCH_TIMEOUT_SECONDS = float(os.getenv('PENDING_BATCH_TIMEOUT_SECONDS', 900))
+    BATCH_DELETE_CHUNK = int(os.getenv('BATCH_DELETE_CHUNK', 5000))
+    
+    # Sharded multi-city analysis (see utils/shards.py): comma-separated
+    # name=DSN pairs, e.g. "hcm=mysql://user:pw@db:3306/retail_dss_hcm,dn=sqlite:///dn.db"
+    SHARD_DSNS = os.getenv('SHARD_DSNS', '')
+    SHARD_POOL_SIZE = int(os.getenv('SHARD_POOL_SIZE', 2))
+    SHARD_WORKERS = int(os.getenv('SHARD_WORKERS', 8))
+    
     # Analysis configuration
     MAX_SITES = 1000  # Maximum number of sites to analyze
     TOP_RESULTS_LIMIT = 50  # Maximum number of top results to return
+    
+    # Copeland consensus compares every pair of sites (O(n^2) time); larger
+    # site sets are refused with HTTP 400 in favour of borda or kemeny
+    CONSENSUS_COPELAND_MAX_SITES = int(os.getenv('CONSENSUS_COPELAND_MAX_SITES', 20000))
+    
+    # Process pool for algorithm kernels (analysis, consensus, bootstrap),
+    # see utils/compute_pool.py: warm worker processes keep CPU-bound work
+    # off the request threads. At most COMPUTE_MAX_JOBS requests use it at
+    # once, further ones get HTTP 429; analyses of fewer than
+    # COMPUTE_MIN_SITES sites run in-process (shipping them costs more).
+    # Every gunicorn worker has its own pool, so by default the CPUs are
+    # split between them; with the pool disabled, consensus and bootstrap
+    # run their tasks on the request thread
+    PROCESS_POOL_WORKERS = int(os.getenv(
+        'PROCESS_POOL_WORKERS',
+        max(1, (os.cpu_count() or 2) // int(os.getenv('GUNICORN_WORKERS', 2)))
+    ))
+    PROCESS_POOL_START_METHOD = os.getenv('PROCESS_POOL_START_METHOD', 'spawn')
+    COMPUTE_POOL_ENABLED = os.getenv('COMPUTE_POOL_ENABLED', 'True').lower() == 'true'
+    COMPUTE_POOL_PRESTART = os.getenv('COMPUTE_POOL_PRESTART', 'True').lower() == 'true'
+    COMPUTE_MAX_JOBS = int(os.getenv('COMPUTE_MAX_JOBS', 8))
+    COMPUTE_MIN_SITES = int(os.getenv('COMPUTE_MIN_SITES', 2000))
 
 
 class DevelopmentConfig(Config):
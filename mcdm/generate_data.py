@@ -5,7 +5,6 @@ Tạo dữ liệu mẫu có tính logic thực tế cho hệ thống
 ============================================================================
 """
 
-import mysql.connector
 import numpy as np
 import random
 import os
@@ -47,6 +46,9 @@ DB_CONFIG = {
 # DATA GENERATION PARAMETERS
 # ============================================================================
 
+# Tiền tố mã địa điểm theo thành phố (mỗi thành phố một schema/shard)
+SITE_CODE_PREFIX = os.getenv('SITE_CODE_PREFIX', 'HCM')
+
 # Danh sách quận (lấy từ database)
 DISTRICTS = []
 
@@ -178,7 +180,12 @@ def generate_correlated_site_data(district, base_population_density):
 # ============================================================================
 
 def get_db_connection():
-    """Tạo kết nối đến MySQL database"""
+    """Tạo kết nối đến MySQL database (hoặc file SQLite khi DB_BACKEND=sqlite)"""
+    if os.getenv('DB_BACKEND', 'mysql').lower() == 'sqlite':
+        from utils import db_connector
+        return db_connector.get_db_connection()
+    # Imported here so benchmarks can reuse the generator without MySQL
+    import mysql.connector
     try:
         conn = mysql.connector.connect(**DB_CONFIG)
         print("✓ Connected to MySQL database")
@@ -211,7 +218,7 @@ def insert_potential_site(conn, site_data, site_number):
     
     # Generate site_code
     district_name_short = site_data['address'].split(',')[-1].strip().replace('Quận ', 'Q')
-    site_code = f"HCM-{district_name_short}-{site_number:03d}"
+    site_code = f"{SITE_CODE_PREFIX}-{district_name_short}-{site_number:03d}"
     
     query = """
         INSERT INTO potential_site (
@@ -0,0 +1,40 @@
+# ============================================================================
+# Gunicorn configuration for Flask MCDM Service
+# ============================================================================
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Load the app (and warm algorithm kernels + DB pool, see app.warm_up) once in
+# the master before forking, so workers start with everything imported.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+if preload_app:
+    os.environ.setdefault('WARM_UP_ON_START', 'True')
+
+
+def post_fork(server, worker):
+    """Give every worker its own DB pool instead of the master's sockets"""
+    from config import Config
+    from utils.db_connector import reset_pool
+    from utils.shards import reset_shard_pools
+    reset_pool()
+    reset_shard_pools()
+    
+    # Threads do not survive fork, so each worker starts its own refresher
+    if Config.SNAPSHOT_REFRESH_ENABLED:
+        from services.snapshot_service import start_refresher
+        start_refresher()
+    
+    # Each worker also sweeps abandoned pending batches (deletes are idempotent)
+    if Config.BATCH_SWEEP_ENABLED:
+        from services.batch_sweeper import start_sweeper
+        start_sweeper()
+    
+    # Spawn the compute pool's warm processes now, not on the first analysis
+    if Config.COMPUTE_POOL_ENABLED and Config.COMPUTE_POOL_PRESTART:
+        from services.analysis_service import get_process_pool
+        get_process_pool().start()
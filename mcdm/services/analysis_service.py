@@ -1,11 +1,145 @@
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from algorithms import AlgorithmFactory
-from services.data_service import DataService
+from config import Config
+from services.data_service import BATCH_PUBLISHED, DataService, new_batch_id
+from services.ranking_service import RankingService
+from utils.compute_pool import ComputePoolSaturated
+from utils.single_flight import AnalysisInProgress, IdempotencyKeyReused, SingleFlight
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+# Criteria columns of potential_site, cost criteria first
+COST_CRITERIA = [
+    'rent_cost', 'renovation_cost', 
+    'competitor_count', 'distance_to_warehouse'
+]
+BENEFIT_CRITERIA = [
+    'floor_area', 'front_width', 
+    'traffic_score', 'population_density',
+    'market_capture'
+]
+
+# Column of expert_criteria_config holding the weight of each criterion
+WEIGHT_COLUMNS = {
+    'rent_cost': 'weight_rent_cost',
+    'renovation_cost': 'weight_renovation_cost',
+    'competitor_count': 'weight_competitor_count',
+    'distance_to_warehouse': 'weight_warehouse_distance',
+    'floor_area': 'weight_floor_area',
+    'front_width': 'weight_front_width',
+    'traffic_score': 'weight_traffic_score',
+    'population_density': 'weight_population_density',
+    'market_capture': 'weight_market_capture'
+}
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+# In-flight /analyze computations of this worker, by request key
+_single_flight = SingleFlight()
+
+_shard_pool = None
+_shard_pool_lock = threading.Lock()
+
+# Skyband masks per (site-data version, k); None records a skipped filter.
+# The skyband does not depend on the weights, so every strategy reuses it.
+_skyband_cache = OrderedDict()
+_skyband_cache_lock = threading.Lock()
+
+# Objective criteria weights per (site-data version, method); derived from
+# the decision matrix alone, so every config and algorithm reuses them
+_objective_weights_cache = OrderedDict()
+_objective_weights_cache_lock = threading.Lock()
+
+# Site data version in the result ETags: (version, monotonic time read)
+_results_site_version = (None, 0.0)
+
+
+def get_process_pool():
+    """
+    Per-worker compute pool (utils/compute_pool.py) for the algorithm kernels
+    
+    Created on first use, so under gunicorn every worker gets its own pool
+    after the fork; its load is reported as compute_* gauges.
+    """
+    global _process_pool
+    
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                from utils.compute_pool import ComputePool
+                from utils.metrics import metrics
+                pool = ComputePool(
+                    workers=Config.PROCESS_POOL_WORKERS,
+                    max_jobs=Config.COMPUTE_MAX_JOBS,
+                    start_method=Config.PROCESS_POOL_START_METHOD
+                )
+                metrics.register_gauge('compute_workers', lambda: pool.stats()['workers'])
+                metrics.register_gauge('compute_jobs_in_progress', lambda: pool.stats()['jobs_in_progress'])
+                metrics.register_gauge('compute_tasks_pending', lambda: pool.stats()['tasks_pending'])
+                metrics.register_gauge('compute_utilization', lambda: pool.stats()['utilization'])
+                _process_pool = pool
+    return _process_pool
+
+
+def get_kernel_pool():
+    """
+    Pool the fan-out kernels (consensus, bootstrap) submit their tasks to
+    
+    The compute pool, or with Config.COMPUTE_POOL_ENABLED off an InlinePool
+    running the same tasks on the request thread.
+    """
+    if not Config.COMPUTE_POOL_ENABLED:
+        from utils.compute_pool import InlinePool
+        return InlinePool()
+    return get_process_pool()
+
+
+def get_shard_pool():
+    """Per-worker thread pool for shard loads and per-shard scoring"""
+    global _shard_pool
+    
+    if _shard_pool is None:
+        with _shard_pool_lock:
+            if _shard_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _shard_pool = ThreadPoolExecutor(
+                    max_workers=Config.SHARD_WORKERS,
+                    thread_name_prefix='shard'
+                )
+    return _shard_pool
+
+
+# Downsampled site history: length of the created_at text prefix grouped on
+HISTORY_PERIOD_CHARS = {'day': 10, 'month': 7}
+
+
+def _sql_time(value) -> str:
+    """created_at value as the 'YYYY-MM-DD HH:MM:SS' text both backends compare"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _period_start(value, resolution: str) -> datetime:
+    """Start of the day or month holding a created_at value"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    start = datetime(value.year, value.month, value.day)
+    return start.replace(day=1) if resolution == 'month' else start
+
+
+def _shift_periods(start: datetime, resolution: str, periods: int) -> datetime:
+    """Start of the day or month `periods` after (negative: before) `start`"""
+    if resolution == 'month':
+        months = start.year * 12 + start.month - 1 + periods
+        return start.replace(year=months // 12, month=months % 12 + 1)
+    return start + timedelta(days=periods)
+
 
 class AnalysisService:
     """Service to orchestrate MCDM analysis"""
@@ -13,22 +147,340 @@ class AnalysisService:
     def __init__(self):
         self.data_service = DataService()
     
+    def _build_weights(self, config: dict) -> dict:
+        """Map each criterion to its weight in an expert_criteria_config row"""
+        return {
+            criterion: config[column]
+            for criterion, column in WEIGHT_COLUMNS.items()
+        }
+    
+    def _weigh(self, config: dict, algo, df, weighting: str = None, blend: float = None) -> tuple:
+        """
+        Criterion weights of an analysis
+        
+        'expert' takes the config's weights; the objective methods of
+        algorithms/weighting.py derive weights from the loaded sites'
+        column statistics (cached per site-data version) and blend them
+        with the config's weights.
+        
+        Args:
+            config: expert_criteria_config row
+            algo: Algorithm instance (its column statistics cache is used)
+            df: Loaded sites
+            weighting: One of Config.SUPPORTED_WEIGHTINGS (None = Config.DEFAULT_WEIGHTING)
+            blend: Share of the objective weights (None = Config.WEIGHTING_BLEND)
+        
+        Returns:
+            Tuple (weights dict, weighting info for the response or None for
+            expert weights)
+        """
+        import numpy as np
+        from algorithms.weighting import blend_weights, objective_weights
+        
+        weighting = (weighting or Config.DEFAULT_WEIGHTING).lower()
+        if weighting not in Config.SUPPORTED_WEIGHTINGS:
+            raise ValueError(f"Unsupported weighting: {weighting}. Supported: {Config.SUPPORTED_WEIGHTINGS}")
+        expert = self._build_weights(config)
+        if weighting == 'expert':
+            return expert, None
+        
+        blend = Config.WEIGHTING_BLEND if blend is None else blend
+        if isinstance(blend, bool) or not isinstance(blend, (int, float)) or not 0 <= blend <= 1:
+            raise ValueError("weighting_blend must be a number between 0 and 1")
+        
+        all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+        version = df.attrs.get('data_version')
+        cache_key = (version, weighting)
+        with _objective_weights_cache_lock:
+            objective = _objective_weights_cache.get(cache_key)
+            if objective is not None:
+                _objective_weights_cache.move_to_end(cache_key)
+        cached = objective is not None
+        
+        if not cached:
+            stats = algo.column_statistics(df, all_criteria, df[all_criteria].to_numpy(dtype=np.float64))
+            objective = objective_weights(weighting, stats, len(COST_CRITERIA))
+            if version is not None:
+                with _objective_weights_cache_lock:
+                    _objective_weights_cache[cache_key] = objective
+                    while len(_objective_weights_cache) > Config.COLUMN_STATS_CACHE_SIZE:
+                        _objective_weights_cache.popitem(last=False)
+        
+        blended = blend_weights([expert[c] for c in all_criteria], objective, float(blend))
+        weights = dict(zip(all_criteria, blended.tolist()))
+        info = {
+            'method': weighting,
+            'blend': blend,
+            'cached': cached,
+            'objective_weights': {c: round(w, 6) for c, w in zip(all_criteria, objective.tolist())},
+            'weights': {c: round(w, 6) for c, w in weights.items()}
+        }
+        logger.info(f"{weighting} weights (blend {blend}): {info['weights']}")
+        return weights, info
+    
     def run_analysis(self, algorithm: str = 'topsis', 
                     config_id: int = None, 
                     user_id: int = None,
-                    top_n: int = 10) -> dict:
+                    top_n: int = 10,
+                    normalization: str = None,
+                    group_by: str = None,
+                    prefilter: str = None,
+                    filters: dict = None,
+                    columnar: bool = False,
+                    idempotency_key: str = None,
+                    weighting: str = None,
+                    weighting_blend: float = None) -> dict:
         """
         Run MCDM analysis and save results to evaluation_result table
         
+        Identical concurrent requests (same parameters, site data and
+        configs) are coalesced: one of them runs the analysis and the others
+        receive its result and batch_id, marked "coalesced": true. The
+        requesting user_id of a coalesced request is not recorded.
+        
+        Results are staged under a PENDING batch header and published with
+        the response once complete. A retry with the same idempotency_key
+        gets that stored response back ("idempotent_replay": true) from one
+        lookup instead of a second analysis; the key is bound to the request
+        parameters it was first used with.
+        
         Args:
             algorithm: Algorithm name (topsis, ahp, etc.)
             config_id: Expert criteria configuration ID (None = use active config)
             user_id: User performing the analysis (optional)
             top_n: Number of top results to return
+            normalization: Normalization strategy (None = Config.DEFAULT_NORMALIZATION)
+            group_by: Rank sites inside each group of this column instead of
+                globally (None = single global ranking)
+            prefilter: 'skyband' scores only the sites that can reach the
+                top_n under any weights and saves just the top_n (None = all)
+            filters: Site filter spec pushed down to SQL, e.g.
+                {"district_id": [1, 3], "rent_cost": {"lt": 40}}
+            columnar: Return top_sites as {field: array} instead of a list
+                of row dicts (for Arrow responses; not with group_by)
+            idempotency_key: Client's Idempotency-Key (None = not idempotent);
+                keyed requests are not coalesced
+            weighting: 'expert' (config weights) or an objective method
+                derived from the site data: 'entropy', 'critic', 'std'
+                (None = Config.DEFAULT_WEIGHTING)
+            weighting_blend: Objective share of a multiplicative blend with
+                the expert weights, 0 to 1 (None = Config.WEIGHTING_BLEND)
         
         Returns:
             Dictionary with analysis results
+        
+        Raises:
+            AnalysisInProgress: The idempotency key's analysis is still running
+            IdempotencyKeyReused: The idempotency key was first used with
+                different parameters
+        """
+        from utils.columns import rows_from_columns
+        from utils.metrics import metrics
+        
+        def run(batch_id):
+            return self._run_analysis(
+                algorithm, config_id=config_id, user_id=user_id, top_n=top_n,
+                normalization=normalization, group_by=group_by,
+                prefilter=prefilter, filters=filters, weighting=weighting,
+                weighting_blend=weighting_blend, batch_id=batch_id
+            )
+        
+        def execute(request_key=None):
+            batch_id = new_batch_id(algorithm.upper())
+            self.data_service.claim_batch(batch_id, algorithm.upper(), request_key=request_key)
+            return self._staged(batch_id, run)
+        
+        def represent(result, coalesced):
+            # Results are shared between coalesced callers: copy, never mutate
+            result = {**result, 'coalesced': coalesced}
+            if not columnar and isinstance(result.get('top_sites'), dict):
+                result['top_sites'] = rows_from_columns(result['top_sites'])
+            return result
+        
+        if idempotency_key is not None:
+            fingerprint = self._request_key(
+                versioned=False, algorithm=algorithm, config_id=config_id,
+                user_id=user_id, top_n=top_n, normalization=normalization,
+                group_by=group_by, prefilter=prefilter, filters=filters,
+                weighting=weighting, weighting_blend=weighting_blend
+            )
+            result, replayed = self._run_idempotent(idempotency_key, fingerprint, algorithm, run)
+            metrics.increment('analysis_requests', outcome='replayed' if replayed else 'executed')
+            if replayed:
+                logger.info(f"Idempotent replay of batch {result.get('batch_id')}")
+            return {**represent(result, False), 'idempotent_replay': replayed}
+        
+        if not Config.SINGLE_FLIGHT_ENABLED:
+            metrics.increment('analysis_requests', outcome='executed')
+            return represent(execute(), False)
+        
+        request_key = self._request_key(
+            algorithm=algorithm, config_id=config_id, top_n=top_n,
+            normalization=normalization, group_by=group_by,
+            prefilter=prefilter, filters=filters, weighting=weighting,
+            weighting_blend=weighting_blend
+        )
+        (result, from_other_worker), shared = _single_flight.do(
+            request_key, lambda: self._run_once_across_workers(request_key, lambda: execute(request_key))
+        )
+        
+        if shared:
+            outcome = 'coalesced_thread'
+        elif from_other_worker:
+            outcome = 'coalesced_worker'
+        else:
+            outcome = 'executed'
+        metrics.increment('analysis_requests', outcome=outcome)
+        if outcome != 'executed':
+            logger.info(f"Analysis request coalesced ({outcome}) into batch {result.get('batch_id')}")
+        
+        return represent(result, outcome != 'executed')
+    
+    def _request_key(self, versioned: bool = True, **params) -> str:
+        """
+        Coalescing key: request parameters plus the site-data and config versions
+        
+        user_id is left out on purpose, so requests of different users share.
+        With versioned=False it is a fingerprint of the parameters alone, as
+        bound to an idempotency key.
+        """
+        import hashlib
+        import json
+        
+        if versioned:
+            params['site_version'] = self.data_service.get_data_version()
+            params['config_version'] = self.data_service.get_config_version()
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+    
+    def _run_once_across_workers(self, request_key: str, execute) -> tuple:
+        """
+        Run `execute` unless another worker just produced this request's batch
+        
+        With Config.SINGLE_FLIGHT_CROSS_WORKER the run happens under a MySQL
+        named lock for the key; a worker that waited on the lock first looks
+        for a batch published for the key within SINGLE_FLIGHT_REUSE_SECONDS.
+        
+        Returns:
+            Tuple (response, True when it came from another worker)
+        """
+        from utils.db_connector import advisory_lock
+        
+        if not Config.SINGLE_FLIGHT_CROSS_WORKER:
+            return execute(), False
+        
+        with advisory_lock(f"mcdm:analyze:{request_key}", Config.SINGLE_FLIGHT_LOCK_TIMEOUT) as acquired:
+            if not acquired:
+                logger.warning(f"Timed out waiting for analysis lock {request_key}, running anyway")
+            
+            recent = self.data_service.find_recent_batch(request_key, Config.SINGLE_FLIGHT_REUSE_SECONDS)
+            if recent is not None:
+                return recent, True
+            
+            return execute(), False
+    
+    def _run_idempotent(self, idempotency_key: str, request_key: str, algorithm: str, run) -> tuple:
+        """
+        Run the analysis of an idempotency key once
+        
+        The key is claimed with the batch's PENDING header, which stores the
+        request's parameter fingerprint; a request that finds the key
+        published with the same fingerprint gets the stored response back.
+        
+        Args:
+            idempotency_key: Client's Idempotency-Key
+            request_key: Parameter fingerprint of the request (_request_key)
+            algorithm: Algorithm name
+            run: Callable running the analysis under a given batch_id
+        
+        Returns:
+            Tuple (response, True when replayed from the published batch)
+        
+        Raises:
+            AnalysisInProgress: The key's batch is still pending
+            IdempotencyKeyReused: The key's batch was claimed by a request
+                with different parameters
+        """
+        existing = self.data_service.find_batch_by_idempotency_key(idempotency_key)
+        if existing is None:
+            batch_id = new_batch_id(algorithm.upper())
+            if self.data_service.claim_batch(batch_id, algorithm.upper(), idempotency_key=idempotency_key,
+                                             request_key=request_key):
+                return self._staged(batch_id, run), False
+            existing = self.data_service.find_batch_by_idempotency_key(idempotency_key)
+        
+        # Batches claimed before fingerprints were stored have none to compare
+        if existing is not None and existing['request_key'] not in (None, request_key):
+            raise IdempotencyKeyReused(idempotency_key)
+        if existing is not None and existing['status'] == BATCH_PUBLISHED:
+            return existing['response'], True
+        raise AnalysisInProgress(idempotency_key)
+    
+    def _staged(self, batch_id: str, run, services: list = None) -> dict:
         """
+        run(batch_id) under a claimed batch, discarding it unless published
+        
+        The analysis saves its rows under the PENDING header and publishes
+        it once the response is built. After an error or an unsuccessful
+        response the batch is deleted right away rather than by the sweeper,
+        which also frees its idempotency key. `services` are the databases
+        holding parts of the batch (None = this service's own).
+        """
+        try:
+            response = run(batch_id)
+        except BaseException:
+            self._discard(batch_id, services)
+            raise
+        if not response.get('success'):
+            self._discard(batch_id, services)
+        return response
+    
+    def _discard(self, batch_id: str, services: list = None):
+        """Delete a pending batch; failures are left to the batch sweeper"""
+        for service in services or [self.data_service]:
+            try:
+                service.discard_batch(batch_id)
+            except Exception as e:
+                logger.warning(f"Could not discard pending batch {batch_id}: {e}")
+    
+    def _publish(self, batch_id: str, response: dict, df, algorithm: str,
+                 full_ranking: bool = True):
+        """
+        Make a saved batch visible: its header, then this worker's rank index
+        
+        full_ranking=False marks grouped and top-N-only batches, which rank
+        queries on the latest batch skip.
+        """
+        self.data_service.publish_batch(batch_id, response, full_ranking)
+        RankingService.publish_batch(batch_id, df, algorithm, full_ranking)
+    
+    def _run_analysis(self, algorithm: str = 'topsis', 
+                      config_id: int = None, 
+                      user_id: int = None,
+                      top_n: int = 10,
+                      normalization: str = None,
+                      group_by: str = None,
+                      prefilter: str = None,
+                      filters: dict = None,
+                      weighting: str = None,
+                      weighting_blend: float = None,
+                      batch_id: str = None) -> dict:
+        """
+        Run MCDM analysis and save results, without coalescing
+        
+        Arguments and result as for run_analysis; batch_id is the claimed
+        batch to save under (None = a new one).
+        """
+        
+        if group_by is not None:
+            if prefilter is not None:
+                raise ValueError("prefilter cannot be combined with group_by")
+            return self.run_grouped_analysis(
+                algorithm, group_by, config_id=config_id, user_id=user_id,
+                top_n=top_n, normalization=normalization, filters=filters,
+                weighting=weighting, weighting_blend=weighting_blend,
+                batch_id=batch_id
+            )
         
         start_time = datetime.now()
         start_ms = int(time.time() * 1000)
@@ -40,8 +492,16 @@ class AnalysisService:
             config = self.data_service.load_config(config_id)
             logger.info(f"Loaded configuration: {config['strategy_name']}")
             
-            # Step 2: Load site data
-            df = self.data_service.load_sites()
+            # Step 2: Load site data (filtered in SQL, only the columns
+            # the algorithm reads)
+            cost_criteria = COST_CRITERIA
+            benefit_criteria = BENEFIT_CRITERIA
+            algo = AlgorithmFactory.create(algorithm, normalization=normalization)
+            
+            df = self.data_service.load_sites(
+                filters=filters,
+                columns=algo.required_columns(cost_criteria + benefit_criteria)
+            )
             logger.info(f"Loaded {len(df)} potential sites")
             
             if len(df) == 0:
@@ -51,32 +511,21 @@ class AnalysisService:
                     'sites_analyzed': 0
                 }
             
-            # Step 3: Prepare criteria and weights
-            cost_criteria = [
-                'rent_cost', 'renovation_cost', 
-                'competitor_count', 'distance_to_warehouse'
-            ]
-            benefit_criteria = [
-                'floor_area', 'front_width', 
-                'traffic_score', 'population_density'
-            ]
-            
-            weights = {
-                'rent_cost': config['weight_rent_cost'],
-                'renovation_cost': config['weight_renovation_cost'],
-                'competitor_count': config['weight_competitor_count'],
-                'distance_to_warehouse': config['weight_warehouse_distance'],
-                'floor_area': config['weight_floor_area'],
-                'front_width': config['weight_front_width'],
-                'traffic_score': config['weight_traffic_score'],
-                'population_density': config['weight_population_density']
-            }
+            # Step 3: Prepare weights (from the full data, before any pre-filter)
+            weights, weighting_info = self._weigh(config, algo, df, weighting, weighting_blend)
             
             # Step 4: Run algorithm
-            algo = AlgorithmFactory.create(algorithm)
-            logger.info(f"Running {algo.name} algorithm...")
+            logger.info(f"Running {algo.name} algorithm ({algo.normalization.name} normalization)...")
+            
+            prefilter_info = None
+            if prefilter is not None:
+                df, prefilter_info = self._apply_prefilter(df, algo, prefilter, top_n)
+            
+            df_results = self._analyze(algorithm, algo, df, weights)
             
-            df_results = algo.analyze(df, weights, cost_criteria, benefit_criteria)
+            if prefilter_info is not None and prefilter_info['applied']:
+                # Ranks are exact up to top_n only
+                df_results = df_results[df_results['rank_position'] <= top_n]
             
             # Calculate execution time
             end_ms = int(time.time() * 1000)
@@ -88,7 +537,8 @@ class AnalysisService:
                 config['id'],
                 user_id=user_id,
                 algorithm=algorithm.upper(),
-                execution_time_ms=execution_time_ms
+                execution_time_ms=execution_time_ms,
+                batch_id=batch_id
             )
             logger.info(f"Results saved to evaluation_result table with batch_id: {batch_id}")
             
@@ -102,6 +552,7 @@ class AnalysisService:
             response = {
                 'success': True,
                 'algorithm': algorithm.upper(),
+                'normalization': algo.normalization.name,
                 'strategy_name': config['strategy_name'],
                 'batch_id': batch_id,
                 'sites_analyzed': len(df_results),
@@ -110,45 +561,736 @@ class AnalysisService:
                 'timestamp': end_time.isoformat(),
                 'config_id': config['id'],
                 'user_id': user_id,
-                'score_statistics': {
-                    'min': float(df_results['topsis_score'].min()),
-                    'max': float(df_results['topsis_score'].max()),
-                    'mean': float(df_results['topsis_score'].mean()),
-                    'std': float(df_results['topsis_score'].std())
-                },
-                'top_sites': [
-                    {
-                        'rank': int(row['rank_position']),
-                        'site_id': int(row['id']),
-                        'site_code': row['site_code'],
-                        'address': row['address'],
-                        'score': round(float(row['topsis_score']), 4),
-                        'rent_cost': float(row['rent_cost']),
-                        'floor_area': float(row['floor_area']),
-                        'traffic_score': int(row['traffic_score']),
-                        'competitor_count': int(row['competitor_count']),
-                        'population_density': float(row['population_density'])
-                    }
-                    for _, row in top_sites.iterrows()
-                ]
+                'filters': filters,
+                'score_statistics': self._score_statistics(df_results['topsis_score']),
+                'top_sites': self._top_site_columns(top_sites)
             }
+            if prefilter_info is not None:
+                response['sites_analyzed'] = prefilter_info['sites_loaded']
+                response['prefilter'] = prefilter_info
+            if weighting_info is not None:
+                response['weighting'] = weighting_info
             
             logger.info(f"Analysis completed successfully in {duration:.2f}s")
-            logger.info(f"Top site: {response['top_sites'][0]['site_code']} with score {response['top_sites'][0]['score']}")
+            logger.info(f"Top site: {response['top_sites']['site_code'][0]} with score {response['top_sites']['score'][0]}")
             
+            # A pre-filtered batch only holds the exact top_n
+            partial = prefilter_info is not None and prefilter_info['applied']
+            self._publish(batch_id, response, df_results, algorithm.upper(), full_ranking=not partial)
             return response
             
+        except ComputePoolSaturated:
+            raise
+            
         except Exception as e:
             logger.error(f"Analysis failed: {str(e)}", exc_info=True)
             raise
     
-    def get_batch_results(self, batch_id: str = None, limit: int = 10) -> dict:
+    def _analyze(self, algorithm: str, algo, df, weights: dict, group_by: str = None):
+        """
+        algo.analyze (or analyze_grouped) on the compute pool
+        
+        The request thread only copies the columns the algorithm reads into
+        shared memory and attaches the returned scores and ranks, so other
+        requests of this worker are not stalled behind the GIL. Small inputs
+        (fewer than Config.COMPUTE_MIN_SITES sites) and a disabled pool run
+        in-process.
+        
+        Raises:
+            ComputePoolSaturated: when the pool has no free job slot
+        
+        Returns:
+            DataFrame as returned by the algorithm
+        """
+        if not Config.COMPUTE_POOL_ENABLED or len(df) < Config.COMPUTE_MIN_SITES:
+            if group_by is None:
+                return algo.analyze(df, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+            return algo.analyze_grouped(df, weights, COST_CRITERIA, BENEFIT_CRITERIA, group_by)
+        
+        import numpy as np
+        from algorithms.shared_analysis import analyze_shared
+        from utils.shared_array import SharedArray
+        
+        # Optional columns (e.g. fuzzy bounds) may be absent from the frame
+        columns = [c for c in algo.required_columns(COST_CRITERIA + BENEFIT_CRITERIA) if c in df.columns]
+        if group_by is not None:
+            columns = columns + [group_by]
+        attrs = {key: df.attrs[key] for key in ('data_version', 'column_stats') if key in df.attrs}
+        
+        pool = get_process_pool()
+        with pool.admit():
+            with SharedArray.from_array(df[columns].to_numpy(dtype=np.float64)) as matrix:
+                positions, scores, ranks, elapsed_ms = pool.run(
+                    analyze_shared, algorithm, algo.normalization.name, columns,
+                    matrix.spec, weights, COST_CRITERIA, BENEFIT_CRITERIA, attrs, group_by
+                )
+        logger.info(f"{algo.name} scored {len(df)} sites on the compute pool in {elapsed_ms} ms")
+        
+        if positions is None:
+            df_results = df.copy(deep=False)
+        else:
+            df_results = df.iloc[positions].reset_index(drop=True)
+        df_results['topsis_score'] = scores
+        df_results['rank_position'] = ranks
+        return df_results
+    
+    def _apply_prefilter(self, df, algo, prefilter: str, top_n: int) -> tuple:
+        """
+        Reduce the sites to the top_n-skyband before scoring
+        
+        The subset carries the column statistics of all loaded sites, so
+        normalization and ideal points - and therefore the scores and the
+        top_n ranks - are the same as without the pre-filter. The filter is
+        skipped when a sample suggests it would keep more than
+        Config.SKYLINE_MAX_FRACTION of the sites. Masks are cached per data
+        version, so later strategies on the same data skip the filter cost.
+        
+        Returns:
+            Tuple (DataFrame to score, prefilter summary dict)
+        """
+        import numpy as np
+        from algorithms.skyline import estimate_skyband_fraction, skyband_mask
+        
+        if prefilter not in Config.SUPPORTED_PREFILTERS:
+            raise ValueError(f"Unsupported prefilter: {prefilter}. Supported: {Config.SUPPORTED_PREFILTERS}")
+        if not algo.dominance_monotone:
+            raise ValueError(f"{algo.name} does not support the {prefilter} pre-filter")
+        
+        start = time.perf_counter()
+        all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+        matrix = df[all_criteria].to_numpy(dtype=np.float64)
+        n_cost = len(COST_CRITERIA)
+        
+        info = {
+            'method': prefilter,
+            'k': top_n,
+            'sites_loaded': len(df),
+            'applied': False
+        }
+        
+        version = df.attrs.get('data_version')
+        cache_key = (version, top_n)
+        with _skyband_cache_lock:
+            cached = cache_key in _skyband_cache
+            mask = _skyband_cache.get(cache_key)
+        info['cached'] = cached
+        
+        if not cached:
+            estimate = estimate_skyband_fraction(matrix, n_cost, top_n, Config.SKYLINE_SAMPLE_SIZE)
+            info['estimated_fraction'] = round(estimate, 4)
+            if estimate <= Config.SKYLINE_MAX_FRACTION:
+                mask = skyband_mask(matrix, n_cost, top_n, max_fraction=Config.SKYLINE_MAX_FRACTION)
+            
+            if version is not None:
+                with _skyband_cache_lock:
+                    _skyband_cache[cache_key] = mask
+                    while len(_skyband_cache) > Config.COLUMN_STATS_CACHE_SIZE:
+                        _skyband_cache.popitem(last=False)
+        
+        if mask is not None:
+            stats = algo.column_statistics(df, all_criteria, matrix)
+            df = df[mask].copy()
+            df.attrs['column_stats'] = (tuple(all_criteria), stats)
+            info.update({
+                'applied': True,
+                'candidates': len(df),
+                'reduction_ratio': round(1 - len(df) / info['sites_loaded'], 4)
+            })
+        
+        info['filter_time_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Skyband pre-filter: {info}")
+        return df, info
+    
+    def run_grouped_analysis(self, algorithm: str, group_by: str,
+                             config_id: int = None,
+                             user_id: int = None,
+                             top_n: int = 10,
+                             normalization: str = None,
+                             filters: dict = None,
+                             weighting: str = None,
+                             weighting_blend: float = None,
+                             batch_id: str = None) -> dict:
+        """
+        Rank sites inside every group (e.g. per district) in one pass
+        
+        Normalization, ideal points and ranks are computed per group, so the
+        result equals one analysis per group. Only the top_n sites of each
+        group are saved; their rank_position is the rank inside the group
+        and group_key holds the group value.
+        
+        Args:
+            algorithm: Algorithm name (must implement analyze_grouped)
+            group_by: Grouping column (one of Config.SUPPORTED_GROUP_BY)
+            config_id: Expert criteria configuration ID (None = use active config)
+            user_id: User performing the analysis (optional)
+            top_n: Number of top sites kept per group
+            normalization: Normalization strategy (None = Config.DEFAULT_NORMALIZATION)
+            filters: Site filter spec pushed down to SQL (optional)
+            weighting: Weighting method, as for run_analysis (weights are
+                derived from all sites, not per group)
+            weighting_blend: Objective share of the blend, as for run_analysis
+            batch_id: Claimed batch to save under (None = a new one)
+        
+        Returns:
+            Dictionary with the top sites of every group
+        """
+        from algorithms.grouped import Segments, top_n_mask
+        
+        if group_by not in Config.SUPPORTED_GROUP_BY:
+            raise ValueError(f"Unsupported group_by: {group_by}. Supported: {Config.SUPPORTED_GROUP_BY}")
+        
+        start_time = datetime.now()
+        start_ms = int(time.time() * 1000)
+        
+        logger.info(f"Starting {algorithm.upper()} analysis grouped by {group_by}...")
+        
+        config = self.data_service.load_config(config_id)
+        algo = AlgorithmFactory.create(algorithm, normalization=normalization)
+        df = self.data_service.load_sites(
+            group_by=group_by,
+            filters=filters,
+            columns=algo.required_columns(COST_CRITERIA + BENEFIT_CRITERIA)
+        )
+        
+        # Sites without a group value cannot be ranked inside a group
+        df = df[df[group_by].notna()]
+        logger.info(f"Loaded {len(df)} potential sites with {group_by}")
+        
+        if len(df) == 0:
+            return {
+                'success': False,
+                'error': 'No sites found to analyze',
+                'sites_analyzed': 0
+            }
+        
+        weights, weighting_info = self._weigh(config, algo, df, weighting, weighting_blend)
+        
+        df_results = self._analyze(algorithm, algo, df, weights, group_by=group_by)
+        
+        # Keep the best top_n of each group (rows are sorted by group)
+        segments = Segments.from_groups(df_results[group_by].to_numpy())
+        ranks = df_results['rank_position'].to_numpy()
+        df_top = df_results[top_n_mask(ranks, segments, top_n)]
+        
+        execution_time_ms = int(time.time() * 1000) - start_ms
+        
+        batch_id = self.data_service.save_results(
+            df_top,
+            config['id'],
+            user_id=user_id,
+            algorithm=algorithm.upper(),
+            execution_time_ms=execution_time_ms,
+            group_column=group_by,
+            batch_id=batch_id
+        )
+        logger.info(f"Saved top {top_n} of {len(segments.keys)} groups with batch_id: {batch_id}")
+        
+        end_time = datetime.now()
+        
+        groups = []
+        for i, (key, group_df) in enumerate(df_top.groupby(group_by, sort=True)):
+            group_df = group_df.sort_values('rank_position', kind='stable')
+            groups.append({
+                'group_key': key.item() if hasattr(key, 'item') else key,
+                'district_name': group_df['district_name'].iloc[0] if 'district_name' in group_df else None,
+                'sites_in_group': int(segments.counts[i]),
+                'top_sites': self._format_top_sites(group_df)
+            })
+        
+        response = {
+            'success': True,
+            'algorithm': algorithm.upper(),
+            'normalization': algo.normalization.name,
+            'group_by': group_by,
+            'strategy_name': config['strategy_name'],
+            'batch_id': batch_id,
+            'sites_analyzed': len(df_results),
+            'groups_analyzed': len(groups),
+            'execution_time_seconds': round((end_time - start_time).total_seconds(), 2),
+            'execution_time_ms': execution_time_ms,
+            'timestamp': end_time.isoformat(),
+            'config_id': config['id'],
+            'user_id': user_id,
+            'filters': filters,
+            'groups': groups
+        }
+        if weighting_info is not None:
+            response['weighting'] = weighting_info
+        self._publish(batch_id, response, df_top, algorithm.upper(), full_ranking=False)
+        return response
+    
+    def run_sharded_analysis(self, algorithm: str = 'topsis',
+                             config_id: int = None,
+                             user_id: int = None,
+                             top_n: int = 10,
+                             normalization: str = None,
+                             filters: dict = None,
+                             shards: list = None) -> dict:
+        """
+        Rank the sites of every configured shard (city) as one ranking
+        
+        Shards are loaded in parallel, their column statistics merged into
+        global normalization terms and each shard scored against them in the
+        shard thread pool, so scores and ranks equal one analysis over all
+        sites. Every shard stores its own results under one shared batch_id;
+        the global top_n is a heap merge of the per-shard top lists. Each
+        shard claims the batch, saves under its PENDING header and publishes
+        its part with its own header flip, so the batch becomes visible shard
+        by shard; a failure discards the pending parts on every shard.
+        
+        Args:
+            algorithm: Algorithm name (must be shardable, e.g. topsis)
+            config_id: Expert criteria configuration ID (None = use active config)
+            user_id: User performing the analysis (optional)
+            top_n: Number of top results to return
+            normalization: Normalization strategy (None = Config.DEFAULT_NORMALIZATION)
+            filters: Site filter spec applied on every shard (optional)
+            shards: Names of the shards to include (None = all configured)
+        
+        Returns:
+            Dictionary with the global top sites and per-shard summaries
+        """
+        import pandas as pd
+        from algorithms.sharded import merge_top_k, score_shards
+        from utils.shards import configured_shards
+        
+        available = configured_shards()
+        if not available:
+            raise ValueError("No shards configured (set SHARD_DSNS)")
+        if shards is not None:
+            unknown = set(shards) - {shard.name for shard in available}
+            if unknown:
+                raise ValueError(f"Unknown shards: {sorted(unknown)}")
+            available = [shard for shard in available if shard.name in shards]
+        
+        algo = AlgorithmFactory.create(algorithm, normalization=normalization)
+        if not algo.shardable:
+            raise ValueError(f"{algo.name} does not support sharded analysis")
+        
+        start_time = datetime.now()
+        start_ms = int(time.time() * 1000)
+        logger.info(f"Starting sharded {algorithm.upper()} analysis over {[s.name for s in available]}...")
+        
+        config = self.data_service.load_config(config_id)
+        weights = self._build_weights(config)
+        shard_services = [DataService(shard) for shard in available]
+        pool = get_shard_pool()
+        
+        # Step 1: Load every shard in parallel
+        columns = algo.required_columns(COST_CRITERIA + BENEFIT_CRITERIA)
+        frames = list(pool.map(
+            lambda service: service.load_sites(filters=filters, columns=columns),
+            shard_services
+        ))
+        total_sites = sum(len(df) for df in frames)
+        logger.info(f"Loaded {total_sites} potential sites from {len(frames)} shards")
+        
+        if total_sites == 0:
+            return {
+                'success': False,
+                'error': 'No sites found to analyze',
+                'sites_analyzed': 0
+            }
+        
+        # Step 2: Merge statistics and score the shards
+        results, _ = score_shards(frames, algo, weights, COST_CRITERIA, BENEFIT_CRITERIA, pool)
+        execution_time_ms = int(time.time() * 1000) - start_ms
+        
+        saved = [(service, df) for service, df in zip(shard_services, results) if len(df)]
+        
+        def run(batch_id):
+            # Step 3: Every shard claims the batch and saves its own sites
+            # under it; _staged discards the pending parts on every shard
+            def save(item):
+                service, df = item
+                service.claim_batch(batch_id, algorithm.upper())
+                service.save_results(
+                    df, config['id'], user_id=user_id,
+                    algorithm=algorithm.upper(),
+                    execution_time_ms=execution_time_ms,
+                    batch_id=batch_id
+                )
+            
+            list(pool.map(save, saved))
+            logger.info(f"Sharded results saved with batch_id: {batch_id}")
+            
+            # Step 4: Global top_n from the per-shard top lists
+            top = merge_top_k(
+                [df['topsis_score'].to_numpy() for df in results],
+                [df['id'].to_numpy() for df in results],
+                top_n
+            )
+            top_sites = []
+            for index, row in top:
+                site = self._format_top_sites(results[index].iloc[[row]])[0]
+                site['shard'] = available[index].name
+                top_sites.append(site)
+            
+            end_time = datetime.now()
+            all_scores = pd.concat([df['topsis_score'] for df in results], ignore_index=True)
+            
+            response = {
+                'success': True,
+                'algorithm': algorithm.upper(),
+                'normalization': algo.normalization.name,
+                'strategy_name': config['strategy_name'],
+                'batch_id': batch_id,
+                'sites_analyzed': total_sites,
+                'shards': [
+                    {'shard': shard.name, 'sites_analyzed': len(df)}
+                    for shard, df in zip(available, results)
+                ],
+                'execution_time_seconds': round((end_time - start_time).total_seconds(), 2),
+                'execution_time_ms': execution_time_ms,
+                'timestamp': end_time.isoformat(),
+                'config_id': config['id'],
+                'user_id': user_id,
+                'filters': filters,
+                'score_statistics': self._score_statistics(all_scores),
+                'top_sites': top_sites
+            }
+            list(pool.map(lambda item: item[0].publish_batch(batch_id, response), saved))
+            return response
+        
+        return self._staged(new_batch_id(algorithm.upper()), run, [service for service, _ in saved])
+    
+    def run_consensus(self, algorithms: list, method: str = 'borda',
+                      config_id: int = None,
+                      user_id: int = None,
+                      top_n: int = 10,
+                      normalization: str = None) -> dict:
+        """
+        Run several algorithms on the same decision matrix and merge their rankings
+        
+        The matrix is loaded once and copied into shared memory; each algorithm
+        scores it in its own process-pool worker, so wall time tracks the
+        slowest algorithm instead of the sum. Rankings are then merged with
+        the requested consensus method and saved as one batch, staged under
+        a PENDING header like run_analysis and discarded on failure.
+        
+        Args:
+            algorithms: Algorithm names registered in AlgorithmFactory
+            method: Consensus method (borda, copeland, kemeny)
+            config_id: Expert criteria configuration ID (None = use active config)
+            user_id: User performing the analysis (optional)
+            top_n: Number of top results to return
+            normalization: Normalization strategy shared by all algorithms
+        
+        Returns:
+            Dictionary with consensus ranking and per-algorithm agreement
+        """
+        from algorithms.consensus import CONSENSUS_METHODS
+        
+        algorithms = [a.lower() for a in algorithms]
+        method = method.lower()
+        
+        if len(algorithms) < 2:
+            raise ValueError("Consensus requires at least two algorithms")
+        if method not in CONSENSUS_METHODS:
+            raise ValueError(f"Unknown consensus method: {method}. Supported: {CONSENSUS_METHODS}")
+        for name in algorithms:
+            if name not in AlgorithmFactory.get_supported_algorithms():
+                raise ValueError(f"Unknown algorithm: {name}")
+            if not AlgorithmFactory.create(name).supports_matrix_scoring:
+                raise ValueError(f"{name.upper()} does not support consensus scoring")
+        
+        algorithm_label = f"CONSENSUS_{method.upper()}"
+        batch_id = new_batch_id(algorithm_label)
+        self.data_service.claim_batch(batch_id, algorithm_label)
+        return self._staged(batch_id, lambda batch_id: self._run_consensus(
+            algorithms, method, algorithm_label, config_id=config_id,
+            user_id=user_id, top_n=top_n, normalization=normalization,
+            batch_id=batch_id
+        ))
+    
+    def _run_consensus(self, algorithms: list, method: str, algorithm_label: str,
+                       config_id: int = None,
+                       user_id: int = None,
+                       top_n: int = 10,
+                       normalization: str = None,
+                       batch_id: str = None) -> dict:
+        """
+        run_consensus for validated arguments, under a claimed batch
+        
+        Arguments and result as for run_consensus; algorithm_label is the
+        algorithm_used of the batch and batch_id the claimed batch to save
+        under.
+        """
+        import numpy as np
+        from algorithms.consensus import aggregate, kendall_tau, rank_from_scores, score_shared_matrix
+        from utils.shared_array import SharedArray
+        
+        start_time = datetime.now()
+        start_ms = int(time.time() * 1000)
+        
+        logger.info(f"Starting {method} consensus of {algorithms}...")
+        
+        config = self.data_service.load_config(config_id)
+        df = self.data_service.load_sites()
+        
+        if len(df) == 0:
+            return {
+                'success': False,
+                'error': 'No sites found to analyze',
+                'sites_analyzed': 0
+            }
+        if method == 'copeland' and len(df) > Config.CONSENSUS_COPELAND_MAX_SITES:
+            raise ValueError(
+                f"copeland consensus compares every pair of sites and is limited to "
+                f"{Config.CONSENSUS_COPELAND_MAX_SITES} sites ({len(df)} loaded); use borda or kemeny"
+            )
+        
+        weights = self._build_weights(config)
+        all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+        weights_array = np.array([weights[c] for c in all_criteria], dtype=np.float64)
+        
+        # Validate once in-process so bad input fails before fan-out
+        for name in algorithms:
+            algo = AlgorithmFactory.create(name, normalization=normalization)
+            algo.validate_inputs(df, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+        
+        decision_matrix = df[all_criteria].to_numpy(dtype=np.float64)
+        # Column statistics are reduced once and shipped to every worker
+        stats = algo.column_statistics(df, all_criteria, decision_matrix)
+        
+        # Steps 1-2: Share the matrix and score it with every algorithm in parallel
+        pool = get_kernel_pool()
+        with pool.admit(), SharedArray.from_array(decision_matrix) as matrix:
+            futures = [
+                pool.submit(score_shared_matrix, name, matrix.spec,
+                            weights_array, len(COST_CRITERIA),
+                            algo.normalization.name, stats,
+                            AlgorithmFactory.create(name).matrix_options(df, all_criteria))
+                for name in algorithms
+            ]
+            results = [future.result() for future in futures]
+        
+        scores = np.vstack([result[1] for result in results])
+        ranks = rank_from_scores(scores)
+        
+        # Step 3: Aggregate rankings
+        consensus_scores = aggregate(ranks, method)
+        consensus_ranks = rank_from_scores(consensus_scores)[0]
+        
+        # Scale to [0, 1] so it fits evaluation_result.topsis_score
+        span = consensus_scores.max() - consensus_scores.min()
+        normalized = (consensus_scores - consensus_scores.min()) / span if span > 0 else np.ones_like(consensus_scores)
+        
+        df_results = df.copy(deep=False)
+        df_results['topsis_score'] = normalized
+        df_results['rank_position'] = consensus_ranks
+        
+        execution_time_ms = int(time.time() * 1000) - start_ms
+        
+        # Step 4: Save consensus ranking as one batch
+        batch_id = self.data_service.save_results(
+            df_results,
+            config['id'],
+            user_id=user_id,
+            algorithm=algorithm_label,
+            execution_time_ms=execution_time_ms,
+            batch_id=batch_id
+        )
+        
+        end_time = datetime.now()
+        top_sites = df_results.nsmallest(top_n, 'rank_position')
+        
+        response = {
+            'success': True,
+            'algorithm': algorithm_label,
+            'consensus_method': method,
+            'normalization': algo.normalization.name,
+            'algorithms': [
+                {
+                    'algorithm': name.upper(),
+                    'execution_time_ms': elapsed,
+                    'kendall_tau': round(kendall_tau(ranks[i], consensus_ranks), 4)
+                }
+                for i, (name, _, elapsed) in enumerate(results)
+            ],
+            'strategy_name': config['strategy_name'],
+            'batch_id': batch_id,
+            'sites_analyzed': len(df_results),
+            'execution_time_seconds': round((end_time - start_time).total_seconds(), 2),
+            'execution_time_ms': execution_time_ms,
+            'timestamp': end_time.isoformat(),
+            'config_id': config['id'],
+            'user_id': user_id,
+            'score_statistics': self._score_statistics(df_results['topsis_score']),
+            'top_sites': self._format_top_sites(top_sites)
+        }
+        self._publish(batch_id, response, df_results, algorithm_label)
+        return response
+    
+    def run_bootstrap(self, algorithm: str = 'topsis',
+                      config_id: int = None,
+                      replicates: int = None,
+                      confidence: float = None,
+                      seed: int = None,
+                      top_n: int = 10,
+                      normalization: str = None) -> dict:
+        """
+        Confidence intervals of site scores and ranks under survey noise
+        
+        The decision matrix is perturbed with the error models of
+        Config.BOOTSTRAP_ERROR_MODELS and rescored `replicates` times on the
+        process pool (see algorithms/bootstrap.py). Nothing is saved.
+        
+        Args:
+            algorithm: Algorithm with matrix scoring (topsis, fuzzy_topsis)
+            config_id: Expert criteria configuration ID (None = use active config)
+            replicates: Number of perturbed matrices (None = Config.BOOTSTRAP_REPLICATES)
+            confidence: Two-sided interval coverage (None = Config.BOOTSTRAP_CONFIDENCE)
+            seed: Base random seed (None = random; the one used is returned)
+            top_n: Number of sites returned, best baseline rank first
+            normalization: Normalization strategy
+        
+        Returns:
+            Dictionary with per-site score and rank intervals
+        """
+        import numpy as np
+        from algorithms.bootstrap import bootstrap_intervals, noise_arrays, parse_error_models
+        from algorithms.consensus import rank_from_scores
+        
+        replicates = Config.BOOTSTRAP_REPLICATES if replicates is None else replicates
+        confidence = Config.BOOTSTRAP_CONFIDENCE if confidence is None else confidence
+        if not isinstance(replicates, int) or not 1 <= replicates <= Config.BOOTSTRAP_MAX_REPLICATES:
+            raise ValueError(f"replicates must be an integer between 1 and {Config.BOOTSTRAP_MAX_REPLICATES}")
+        if not isinstance(confidence, (int, float)) or not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if seed is not None and (not isinstance(seed, int) or seed < 0):
+            raise ValueError("seed must be a non-negative integer")
+        if not isinstance(top_n, int) or top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+        
+        algo = AlgorithmFactory.create(algorithm, normalization=normalization)
+        if not algo.supports_matrix_scoring:
+            raise ValueError(f"{algo.name} does not support bootstrap intervals")
+        
+        start_time = datetime.now()
+        all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+        models = parse_error_models(Config.BOOTSTRAP_ERROR_MODELS, all_criteria)
+        
+        config = self.data_service.load_config(config_id)
+        df = self.data_service.load_sites(columns=algo.required_columns(all_criteria))
+        
+        if len(df) == 0:
+            return {
+                'success': False,
+                'error': 'No sites found to analyze',
+                'sites_analyzed': 0
+            }
+        if replicates * len(df) > Config.BOOTSTRAP_MAX_VALUES:
+            raise ValueError(f"replicates x sites exceeds {Config.BOOTSTRAP_MAX_VALUES}; "
+                             f"use at most {Config.BOOTSTRAP_MAX_VALUES // len(df)} replicates")
+        
+        weights = self._build_weights(config)
+        algo.validate_inputs(df, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+        weights_array = np.array([weights[c] for c in all_criteria], dtype=np.float64)
+        decision_matrix = df[all_criteria].to_numpy(dtype=np.float64)
+        
+        # Baseline: the unperturbed matrix, scored the way replicates are
+        options = algo.matrix_options(df, all_criteria)
+        baseline = algo.score_matrix(decision_matrix, weights_array, len(COST_CRITERIA), **options)
+        baseline_ranks = rank_from_scores(baseline)[0]
+        
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        
+        logger.info(f"Starting {algorithm.upper()} bootstrap: {replicates} replicates "
+                    f"of {len(df)} sites, seed {seed}")
+        
+        pool = get_kernel_pool()
+        with pool.admit():
+            intervals = bootstrap_intervals(
+                decision_matrix, algorithm, weights_array, len(COST_CRITERIA),
+                noise_arrays(models, all_criteria), replicates, seed,
+                pool, tasks=2 * Config.PROCESS_POOL_WORKERS,
+                normalization=algo.normalization.name, confidence=confidence,
+                top_n=top_n, batch_values=Config.BOOTSTRAP_BATCH_VALUES,
+                options=options
+            )
+        
+        end_time = datetime.now()
+        top = np.argsort(baseline_ranks, kind='stable')[:top_n]
+        
+        from utils.columns import rows_from_columns
+        sites = rows_from_columns({
+            'rank': baseline_ranks[top],
+            'rank_low': intervals['rank_low'][top],
+            'rank_median': intervals['rank_median'][top],
+            'rank_high': intervals['rank_high'][top],
+            'site_id': df['id'].to_numpy(dtype=np.int64)[top],
+            'site_code': df['site_code'].to_numpy(dtype=object)[top],
+            'score': np.round(baseline[top], 4),
+            'score_low': np.round(intervals['score_low'][top], 4),
+            'score_high': np.round(intervals['score_high'][top], 4),
+            'score_std': np.round(intervals['score_std'][top], 4),
+            'top_n_share': np.round(intervals['top_n_share'][top], 4)
+        })
+        
+        return {
+            'success': True,
+            'algorithm': algo.name,
+            'normalization': algo.normalization.name,
+            'strategy_name': config['strategy_name'],
+            'config_id': config['id'],
+            'replicates': replicates,
+            'confidence': confidence,
+            'seed': seed,
+            'error_models': {c: {'kind': m.kind, 'scale': m.scale} for c, m in models.items()},
+            'sites_analyzed': len(df),
+            'scoring_time_ms': intervals['scoring_ms'],
+            'summary_time_ms': intervals['summary_ms'],
+            'execution_time_seconds': round((end_time - start_time).total_seconds(), 2),
+            'timestamp': end_time.isoformat(),
+            'interval_statistics': {
+                'mean_score_width': float(np.mean(intervals['score_high'] - intervals['score_low'])),
+                'mean_rank_width': float(np.mean(intervals['rank_high'] - intervals['rank_low'])),
+                'top_n_stable_sites': int(np.count_nonzero(intervals['rank_high'] <= top_n))
+            },
+            'sites': sites
+        }
+    
+    def _score_statistics(self, scores) -> dict:
+        """Summary statistics of a score column"""
+        return {
+            'min': float(scores.min()),
+            'max': float(scores.max()),
+            'mean': float(scores.mean()),
+            'std': float(scores.std())
+        }
+    
+    def _top_site_columns(self, top_sites) -> dict:
+        """The top rows of a result DataFrame as {field: array}"""
+        import numpy as np
+        return {
+            'rank': top_sites['rank_position'].to_numpy(dtype=np.int64),
+            'site_id': top_sites['id'].to_numpy(dtype=np.int64),
+            'site_code': top_sites['site_code'].to_numpy(dtype=object),
+            'address': top_sites['address'].to_numpy(dtype=object),
+            'score': np.round(top_sites['topsis_score'].to_numpy(dtype=np.float64), 4),
+            'rent_cost': top_sites['rent_cost'].to_numpy(dtype=np.float64),
+            'floor_area': top_sites['floor_area'].to_numpy(dtype=np.float64),
+            'traffic_score': top_sites['traffic_score'].to_numpy(dtype=np.int64),
+            'competitor_count': top_sites['competitor_count'].to_numpy(dtype=np.int64),
+            'population_density': top_sites['population_density'].to_numpy(dtype=np.float64)
+        }
+    
+    def _format_top_sites(self, top_sites) -> list:
+        """Serialize the top rows of a result DataFrame"""
+        from utils.columns import rows_from_columns
+        return rows_from_columns(self._top_site_columns(top_sites))
+    
+    def get_batch_results(self, batch_id: str = None, limit: int = 10,
+                          columnar: bool = False) -> dict:
         """
         Get results from a specific batch or latest batch
         
         Args:
             batch_id: Batch ID (None = get latest batch)
             limit: Number of results to return
+            columnar: Return results as {field: array} instead of row dicts
             
         Returns:
             Dictionary with batch results
@@ -159,8 +1301,7 @@ class AnalysisService:
                 df = self.data_service.get_latest_batch_results(limit)
             else:
                 # Get specific batch results
-                df = self.data_service.get_latest_batch_results(limit)
-                # TODO: Implement get_batch_results_by_id if needed
+                df = self.data_service.get_batch_results_by_id(batch_id, limit)
             
             if df.empty:
                 return {
@@ -168,27 +1309,31 @@ class AnalysisService:
                     'error': 'No results found'
                 }
             
-            results = []
-            for _, row in df.iterrows():
-                results.append({
-                    'rank': int(row['rank_position']),
-                    'site_code': row['site_code'],
-                    'address': row['address'],
-                    'district_name': row['district_name'],
-                    'score': float(row['topsis_score']),
-                    'rent_cost': float(row['rent_cost']),
-                    'floor_area': float(row['floor_area']),
-                    'traffic_score': int(row['traffic_score']),
-                    'competitor_count': int(row['competitor_count']),
-                    'strategy_name': row['strategy_name'],
-                    'analysis_date': row['analysis_date'].isoformat() if hasattr(row['analysis_date'], 'isoformat') else str(row['analysis_date']),
-                    'algorithm_used': row.get('algorithm_used', 'TOPSIS')
-                })
+            import numpy as np
+            from utils.columns import rows_from_columns
+            
+            results = {
+                'rank': df['rank_position'].to_numpy(dtype=np.int64),
+                'site_code': df['site_code'].to_numpy(dtype=object),
+                'address': df['address'].to_numpy(dtype=object),
+                'district_name': df['district_name'].to_numpy(dtype=object),
+                'score': df['topsis_score'].to_numpy(dtype=np.float64),
+                'rent_cost': df['rent_cost'].to_numpy(dtype=np.float64),
+                'floor_area': df['floor_area'].to_numpy(dtype=np.float64),
+                'traffic_score': df['traffic_score'].to_numpy(dtype=np.int64),
+                'competitor_count': df['competitor_count'].to_numpy(dtype=np.int64),
+                'strategy_name': df['strategy_name'].to_numpy(dtype=object),
+                'analysis_date': np.array([
+                    value.isoformat() if hasattr(value, 'isoformat') else str(value)
+                    for value in df['analysis_date']
+                ], dtype=object),
+                'algorithm_used': df['algorithm_used'].fillna('TOPSIS').to_numpy(dtype=object)
+            }
             
             return {
                 'success': True,
-                'total_results': len(results),
-                'results': results
+                'total_results': len(df),
+                'results': results if columnar else rows_from_columns(results)
             }
             
         except Exception as e:
@@ -198,49 +1343,177 @@ class AnalysisService:
                 'error': str(e)
             }
     
-    def get_site_evaluation_history(self, site_id: int) -> dict:
+    def get_results_version(self, include_sites: bool = True) -> str:
         """
-        Get evaluation history for a specific site
+        Version token of the saved results, for HTTP validators (ETags)
+        
+        Changes when a new batch is saved and, with include_sites, when the
+        site data joined into the results changes (see get_site_version).
+        
+        Args:
+            include_sites: Also reflect the potential_site data version
+            
+        Returns:
+            Version string
+        """
+        # Primary-key lookup on every call: a new batch shows up at once
+        batch_id = self.data_service.get_latest_batch_id()
+        if not include_sites:
+            return str(batch_id)
+        return f"{batch_id}:{self.get_site_version()}"
+    
+    def get_site_version(self) -> str:
+        """
+        Site data version for HTTP validators of responses joining site columns
+        
+        Re-read at most every Config.HTTP_CACHE_VERSION_TTL_SECONDS.
+        
+        Returns:
+            Version string
+        """
+        global _results_site_version
+        
+        version, checked_at = _results_site_version
+        if version is None or time.monotonic() - checked_at >= Config.HTTP_CACHE_VERSION_TTL_SECONDS:
+            version = self.data_service.get_data_version()
+            _results_site_version = (version, time.monotonic())
+        return str(version)
+    
+    def get_site_evaluation_history(self, site_id: int, limit: int = None,
+                                    cursor: str = None, resolution: str = None) -> dict:
+        """
+        One page of a site's evaluation history, newest first
+        
+        Pages are keyset-paginated on (created_at, id), so every page costs
+        the same however long the history is. With a resolution, the page
+        holds one aggregated point per day or month instead, computed in
+        SQL over a window of `limit` periods.
         
         Args:
             site_id: Site ID
+            limit: Evaluations (or periods) per page, default
+                Config.HISTORY_PAGE_SIZE
+            cursor: next_cursor of the previous page
+            resolution: 'day' or 'month' to downsample (None = every evaluation)
             
         Returns:
-            Dictionary with evaluation history
+            Dictionary with the page under 'history' and 'next_cursor'
+            (None on the last page)
+            
+        Raises:
+            ValueError: Invalid cursor
         """
         try:
-            df = self.data_service.get_evaluation_history_by_site(site_id)
+            from utils.cursor import decode_cursor, encode_cursor
+            limit = limit or Config.HISTORY_PAGE_SIZE
             
-            if df.empty:
+            if resolution is not None:
+                return self._get_site_history_periods(site_id, limit, cursor, resolution)
+            
+            before = None
+            if cursor:
+                created_at, evaluation_id = decode_cursor(cursor, 'history', 2)
+                before = (_sql_time(str(created_at)), int(evaluation_id))
+            # One extra row tells whether another page follows
+            df = self.data_service.get_evaluation_history_by_site(site_id, limit + 1, before)
+            
+            if df.empty and cursor is None:
                 return {
                     'success': False,
                     'error': 'No evaluation history found for this site'
                 }
             
+            next_cursor = None
+            if len(df) > limit:
+                df = df.iloc[:limit]
+                last = df.iloc[-1]
+                next_cursor = encode_cursor('history', _sql_time(last['created_at']), int(last['id']))
+            
             history = []
-            for _, row in df.iterrows():
+            for row in df.itertuples(index=False):
                 history.append({
-                    'evaluation_id': int(row['id']),
-                    'score': float(row['topsis_score']),
-                    'rank': int(row['rank_position']),
-                    'algorithm': row['algorithm_used'],
-                    'strategy_name': row.get('strategy_name', 'N/A'),
-                    'evaluated_by': row.get('evaluated_by', 'System'),
-                    'evaluation_date': row['created_at'].isoformat() if hasattr(row['created_at'], 'isoformat') else str(row['created_at']),
-                    'batch_id': row['batch_id']
+                    'evaluation_id': int(row.id),
+                    'score': float(row.topsis_score),
+                    'rank': int(row.rank_position),
+                    'algorithm': row.algorithm_used,
+                    'strategy_name': row.strategy_name,
+                    'evaluated_by': row.evaluated_by,
+                    'evaluation_date': row.created_at.isoformat() if hasattr(row.created_at, 'isoformat') else str(row.created_at),
+                    'batch_id': row.batch_id
                 })
             
             return {
                 'success': True,
                 'site_id': site_id,
                 'total_evaluations': len(history),
-                'history': history
+                'history': history,
+                'next_cursor': next_cursor
             }
             
+        except ValueError:
+            raise
+            
         except Exception as e:
             logger.error(f"Error getting site evaluation history: {str(e)}", exc_info=True)
             return {
                 'success': False,
                 'error': str(e)
             }
+    
+    def _get_site_history_periods(self, site_id: int, limit: int, cursor: str,
+                                  resolution: str) -> dict:
+        """
+        Downsampled page of get_site_evaluation_history
+        
+        The window ends after the period of the newest evaluation older
+        than the cursor (skipping periods without evaluations) and spans
+        `limit` periods; only its rows are aggregated.
+        """
+        from utils.cursor import decode_cursor, encode_cursor
+        
+        before = _sql_time(str(decode_cursor(cursor, resolution, 1)[0])) if cursor else None
+        newest = self.data_service.get_latest_evaluation_time(site_id, before)
+        if newest is None:
+            if cursor is None:
+                return {
+                    'success': False,
+                    'error': 'No evaluation history found for this site'
+                }
+            return {
+                'success': True,
+                'site_id': site_id,
+                'resolution': resolution,
+                'total_evaluations': 0,
+                'history': [],
+                'next_cursor': None
+            }
+        
+        end = _shift_periods(_period_start(newest, resolution), resolution, 1)
+        start = _shift_periods(end, resolution, -limit)
+        df = self.data_service.get_evaluation_history_buckets(
+            site_id, HISTORY_PERIOD_CHARS[resolution], _sql_time(start), _sql_time(end)
+        )
+        
+        has_more = self.data_service.get_latest_evaluation_time(site_id, _sql_time(start)) is not None
+        history = [
+            {
+                'period': row.period,
+                'evaluations': int(row.evaluations),
+                'avg_score': float(row.avg_score),
+                'avg_rank': round(float(row.avg_rank), 2),
+                'best_rank': int(row.best_rank),
+                'worst_rank': int(row.worst_rank),
+                'last_evaluation_date': _sql_time(row.last_evaluation_date).replace(' ', 'T')
+            }
+            for row in df.itertuples(index=False)
+        ]
+        
+        return {
+            'success': True,
+            'site_id': site_id,
+            'resolution': resolution,
+            'total_evaluations': sum(point['evaluations'] for point in history),
+            'history': history,
+            'next_cursor': encode_cursor(resolution, _sql_time(start)) if has_more else None
+        }
         
\ No newline at end of file
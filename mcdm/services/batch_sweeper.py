@@ -0,0 +1,83 @@
+"""
+Sweeper of abandoned analysis batches
+
+Analyses save their rows under a PENDING analysis_batch header and publish
+it once done (see DataService.save_results / publish_batch). A failed run
+discards its batch itself; a worker killed mid-run (timeout, OOM, deploy)
+leaves it pending: invisible, but holding rows and its idempotency key.
+Every worker periodically deletes batches pending for longer than
+Config.PENDING_BATCH_TIMEOUT_SECONDS, on the main database and every shard.
+Concurrent sweepers are safe: a batch is only deleted once, and never after
+it was published.
+"""
+from config import Config
+from services.data_service import DataService
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_sweeper = None
+
+# Batches looked up per query while sweeping
+SWEEP_PAGE = 100
+
+
+def start_sweeper():
+    """
+    Start the background sweeper thread of this process (idempotent)
+
+    Called from gunicorn's post_fork hook (and by app.py in development),
+    not in a preloading master: threads do not survive fork.
+    """
+    global _sweeper
+
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+    _sweeper = threading.Thread(target=_sweep_loop, name='batch-sweeper', daemon=True)
+    _sweeper.start()
+    logger.info(f"Started abandoned batch sweeper (every {Config.BATCH_SWEEP_INTERVAL_SECONDS}s)")
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(Config.BATCH_SWEEP_INTERVAL_SECONDS)
+        try:
+            sweep_abandoned_batches()
+        except Exception as e:
+            logger.error(f"Abandoned batch sweep failed: {e}", exc_info=True)
+
+
+def sweep_abandoned_batches(older_than_seconds: float = None) -> dict:
+    """
+    Delete the batches left pending on the main database and every shard
+
+    Args:
+        older_than_seconds: Pending age after which a batch is abandoned
+            (None = Config.PENDING_BATCH_TIMEOUT_SECONDS)
+
+    Returns:
+        Dictionary with the number of batches and rows deleted
+    """
+    from utils.metrics import metrics
+    from utils.shards import configured_shards
+
+    if older_than_seconds is None:
+        older_than_seconds = Config.PENDING_BATCH_TIMEOUT_SECONDS
+
+    swept = {'batches': 0, 'rows': 0}
+    for service in [DataService()] + [DataService(shard) for shard in configured_shards()]:
+        while True:
+            batch_ids = service.find_abandoned_batches(older_than_seconds, SWEEP_PAGE)
+            for batch_id in batch_ids:
+                rows = service.discard_batch(batch_id)
+                logger.warning(f"Discarded abandoned batch {batch_id} ({rows} rows)")
+                swept['batches'] += 1
+                swept['rows'] += rows
+            if len(batch_ids) < SWEEP_PAGE:
+                break
+
+    if swept['batches']:
+        metrics.increment('batches_swept', swept['batches'])
+    return swept
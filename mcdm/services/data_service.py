@@ -1,13 +1,198 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
+from config import Config
 from utils.db_connector import get_db_connection
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# potential_site columns that may be selected, and their value types
+SITE_COLUMNS = {
+    'district_id': int,
+    'x_coordinate': float,
+    'y_coordinate': float,
+    'rent_cost': float,
+    'renovation_cost': float,
+    'competitor_count': int,
+    'distance_to_warehouse': float,
+    'nearest_warehouse_id': int,
+    'floor_area': float,
+    'front_width': float,
+    'traffic_score': int,
+    'population_density': float,
+    'market_capture': float,
+    'renovation_cost_lower': float,
+    'renovation_cost_upper': float,
+    'traffic_score_lower': float,
+    'traffic_score_upper': float,
+    'population_density_lower': float,
+    'population_density_upper': float,
+    'has_parking': bool,
+    'is_corner_lot': bool,
+    'near_school': bool,
+    'near_market': bool,
+}
+
+# Columns always loaded with the site data
+SITE_KEY_COLUMNS = ['id', 'site_code', 'address']
+
+# Columns loaded when no projection is requested
+DEFAULT_SITE_COLUMNS = [
+    'rent_cost', 'renovation_cost', 'competitor_count', 'distance_to_warehouse',
+    'floor_area', 'front_width', 'traffic_score', 'population_density',
+    'market_capture',
+    'renovation_cost_lower', 'renovation_cost_upper',
+    'traffic_score_lower', 'traffic_score_upper',
+    'population_density_lower', 'population_density_upper'
+]
+
+# analysis_batch.status: results of a PENDING batch are being written and
+# stay invisible to readers until publish_batch flips the header; a
+# DISCARDED batch is being deleted (see discard_batch)
+BATCH_PENDING = 'PENDING'
+BATCH_PUBLISHED = 'PUBLISHED'
+BATCH_DISCARDED = 'DISCARDED'
+
+# Excludes the rows of unpublished batches from a query on evaluation_result
+# er (rows without a header predate batch headers and stay visible)
+VISIBLE_RESULTS = (
+    "NOT EXISTS (SELECT 1 FROM analysis_batch ab "
+    "WHERE ab.batch_id = er.batch_id AND ab.status <> 'PUBLISHED')"
+)
+# Same for a query on one batch; takes the batch_id as parameter
+VISIBLE_BATCH = (
+    "NOT EXISTS (SELECT 1 FROM analysis_batch ab "
+    "WHERE ab.batch_id = %s AND ab.status <> 'PUBLISHED')"
+)
+
+FILTER_OPERATORS = {
+    'eq': '=', 'ne': '<>', 'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>='
+}
+
+
+def compile_site_filters(filters: dict) -> tuple:
+    """
+    Compile a filter spec to a parameterized WHERE fragment on potential_site
+    
+    Spec: {column: value} for equality, {column: [values]} for IN, or
+    {column: {"lt": 40, "gte": 10, "in": [...], "between": [lo, hi]}}.
+    Column names and operators are whitelisted; values are always passed
+    as query parameters.
+    
+    Args:
+        filters: Filter spec (None or empty = no filter)
+    
+    Returns:
+        Tuple (list of SQL conditions, list of parameters)
+    """
+    conditions = []
+    params = []
+    
+    for column, condition in (filters or {}).items():
+        if column not in SITE_COLUMNS:
+            raise ValueError(f"Cannot filter on column: {column}")
+        cast = SITE_COLUMNS[column]
+        
+        def value(v):
+            if v is None or isinstance(v, (list, dict)):
+                raise ValueError(f"Invalid value for {column}: {v!r}")
+            if cast is bool and not isinstance(v, bool):
+                raise ValueError(f"{column} expects true or false")
+            try:
+                return cast(v)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for {column}: {v!r}")
+        
+        if not isinstance(condition, dict):
+            condition = {'in': condition} if isinstance(condition, list) else {'eq': condition}
+        if not condition:
+            raise ValueError(f"Empty condition for {column}")
+        
+        for operator, operand in condition.items():
+            if operator in FILTER_OPERATORS:
+                conditions.append(f"ps.{column} {FILTER_OPERATORS[operator]} %s")
+                params.append(value(operand))
+            elif operator == 'in':
+                if not isinstance(operand, list) or not operand:
+                    raise ValueError(f"'in' for {column} needs a non-empty list")
+                conditions.append(f"ps.{column} IN ({', '.join(['%s'] * len(operand))})")
+                params.extend(value(v) for v in operand)
+            elif operator == 'between':
+                if not isinstance(operand, list) or len(operand) != 2:
+                    raise ValueError(f"'between' for {column} needs [low, high]")
+                conditions.append(f"ps.{column} BETWEEN %s AND %s")
+                params.extend(value(v) for v in operand)
+            else:
+                raise ValueError(f"Unknown filter operator: {operator}")
+    
+    return conditions, params
+
+
+def _json_default(value):
+    # NumPy arrays and scalars (columnar results), anything else as text
+    return value.tolist() if hasattr(value, 'tolist') else str(value)
+
+
+def new_batch_id(algorithm: str) -> str:
+    """Unique batch_id for an analysis run"""
+    return f"{algorithm}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+
+
+_site_matrix_store = None
+_site_matrix_store_lock = threading.Lock()
+
+# Monotonic time of the last failure to publish or attach the site matrix
+_site_matrix_failed_at = None
+
+
+def get_site_matrix_store():
+    """
+    Site matrix store of the main database (see utils/site_matrix.py)
+    
+    The directory is keyed by the database, so services pointed at different
+    databases never share generations.
+    """
+    global _site_matrix_store
+    
+    if _site_matrix_store is None:
+        with _site_matrix_store_lock:
+            if _site_matrix_store is None:
+                from utils.site_matrix import SiteMatrixStore
+                if Config.DB_BACKEND == 'sqlite':
+                    database = f"sqlite:{os.path.abspath(Config.DB_PATH)}"
+                else:
+                    database = f"mysql:{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+                key = hashlib.sha1(database.encode()).hexdigest()[:12]
+                _site_matrix_store = SiteMatrixStore(
+                    os.path.join(Config.SITE_MATRIX_DIR, key),
+                    keep=Config.SITE_MATRIX_KEEP_GENERATIONS
+                )
+    return _site_matrix_store
+
+
 class DataService:
-    """Service for data loading and saving operations"""
+    """
+    Service for data loading and saving operations
+    
+    Args:
+        shard: Site-data shard to read and write (None = the main database,
+            see utils/shards.py)
+    """
+    
+    def __init__(self, shard=None):
+        self.shard = shard
+    
+    def _connect(self):
+        if self.shard is None:
+            return get_db_connection()
+        from utils.shards import get_shard_connection
+        return get_shard_connection(self.shard)
     
     def load_config(self, config_id: int = None) -> dict:
         """
@@ -20,7 +205,7 @@ class DataService:
             Dictionary with configuration data
         """
         
-        conn = get_db_connection()
+        conn = self._connect()
         cursor = conn.cursor(dictionary=True)
         
         try:
@@ -49,37 +234,491 @@ class DataService:
             cursor.close()
             conn.close()
     
-    def load_sites(self) -> pd.DataFrame:
+    def get_data_version(self) -> str:
         """
-        Load potential sites from database
+        Version token of the potential_site data
+        
+        Changes whenever a site is added, deleted, updated (updated_at) or
+        changes status; used to key caches derived from the site matrix.
         
         Returns:
-            DataFrame with site data
+            Version string
         """
         
         query = """
             SELECT 
-                id, site_code, address,
-                rent_cost, renovation_cost, competitor_count, distance_to_warehouse,
-                floor_area, front_width, traffic_score, population_density
+                COUNT(*) as site_count,
+                SUM(CASE WHEN status = 'ACTIVE' THEN 1 ELSE 0 END) as active_count,
+                MAX(id) as max_id,
+                MAX(updated_at) as last_updated
             FROM potential_site
-            WHERE status = 'ACTIVE'
         """
         
-        conn = get_db_connection()
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query)
+            site_count, active_count, max_id, last_updated = cursor.fetchone()
+            version = f"{site_count}-{active_count}-{max_id}-{last_updated}"
+            # Versions of different shards must never collide in caches
+            return version if self.shard is None else f"{self.shard.name}:{version}"
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def get_config_version(self) -> str:
+        """
+        Version token of expert_criteria_config
+        
+        Changes whenever a configuration is added, deleted or updated.
+        
+        Returns:
+            Version string
+        """
+        
+        query = """
+            SELECT COUNT(*), MAX(id), MAX(updated_at)
+            FROM expert_criteria_config
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
         
         try:
-            df = pd.read_sql(query, conn)
+            cursor.execute(query)
+            config_count, max_id, last_updated = cursor.fetchone()
+            return f"{config_count}-{max_id}-{last_updated}"
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_all_configs(self) -> list:
+        """
+        Every expert criteria configuration
+        
+        Returns:
+            List of configuration rows (dicts), ordered by id
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            cursor.execute("SELECT * FROM expert_criteria_config ORDER BY id")
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_sites(self, group_by: str = None, filters: dict = None,
+                   columns: list = None) -> pd.DataFrame:
+        """
+        Load potential sites from database
+        
+        The DataFrame is tagged with attrs['data_version'] when the data did
+        not change while loading, so algorithms can reuse cached column
+        statistics for it. Filtered loads get a version that includes a
+        fingerprint of the filter, since their statistics differ.
+        
+        With Config.SITE_MATRIX_ENABLED, unfiltered loads of the main
+        database are built from the shared site matrix (load_site_matrix)
+        instead of a query.
+        
+        Args:
+            group_by: Optional grouping column; 'district_id' also joins the
+                district table for district_name
+            filters: Filter spec pushed down to SQL (see compile_site_filters)
+            columns: potential_site columns to load besides id, site_code and
+                address (None = DEFAULT_SITE_COLUMNS)
+        
+        Returns:
+            DataFrame with site data
+        """
+        
+        columns = list(DEFAULT_SITE_COLUMNS if columns is None else columns)
+        for column in columns:
+            if column not in SITE_COLUMNS:
+                raise ValueError(f"Unknown site column: {column}")
+        
+        if Config.SITE_MATRIX_ENABLED and self.shard is None and not filters \
+                and group_by in (None, 'district_id'):
+            matrix = self.try_load_site_matrix()
+            if matrix is not None:
+                return self._sites_from_matrix(matrix, group_by, columns)
+        
+        group_join = ""
+        if group_by == 'district_id':
+            if 'district_id' not in columns:
+                columns.append('district_id')
+            group_join = "LEFT JOIN district d ON ps.district_id = d.id"
+        elif group_by is not None:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        
+        select_list = [f"ps.{column}" for column in SITE_KEY_COLUMNS + columns]
+        if group_join:
+            select_list.append("d.name as district_name")
+        
+        conditions, params = compile_site_filters(filters)
+        where = " AND ".join(["ps.status = 'ACTIVE'"] + conditions)
+        
+        query = f"""
+            SELECT {', '.join(select_list)}
+            FROM potential_site ps
+            {group_join}
+            WHERE {where}
+        """
+        
+        version = self.get_data_version()
+        conn = self._connect()
+        
+        try:
+            df = pd.read_sql(query, conn, params=tuple(params) or None)
             logger.info(f"Loaded {len(df)} active sites from database")
-            return df
+        finally:
+            conn.close()
+        
+        if self.get_data_version() == version:
+            if conditions:
+                fingerprint = hashlib.sha1(repr((conditions, params)).encode()).hexdigest()[:12]
+                version = f"{version}-{fingerprint}"
+            df.attrs['data_version'] = version
+        
+        return df
+    
+    def load_site_matrix(self):
+        """
+        Active sites of the current data version as a shared SiteMatrix
+        
+        Attached read-only from the store; when the data changed, one
+        process reads potential_site and publishes a new generation while
+        the others wait for it (see utils/site_matrix.py).
+        
+        Returns:
+            SiteMatrix
+        """
+        return get_site_matrix_store().get(self.get_data_version(), self._read_site_matrix)
+    
+    def try_load_site_matrix(self):
+        """
+        load_site_matrix(), or None when the shared store cannot be used
+        
+        Publishing fails when SITE_MATRIX_DIR is full (Docker's default
+        /dev/shm is 64 MB) or not writable. Callers then query the database
+        instead; the store is not tried again for
+        Config.SITE_MATRIX_RETRY_SECONDS, so loads do not each read the
+        whole table for a write that keeps failing.
+        
+        Returns:
+            SiteMatrix, or None
+        """
+        global _site_matrix_failed_at
+        
+        if _site_matrix_failed_at is not None \
+                and time.monotonic() - _site_matrix_failed_at < Config.SITE_MATRIX_RETRY_SECONDS:
+            return None
+        try:
+            matrix = self.load_site_matrix()
+        except (OSError, ValueError) as e:
+            _site_matrix_failed_at = time.monotonic()
+            logger.warning(f"Shared site matrix unavailable, querying potential_site "
+                           f"for {Config.SITE_MATRIX_RETRY_SECONDS}s: {e}")
+            from utils.metrics import metrics
+            metrics.increment('site_matrix_failures')
+            return None
+        _site_matrix_failed_at = None
+        return matrix
+    
+    def _read_site_matrix(self) -> tuple:
+        """
+        Every active site with every SITE_COLUMNS column, for a new generation
+        
+        Returns:
+            Tuple (keys, columns, values, data_version); data_version is
+            empty when the data kept changing during the read, so the
+            generation is replaced on the next load
+        """
+        import numpy as np
+        
+        columns = list(SITE_COLUMNS)
+        query = f"""
+            SELECT {', '.join(f'ps.{c}' for c in SITE_KEY_COLUMNS + columns)},
+                   d.name as district_name
+            FROM potential_site ps
+            LEFT JOIN district d ON ps.district_id = d.id
+            WHERE ps.status = 'ACTIVE'
+            ORDER BY ps.id
+        """
+        
+        # Data changing during the read must not be published under the
+        # version read before it
+        for _ in range(3):
+            version = self.get_data_version()
+            conn = self._connect()
+            try:
+                df = pd.read_sql(query, conn)
+            finally:
+                conn.close()
+            if self.get_data_version() == version:
+                break
+        else:
+            version = ''
+        
+        keys = {'id': df['id'].to_numpy(dtype=np.int64)}
+        for key in ['site_code', 'address', 'district_name']:
+            # Fixed-width text maps without pickling; NULL is stored as ''
+            keys[key] = df[key].fillna('').astype(str).to_numpy(dtype=str)
+        
+        numeric = []
+        for column in columns:
+            values = pd.to_numeric(df[column], errors='coerce')
+            # Complete integer and flag columns are stored as integers, so
+            # loads can hand out the mapped array as it is
+            if SITE_COLUMNS[column] in (int, bool) and not values.isna().any():
+                keys[column] = values.to_numpy(dtype=np.int64)
+            else:
+                numeric.append(values.to_numpy(dtype=np.float64))
+        values = np.vstack(numeric) if numeric and len(df) else np.empty((len(numeric), len(df)))
+        
+        logger.info(f"Read {len(df)} active sites for the shared site matrix")
+        return keys, [c for c in columns if c not in keys], values, version
+    
+    def _sites_from_matrix(self, matrix, group_by: str, columns: list) -> pd.DataFrame:
+        """
+        load_sites result built from a SiteMatrix
+        
+        Same columns and types as the query, except that numeric columns
+        with no value at all hold NaN instead of None. id and the numeric
+        columns are read-only views of the mapped files, so they take no
+        memory of their own in the worker; only the text columns are built
+        as Python objects.
+        """
+        import numpy as np
+        
+        if group_by == 'district_id' and 'district_id' not in columns:
+            columns = columns + ['district_id']
+        
+        def text(key):
+            values = np.asarray(matrix.column(key), dtype=object)
+            values[values == ''] = None
+            return values
+        
+        data = {'id': matrix.column('id'), 'site_code': text('site_code'), 'address': text('address')}
+        for column in columns:
+            values = matrix.column(column)
+            # Integer and flag columns come back as integers when complete,
+            # as a query would return them (generations store them so already)
+            if SITE_COLUMNS[column] in (int, bool) and values.dtype.kind == 'f' and not np.isnan(values).any():
+                values = values.astype(np.int64)
+            data[column] = values
+        if group_by == 'district_id':
+            data['district_name'] = text('district_name')
+        
+        # copy=False keeps every column its own block over the mapped array
+        df = pd.DataFrame(data, copy=False)
+        if matrix.data_version:
+            df.attrs['data_version'] = matrix.data_version
+        logger.info(f"Loaded {len(df)} active sites from site matrix {matrix.generation}")
+        return df
+    
+    def load_warehouses(self, active_only: bool = True) -> pd.DataFrame:
+        """
+        Load warehouse (depot) locations
+        
+        Args:
+            active_only: Only warehouses with is_active set
+        
+        Returns:
+            DataFrame with id, code, name, x_coordinate, y_coordinate, is_active
+        """
+        
+        query = """
+            SELECT id, code, name, x_coordinate, y_coordinate, is_active
+            FROM warehouse
+        """
+        if active_only:
+            query += " WHERE is_active = TRUE"
+        query += " ORDER BY id"
+        
+        conn = self._connect()
+        
+        try:
+            return pd.read_sql(query, conn)
+        finally:
+            conn.close()
+    
+    def add_warehouse(self, code: str, name: str, x_coordinate: float,
+                      y_coordinate: float) -> int:
+        """
+        Insert a warehouse
+        
+        Args:
+            code: Unique warehouse code
+            name: Display name
+            x_coordinate: Longitude
+            y_coordinate: Latitude
+        
+        Returns:
+            ID of the new warehouse
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO warehouse (code, name, x_coordinate, y_coordinate)
+                VALUES (%s, %s, %s, %s)
+            """, (code, name, float(x_coordinate), float(y_coordinate)))
+            conn.commit()
+            logger.info(f"Added warehouse {code} (id {cursor.lastrowid})")
+            return cursor.lastrowid
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error adding warehouse: {str(e)}", exc_info=True)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_districts(self) -> pd.DataFrame:
+        """
+        Load districts with centroid coordinates and population density
+        
+        Returns:
+            DataFrame with id, name, x_coordinate, y_coordinate, population_density
+        """
+        
+        query = """
+            SELECT id, name, x_coordinate, y_coordinate, population_density
+            FROM district
+            WHERE x_coordinate IS NOT NULL AND y_coordinate IS NOT NULL
+            ORDER BY id
+        """
+        
+        conn = self._connect()
+        
+        try:
+            return pd.read_sql(query, conn)
+        finally:
+            conn.close()
+    
+    def load_competitors(self) -> pd.DataFrame:
+        """
+        Load competitor store locations
+        
+        Returns:
+            DataFrame with id, name, brand, x_coordinate, y_coordinate, floor_area
+        """
+        
+        query = """
+            SELECT id, name, brand, x_coordinate, y_coordinate, floor_area
+            FROM competitor_store
+            ORDER BY id
+        """
+        
+        conn = self._connect()
+        
+        try:
+            return pd.read_sql(query, conn)
         finally:
             conn.close()
     
+    def load_site_locations(self, columns: list = None) -> pd.DataFrame:
+        """
+        Coordinates and derived columns of every located site
+        
+        All statuses are loaded, so sites that become ACTIVE again already
+        have current values.
+        
+        Args:
+            columns: potential_site columns to load besides id, x_coordinate
+                and y_coordinate (None = distance_to_warehouse and
+                nearest_warehouse_id)
+        
+        Returns:
+            DataFrame with id, x_coordinate, y_coordinate and the columns
+        """
+        
+        columns = columns or ['distance_to_warehouse', 'nearest_warehouse_id']
+        for column in columns:
+            if column not in SITE_COLUMNS:
+                raise ValueError(f"Unknown site column: {column}")
+        
+        query = f"""
+            SELECT {', '.join(['id', 'x_coordinate', 'y_coordinate'] + columns)}
+            FROM potential_site
+            WHERE x_coordinate IS NOT NULL AND y_coordinate IS NOT NULL
+        """
+        
+        conn = self._connect()
+        
+        try:
+            return pd.read_sql(query, conn)
+        finally:
+            conn.close()
+    
+    def update_site_columns(self, site_ids, values: dict) -> int:
+        """
+        Store recomputed derived columns of sites
+        
+        Used for values computed from other tables (distance_to_warehouse,
+        market_capture). Rows are written in chunks of
+        Config.SITE_UPDATE_CHUNK, each in its own transaction, so a large
+        recompute does not hold row locks for the whole update.
+        
+        Args:
+            site_ids: Site IDs to update
+            values: {potential_site column: new values, one per site}
+        
+        Returns:
+            Number of rows written
+        """
+        columns = list(values)
+        for column in columns:
+            if column not in SITE_COLUMNS:
+                raise ValueError(f"Unknown site column: {column}")
+        casts = [SITE_COLUMNS[column] for column in columns]
+        
+        rows = [
+            tuple(cast(value) for cast, value in zip(casts, row)) + (int(site_id),)
+            for site_id, *row in zip(site_ids, *values.values())
+        ]
+        query = f"""
+            UPDATE potential_site
+            SET {', '.join(f"{column} = %s" for column in columns)}
+            WHERE id = %s
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            for start in range(0, len(rows), Config.SITE_UPDATE_CHUNK):
+                cursor.executemany(query, rows[start:start + Config.SITE_UPDATE_CHUNK])
+                conn.commit()
+            logger.info(f"Updated {', '.join(columns)} of {len(rows)} sites")
+            return len(rows)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error updating site columns: {str(e)}", exc_info=True)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
     def save_results(self, df: pd.DataFrame, config_id: int, 
                     user_id: int = None, algorithm: str = 'TOPSIS',
-                    execution_time_ms: int = None):
+                    execution_time_ms: int = None,
+                    group_column: str = None,
+                    batch_id: str = None):
         """
-        Save analysis results to evaluation_result table
+        Save analysis results to evaluation_result table as a pending batch
+        
+        The batch header (analysis_batch, status PENDING) and the rows are
+        written in one transaction; readers ignore the rows until
+        publish_batch flips the header, so a failed or abandoned save is
+        never seen half-written (see discard_batch and the batch sweeper).
         
         Args:
             df: DataFrame with results (must have topsis_score and rank_position)
@@ -87,41 +726,67 @@ class DataService:
             user_id: User who performed the analysis (optional)
             algorithm: Algorithm used (default: TOPSIS)
             execution_time_ms: Execution time in milliseconds
+            group_column: Column whose value is stored as group_key for
+                grouped analyses (rank_position is then the rank in the group)
+            batch_id: Batch ID to save under (None = generate one); sharded
+                analyses save one batch ID on every shard. The header may
+                already exist as a pending claim (see claim_batch)
         """
         
-        conn = get_db_connection()
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
             # Generate unique batch_id for this analysis run
-            batch_id = f"{algorithm}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+            if batch_id is None:
+                batch_id = new_batch_id(algorithm)
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
             logger.info(f"Saving {len(df)} evaluation results with batch_id: {batch_id}")
             
+            cursor.execute("SELECT status FROM analysis_batch WHERE batch_id = %s", (batch_id,))
+            header = cursor.fetchone()
+            if header is None:
+                cursor.execute(
+                    "INSERT INTO analysis_batch (batch_id, status, algorithm_used, config_id, created_at) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    (batch_id, BATCH_PENDING, algorithm, config_id, current_time)
+                )
+            elif header[0] != BATCH_PENDING:
+                raise RuntimeError(f"Batch {batch_id} is no longer pending")
+            
             insert_query = """
                 INSERT INTO evaluation_result 
                 (user_id, config_id, site_id, algorithm_used, 
                  topsis_score, rank_position, created_at, 
-                 execution_time_ms, batch_id)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                 execution_time_ms, batch_id, group_key)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
             
-            insert_count = 0
-            for _, row in df.iterrows():
-                values = (
+            group_keys = (
+                df[group_column].astype(str).tolist() if group_column
+                else [None] * len(df)
+            )
+            values = [
+                (
                     user_id,  # Can be NULL
                     config_id,
-                    int(row['id']),
+                    int(site_id),
                     algorithm,
-                    float(row['topsis_score']),
-                    int(row['rank_position']),
+                    float(score),
+                    int(rank),
                     current_time,
                     execution_time_ms,
-                    batch_id
+                    batch_id,
+                    group_key
+                )
+                for site_id, score, rank, group_key in zip(
+                    df['id'], df['topsis_score'], df['rank_position'], group_keys
                 )
-                cursor.execute(insert_query, values)
-                insert_count += 1
+            ]
+            # executemany sends the rows as multi-row INSERT statements
+            cursor.executemany(insert_query, values)
+            insert_count = len(values)
             
             conn.commit()
             logger.info(f"Successfully inserted {insert_count} records into evaluation_result table")
@@ -137,6 +802,252 @@ class DataService:
             cursor.close()
             conn.close()
     
+    def claim_batch(self, batch_id: str, algorithm: str,
+                    idempotency_key: str = None, request_key: str = None) -> bool:
+        """
+        Insert the PENDING header of a batch about to be computed
+        
+        save_results then adds the rows under it. With an idempotency key
+        the claim is atomic across workers (uq_idempotency_key).
+        
+        Args:
+            batch_id: Batch ID the results will be saved under
+            algorithm: Algorithm used
+            idempotency_key: Client's Idempotency-Key (optional)
+            request_key: Coalescing key of the request, or the parameter
+                fingerprint of an idempotent one (see AnalysisService)
+        
+        Returns:
+            True when claimed, False when the idempotency key already has a batch
+        """
+        
+        query = """
+            INSERT INTO analysis_batch
+            (batch_id, idempotency_key, request_key, status, algorithm_used, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        # Application clock, as find_abandoned_batches compares against it
+        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, (batch_id, idempotency_key, request_key, BATCH_PENDING,
+                                   algorithm, created_at))
+            conn.commit()
+            return True
+        except Exception:
+            conn.rollback()
+            # Lost the race to another worker; anything else is a real error
+            if idempotency_key is not None and self.find_batch_by_idempotency_key(idempotency_key) is not None:
+                return False
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def find_batch_by_idempotency_key(self, idempotency_key: str) -> dict:
+        """
+        Batch created for an idempotency key (one uq_idempotency_key lookup)
+        
+        Args:
+            idempotency_key: Client's Idempotency-Key
+        
+        Returns:
+            Dictionary with batch_id, status, request_key (parameter
+            fingerprint of the claiming request) and response (the stored
+            response of a published batch), or None
+        """
+        
+        query = """
+            SELECT batch_id, status, request_key, response_json
+            FROM analysis_batch
+            WHERE idempotency_key = %s
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, (idempotency_key,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return {
+                'batch_id': row[0],
+                'status': row[1],
+                'request_key': row[2],
+                'response': json.loads(row[3]) if row[3] else None
+            }
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def publish_batch(self, batch_id: str, response: dict, full_ranking: bool = True):
+        """
+        Make a pending batch visible, recording the response it produced
+        
+        A single-row update of the header: every reader sees either none or
+        all of the batch's rows.
+        
+        Args:
+            batch_id: Batch ID saved by save_results
+            response: JSON-serializable analysis response (replayed to
+                retries and coalesced requests)
+            full_ranking: False for batches that rank sites within groups
+                or hold only the top N (skipped by rank queries)
+        
+        Raises:
+            RuntimeError: The batch is no longer pending (swept as abandoned)
+        """
+        
+        query = """
+            UPDATE analysis_batch
+            SET status = %s, published_at = %s, config_id = %s, response_json = %s, full_ranking = %s
+            WHERE batch_id = %s AND status = %s
+        """
+        published_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, (BATCH_PUBLISHED, published_at, response.get('config_id'),
+                                   json.dumps(response, default=_json_default),
+                                   int(full_ranking), batch_id, BATCH_PENDING))
+            if cursor.rowcount != 1:
+                conn.rollback()
+                raise RuntimeError(f"Batch {batch_id} is no longer pending and cannot be published")
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def discard_batch(self, batch_id: str) -> int:
+        """
+        Delete an unpublished batch: its rows, then its header
+        
+        The header is first marked DISCARDED, so a late publish_batch fails
+        instead of exposing a half-deleted batch. Rows are then deleted
+        through idx_batch_id in id ranges of Config.BATCH_DELETE_CHUNK, one
+        transaction each. Published batches are left alone.
+        
+        Args:
+            batch_id: Batch ID
+            
+        Returns:
+            Number of evaluation_result rows deleted
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "UPDATE analysis_batch SET status = %s WHERE batch_id = %s AND status <> %s",
+                (BATCH_DISCARDED, batch_id, BATCH_PUBLISHED)
+            )
+            conn.commit()
+            if cursor.rowcount != 1:
+                return 0
+            
+            cursor.execute(
+                "SELECT MIN(id), MAX(id) FROM evaluation_result WHERE batch_id = %s", (batch_id,)
+            )
+            low, high = cursor.fetchone()
+            deleted = 0
+            if low is not None:
+                for start in range(low, high + 1, Config.BATCH_DELETE_CHUNK):
+                    cursor.execute(
+                        "DELETE FROM evaluation_result WHERE batch_id = %s AND id >= %s AND id < %s",
+                        (batch_id, start, start + Config.BATCH_DELETE_CHUNK)
+                    )
+                    deleted += cursor.rowcount
+                    conn.commit()
+            
+            cursor.execute(
+                "DELETE FROM analysis_batch WHERE batch_id = %s AND status = %s",
+                (batch_id, BATCH_DISCARDED)
+            )
+            conn.commit()
+            return deleted
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def find_abandoned_batches(self, older_than_seconds: float, limit: int = 100) -> list:
+        """
+        Unpublished batches created more than `older_than_seconds` ago
+        
+        Pending batches whose run died, and discards that were interrupted.
+        
+        Args:
+            older_than_seconds: Age after which a pending batch is abandoned
+            limit: Maximum number of batch IDs to return
+        
+        Returns:
+            List of batch IDs, oldest first
+        """
+        
+        # idx_status_created
+        query = """
+            SELECT batch_id
+            FROM analysis_batch
+            WHERE status IN (%s, %s) AND created_at < %s
+            ORDER BY created_at
+            LIMIT %s
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cutoff = datetime.now() - timedelta(seconds=older_than_seconds)
+            cursor.execute(query, (BATCH_PENDING, BATCH_DISCARDED,
+                                   cutoff.strftime('%Y-%m-%d %H:%M:%S'), limit))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def find_recent_batch(self, request_key: str, max_age_seconds: float) -> dict:
+        """
+        Response of a batch produced for the same request key recently
+        
+        Args:
+            request_key: Coalescing key of the request
+            max_age_seconds: Oldest batch age to accept
+        
+        Returns:
+            The stored response, or None
+        """
+        
+        query = """
+            SELECT response_json
+            FROM analysis_batch
+            WHERE request_key = %s
+              AND status = 'PUBLISHED'
+              AND created_at >= %s
+            ORDER BY created_at DESC
+            LIMIT 1
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cutoff = datetime.now() - timedelta(seconds=max_age_seconds)
+            cursor.execute(query, (request_key, cutoff.strftime('%Y-%m-%d %H:%M:%S')))
+            row = cursor.fetchone()
+            return json.loads(row[0]) if row and row[0] else None
+        finally:
+            cursor.close()
+            conn.close()
+    
     def get_latest_batch_results(self, limit: int = 10) -> pd.DataFrame:
         """
         Get top N results from the latest analysis batch
@@ -148,7 +1059,24 @@ class DataService:
             DataFrame with top results
         """
         
-        query = """
+        # Published batches only; no batch yet gives an empty frame
+        batch_id = self.get_latest_batch_id()
+        return self.get_batch_results_by_id(batch_id or '', limit)
+    
+    def get_batch_results_by_id(self, batch_id: str, limit: int = 10) -> pd.DataFrame:
+        """
+        Get top N results of one analysis batch
+        
+        Args:
+            batch_id: Batch ID
+            limit: Number of top results to return
+            
+        Returns:
+            DataFrame with top results (same columns as get_latest_batch_results)
+        """
+        
+        # idx_batch_id: reads only the rows of the requested batch
+        query = f"""
             SELECT 
                 er.rank_position,
                 ps.site_code,
@@ -163,52 +1091,396 @@ class DataService:
                 er.created_at as analysis_date,
                 er.algorithm_used
             FROM evaluation_result er
-            INNER JOIN (
-                SELECT MAX(batch_id) as latest_batch 
-                FROM evaluation_result
-            ) lb ON er.batch_id = lb.latest_batch
             LEFT JOIN potential_site ps ON er.site_id = ps.id
             LEFT JOIN district d ON ps.district_id = d.id
             LEFT JOIN expert_criteria_config ec ON er.config_id = ec.id
+            WHERE er.batch_id = %s AND {VISIBLE_BATCH}
             ORDER BY er.rank_position ASC
             LIMIT %s
         """
         
-        conn = get_db_connection()
+        conn = self._connect()
+        
+        try:
+            df = pd.read_sql(query, conn, params=(batch_id, batch_id, limit))
+            return df
+        finally:
+            conn.close()
+    
+    def get_latest_batch_id(self, full_ranking: bool = False) -> str:
+        """
+        batch_id of the most recently published analysis batch
+        
+        Args:
+            full_ranking: Only batches ranking every analyzed site in one
+                global ranking (not grouped, not top-N only)
+        
+        Returns:
+            Batch ID, or None when no results exist
+        """
+        
+        # Single seeks (idx_status_published / idx_full_ranking_published,
+        # primary key): cheap enough to poll for new batches
+        query = f"""
+            SELECT batch_id 
+            FROM analysis_batch 
+            WHERE status = 'PUBLISHED' {'AND full_ranking = 1' if full_ranking else ''}
+            ORDER BY published_at DESC 
+            LIMIT 1
+        """
+        # Results saved before batch headers existed
+        legacy_query = f"""
+            SELECT er.batch_id 
+            FROM evaluation_result er 
+            WHERE {VISIBLE_RESULTS} {'AND er.group_key IS NULL' if full_ranking else ''}
+            ORDER BY er.id DESC 
+            LIMIT 1
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query)
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(legacy_query)
+                row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_batch_scores(self, batch_id: str) -> pd.DataFrame:
+        """
+        Scores of every site in a batch
+        
+        Args:
+            batch_id: Batch ID
+            
+        Returns:
+            DataFrame with site_id, site_code, topsis_score, rank_position,
+            group_key and algorithm_used
+        """
+        
+        query = f"""
+            SELECT 
+                er.site_id,
+                ps.site_code,
+                er.topsis_score,
+                er.rank_position,
+                er.group_key,
+                er.algorithm_used
+            FROM evaluation_result er
+            LEFT JOIN potential_site ps ON er.site_id = ps.id
+            WHERE er.batch_id = %s AND {VISIBLE_BATCH}
+        """
+        
+        conn = self._connect()
         
         try:
-            df = pd.read_sql(query, conn, params=(limit,))
+            df = pd.read_sql(query, conn, params=(batch_id, batch_id))
             return df
         finally:
             conn.close()
     
-    def get_evaluation_history_by_site(self, site_id: int) -> pd.DataFrame:
+    def load_batch_ranking(self, batch_id: str) -> tuple:
+        """
+        Site ids and scores of a batch as arrays, plus its header
+        
+        Reads evaluation_result only (no joins) through idx_batch_id,
+        straight into NumPy arrays.
+        
+        Args:
+            batch_id: Batch ID
+            
+        Returns:
+            Tuple (site_ids, scores, header) with header holding
+            algorithm_used, config_id, created_at and group_key of the
+            batch, or None when the batch does not exist
+        """
+        import numpy as np
+        
+        header_query = f"""
+            SELECT algorithm_used, config_id, created_at, group_key
+            FROM evaluation_result
+            WHERE batch_id = %s AND {VISIBLE_BATCH}
+            LIMIT 1
+        """
+        scores_query = """
+            SELECT site_id, topsis_score
+            FROM evaluation_result
+            WHERE batch_id = %s
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(header_query, (batch_id, batch_id))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            header = dict(zip(('algorithm_used', 'config_id', 'created_at', 'group_key'), row))
+            
+            cursor.execute(scores_query, (batch_id,))
+            rows = cursor.fetchall()
+            values = np.array(rows, dtype=np.float64).reshape(-1, 2)
+            return values[:, 0].astype(np.int64), values[:, 1], header
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_site_codes(self, site_ids) -> dict:
+        """
+        site_code of each of the given sites
+        
+        Args:
+            site_ids: Site IDs
+            
+        Returns:
+            Dictionary of site ID -> site code
+        """
+        site_ids = sorted({int(site_id) for site_id in site_ids})
+        if not site_ids:
+            return {}
+        
+        placeholders = ', '.join(['%s'] * len(site_ids))
+        query = f"SELECT id, site_code FROM potential_site WHERE id IN ({placeholders})"
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, site_ids)
+            return {int(site_id): code for site_id, code in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def save_ranking_snapshots(self, rankings: list, site_version: str,
+                               config_version: str, algorithm: str,
+                               normalization: str):
         """
-        Get evaluation history for a specific site
+        Replace the stored ranking snapshots in one transaction
+        
+        Args:
+            rankings: (config_id, site_ids, scores, ranks) tuples, one per config
+            site_version: potential_site version the rankings were computed from
+            config_version: expert_criteria_config version they were computed from
+            algorithm: Algorithm used
+            normalization: Normalization strategy used
+        """
+        
+        refreshed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("DELETE FROM ranking_snapshot_meta")
+            cursor.execute("DELETE FROM ranking_snapshot")
+            
+            for config_id, site_ids, scores, ranks in rankings:
+                cursor.execute("""
+                    INSERT INTO ranking_snapshot_meta
+                    (config_id, site_version, config_version, algorithm_used,
+                     normalization, site_count, refreshed_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (int(config_id), site_version, config_version, algorithm,
+                      normalization, len(site_ids), refreshed_at))
+                cursor.executemany("""
+                    INSERT INTO ranking_snapshot
+                    (config_id, site_id, score, rank_position)
+                    VALUES (%s, %s, %s, %s)
+                """, [
+                    (int(config_id), int(site_id), float(score), int(rank))
+                    for site_id, score, rank in zip(site_ids, scores, ranks)
+                ])
+            
+            conn.commit()
+            logger.info(f"Stored ranking snapshots of {len(rankings)} configs")
+            
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error saving ranking snapshots: {str(e)}", exc_info=True)
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_ranking_snapshots(self, site_version: str, config_version: str,
+                               algorithm: str, normalization: str) -> pd.DataFrame:
+        """
+        Stored ranking snapshots, if they match the given data versions
+        
+        Args:
+            site_version: Current potential_site version
+            config_version: Current expert_criteria_config version
+            algorithm: Algorithm the snapshots must have been computed with
+            normalization: Normalization they must have been computed with
+        
+        Returns:
+            DataFrame with config_id, site_id and score, or None when no
+            snapshot or an outdated one is stored
+        """
+        
+        conn = self._connect()
+        
+        try:
+            meta = pd.read_sql(
+                """
+                    SELECT config_id, site_version, config_version,
+                           algorithm_used, normalization
+                    FROM ranking_snapshot_meta
+                """,
+                conn
+            )
+            if meta.empty or not (
+                (meta['site_version'] == site_version).all()
+                and (meta['config_version'] == config_version).all()
+                and (meta['algorithm_used'] == algorithm).all()
+                and (meta['normalization'] == normalization).all()
+            ):
+                return None
+            
+            return pd.read_sql(
+                "SELECT config_id, site_id, score FROM ranking_snapshot",
+                conn
+            )
+        finally:
+            conn.close()
+    
+    def get_evaluation_history_by_site(self, site_id: int, limit: int = 100,
+                                       before: tuple = None) -> pd.DataFrame:
+        """
+        One page of a site's evaluation history, newest first
+        
+        Keyset pagination on idx_site_created (site_id, created_at DESC,
+        id DESC): the page is an index range scan of `limit` rows starting
+        after `before`, however long the history is.
         
         Args:
             site_id: Site ID
+            limit: Number of rows to return
+            before: (created_at, id) of the last row of the previous page
             
         Returns:
-            DataFrame with evaluation history
+            DataFrame with id, topsis_score, rank_position, algorithm_used,
+            created_at, batch_id, strategy_name and evaluated_by
         """
         
-        query = """
+        keyset = ''
+        params = [site_id]
+        if before is not None:
+            # The leading created_at <= bound makes it an index range on both backends
+            keyset = 'AND er.created_at <= %s AND (er.created_at < %s OR er.id < %s)'
+            params += [before[0], before[0], before[1]]
+        
+        query = f"""
             SELECT 
-                er.*,
+                er.id,
+                er.topsis_score,
+                er.rank_position,
+                er.algorithm_used,
+                er.created_at,
+                er.batch_id,
                 ec.strategy_name,
                 u.full_name as evaluated_by
             FROM evaluation_result er
             LEFT JOIN expert_criteria_config ec ON er.config_id = ec.id
             LEFT JOIN users u ON er.user_id = u.id
-            WHERE er.site_id = %s
-            ORDER BY er.created_at DESC
+            WHERE er.site_id = %s {keyset} AND {VISIBLE_RESULTS}
+            ORDER BY er.created_at DESC, er.id DESC
+            LIMIT %s
         """
         
-        conn = get_db_connection()
+        conn = self._connect()
         
         try:
-            df = pd.read_sql(query, conn, params=(site_id,))
+            df = pd.read_sql(query, conn, params=(*params, limit))
+            return df
+        finally:
+            conn.close()
+    
+    def get_latest_evaluation_time(self, site_id: int, before: str = None):
+        """
+        created_at of a site's newest evaluation (older than `before` if given)
+        
+        Args:
+            site_id: Site ID
+            before: Exclusive upper bound ('YYYY-MM-DD HH:MM:SS')
+            
+        Returns:
+            The timestamp, or None when there is no such evaluation
+        """
+        
+        bound = ''
+        params = [site_id]
+        if before is not None:
+            bound = 'AND er.created_at < %s'
+            params.append(before)
+        
+        # A seek on idx_site_created
+        query = f"""
+            SELECT er.created_at 
+            FROM evaluation_result er 
+            WHERE er.site_id = %s {bound} AND {VISIBLE_RESULTS}
+            ORDER BY er.created_at DESC 
+            LIMIT 1
+        """
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, tuple(params))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def get_evaluation_history_buckets(self, site_id: int, bucket_chars: int,
+                                       start: str, end: str) -> pd.DataFrame:
+        """
+        A site's evaluations in [start, end), aggregated per period
+        
+        The period is the created_at text prefix of `bucket_chars`
+        characters (10 = day, 7 = month), the same on MySQL DATETIME and
+        SQLite text timestamps. Only the window's rows of idx_site_created
+        are read.
+        
+        Args:
+            site_id: Site ID
+            bucket_chars: Length of the created_at prefix grouped on
+            start: Inclusive lower bound ('YYYY-MM-DD HH:MM:SS')
+            end: Exclusive upper bound
+            
+        Returns:
+            DataFrame with period, evaluations, avg_score, avg_rank,
+            best_rank, worst_rank and last_evaluation_date, newest first
+        """
+        
+        query = f"""
+            SELECT 
+                SUBSTR(er.created_at, 1, {int(bucket_chars)}) as period,
+                COUNT(*) as evaluations,
+                AVG(er.topsis_score) as avg_score,
+                AVG(er.rank_position) as avg_rank,
+                MIN(er.rank_position) as best_rank,
+                MAX(er.rank_position) as worst_rank,
+                MAX(er.created_at) as last_evaluation_date
+            FROM evaluation_result er
+            WHERE er.site_id = %s AND er.created_at >= %s AND er.created_at < %s
+              AND {VISIBLE_RESULTS}
+            GROUP BY period
+            ORDER BY period DESC
+        """
+        
+        conn = self._connect()
+        
+        try:
+            df = pd.read_sql(query, conn, params=(site_id, start, end))
             return df
         finally:
             conn.close()
@@ -224,26 +1496,26 @@ class DataService:
             Dictionary with statistics
         """
         
-        query = """
+        query = f"""
             SELECT 
                 COUNT(*) as total_sites,
                 MIN(topsis_score) as min_score,
                 MAX(topsis_score) as max_score,
                 AVG(topsis_score) as avg_score,
-                STDDEV(topsis_score) as std_score,
+                STDDEV_POP(topsis_score) as std_score,
                 algorithm_used,
                 created_at,
                 execution_time_ms
             FROM evaluation_result
-            WHERE batch_id = %s
+            WHERE batch_id = %s AND {VISIBLE_BATCH}
             GROUP BY algorithm_used, created_at, execution_time_ms
         """
         
-        conn = get_db_connection()
+        conn = self._connect()
         cursor = conn.cursor(dictionary=True)
         
         try:
-            cursor.execute(query, (batch_id,))
+            cursor.execute(query, (batch_id, batch_id))
             result = cursor.fetchone()
             return result if result else {}
         finally:
@@ -0,0 +1,102 @@
+from datetime import datetime
+from config import Config
+from services.data_service import DataService
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MarketCaptureService:
+    """
+    Huff-model market capture of every site (see utils/huff.py)
+
+    potential_site.market_capture is the demand (people) a site would draw
+    from the district-density demand grid if it opened next to the stores
+    in competitor_store. It is a benefit criterion like the others;
+    configurations weight it with weight_market_capture.
+    """
+
+    def __init__(self):
+        self.data_service = DataService()
+
+    def list_competitors(self) -> dict:
+        """
+        Competitor store locations
+
+        Returns:
+            Dictionary with the competitor stores
+        """
+        df = self.data_service.load_competitors()
+        return {
+            'success': True,
+            'count': len(df),
+            'competitors': df.to_dict('records')
+        }
+
+    def recompute(self) -> dict:
+        """
+        Recompute the market capture of every located site
+
+        The demand grid covers the sites plus the cutoff radius; only sites
+        whose rounded value changed are written back.
+
+        Returns:
+            Dictionary with the grid size, counts and timings
+        """
+        import numpy as np
+        from utils.huff import DemandGrid, HuffModel
+
+        start = time.perf_counter()
+        districts = self.data_service.load_districts()
+        competitors = self.data_service.load_competitors()
+        sites = self.data_service.load_site_locations(columns=['floor_area', 'market_capture'])
+        if len(sites) == 0:
+            raise ValueError("No sites with coordinates")
+        load_ms = (time.perf_counter() - start) * 1000
+
+        compute_start = time.perf_counter()
+        geometry = DemandGrid.covering(sites['x_coordinate'], sites['y_coordinate'],
+                                       margin_km=Config.HUFF_CUTOFF_KM)
+        grid = DemandGrid.from_districts(districts['x_coordinate'], districts['y_coordinate'],
+                                         districts['population_density'], *geometry)
+
+        exponent = Config.HUFF_ATTRACTIVENESS_EXPONENT
+        model = HuffModel(grid, competitors['x_coordinate'], competitors['y_coordinate'],
+                          competitors['floor_area'].to_numpy(dtype=np.float64) ** exponent)
+        capture = np.round(model.capture(
+            sites['x_coordinate'], sites['y_coordinate'],
+            sites['floor_area'].to_numpy(dtype=np.float64) ** exponent
+        ), 1)
+
+        changed = capture != np.round(sites['market_capture'].to_numpy(dtype=np.float64), 1)
+        compute_ms = (time.perf_counter() - compute_start) * 1000
+
+        save_start = time.perf_counter()
+        updated = 0
+        if changed.any():
+            updated = self.data_service.update_site_columns(
+                sites['id'].to_numpy()[changed], {'market_capture': capture[changed]}
+            )
+        save_ms = (time.perf_counter() - save_start) * 1000
+
+        logger.info(f"Recomputed market capture of {len(sites)} sites over "
+                    f"{grid.n_cells} cells, {len(competitors)} competitors: {updated} changed")
+
+        return {
+            'success': True,
+            'grid': {
+                'rows': grid.shape[0],
+                'columns': grid.shape[1],
+                'cell_km': round(grid.cell_km, 4),
+                'total_demand': round(float(grid.demand.sum()), 1)
+            },
+            'competitors': len(competitors),
+            'sites': len(sites),
+            'sites_updated': updated,
+            'load_time_ms': round(load_ms, 1),
+            'compute_time_ms': round(compute_ms, 1),
+            'save_time_ms': round(save_ms, 1),
+            'execution_time_ms': round((time.perf_counter() - start) * 1000, 1),
+            'timestamp': datetime.now().isoformat()
+        }
@@ -0,0 +1,326 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from config import Config
+from services.data_service import DataService
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _IndexEntry:
+    """Rank index of one batch and when its freshness was last checked"""
+    batch_id: str
+    index: object
+    algorithm: str
+    checked_at: float
+
+
+# Per-worker index of the latest batch
+_latest = None
+_latest_lock = threading.Lock()
+
+# Batches never change once saved: per-worker LRU caches of loaded
+# rankings (batch_id -> (BatchRanking, header)) and of finished
+# comparisons ((base, target, top_n, limit) -> response)
+_batch_rankings = OrderedDict()
+_comparisons = OrderedDict()
+_compare_lock = threading.Lock()
+
+
+def _cache_get(cache: OrderedDict, key):
+    with _compare_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache: OrderedDict, key, value, max_entries: int):
+    with _compare_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+
+class RankingService:
+    """
+    Rank, percentile, score-range and neighbor queries on the latest batch
+
+    Only full rankings are indexed: grouped batches (per-group scores) and
+    top-N-only batches are skipped, so "latest" is the most recent batch
+    ranking every analyzed site globally.
+
+    Answered from an in-memory RankIndex instead of MySQL. The index is
+    built from the results when this worker produces a batch, or from the
+    database on first read; other workers' batches are picked up by
+    checking the latest batch_id at most every
+    Config.RANK_INDEX_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self.data_service = DataService()
+
+    @staticmethod
+    def publish_batch(batch_id: str, df, algorithm: str, full_ranking: bool = True):
+        """Make a batch just saved by this worker the indexed latest batch"""
+        from utils.rank_index import RankIndex
+
+        if not full_ranking:
+            return
+
+        global _latest
+        index = RankIndex(df['id'].to_numpy(), df['topsis_score'].to_numpy(), df['site_code'].to_numpy())
+        with _latest_lock:
+            _latest = _IndexEntry(batch_id, index, algorithm, time.monotonic())
+
+    def get_latest(self) -> _IndexEntry:
+        """Index of the latest batch, refreshed when a newer batch exists"""
+        global _latest
+
+        entry = _latest
+        if entry is not None and time.monotonic() - entry.checked_at < Config.RANK_INDEX_TTL_SECONDS:
+            return entry
+
+        with _latest_lock:
+            entry = _latest
+            if entry is not None and time.monotonic() - entry.checked_at < Config.RANK_INDEX_TTL_SECONDS:
+                return entry
+
+            batch_id = self.data_service.get_latest_batch_id(full_ranking=True)
+            if batch_id is None:
+                raise ValueError("No analysis batch with a full ranking found")
+
+            if entry is not None and entry.batch_id == batch_id:
+                entry.checked_at = time.monotonic()
+                return entry
+
+            _latest = self._build(batch_id)
+            return _latest
+
+    def _build(self, batch_id: str) -> _IndexEntry:
+        from utils.rank_index import RankIndex
+
+        start = time.perf_counter()
+        df = self.data_service.load_batch_scores(batch_id)
+        if df['group_key'].notna().any():
+            raise ValueError(f"Batch {batch_id} ranks sites within groups and cannot be indexed")
+        index = RankIndex(df['site_id'].to_numpy(), df['topsis_score'].to_numpy(), df['site_code'].to_numpy())
+        algorithm = df['algorithm_used'].iloc[0] if len(df) else None
+
+        logger.info(f"Built rank index for batch {batch_id} ({len(df)} results) "
+                    f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return _IndexEntry(batch_id, index, algorithm, time.monotonic())
+
+    def _header(self, entry: _IndexEntry) -> dict:
+        return {
+            'success': True,
+            'batch_id': entry.batch_id,
+            'algorithm': entry.algorithm,
+            'total_results': len(entry.index)
+        }
+
+    def get_site_rank(self, site_id: int) -> dict:
+        """
+        Rank and percentile of a site in the latest batch
+
+        Args:
+            site_id: Site ID
+
+        Returns:
+            Dictionary with score, rank and percentile
+        """
+        entry = self.get_latest()
+        index = entry.index
+        position = index.position(site_id)
+        if position is None:
+            return {
+                'success': False,
+                'error': f'Site {site_id} is not in the latest batch'
+            }
+
+        score = float(index.ranked_scores[position])
+        return {
+            **self._header(entry),
+            **index.entry(position),
+            'percentile': round(index.percentile_of_score(score), 2)
+        }
+
+    def get_score_range(self, min_score: float, max_score: float,
+                        limit: int = 50, offset: int = 0,
+                        columnar: bool = False) -> dict:
+        """
+        Sites of the latest batch with min_score <= score <= max_score
+
+        Args:
+            min_score: Lower score bound (inclusive)
+            max_score: Upper score bound (inclusive)
+            limit: Maximum number of sites to list
+            offset: Number of matching sites to skip (best first)
+            columnar: Return sites as {field: array} instead of row dicts
+
+        Returns:
+            Dictionary with the match count, mean score and one page of sites
+        """
+        if min_score > max_score:
+            raise ValueError("min_score must not exceed max_score")
+
+        entry = self.get_latest()
+        index = entry.index
+        start, stop = index.score_range(min_score, max_score)
+        page_start = min(start + offset, stop)
+        page_stop = min(page_start + limit, stop)
+
+        mean = index.range_mean(start, stop)
+        return {
+            **self._header(entry),
+            'min_score': min_score,
+            'max_score': max_score,
+            'count': stop - start,
+            'mean_score': None if mean is None else round(mean, 6),
+            'offset': offset,
+            'sites': index.columns(page_start, page_stop) if columnar else [
+                index.entry(position) for position in range(page_start, page_stop)
+            ]
+        }
+
+    def get_neighbors(self, site_id: int, k: int = 5) -> dict:
+        """
+        The k sites ranked directly above and below a site in the latest batch
+
+        Args:
+            site_id: Site ID
+            k: Number of neighbors on each side
+
+        Returns:
+            Dictionary with the site and its neighbors
+        """
+        entry = self.get_latest()
+        index = entry.index
+        position = index.position(site_id)
+        if position is None:
+            return {
+                'success': False,
+                'error': f'Site {site_id} is not in the latest batch'
+            }
+
+        return {
+            **self._header(entry),
+            'site': index.entry(position),
+            'above': [index.entry(p) for p in range(max(position - k, 0), position)],
+            'below': [index.entry(p) for p in range(position + 1, min(position + k + 1, len(index)))]
+        }
+
+    def _batch_ranking(self, batch_id: str) -> tuple:
+        """(BatchRanking, header) of a batch, loaded once per worker"""
+        from algorithms.rank_drift import BatchRanking
+
+        cached = _cache_get(_batch_rankings, batch_id)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        loaded = self.data_service.load_batch_ranking(batch_id)
+        if loaded is None:
+            raise ValueError(f"Batch not found: {batch_id}")
+        site_ids, scores, header = loaded
+        if header['group_key'] is not None:
+            raise ValueError(f"Batch {batch_id} ranks sites within groups and cannot be compared")
+
+        entry = (BatchRanking(site_ids, scores), header)
+        _cache_put(_batch_rankings, batch_id, entry, Config.COMPARE_BATCH_CACHE_SIZE)
+        logger.info(f"Loaded ranking of batch {batch_id} ({len(site_ids)} results) "
+                    f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return entry
+
+    def compare_batches(self, base_id: str, target_id: str,
+                        top_n: int = 10, limit: int = 10) -> dict:
+        """
+        Rank drift between two batches (see algorithms/rank_drift.py)
+
+        Args:
+            base_id: Reference batch ID ('latest' = the latest batch)
+            target_id: Compared batch ID ('latest' = the latest batch)
+            top_n: Cut-off of the top-N overlap
+            limit: Number of climbers, fallers and top-N entries/exits listed
+
+        Returns:
+            Dictionary with correlations, rank-change statistics, top-N
+            overlap and the biggest movers
+        """
+        import numpy as np
+        from algorithms.rank_drift import compare_rankings
+        from utils.columns import rows_from_columns
+
+        start = time.perf_counter()
+        if 'latest' in (base_id, target_id):
+            latest = self.data_service.get_latest_batch_id(full_ranking=True)
+            if latest is None:
+                raise ValueError("No analysis batch with a full ranking found")
+            base_id = latest if base_id == 'latest' else base_id
+            target_id = latest if target_id == 'latest' else target_id
+
+        key = (base_id, target_id, top_n, limit)
+        result = _cache_get(_comparisons, key)
+        if result is not None:
+            return {
+                **result,
+                'cached': True,
+                'execution_time_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+
+        base, base_header = self._batch_ranking(base_id)
+        target, target_header = self._batch_ranking(target_id)
+        drift = compare_rankings(base, target, top_n=top_n, limit=limit)
+
+        listed = [drift['climbers']['site_id'], drift['fallers']['site_id'],
+                  drift['entered_top_n'], drift['left_top_n']]
+        codes = self.data_service.load_site_codes(np.concatenate(listed))
+
+        def with_codes(columns: dict) -> list:
+            columns = {'site_code': [codes.get(int(i)) for i in columns['site_id']], **columns}
+            return rows_from_columns(columns)
+
+        def sites(site_ids) -> list:
+            return [{'site_id': int(i), 'site_code': codes.get(int(i))} for i in site_ids]
+
+        def describe(batch_id: str, ranking, header: dict) -> dict:
+            created_at = header['created_at']
+            return {
+                'batch_id': batch_id,
+                'algorithm': header['algorithm_used'],
+                'config_id': header['config_id'],
+                'created_at': created_at.isoformat() if hasattr(created_at, 'isoformat') else created_at,
+                'total_results': len(ranking)
+            }
+
+        result = {
+            'success': True,
+            'base': describe(base_id, base, base_header),
+            'target': describe(target_id, target, target_header),
+            'common_sites': drift['common_sites'],
+            'only_in_base': drift['only_in_base'],
+            'only_in_target': drift['only_in_target'],
+            'correlation': {
+                'kendall_tau': drift['kendall_tau'],
+                'spearman': drift['spearman']
+            },
+            'rank_change': drift['rank_change'],
+            'top_n': {
+                **drift['top_n'],
+                'entered': sites(drift['entered_top_n']),
+                'left': sites(drift['left_top_n'])
+            },
+            'climbers': with_codes(drift['climbers']),
+            'fallers': with_codes(drift['fallers'])
+        }
+        _cache_put(_comparisons, key, result, Config.COMPARE_RESULT_CACHE_SIZE)
+
+        return {
+            **result,
+            'cached': False,
+            'execution_time_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
@@ -0,0 +1,307 @@
+from dataclasses import dataclass
+from datetime import datetime
+from config import Config
+from services.data_service import DataService
+from utils.db_connector import advisory_lock
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Snapshots:
+    """Rankings of every config for one (site data, configs) version pair"""
+    site_version: str
+    config_version: str
+    algorithm: str
+    normalization: str
+    # config_id -> RankIndex, config_id -> config row
+    indexes: dict
+    configs: dict
+    # Display columns of the ranked sites, indexed by site id
+    sites: object
+    active_config_id: int
+    refreshed_at: datetime
+    checked_at: float
+
+
+# Per-worker snapshots, replaced as a whole on refresh (reads take no lock)
+_snapshots = None
+_refresh_lock = threading.Lock()
+_refresher = None
+
+# MySQL named lock held while a worker computes and stores the snapshots
+SNAPSHOT_LOCK = 'mcdm:ranking_snapshot'
+
+
+def start_refresher():
+    """
+    Start the background refresher thread of this process (idempotent)
+
+    Called from gunicorn's post_fork hook (and by app.py in development),
+    not in a preloading master: threads do not survive fork.
+    """
+    global _refresher
+
+    if _refresher is not None and _refresher.is_alive():
+        return
+    _refresher = threading.Thread(target=_refresh_loop, name='snapshot-refresher', daemon=True)
+    _refresher.start()
+    logger.info(f"Started ranking snapshot refresher (every {Config.SNAPSHOT_REFRESH_SECONDS}s)")
+
+
+def _refresh_loop():
+    service = SnapshotService()
+    while True:
+        try:
+            service.refresh()
+        except Exception as e:
+            logger.error(f"Ranking snapshot refresh failed: {e}", exc_info=True)
+        time.sleep(Config.SNAPSHOT_REFRESH_SECONDS)
+
+
+class SnapshotService:
+    """
+    Materialized rankings of every expert_criteria_config
+
+    Rankings only change when potential_site or expert_criteria_config
+    changes, so they are recomputed when one of their version tokens moves:
+    all configs in one batched pass over the site matrix
+    (score_matrix_batch). The result is kept in memory as one RankIndex per
+    config and stored in ranking_snapshot, so other workers and restarts
+    reuse it instead of recomputing: only the worker holding SNAPSHOT_LOCK
+    computes and rewrites the table, the others wait and load it. Reads slice the precomputed order and
+    never touch the site matrix.
+    """
+
+    def __init__(self):
+        self.data_service = DataService()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Recompute the snapshots if the site data or the configs changed
+
+        Args:
+            force: Recompute even when the versions did not change
+
+        Returns:
+            True when new snapshots were installed
+        """
+        global _snapshots
+
+        with _refresh_lock:
+            site_version = self.data_service.get_data_version()
+            config_version = self.data_service.get_config_version()
+
+            current = _snapshots
+            if (not force and current is not None
+                    and current.site_version == site_version
+                    and current.config_version == config_version):
+                current.checked_at = time.monotonic()
+                return False
+
+            _snapshots = self._build(site_version, config_version, reuse_stored=not force)
+            return True
+
+    def _build(self, site_version: str, config_version: str, reuse_stored: bool) -> _Snapshots:
+        import numpy as np
+        from algorithms import AlgorithmFactory
+        from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA, WEIGHT_COLUMNS
+        from utils.rank_index import RankIndex
+
+        start = time.perf_counter()
+        algo = AlgorithmFactory.create(Config.SNAPSHOT_ALGORITHM)
+        algorithm = Config.SNAPSHOT_ALGORITHM.upper()
+        if not algo.supports_matrix_scoring:
+            raise ValueError(f"{algo.name} does not support matrix scoring and cannot build snapshots")
+        criteria = COST_CRITERIA + BENEFIT_CRITERIA
+
+        configs = self.data_service.load_all_configs()
+        df = self.data_service.load_sites(group_by='district_id', columns=algo.required_columns(criteria))
+        if not configs or df.empty:
+            raise ValueError("No configurations or sites to rank")
+
+        site_ids = df['id'].to_numpy()
+        normalization = algo.normalization.name
+
+        def stored_scores():
+            # Computed by another worker (or before a restart) for these versions
+            stored = self.data_service.load_ranking_snapshots(
+                site_version, config_version, algorithm, normalization
+            )
+            if stored is None:
+                return None
+            by_config = {config_id: rows for config_id, rows in stored.groupby('config_id')}
+            return {
+                config['id']: by_config[config['id']].set_index('site_id')['score'].reindex(site_ids).to_numpy()
+                for config in configs
+            }
+
+        def rank_indexes(scores):
+            return {
+                config_id: RankIndex(site_ids, config_scores, df['site_code'].to_numpy())
+                for config_id, config_scores in scores.items()
+            }
+
+        source = 'stored'
+        scores = stored_scores() if reuse_stored else None
+        if scores is None:
+            # One worker computes and stores the rankings; the others wait on
+            # the lock and then load what it stored
+            with advisory_lock(SNAPSHOT_LOCK, Config.SNAPSHOT_LOCK_TIMEOUT) as acquired:
+                if not acquired:
+                    logger.warning("Timed out waiting for the ranking snapshot lock, computing anyway")
+                scores = stored_scores() if reuse_stored else None
+                if scores is None:
+                    source = 'computed'
+                    matrix = df[criteria].to_numpy(dtype=np.float64)
+                    weights = np.array([[config[WEIGHT_COLUMNS[c]] for c in criteria] for config in configs])
+                    stats = algo.column_statistics(df, criteria, matrix)
+                    all_scores = algo.score_matrix_batch(matrix, weights, len(COST_CRITERIA), stats,
+                                                          **algo.matrix_options(df, criteria))
+                    scores = {config['id']: all_scores[:, k] for k, config in enumerate(configs)}
+                    indexes = rank_indexes(scores)
+                    rankings = [
+                        (config_id, index.ranked_site_ids, index.ranked_scores, index.competition_ranks())
+                        for config_id, index in indexes.items()
+                    ]
+                    self.data_service.save_ranking_snapshots(
+                        rankings, site_version, config_version, algorithm, normalization
+                    )
+        if source == 'stored':
+            indexes = rank_indexes(scores)
+
+        active = [config['id'] for config in configs if config.get('is_active')]
+        snapshots = _Snapshots(
+            site_version=site_version,
+            config_version=config_version,
+            algorithm=algorithm,
+            normalization=normalization,
+            indexes=indexes,
+            configs={config['id']: config for config in configs},
+            sites=df.set_index('id')[['site_code', 'address', 'district_name'] + list(criteria)],
+            active_config_id=active[0] if active else None,
+            refreshed_at=datetime.now(),
+            checked_at=time.monotonic()
+        )
+        logger.info(f"Ranking snapshots of {len(configs)} configs over {len(df)} sites "
+                    f"{source} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return snapshots
+
+    def get_snapshots(self) -> _Snapshots:
+        """
+        Current snapshots
+
+        Built on first use; without a running refresher they are re-checked
+        inline at most every Config.SNAPSHOT_REFRESH_SECONDS.
+        """
+        snapshots = _snapshots
+        refresher_running = _refresher is not None and _refresher.is_alive()
+        if snapshots is None or (
+            not refresher_running
+            and time.monotonic() - snapshots.checked_at >= Config.SNAPSHOT_REFRESH_SECONDS
+        ):
+            self.refresh()
+            snapshots = _snapshots
+        return snapshots
+
+    def _staleness(self, snapshots: _Snapshots) -> dict:
+        return {
+            'source': 'snapshot',
+            'refreshed_at': snapshots.refreshed_at.isoformat(),
+            # Changes made since the last version check are not reflected yet
+            'staleness_seconds': round(time.monotonic() - snapshots.checked_at, 3)
+        }
+
+    def _site_columns(self, snapshots: _Snapshots, index, start: int, stop: int) -> dict:
+        """Ranking positions [start, stop) as {field: array}"""
+        import numpy as np
+
+        sites = snapshots.sites.loc[index.ranked_site_ids[start:stop]]
+        return {
+            'rank': index.competition_ranks(start, stop),
+            'site_id': index.ranked_site_ids[start:stop],
+            'site_code': sites['site_code'].to_numpy(dtype=object),
+            'address': sites['address'].to_numpy(dtype=object),
+            'district_name': sites['district_name'].to_numpy(dtype=object),
+            'score': np.round(index.ranked_scores[start:stop], 6),
+            'rent_cost': sites['rent_cost'].to_numpy(dtype=np.float64),
+            'floor_area': sites['floor_area'].to_numpy(dtype=np.float64),
+            'traffic_score': sites['traffic_score'].to_numpy(dtype=np.int64),
+            'competitor_count': sites['competitor_count'].to_numpy(dtype=np.int64)
+        }
+
+    def get_ranking(self, config_id: int, limit: int = 10, offset: int = 0,
+                    columnar: bool = False) -> dict:
+        """
+        One page of a config's materialized ranking
+
+        Args:
+            config_id: Expert criteria configuration ID
+            limit: Number of sites to return
+            offset: Number of ranked sites to skip
+            columnar: Return results as {field: array} instead of row dicts
+
+        Returns:
+            Dictionary with the page of sites and the snapshot age
+        """
+        snapshots = self.get_snapshots()
+        index = snapshots.indexes.get(config_id)
+        if index is None:
+            raise ValueError(f"No ranking for config {config_id}")
+
+        from utils.columns import rows_from_columns
+
+        start = min(offset, len(index))
+        stop = min(start + limit, len(index))
+        results = self._site_columns(snapshots, index, start, stop)
+        config = snapshots.configs[config_id]
+        return {
+            'success': True,
+            'config_id': config_id,
+            'strategy_name': config['strategy_name'],
+            'algorithm': snapshots.algorithm,
+            'normalization': snapshots.normalization,
+            'total_results': len(index),
+            'offset': offset,
+            **self._staleness(snapshots),
+            'results': results if columnar else rows_from_columns(results)
+        }
+
+    def get_latest(self, limit: int = 10, columnar: bool = False) -> dict:
+        """
+        Top sites of the active config, in the shape of /results/latest
+
+        Args:
+            limit: Number of sites to return
+            columnar: Return results as {field: array} instead of row dicts
+
+        Returns:
+            Dictionary with the top results, or None when no config is active
+        """
+        snapshots = self.get_snapshots()
+        config_id = snapshots.active_config_id
+        if config_id is None:
+            return None
+
+        import numpy as np
+        from utils.columns import rows_from_columns
+
+        index = snapshots.indexes[config_id]
+        stop = min(limit, len(index))
+        results = self._site_columns(snapshots, index, 0, stop)
+        for field, value in (
+            ('strategy_name', snapshots.configs[config_id]['strategy_name']),
+            ('analysis_date', snapshots.refreshed_at.isoformat()),
+            ('algorithm_used', snapshots.algorithm)
+        ):
+            results[field] = np.full(stop, value, dtype=object)
+        return {
+            'success': True,
+            'config_id': config_id,
+            'total_results': stop,
+            **self._staleness(snapshots),
+            'results': results if columnar else rows_from_columns(results)
+        }
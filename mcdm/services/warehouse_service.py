@@ -0,0 +1,138 @@
+from datetime import datetime
+from services.data_service import DataService
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WarehouseService:
+    """
+    Warehouse locations and the nearest-warehouse distance of every site
+
+    potential_site.distance_to_warehouse is the distance to the nearest
+    active warehouse. recompute_distances refreshes it for all sites in one
+    bulk KD-tree query (see utils/warehouse_index.py) and writes back only
+    the sites whose nearest warehouse or distance changed.
+    """
+
+    def __init__(self):
+        self.data_service = DataService()
+
+    def list_warehouses(self, active_only: bool = False) -> dict:
+        """
+        Warehouse locations
+
+        Args:
+            active_only: Only warehouses with is_active set
+
+        Returns:
+            Dictionary with the warehouses
+        """
+        df = self.data_service.load_warehouses(active_only=active_only)
+        df['is_active'] = df['is_active'].astype(bool)
+        return {
+            'success': True,
+            'count': len(df),
+            'warehouses': df.to_dict('records')
+        }
+
+    def add_warehouse(self, code: str, name: str, x_coordinate: float,
+                      y_coordinate: float, recompute: bool = True) -> dict:
+        """
+        Add a warehouse and, by default, recompute site distances
+
+        Args:
+            code: Unique warehouse code
+            name: Display name
+            x_coordinate: Longitude in degrees
+            y_coordinate: Latitude in degrees
+            recompute: Recompute the nearest warehouse of every site
+
+        Returns:
+            Dictionary with the new warehouse ID and the recompute summary
+        """
+        if not code or not name:
+            raise ValueError("code and name are required")
+        x_coordinate, y_coordinate = self.validate_location(x_coordinate, y_coordinate)
+        if code in set(self.data_service.load_warehouses(active_only=False)['code']):
+            raise ValueError(f"Warehouse code already exists: {code}")
+
+        warehouse_id = self.data_service.add_warehouse(code, name, x_coordinate, y_coordinate)
+        result = {
+            'success': True,
+            'warehouse_id': int(warehouse_id)
+        }
+        if recompute:
+            result['recompute'] = self.recompute_distances()
+        return result
+
+    @staticmethod
+    def validate_location(x_coordinate, y_coordinate) -> tuple:
+        """(longitude, latitude) as floats, or ValueError"""
+        try:
+            lon, lat = float(x_coordinate), float(y_coordinate)
+        except (TypeError, ValueError):
+            raise ValueError("x_coordinate and y_coordinate must be numbers")
+        if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+            raise ValueError("x_coordinate must be a longitude and y_coordinate a latitude")
+        return lon, lat
+
+    def recompute_distances(self, metric: str = None) -> dict:
+        """
+        Recompute every site's distance to its nearest active warehouse
+
+        Args:
+            metric: 'haversine' or 'road' (None = Config.WAREHOUSE_DISTANCE_METRIC)
+
+        Returns:
+            Dictionary with counts and timings
+        """
+        import numpy as np
+        from utils.warehouse_index import WarehouseIndex, get_warehouse_distance
+
+        start = time.perf_counter()
+        distance = get_warehouse_distance(metric)
+
+        warehouses = self.data_service.load_warehouses()
+        if len(warehouses) == 0:
+            raise ValueError("No active warehouses")
+        sites = self.data_service.load_site_locations()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        compute_start = time.perf_counter()
+        index = WarehouseIndex(warehouses['id'], warehouses['x_coordinate'], warehouses['y_coordinate'])
+        site_ids = sites['id'].to_numpy(dtype=np.int64)
+        nearest_ids, km = index.nearest(site_ids, sites['x_coordinate'], sites['y_coordinate'], distance)
+        km = np.round(km, 2)
+
+        # Stored values are rounded to 0.01 km, so compare at that precision
+        current_km = np.round(sites['distance_to_warehouse'].to_numpy(dtype=np.float64), 2)
+        current_ids = sites['nearest_warehouse_id'].fillna(-1).to_numpy(dtype=np.int64)
+        changed = (nearest_ids != current_ids) | (km != current_km)
+        compute_ms = (time.perf_counter() - compute_start) * 1000
+
+        save_start = time.perf_counter()
+        updated = 0
+        if changed.any():
+            updated = self.data_service.update_site_columns(site_ids[changed], {
+                'distance_to_warehouse': km[changed],
+                'nearest_warehouse_id': nearest_ids[changed]
+            })
+        save_ms = (time.perf_counter() - save_start) * 1000
+
+        logger.info(f"Recomputed warehouse distances of {len(sites)} sites to "
+                    f"{len(warehouses)} warehouses ({distance.name}): {updated} changed")
+
+        return {
+            'success': True,
+            'metric': distance.name,
+            'warehouses': len(warehouses),
+            'sites': len(sites),
+            'sites_updated': updated,
+            'load_time_ms': round(load_ms, 1),
+            'compute_time_ms': round(compute_ms, 1),
+            'save_time_ms': round(save_ms, 1),
+            'execution_time_ms': round((time.perf_counter() - start) * 1000, 1),
+            'timestamp': datetime.now().isoformat()
+        }
@@ -0,0 +1,304 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from config import Config
+from services.data_service import DataService, DEFAULT_SITE_COLUMNS
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA, WEIGHT_COLUMNS
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ModelEntry:
+    """A what-if model and what it was built from"""
+    model: object
+    config: dict
+    data_version: str
+    site_ids: object        # (n_sites,) site id of every model row
+    site_codes: object      # (n_sites,) site code of every model row
+    site_lons: object       # (n_sites,) x_coordinate (NaN when unknown)
+    site_lats: object       # (n_sites,) y_coordinate (NaN when unknown)
+    row_by_id: dict
+    row_by_code: dict
+    checked_at: float
+
+
+# Per-worker models keyed by (config_id, normalization); config_id None is
+# the active configuration
+_models = OrderedDict()
+_models_lock = threading.Lock()
+
+
+class WhatIfService:
+    """
+    Score hypothetical edits of sites against an in-memory TOPSIS model
+
+    Nothing is written to MySQL. The model for a configuration is built on
+    first use and rebuilt when the site data or the weights change; these
+    are re-checked at most every Config.WHATIF_VERSION_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self.data_service = DataService()
+
+    def evaluate(self, changes: list, config_id: int = None,
+                 normalization: str = None) -> dict:
+        """
+        Score and rank of sites after hypothetical changes
+
+        Args:
+            changes: List of {"site_id" or "site_code", "set": {criterion: value},
+                "adjust_pct": {criterion: percent}}; all changes are applied
+                together
+            config_id: Expert criteria configuration ID (None = use active config)
+            normalization: Normalization strategy (None = Config.DEFAULT_NORMALIZATION)
+
+        Returns:
+            Dictionary with baseline and hypothetical score/rank per site
+        """
+        import numpy as np
+
+        start = time.perf_counter()
+
+        if not changes:
+            raise ValueError("At least one change is required")
+        if len(changes) > Config.WHATIF_MAX_SITES:
+            raise ValueError(f"At most {Config.WHATIF_MAX_SITES} sites can be changed at once")
+
+        normalization = (normalization or Config.DEFAULT_NORMALIZATION).lower()
+        entry = self._get_model(config_id, normalization)
+        model = entry.model
+        all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+
+        rows = []
+        for change in changes:
+            row = self._resolve_row(entry, change)
+            if row in rows:
+                raise ValueError(f"Site {entry.site_codes[row]} is changed more than once")
+            rows.append(row)
+
+        rows = np.array(rows, dtype=np.int64)
+        new_values = model.matrix[rows].copy()
+        for i, change in enumerate(changes):
+            for criterion, value in (change.get('set') or {}).items():
+                new_values[i, self._criterion_index(all_criteria, criterion)] = float(value)
+            for criterion, pct in (change.get('adjust_pct') or {}).items():
+                new_values[i, self._criterion_index(all_criteria, criterion)] *= 1 + float(pct) / 100
+
+        scores, ranks = model.evaluate(rows, new_values)
+        baseline_scores = model.scores[rows]
+        baseline_ranks = model.rank_of_score(baseline_scores)
+
+        results = []
+        for i, row in enumerate(rows):
+            edited = np.flatnonzero(new_values[i] != model.matrix[row])
+            results.append({
+                'site_id': int(entry.site_ids[row]),
+                'site_code': entry.site_codes[row],
+                'changes': {
+                    all_criteria[j]: {
+                        'from': float(model.matrix[row, j]),
+                        'to': float(new_values[i, j])
+                    }
+                    for j in edited
+                },
+                'baseline_score': round(float(baseline_scores[i]), 6),
+                'baseline_rank': int(baseline_ranks[i]),
+                'score': round(float(scores[i]), 6),
+                'rank': int(ranks[i]),
+                'rank_change': int(baseline_ranks[i] - ranks[i])
+            })
+
+        return {
+            'success': True,
+            'algorithm': 'TOPSIS',
+            'normalization': normalization,
+            'strategy_name': entry.config['strategy_name'],
+            'config_id': entry.config['id'],
+            'sites_analyzed': model.n_sites,
+            'execution_time_ms': round((time.perf_counter() - start) * 1000, 3),
+            'timestamp': datetime.now().isoformat(),
+            'results': results
+        }
+
+    def evaluate_warehouse(self, x_coordinate: float, y_coordinate: float,
+                           config_id: int = None, normalization: str = None,
+                           metric: str = None, limit: int = 20) -> dict:
+        """
+        Score and rank of sites if a warehouse were added at a location
+
+        Only the sites the new warehouse would be nearer to than their
+        current nearest one get a new distance_to_warehouse; those rows are
+        re-scored together against the model.
+
+        Args:
+            x_coordinate: Longitude of the new warehouse
+            y_coordinate: Latitude of the new warehouse
+            config_id: Expert criteria configuration ID (None = use active config)
+            normalization: Normalization strategy (None = Config.DEFAULT_NORMALIZATION)
+            metric: 'haversine' or 'road' (None = Config.WAREHOUSE_DISTANCE_METRIC)
+            limit: Number of changed sites to list, largest rank gain first
+
+        Returns:
+            Dictionary with counts and the sites gaining the most ranks
+        """
+        import numpy as np
+        from services.warehouse_service import WarehouseService
+        from utils.warehouse_index import WarehouseIndex, get_warehouse_distance
+
+        start = time.perf_counter()
+
+        lon, lat = WarehouseService.validate_location(x_coordinate, y_coordinate)
+        distance = get_warehouse_distance(metric)
+        normalization = (normalization or Config.DEFAULT_NORMALIZATION).lower()
+        entry = self._get_model(config_id, normalization)
+        model = entry.model
+        column = (COST_CRITERIA + BENEFIT_CRITERIA).index('distance_to_warehouse')
+
+        # id -1: a planned warehouse, never in the road matrix
+        new_km = np.round(WarehouseIndex.distances_to(
+            -1, lon, lat, entry.site_ids, entry.site_lons, entry.site_lats, distance
+        ), 2)
+        current_km = model.matrix[:, column]
+        with np.errstate(invalid='ignore'):
+            rows = np.flatnonzero(new_km < current_km)
+
+        results = []
+        if len(rows):
+            new_values = model.matrix[rows].copy()
+            new_values[:, column] = new_km[rows]
+            scores, ranks = model.evaluate(rows, new_values)
+            baseline_scores = model.scores[rows]
+            baseline_ranks = model.rank_of_score(baseline_scores)
+            rank_change = baseline_ranks - ranks
+
+            for i in np.argsort(-rank_change, kind='stable')[:limit]:
+                row = rows[i]
+                results.append({
+                    'site_id': int(entry.site_ids[row]),
+                    'site_code': entry.site_codes[row],
+                    'distance_from': float(current_km[row]),
+                    'distance_to': float(new_km[row]),
+                    'baseline_score': round(float(baseline_scores[i]), 6),
+                    'baseline_rank': int(baseline_ranks[i]),
+                    'score': round(float(scores[i]), 6),
+                    'rank': int(ranks[i]),
+                    'rank_change': int(rank_change[i])
+                })
+
+        return {
+            'success': True,
+            'algorithm': 'TOPSIS',
+            'normalization': normalization,
+            'strategy_name': entry.config['strategy_name'],
+            'config_id': entry.config['id'],
+            'warehouse': {'x_coordinate': lon, 'y_coordinate': lat, 'metric': distance.name},
+            'sites_analyzed': model.n_sites,
+            'sites_changed': len(rows),
+            'mean_distance_saved': (round(float((current_km[rows] - new_km[rows]).mean()), 3)
+                                    if len(rows) else 0.0),
+            'execution_time_ms': round((time.perf_counter() - start) * 1000, 3),
+            'timestamp': datetime.now().isoformat(),
+            'results': results
+        }
+
+    def _criterion_index(self, all_criteria: list, criterion: str) -> int:
+        if criterion not in all_criteria:
+            raise ValueError(f"Unknown criterion: {criterion}. Supported: {all_criteria}")
+        return all_criteria.index(criterion)
+
+    def _resolve_row(self, entry: _ModelEntry, change: dict) -> int:
+        """Model row of the site referenced by a change"""
+        if 'site_id' in change:
+            row = entry.row_by_id.get(int(change['site_id']))
+        elif 'site_code' in change:
+            row = entry.row_by_code.get(change['site_code'])
+        else:
+            raise ValueError("Each change needs a site_id or site_code")
+
+        if row is None:
+            site = change.get('site_id', change.get('site_code'))
+            raise ValueError(f"Site not found among active sites: {site}")
+        return row
+
+    def _get_model(self, config_id: int, normalization: str) -> _ModelEntry:
+        """Cached model, rebuilt when the site data or weights changed"""
+        key = (config_id, normalization)
+
+        with _models_lock:
+            entry = _models.get(key)
+            if entry is not None:
+                _models.move_to_end(key)
+
+        if entry is not None:
+            if time.monotonic() - entry.checked_at < Config.WHATIF_VERSION_TTL_SECONDS:
+                return entry
+            if (self.data_service.get_data_version() == entry.data_version
+                    and self._same_weights(self.data_service.load_config(config_id), entry.config)):
+                entry.checked_at = time.monotonic()
+                return entry
+
+        entry = self._build_model(config_id, normalization)
+
+        with _models_lock:
+            _models[key] = entry
+            _models.move_to_end(key)
+            while len(_models) > Config.WHATIF_MAX_MODELS:
+                _models.popitem(last=False)
+        return entry
+
+    def _same_weights(self, config: dict, cached: dict) -> bool:
+        return config['id'] == cached['id'] and all(
+            config[column] == cached[column] for column in WEIGHT_COLUMNS.values()
+        )
+
+    def _build_model(self, config_id: int, normalization: str) -> _ModelEntry:
+        import numpy as np
+        from algorithms import AlgorithmFactory
+        from algorithms.whatif import TopsisWhatIfModel
+
+        start = time.perf_counter()
+
+        config = self.data_service.load_config(config_id)
+        df = self.data_service.load_sites(
+            columns=DEFAULT_SITE_COLUMNS + ['x_coordinate', 'y_coordinate']
+        )
+        if len(df) == 0:
+            raise ValueError("No sites found to analyze")
+
+        weights = {criterion: config[column] for criterion, column in WEIGHT_COLUMNS.items()}
+        all_criteria = COST_CRITERIA + BENEFIT_CRITERIA
+
+        algo = AlgorithmFactory.create('topsis', normalization=normalization)
+        algo.validate_inputs(df, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+
+        matrix = df[all_criteria].to_numpy(dtype=np.float64)
+        model = TopsisWhatIfModel(
+            matrix,
+            np.array([weights[c] for c in all_criteria], dtype=np.float64),
+            len(COST_CRITERIA),
+            normalization=normalization,
+            stats=algo.column_statistics(df, all_criteria, matrix)
+        )
+
+        site_ids = df['id'].to_numpy()
+        site_codes = df['site_code'].to_numpy()
+        logger.info(f"Built what-if model for config {config['id']} ({normalization}, "
+                    f"{len(df)} sites) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        return _ModelEntry(
+            model=model,
+            config=config,
+            # None (data changed while loading) forces a rebuild at the next check
+            data_version=df.attrs.get('data_version'),
+            site_ids=site_ids,
+            site_codes=site_codes,
+            site_lons=df['x_coordinate'].to_numpy(dtype=np.float64, na_value=np.nan),
+            site_lats=df['y_coordinate'].to_numpy(dtype=np.float64, na_value=np.nan),
+            row_by_id={int(site_id): row for row, site_id in enumerate(site_ids)},
+            row_by_code={code: row for row, code in enumerate(site_codes)},
+            checked_at=time.monotonic()
+        )
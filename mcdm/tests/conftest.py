@@ -0,0 +1,34 @@
+"""
+Shared fixtures: synthetic sites in the value ranges of generate_data.py
+
+Run from the mcdm/ directory with `pytest` (make test-mcdm).
+"""
+import numpy as np
+import pytest
+from benchmarks.fuzzy_topsis_benchmark import WEIGHTS, make_sites
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+
+CRITERIA = COST_CRITERIA + BENEFIT_CRITERIA
+N_COST = len(COST_CRITERIA)
+
+
+@pytest.fixture
+def sites():
+    """600 sites in three districts of different size"""
+    df = make_sites(600)
+    df['id'] = np.arange(1, len(df) + 1)
+    df['district'] = np.random.default_rng(7).choice(['D1', 'D3', 'D7'], len(df), p=[0.5, 0.3, 0.2])
+    return df
+
+
+@pytest.fixture
+def weights():
+    return dict(WEIGHTS)
+
+
+@pytest.fixture
+def weight_rows(weights):
+    """Expert weights and four random re-weightings, one per row"""
+    base = np.array([weights[c] for c in CRITERIA])
+    rows = np.random.default_rng(3).dirichlet(np.ones(len(CRITERIA)), 4)
+    return np.vstack([base, rows])
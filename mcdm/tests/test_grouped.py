@@ -0,0 +1,21 @@
+"""analyze_grouped() against separate analyze() runs per group"""
+import numpy as np
+import pytest
+from algorithms import AlgorithmFactory
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+
+
+@pytest.mark.parametrize('name, normalization', [
+    ('topsis', 'vector'), ('topsis', 'minmax'), ('topsis', 'log'),
+    # Fuzzy TOPSIS has its own linear fuzzy normalization
+    ('fuzzy_topsis', None)
+])
+def test_grouped_matches_per_group_runs(name, normalization, sites, weights):
+    algo = AlgorithmFactory.create(name, normalization=normalization)
+    grouped = algo.analyze_grouped(sites, weights, COST_CRITERIA, BENEFIT_CRITERIA, 'district')
+
+    for district, part in grouped.groupby('district'):
+        alone = algo.analyze(sites[sites['district'] == district], weights, COST_CRITERIA, BENEFIT_CRITERIA)
+        alone = alone.set_index('id').loc[part['id']]
+        assert np.allclose(part['topsis_score'], alone['topsis_score'], rtol=1e-10, atol=1e-12)
+        assert (part['rank_position'].to_numpy() == alone['rank_position'].to_numpy()).all()
@@ -0,0 +1,49 @@
+"""Batched and stacked matrix scoring against one score_matrix() call at a time"""
+import numpy as np
+import pytest
+from algorithms import AlgorithmFactory
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from tests.conftest import CRITERIA, N_COST
+
+# Fuzzy TOPSIS has its own linear fuzzy normalization
+ALGORITHMS = [(name, normalization) for name in ['topsis']
+              for normalization in ['vector', 'minmax', 'zscore', 'max', 'log']] + [('fuzzy_topsis', None)]
+
+
+def scoring(name, normalization, sites):
+    algo = AlgorithmFactory.create(name, normalization=normalization)
+    # Stored bounds are optional columns; the fixture has them for traffic_score only
+    df = sites[[column for column in algo.required_columns(CRITERIA) if column in sites]]
+    return algo, df[CRITERIA].to_numpy(dtype=np.float64), algo.matrix_options(df, CRITERIA)
+
+
+@pytest.mark.parametrize('name, normalization', ALGORITHMS)
+def test_batch_matches_single(name, normalization, sites, weight_rows):
+    algo, matrix, options = scoring(name, normalization, sites)
+    batch = algo.score_matrix_batch(matrix, weight_rows, N_COST, **options)
+    single = np.column_stack([algo.score_matrix(matrix, w, N_COST, **options) for w in weight_rows])
+    assert batch.shape == (len(matrix), len(weight_rows))
+    assert np.allclose(batch, single, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize('name, normalization', ALGORITHMS)
+def test_stack_matches_single(name, normalization, sites, weight_rows):
+    algo, matrix, options = scoring(name, normalization, sites)
+    rng = np.random.default_rng(11)
+    stack = matrix * rng.uniform(0.9, 1.1, (3,) + matrix.shape)
+    stacked = algo.score_matrix_stack(stack, weight_rows[0], N_COST, **options)
+    single = np.stack([algo.score_matrix(m, weight_rows[0], N_COST, **options) for m in stack])
+    assert np.allclose(stacked, single, rtol=1e-10, atol=1e-12)
+
+
+def test_fuzzy_matrix_scoring_matches_analyze(sites, weights, weight_rows):
+    """Stored bounds and the FUZZY_CRITERIA spread carry over to the matrix kernels"""
+    algo, matrix, options = scoring('fuzzy_topsis', None, sites)
+    expected = algo.analyze(sites, weights, COST_CRITERIA, BENEFIT_CRITERIA)['topsis_score'].to_numpy()
+
+    assert np.allclose(algo.score_matrix(matrix, weight_rows[0], N_COST, **options), expected)
+    assert np.allclose(algo.score_matrix_batch(matrix, weight_rows, N_COST, **options)[:, 0], expected)
+
+    # The fuzzy kernel differs from the crisp one it inherits from
+    crisp = AlgorithmFactory.create('topsis')
+    assert not np.allclose(crisp.score_matrix_batch(matrix, weight_rows, N_COST)[:, 0], expected)
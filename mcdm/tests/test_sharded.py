@@ -0,0 +1,37 @@
+"""Sharded scoring against one analyze() over the concatenated sites"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from algorithms import AlgorithmFactory
+from algorithms.sharded import merge_top_k, score_shards
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+
+
+@pytest.mark.parametrize('normalization', ['vector', 'minmax', 'zscore', 'log'])
+def test_sharded_matches_global(normalization, sites, weights):
+    algo = AlgorithmFactory.create('topsis', normalization=normalization)
+    # Districts differ in level, so the merged statistics matter
+    frames = [part.assign(rent_cost=part['rent_cost'] * (1 + 0.2 * i)).reset_index(drop=True)
+              for i, (_, part) in enumerate(sites.groupby('district'))]
+    frames.append(sites.iloc[:0])
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results, _ = score_shards(frames, algo, weights, COST_CRITERIA, BENEFIT_CRITERIA, pool)
+    reference = algo.analyze(pd.concat(frames, ignore_index=True), weights, COST_CRITERIA, BENEFIT_CRITERIA)
+
+    scores = np.concatenate([df['topsis_score'].to_numpy() for df in results])
+    ranks = np.concatenate([df['rank_position'].to_numpy() for df in results])
+    assert np.allclose(scores, reference['topsis_score'], rtol=1e-10, atol=1e-12)
+    assert (ranks == reference['rank_position'].to_numpy()).all()
+
+    top = merge_top_k([df['topsis_score'].to_numpy() for df in results],
+                      [df['id'].to_numpy() for df in results], 10)
+    top_scores = [results[index]['topsis_score'].iloc[row] for index, row in top]
+    assert np.allclose(top_scores, np.sort(reference['topsis_score'].to_numpy())[::-1][:10])
+
+
+def test_non_shardable_algorithm_is_rejected(sites, weights):
+    algo = AlgorithmFactory.create('fuzzy_topsis')
+    with ThreadPoolExecutor(max_workers=1) as pool, pytest.raises(ValueError):
+        score_shards([sites], algo, weights, COST_CRITERIA, BENEFIT_CRITERIA, pool)
@@ -0,0 +1,24 @@
+"""Skyband pre-filter: the top k of the reduced set equals the full top k"""
+import numpy as np
+from algorithms import AlgorithmFactory
+from algorithms.skyline import skyband_mask
+from services.analysis_service import COST_CRITERIA, BENEFIT_CRITERIA
+from tests.conftest import CRITERIA, N_COST
+
+
+def test_skyband_keeps_top_k(sites, weights, weight_rows):
+    algo = AlgorithmFactory.create('topsis')
+    k = 5
+    matrix = sites[CRITERIA].to_numpy(dtype=np.float64)
+    mask = skyband_mask(matrix, N_COST, k, block_size=64)
+    assert mask.sum() < len(sites)
+
+    reduced = sites[mask].copy()
+    reduced.attrs['column_stats'] = (tuple(CRITERIA), algo.column_statistics(sites, CRITERIA, matrix))
+    for row in weight_rows:
+        weights = dict(zip(CRITERIA, row))
+        full = algo.analyze(sites, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+        part = algo.analyze(reduced, weights, COST_CRITERIA, BENEFIT_CRITERIA)
+        top_full = full.nsmallest(k, 'rank_position')['topsis_score'].to_numpy()
+        top_part = part.nsmallest(k, 'rank_position')['topsis_score'].to_numpy()
+        assert np.allclose(top_full, top_part)
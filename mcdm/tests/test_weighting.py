@@ -0,0 +1,51 @@
+"""Objective weights from column statistics against the textbook formulas"""
+import numpy as np
+import pytest
+from algorithms.normalization import ColumnStatistics, shift_for_log
+from algorithms.weighting import OBJECTIVE_WEIGHTINGS, entropy_weights, objective_weights
+from benchmarks.weighting_benchmark import direct_weights
+from tests.conftest import CRITERIA, N_COST
+
+
+def textbook_entropy(matrix):
+    """Shares of the plain values; only columns with negatives are shifted"""
+    low = matrix.min(axis=0)
+    values = matrix + np.where(low >= 0, 0.0, -low)
+    shares = values / values.sum(axis=0)
+    logs = np.log(shares, out=np.zeros_like(shares), where=shares > 0)
+    entropy = -(shares * logs).sum(axis=0) / np.log(len(matrix))
+    return (1 - entropy) / (1 - entropy).sum()
+
+
+@pytest.fixture
+def matrix(sites):
+    return sites[CRITERIA].to_numpy(dtype=np.float64)
+
+
+@pytest.mark.parametrize('method', sorted(OBJECTIVE_WEIGHTINGS))
+def test_weights_match_direct_computation(method, matrix):
+    expected = direct_weights(matrix, N_COST)[method]
+    assert np.allclose(objective_weights(method, ColumnStatistics.from_matrix(matrix), N_COST), expected)
+
+
+def test_entropy_uses_unshifted_shares(matrix):
+    # Shares in [0, 1) and a column with zeros: shifting them (e.g. to the
+    # minimum of 1 that log normalization uses) changes the weights
+    matrix = matrix.copy()
+    matrix[:, 6] /= 10
+    matrix[:, 2] = np.where(matrix[:, 2] < 3, 0.0, matrix[:, 2])
+    expected = textbook_entropy(matrix)
+    assert not np.allclose(textbook_entropy(matrix + shift_for_log(matrix.min(axis=0))), expected)
+    assert np.allclose(entropy_weights(ColumnStatistics.from_matrix(matrix)), expected)
+
+
+def test_entropy_shifts_negative_columns(matrix):
+    matrix = matrix.copy()
+    matrix[:, 1] -= matrix[:, 1].mean()
+    assert np.allclose(entropy_weights(ColumnStatistics.from_matrix(matrix)), textbook_entropy(matrix))
+
+
+def test_entropy_from_merged_statistics(matrix):
+    parts = [ColumnStatistics.from_matrix(chunk) for chunk in np.array_split(matrix, 4)]
+    merged = ColumnStatistics.merge(parts)
+    assert np.allclose(entropy_weights(merged), textbook_entropy(matrix))
@@ -0,0 +1,40 @@
+"""TopsisWhatIfModel.evaluate() against re-scoring the edited matrix"""
+import numpy as np
+import pandas as pd
+import pytest
+from algorithms import AlgorithmFactory
+from algorithms.whatif import TopsisWhatIfModel
+from tests.conftest import CRITERIA, N_COST
+
+
+def full_rescore(matrix, weights, normalization, rows, new_values):
+    edited = matrix.copy()
+    edited[rows] = new_values
+    scores = AlgorithmFactory.create('topsis', normalization=normalization).score_matrix(edited, weights, N_COST)
+    ranks = pd.Series(scores).rank(ascending=False, method='min').astype(int).to_numpy()
+    return scores[rows], ranks[rows]
+
+
+@pytest.mark.parametrize('normalization', ['vector', 'minmax', 'zscore', 'max', 'log'])
+@pytest.mark.parametrize('edit', ['small', 'new_extreme', 'remove_extreme'])
+def test_evaluate_matches_full_rescore(normalization, edit, sites, weights):
+    matrix = sites[CRITERIA].to_numpy(dtype=np.float64)
+    weights = np.array([weights[c] for c in CRITERIA])
+    model = TopsisWhatIfModel(matrix, weights, N_COST, normalization)
+
+    rows = np.array([3, 40, 41])
+    new_values = matrix[rows].copy()
+    if edit == 'small':
+        new_values *= 1.05
+    elif edit == 'new_extreme':
+        new_values[:, -1] = matrix[:, -1].max() * 2
+        new_values[:, 0] = matrix[:, 0].min() / 2
+    else:
+        # Edit the rows holding column extremes, so min/max fall back to others
+        rows = np.array([matrix[:, 0].argmin(), matrix[:, -1].argmax()])
+        new_values = np.tile(np.median(matrix, axis=0), (2, 1))
+
+    scores, ranks = model.evaluate(rows, new_values)
+    expected_scores, expected_ranks = full_rescore(matrix, weights, normalization, rows, new_values)
+    assert np.allclose(scores, expected_scores, rtol=1e-9, atol=1e-12)
+    assert (ranks == expected_ranks).all()
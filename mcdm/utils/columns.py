@@ -0,0 +1,25 @@
+"""
+Column-oriented result rows
+
+Result lists are built as {field: array} straight from the DataFrame or
+index arrays. JSON and MessagePack responses expand them to one dict per
+row; Arrow IPC responses encode the arrays as they are.
+"""
+
+
+def _as_list(values) -> list:
+    # NumPy arrays convert to Python scalars in one C-level pass
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def rows_from_columns(columns: dict) -> list:
+    """{field: values} -> [{field: value, ...}, ...]"""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*(_as_list(v) for v in columns.values()))]
+
+
+def columns_from_rows(rows: list) -> dict:
+    """[{field: value, ...}, ...] -> {field: [values]} (fields of the first row)"""
+    if not rows:
+        return {}
+    return {name: [row.get(name) for row in rows] for name in rows[0]}
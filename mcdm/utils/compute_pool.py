@@ -0,0 +1,244 @@
+"""
+Managed process pool for the CPU-bound algorithm kernels
+
+Request threads of a gunicorn worker share one GIL, so a large analysis run
+on a request thread stalls the health probes and every light read of that
+worker. Kernels therefore run in a per-worker pool of warm processes (the
+initializer imports and runs every algorithm once), with inputs passed
+through shared memory (utils/shared_array.py) rather than pickled DataFrames.
+
+Admission is bounded: a request takes a job slot with admit() before it
+touches the pool, and when Config.COMPUTE_MAX_JOBS jobs are already running
+or waiting it is refused with ComputePoolSaturated (HTTP 429) instead of
+queueing without limit. Tasks submitted inside a job are not counted again,
+so a job that fans out (consensus, bootstrap) cannot be refused half-way.
+
+InlinePool has the same admit/submit/run interface and runs every task on
+the calling thread, for when the pool is disabled (COMPUTE_POOL_ENABLED).
+
+A worker that dies (OOM kill, crash) breaks a ProcessPoolExecutor for good;
+the pool then replaces the executor with fresh workers, so only the tasks
+that were in flight fail.
+
+Kept dependency-free (no pandas/NumPy) like utils/metrics.py: the gauges are
+read by /api/metrics.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+import logging
+import multiprocessing
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ComputePoolSaturated(RuntimeError):
+    """Every job slot of the compute pool is taken"""
+
+    def __init__(self, max_jobs: int, retry_after: int = 1):
+        super().__init__(f"Compute pool is saturated ({max_jobs} jobs in progress), retry later")
+        self.retry_after = retry_after
+
+
+def _warm_worker():
+    """Pool initializer: import and run every algorithm kernel once"""
+    from algorithms import AlgorithmFactory
+    AlgorithmFactory.warm_up()
+
+
+def _ping() -> int:
+    import os
+    return os.getpid()
+
+
+def _timed_call(fn, args: tuple, kwargs: dict) -> tuple:
+    """Run a task in the worker, reporting when it started and how long it ran"""
+    started = time.time()
+    begin = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, started, time.perf_counter() - begin
+
+
+class ComputePool:
+    """
+    Process pool with warm workers, bounded admission and utilization counters
+
+    Args:
+        workers: Number of worker processes
+        max_jobs: Jobs (admitted requests) allowed to run or wait at once
+        start_method: multiprocessing start method of the workers
+    """
+
+    def __init__(self, workers: int, max_jobs: int, start_method: str = 'spawn'):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.start_method = start_method
+        self._executor = self._new_executor()
+        self._lock = threading.Lock()
+        self._jobs = 0
+        self._pending = 0
+        self._busy_seconds = 0.0
+        self._restarts = 0
+        self._started_at = time.monotonic()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_warm_worker
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a broken executor, once however many tasks saw it break"""
+        from utils.metrics import metrics
+
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self._restarts += 1
+        logger.warning("Compute pool worker died; replaced the pool with new worker processes")
+        metrics.increment('compute_pool_restarts')
+        broken.shutdown(wait=False)
+
+    def start(self):
+        """
+        Spawn every worker now instead of on the first request
+
+        Returns at once; the workers import the algorithms in the background.
+        """
+        for _ in range(self.workers):
+            self._executor.submit(_ping)
+
+    @contextmanager
+    def admit(self):
+        """
+        Hold a job slot for the duration of the block
+
+        Raises:
+            ComputePoolSaturated: when max_jobs jobs are already in progress
+        """
+        from utils.metrics import metrics
+
+        with self._lock:
+            admitted = self._jobs < self.max_jobs
+            if admitted:
+                self._jobs += 1
+        if not admitted:
+            metrics.increment('compute_jobs', outcome='rejected')
+            raise ComputePoolSaturated(self.max_jobs)
+
+        metrics.increment('compute_jobs', outcome='admitted')
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._jobs -= 1
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) in a worker (ProcessPoolExecutor.submit interface)
+
+        `fn` and its arguments are pickled: pass SharedArray specs, not arrays.
+        A task running when a worker died fails with BrokenProcessPool; the
+        pool is replaced, so later tasks run on new workers.
+        """
+        future = Future()
+        submitted = time.time()
+        executor = self._executor
+        try:
+            inner = executor.submit(_timed_call, fn, args, kwargs)
+        except BrokenProcessPool:
+            self._restart(executor)
+            executor = self._executor
+            inner = executor.submit(_timed_call, fn, args, kwargs)
+        with self._lock:
+            self._pending += 1
+
+        def done(inner: Future):
+            from utils.metrics import metrics
+
+            error = inner.exception()
+            if error is not None:
+                with self._lock:
+                    self._pending -= 1
+                if isinstance(error, BrokenProcessPool):
+                    self._restart(executor)
+                metrics.increment('compute_tasks', outcome='failed')
+                future.set_exception(error)
+                return
+
+            result, started, seconds = inner.result()
+            with self._lock:
+                self._pending -= 1
+                self._busy_seconds += seconds
+            metrics.increment('compute_tasks', outcome='completed')
+            metrics.increment('compute_busy_ms', int(seconds * 1000))
+            metrics.increment('compute_queue_wait_ms', max(int((started - submitted) * 1000), 0))
+            future.set_result(result)
+
+        future.set_running_or_notify_cancel()
+        inner.add_done_callback(done)
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """
+        submit() and wait for the result
+
+        Tasks are pure computations, so one that failed because a worker
+        died is run once more on the replacement workers.
+        """
+        try:
+            return self.submit(fn, *args, **kwargs).result()
+        except BrokenProcessPool:
+            logger.warning(f"Compute pool task {getattr(fn, '__name__', fn)} lost with its worker, retrying once")
+            return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self) -> dict:
+        """
+        Current load of the pool
+
+        Returns:
+            Dictionary with the workers, jobs in progress, tasks not yet
+            finished, the busy seconds summed over workers, the utilization
+            since the pool started (busy / (workers x uptime)) and how often
+            the workers were replaced after one died
+        """
+        with self._lock:
+            jobs, pending, busy = self._jobs, self._pending, self._busy_seconds
+            restarts = self._restarts
+        uptime = time.monotonic() - self._started_at
+        return {
+            'workers': self.workers,
+            'max_jobs': self.max_jobs,
+            'jobs_in_progress': jobs,
+            'tasks_pending': pending,
+            'busy_seconds': round(busy, 3),
+            'utilization': round(busy / (self.workers * uptime), 4) if uptime > 0 else 0.0,
+            'restarts': restarts
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class InlinePool:
+    """Stand-in for ComputePool that runs every task on the calling thread"""
+
+    @contextmanager
+    def admit(self):
+        yield
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run the task now; its result or exception is in the returned future"""
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
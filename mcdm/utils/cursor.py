@@ -0,0 +1,51 @@
+"""
+Opaque pagination cursors
+
+A cursor carries the sort key of the last item of a page (keyset
+pagination), tagged with the kind of listing it belongs to, as URL-safe
+base64 JSON. Clients pass it back unchanged to get the next page.
+"""
+import base64
+import binascii
+import json
+
+
+def encode_cursor(kind: str, *values) -> str:
+    """
+    Cursor resuming a `kind` listing after `values`
+
+    Args:
+        kind: Listing the cursor belongs to (checked by decode_cursor)
+        values: JSON-serializable sort key of the last item returned
+
+    Returns:
+        URL-safe token
+    """
+    payload = json.dumps([kind, *values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(token: str, kind: str, size: int) -> list:
+    """
+    Sort key carried by a cursor of encode_cursor
+
+    Args:
+        token: Cursor sent by the client
+        kind: Listing the cursor must belong to
+        size: Number of values the sort key has
+
+    Returns:
+        The values passed to encode_cursor
+
+    Raises:
+        ValueError: Malformed cursor, or one of another listing
+    """
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if (not isinstance(values, list) or len(values) != size + 1 or values[0] != kind
+            or not all(isinstance(value, (str, int, float)) for value in values[1:])):
+        raise ValueError("Invalid cursor")
+    return values[1:]
@@ -1,29 +1,175 @@
-import mysql.connector
+from contextlib import contextmanager
 from config import Config
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by all request threads of a worker process.
+# It is created lazily so that importing this module stays cheap and so that
+# a gunicorn master (preload mode) never hands open sockets to its children.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _connection_kwargs():
+    return dict(
+        host=Config.DB_HOST,
+        port=Config.DB_PORT,
+        user=Config.DB_USER,
+        password=Config.DB_PASSWORD,
+        database=Config.DB_NAME,
+        charset=Config.DB_CHARSET
+    )
+
+
+def get_pool():
+    """
+    Return the per-process MySQL connection pool, creating it on first use
+    """
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from mysql.connector import pooling
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=Config.DB_POOL_NAME,
+                    pool_size=Config.DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    **_connection_kwargs()
+                )
+                logger.info(f"Created MySQL connection pool (size={Config.DB_POOL_SIZE})")
+    return _pool
+
+
+def reset_pool():
+    """
+    Drop the current pool so the next caller builds a fresh one.
+
+    Called after gunicorn forks a worker: connections opened by the master
+    while warming up must not be shared between processes.
+    """
+    global _pool
+    if Config.DB_BACKEND == 'sqlite':
+        from utils.embedded_db import reset_connections
+        reset_connections()
+        return
+    with _pool_lock:
+        if _pool is not None:
+            try:
+                _pool._remove_connections()
+            except Exception as e:
+                logger.warning(f"Error closing pooled connections: {e}")
+        _pool = None
+
 
 def get_db_connection():
     """
-    Create and return a MySQL database connection
+    Create and return a database connection of Config.DB_BACKEND
+
+    MySQL connections come from the pool; calling close() returns them to
+    it. When the pool is exhausted a dedicated connection is opened instead.
+    With the embedded backend the calling thread's SQLite connection is
+    returned (see utils/embedded_db.py).
     """
+    if Config.DB_BACKEND == 'sqlite':
+        from utils.embedded_db import connect
+        return connect(Config.DB_PATH)
+    if Config.DB_BACKEND != 'mysql':
+        raise ValueError(f"Unsupported DB_BACKEND: {Config.DB_BACKEND}. "
+                         f"Supported: {Config.SUPPORTED_DB_BACKENDS}")
+
+    import mysql.connector
+    from mysql.connector import errors
+
+    try:
+        return get_pool().get_connection()
+    except errors.PoolError:
+        logger.warning("Connection pool exhausted, opening a dedicated connection")
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        raise
+
     try:
-        conn = mysql.connector.connect(
-            host=Config.DB_HOST,
-            port=Config.DB_PORT,
-            user=Config.DB_USER,
-            password=Config.DB_PASSWORD,
-            database=Config.DB_NAME,
-            charset=Config.DB_CHARSET
-        )
-        return conn
+        return mysql.connector.connect(**_connection_kwargs())
     except mysql.connector.Error as err:
         logger.error(f"Database connection error: {err}")
         raise
 
 
+@contextmanager
+def advisory_lock(name: str, timeout: float):
+    """
+    Hold a MySQL named lock (GET_LOCK) for the duration of the block
+    
+    The lock belongs to the session of a dedicated pooled connection, so it
+    is shared by every worker process using the same database.
+    
+    Args:
+        name: Lock name (at most 64 characters)
+        timeout: Seconds to wait for the lock
+    
+    Yields:
+        True when the lock was acquired, False on timeout
+    """
+    if Config.DB_BACKEND == 'sqlite':
+        # SQLite has no named locks; callers fall back to per-worker
+        # coalescing and the recent-batch lookup
+        yield True
+        return
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    acquired = False
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+        acquired = cursor.fetchone()[0] == 1
+        yield acquired
+    finally:
+        try:
+            if acquired:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+                cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def check_pool_health() -> dict:
+    """
+    Borrow a pooled connection and run a trivial query
+
+    Returns:
+        Dictionary with 'healthy' flag, round-trip latency and pool size
+    """
+    start = time.perf_counter()
+    try:
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        return {
+            'healthy': True,
+            'backend': Config.DB_BACKEND,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'pool_size': Config.DB_POOL_SIZE
+        }
+    except Exception as e:
+        logger.error(f"Database readiness check failed: {e}")
+        return {
+            'healthy': False,
+            'backend': Config.DB_BACKEND,
+            'error': str(e),
+            'pool_size': Config.DB_POOL_SIZE
+        }
+
+
 def test_connection():
     """Test database connection"""
     try:
@@ -37,4 +183,3 @@ def test_connection():
     except Exception as e:
         logger.error(f"Connection test failed: {e}")
         return False
-
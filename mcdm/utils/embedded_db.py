@@ -0,0 +1,152 @@
+"""
+Embedded SQLite backend (Config.DB_BACKEND = 'sqlite')
+
+Runs the service against a single database file instead of the MySQL
+server: no network round trip, no server process, same queries. The
+connections accept the mysql.connector conventions the services use:
+'%s' placeholders and cursor(dictionary=True). A new file gets the schema
+and sample data of embedded_schema.sql (the SQLite dialect of
+mysql/init/01-schema.sql).
+
+Each thread keeps one open connection per file and close() only ends its
+transaction, so a request pays no connect cost; connections inherited
+across fork are never reused. The file must be on a local disk (SQLite
+locking is unreliable on network filesystems); ':memory:' is not supported
+since every thread would see its own empty database.
+"""
+from pathlib import Path
+import logging
+import math
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = Path(__file__).with_name('embedded_schema.sql')
+
+# Per-thread connections, keyed by file path
+_local = threading.local()
+_schema_lock = threading.Lock()
+
+
+class _Cursor(sqlite3.Cursor):
+    """Cursor taking mysql.connector style '%s' placeholders"""
+
+    def execute(self, sql, parameters=()):
+        return super().execute(sql.replace('%s', '?'), parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return super().executemany(sql.replace('%s', '?'), seq_of_parameters)
+
+
+class _DictCursor(_Cursor):
+    """Cursor returning rows as dicts, like cursor(dictionary=True)"""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.row_factory = lambda cursor, row: {
+            column[0]: value for column, value in zip(cursor.description, row)
+        }
+
+
+class _StddevPop:
+    """STDDEV_POP aggregate (Welford), which SQLite does not provide"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        return math.sqrt(self.m2 / self.count) if self.count else None
+
+
+class EmbeddedConnection(sqlite3.Connection):
+    """
+    sqlite3 connection shared by the calls of one thread
+
+    Still a sqlite3.Connection, so pandas.read_sql uses it natively.
+    """
+
+    def cursor(self, factory=None, dictionary=False):
+        if factory is None:
+            factory = _DictCursor if dictionary else _Cursor
+        return super().cursor(factory)
+
+    def close(self):
+        """Release the connection: end any open transaction, keep it open"""
+        if self.in_transaction:
+            self.rollback()
+
+    def dispose(self):
+        """Really close the connection"""
+        super().close()
+
+
+def _open(path: str) -> EmbeddedConnection:
+    conn = sqlite3.connect(path, factory=EmbeddedConnection, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.create_aggregate('STDDEV_POP', 1, _StddevPop)
+    return conn
+
+
+def initialize_schema(conn: EmbeddedConnection):
+    """Create the tables and sample data of a new database file"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'potential_site'"
+    ).fetchone()
+    if exists:
+        return
+    with _schema_lock:
+        # The script is idempotent, so workers racing on a new file are fine
+        conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+        logger.info("Initialized embedded database schema")
+
+
+def connect(path: str, initialize: bool = True) -> EmbeddedConnection:
+    """
+    Connection to a SQLite file for the calling thread
+
+    Args:
+        path: Database file path (parent directories are created)
+        initialize: Create the schema when the file has none
+
+    Returns:
+        EmbeddedConnection; close() releases it for the thread's next call
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None or _local.pid != os.getpid():
+        # Connections inherited from a parent process must not be used
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+
+    conn = connections.get(path)
+    if conn is None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = _open(path)
+        if initialize:
+            initialize_schema(conn)
+        connections[path] = conn
+    return conn
+
+
+def reset_connections():
+    """Close the calling thread's connections (before fork, like reset_pool)"""
+    connections = getattr(_local, 'connections', None) or {}
+    if getattr(_local, 'pid', None) == os.getpid():
+        for conn in connections.values():
+            conn.dispose()
+    _local.connections = {}
+    _local.pid = os.getpid()
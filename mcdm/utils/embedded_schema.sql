@@ -0,0 +1,330 @@
+-- ============================================================================
+-- RETAIL SITE SELECTION DSS - EMBEDDED (SQLite) SCHEMA
+-- Phiên bản SQLite của mysql/init/01-schema.sql, dùng khi DB_BACKEND=sqlite
+-- (xem mcdm/utils/embedded_db.py). Giữ đồng bộ với bản MySQL khi thay đổi.
+--
+-- Khác biệt so với MySQL:
+--   * AUTO_INCREMENT -> INTEGER PRIMARY KEY AUTOINCREMENT
+--   * ON UPDATE CURRENT_TIMESTAMP -> trigger cập nhật updated_at
+--   * Thời gian mặc định theo giờ địa phương, như MySQL
+--   * Index khai báo riêng; không có COMMENT, ENGINE, view báo cáo
+-- Script chạy lại nhiều lần không lỗi (IF NOT EXISTS / INSERT OR IGNORE).
+-- ============================================================================
+BEGIN IMMEDIATE;
+
+-- ============================================================================
+-- 1. USERS TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(100) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    full_name VARCHAR(255),
+    role VARCHAR(50) DEFAULT 'STORE_OWNER',
+    created_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+-- ============================================================================
+-- 2. DISTRICT TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS district (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    x_coordinate DOUBLE,
+    y_coordinate DOUBLE,
+    population_density DOUBLE,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_district_name ON district (name);
+
+-- ============================================================================
+-- 3. EXPERT CRITERIA CONFIG TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS expert_criteria_config (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy_name VARCHAR(255) NOT NULL,
+    description TEXT,
+
+    -- Trọng số cho các tiêu chí COST
+    weight_rent_cost DOUBLE NOT NULL DEFAULT 0.15,
+    weight_renovation_cost DOUBLE NOT NULL DEFAULT 0.10,
+    weight_competitor_count DOUBLE NOT NULL DEFAULT 0.15,
+    weight_warehouse_distance DOUBLE NOT NULL DEFAULT 0.10,
+
+    -- Trọng số cho các tiêu chí BENEFIT
+    weight_floor_area DOUBLE NOT NULL DEFAULT 0.15,
+    weight_front_width DOUBLE NOT NULL DEFAULT 0.10,
+    weight_traffic_score DOUBLE NOT NULL DEFAULT 0.15,
+    weight_population_density DOUBLE NOT NULL DEFAULT 0.10,
+    weight_market_capture DOUBLE NOT NULL DEFAULT 0,
+
+    -- Metadata
+    is_active BOOLEAN DEFAULT FALSE,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    created_by VARCHAR(100),
+
+    -- Constraint: Tổng trọng số phải = 1.0
+    CONSTRAINT chk_weights_sum CHECK (
+        ROUND(weight_rent_cost + weight_renovation_cost + weight_competitor_count +
+              weight_warehouse_distance + weight_floor_area + weight_front_width +
+              weight_traffic_score + weight_population_density +
+              weight_market_capture, 2) = 1.0
+    )
+);
+
+CREATE INDEX IF NOT EXISTS idx_active_config ON expert_criteria_config (is_active);
+
+CREATE TRIGGER IF NOT EXISTS trg_config_updated_at
+AFTER UPDATE ON expert_criteria_config
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE expert_criteria_config SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+-- ============================================================================
+-- 4. WAREHOUSE TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS warehouse (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code VARCHAR(50) NOT NULL UNIQUE,
+    name VARCHAR(255) NOT NULL,
+    x_coordinate DOUBLE NOT NULL,
+    y_coordinate DOUBLE NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_warehouse_active ON warehouse (is_active);
+
+CREATE TRIGGER IF NOT EXISTS trg_warehouse_updated_at
+AFTER UPDATE ON warehouse
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE warehouse SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+-- ============================================================================
+-- 5. COMPETITOR STORE TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS competitor_store (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    brand VARCHAR(100),
+    x_coordinate DOUBLE NOT NULL,
+    y_coordinate DOUBLE NOT NULL,
+    floor_area DOUBLE NOT NULL,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_competitor_updated_at
+AFTER UPDATE ON competitor_store
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE competitor_store SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+-- ============================================================================
+-- 6. POTENTIAL SITE TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS potential_site (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    site_code VARCHAR(50) UNIQUE,
+
+    -- Thông tin địa lý
+    address VARCHAR(500) NOT NULL,
+    district_id BIGINT NOT NULL REFERENCES district(id),
+    x_coordinate DOUBLE,
+    y_coordinate DOUBLE,
+
+    -- Cost criteria
+    rent_cost DOUBLE NOT NULL,
+    renovation_cost DOUBLE NOT NULL,
+    competitor_count INT NOT NULL,
+    distance_to_warehouse DOUBLE NOT NULL,
+    nearest_warehouse_id BIGINT NULL REFERENCES warehouse(id) ON DELETE SET NULL,
+
+    -- Benefit criteria
+    floor_area DOUBLE NOT NULL,
+    front_width DOUBLE NOT NULL,
+    traffic_score INT NOT NULL,
+    population_density DOUBLE NOT NULL,
+    market_capture DOUBLE NOT NULL DEFAULT 0,
+
+    -- Khoảng ước lượng (Fuzzy TOPSIS)
+    renovation_cost_lower DOUBLE NULL,
+    renovation_cost_upper DOUBLE NULL,
+    traffic_score_lower DOUBLE NULL,
+    traffic_score_upper DOUBLE NULL,
+    population_density_lower DOUBLE NULL,
+    population_density_upper DOUBLE NULL,
+
+    -- Thuộc tính bổ sung
+    has_parking BOOLEAN DEFAULT FALSE,
+    is_corner_lot BOOLEAN DEFAULT FALSE,
+    near_school BOOLEAN DEFAULT FALSE,
+    near_market BOOLEAN DEFAULT FALSE,
+
+    -- Metadata
+    status VARCHAR(20) DEFAULT 'ACTIVE',
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    notes TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_district ON potential_site (district_id);
+-- Bộ lọc đẩy xuống SQL của load_sites (status = 'ACTIVE' luôn có mặt)
+CREATE INDEX IF NOT EXISTS idx_status_district ON potential_site (status, district_id);
+CREATE INDEX IF NOT EXISTS idx_status_rent ON potential_site (status, rent_cost);
+CREATE INDEX IF NOT EXISTS idx_status_parking_district ON potential_site (status, has_parking, district_id);
+
+-- Thay cho ON UPDATE CURRENT_TIMESTAMP: get_data_version dựa vào updated_at
+CREATE TRIGGER IF NOT EXISTS trg_site_updated_at
+AFTER UPDATE ON potential_site
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE potential_site SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+-- ============================================================================
+-- 7. EVALUATION RESULT TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS evaluation_result (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    -- Liên kết
+    user_id BIGINT REFERENCES users(id) ON DELETE SET NULL,
+    config_id BIGINT NOT NULL REFERENCES expert_criteria_config(id),
+    site_id BIGINT NOT NULL REFERENCES potential_site(id) ON DELETE CASCADE,
+
+    -- Kết quả phân tích
+    algorithm_used VARCHAR(50) DEFAULT 'TOPSIS',
+    topsis_score DOUBLE NOT NULL,
+    rank_position INT NOT NULL,
+
+    -- Metadata
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    execution_time_ms BIGINT,
+    batch_id VARCHAR(100),
+    group_key VARCHAR(100) NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_id ON evaluation_result (user_id);
+CREATE INDEX IF NOT EXISTS idx_config_id ON evaluation_result (config_id);
+CREATE INDEX IF NOT EXISTS idx_site_created ON evaluation_result (site_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_batch_id ON evaluation_result (batch_id);
+CREATE INDEX IF NOT EXISTS idx_batch_group_rank ON evaluation_result (batch_id, group_key, rank_position);
+CREATE INDEX IF NOT EXISTS idx_rank ON evaluation_result (rank_position);
+CREATE INDEX IF NOT EXISTS idx_created_at ON evaluation_result (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_score ON evaluation_result (topsis_score DESC);
+
+-- ============================================================================
+-- 8. ANALYSIS BATCH TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS analysis_batch (
+    batch_id VARCHAR(100) PRIMARY KEY,
+    request_key CHAR(40) NULL,
+    idempotency_key VARCHAR(100) NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'PUBLISHED',
+    algorithm_used VARCHAR(50) NOT NULL,
+    config_id BIGINT NULL,
+    response_json TEXT,
+    full_ranking TINYINT NOT NULL DEFAULT 1,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    published_at DATETIME NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_idempotency_key ON analysis_batch (idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_request_key ON analysis_batch (request_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_status_created ON analysis_batch (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_status_published ON analysis_batch (status, published_at);
+CREATE INDEX IF NOT EXISTS idx_full_ranking_published ON analysis_batch (full_ranking, status, published_at);
+
+-- ============================================================================
+-- 9. RANKING SNAPSHOT TABLES
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS ranking_snapshot_meta (
+    config_id BIGINT PRIMARY KEY,
+    site_version VARCHAR(100) NOT NULL,
+    config_version VARCHAR(100) NOT NULL,
+    algorithm_used VARCHAR(50) NOT NULL,
+    normalization VARCHAR(20) NOT NULL,
+    site_count INT NOT NULL,
+    refreshed_at DATETIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ranking_snapshot (
+    config_id BIGINT NOT NULL,
+    site_id BIGINT NOT NULL,
+    score DOUBLE NOT NULL,
+    rank_position INT NOT NULL,
+
+    PRIMARY KEY (config_id, site_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_config_rank ON ranking_snapshot (config_id, rank_position);
+
+-- ============================================================================
+-- SAMPLE DATA (id cố định để INSERT OR IGNORE không tạo bản trùng)
+-- ============================================================================
+
+INSERT OR IGNORE INTO users (id, username, password_hash, full_name, role) VALUES
+(1, 'admin', '$2a$10$dummyhash123456789', 'System Administrator', 'ADMIN'),
+(2, 'analyst1', '$2a$10$dummyhash123456789', 'Business Analyst', 'ANALYST'),
+(3, 'owner1', '$2a$10$dummyhash123456789', 'Store Owner Demo', 'STORE_OWNER');
+
+INSERT OR IGNORE INTO district (id, name, x_coordinate, y_coordinate, population_density) VALUES
+(1, 'Quận 1', 106.6980, 10.7758, 38000),
+(2, 'Quận 2', 106.7314, 10.7812, 12000),
+(3, 'Quận 3', 106.6835, 10.7835, 32000),
+(4, 'Quận 4', 106.7032, 10.7586, 28000),
+(5, 'Quận 5', 106.6628, 10.7556, 35000),
+(6, 'Quận 6', 106.6334, 10.7475, 25000),
+(7, 'Quận 7', 106.7221, 10.7362, 15000),
+(8, 'Quận 8', 106.6588, 10.7278, 20000),
+(9, 'Quận 10', 106.6683, 10.7724, 30000),
+(10, 'Quận 11', 106.6431, 10.7645, 27000);
+
+INSERT OR IGNORE INTO warehouse (id, code, name, x_coordinate, y_coordinate) VALUES
+(1, 'KHO-TB', 'Kho Trung Tâm Tân Bình', 106.6520, 10.8010),
+(2, 'KHO-Q7', 'Kho Quận 7', 106.7160, 10.7290);
+
+INSERT OR IGNORE INTO competitor_store (id, name, brand, x_coordinate, y_coordinate, floor_area) VALUES
+(1, 'Co.opXtra Quận 1', 'Co.op', 106.6990, 10.7740, 350),
+(2, 'WinMart Quận 3', 'WinMart', 106.6850, 10.7820, 220),
+(3, 'Bách Hóa Xanh Quận 5', 'Bách Hóa Xanh', 106.6640, 10.7560, 120),
+(4, 'WinMart+ Quận 7', 'WinMart', 106.7200, 10.7370, 90),
+(5, 'Co.op Food Quận 10', 'Co.op', 106.6690, 10.7710, 110);
+
+INSERT OR IGNORE INTO expert_criteria_config (
+    id, strategy_name, description,
+    weight_rent_cost, weight_renovation_cost, weight_competitor_count, weight_warehouse_distance,
+    weight_floor_area, weight_front_width, weight_traffic_score, weight_population_density,
+    is_active, created_by
+) VALUES
+(
+    1, 'Phủ Sóng Thị Trường',
+    'Ưu tiên vị trí có lưu lượng cao, mật độ dân cư cao. Chấp nhận giá thuê và cạnh tranh cao.',
+    0.08, 0.07, 0.10, 0.05,
+    0.12, 0.10, 0.25, 0.23,
+    TRUE, 'Strategy Team'
+),
+(
+    2, 'Tối Ưu Lợi Nhuận',
+    'Ưu tiên chi phí thấp, ít đối thủ cạnh tranh.',
+    0.25, 0.15, 0.20, 0.10,
+    0.10, 0.05, 0.08, 0.07,
+    FALSE, 'Finance Team'
+),
+(
+    3, 'Cân Bằng Toàn Diện',
+    'Cân đối giữa chi phí và lợi ích.',
+    0.15, 0.10, 0.12, 0.08,
+    0.15, 0.10, 0.15, 0.15,
+    FALSE, 'Operations Team'
+);
+
+COMMIT;
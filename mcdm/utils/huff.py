@@ -0,0 +1,265 @@
+"""
+Huff gravity model of the demand a site would capture
+
+Demand is rasterized into a regular grid of cells (people per cell) by
+interpolating district population density between district centroids.
+A store j attracts the shoppers of cell i with utility
+
+    u_ij = A_j / max(d_ij, d_min)^decay
+
+and captures the share u_ij / sum_k u_ik of the cell's demand. Only cells
+within a cutoff radius of a store count. The grid is its own spatial index:
+the cells within the cutoff of any point are a fixed stencil of row/column
+offsets around the point's cell, so no per-pair search is needed.
+
+A candidate is evaluated as if it alone opened next to the existing
+competitors (candidates do not take demand from each other):
+
+    capture_j = sum_i D_i * u_ij / (S_i + u_ij),   S_i = sum_competitors u_ik
+
+S is accumulated once; candidates are then scored in blocks of at most
+Config.HUFF_BLOCK_PAIRS (candidate, cell) pairs, which bounds memory.
+
+Coordinates are longitude/latitude in degrees, projected to km around the
+grid origin (equirectangular, accurate at city scale).
+"""
+import numpy as np
+from config import Config
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON_EQUATOR = 111.320
+
+
+class DemandGrid:
+    """
+    Regular grid of demand cells
+
+    Args:
+        origin_lon: Longitude of the grid's south-west corner
+        origin_lat: Latitude of the grid's south-west corner
+        cell_km: Cell edge length in km
+        demand: (rows, columns) people per cell; row 0 is the southmost
+    """
+
+    def __init__(self, origin_lon: float, origin_lat: float, cell_km: float, demand: np.ndarray):
+        self.origin_lon = float(origin_lon)
+        self.origin_lat = float(origin_lat)
+        self.cell_km = float(cell_km)
+        self.demand = np.asarray(demand, dtype=np.float64)
+        self.km_per_degree_lon = KM_PER_DEGREE_LON_EQUATOR * np.cos(np.radians(self.origin_lat))
+
+    @property
+    def shape(self) -> tuple:
+        return self.demand.shape
+
+    @property
+    def n_cells(self) -> int:
+        return self.demand.size
+
+    def project(self, lons, lats) -> tuple:
+        """(x, y) in km from the grid origin"""
+        x = (np.asarray(lons, dtype=np.float64) - self.origin_lon) * self.km_per_degree_lon
+        y = (np.asarray(lats, dtype=np.float64) - self.origin_lat) * KM_PER_DEGREE_LAT
+        return x, y
+
+    @classmethod
+    def covering(cls, lons, lats, margin_km: float, cell_km: float = None,
+                 max_cells: int = None) -> tuple:
+        """
+        (origin_lon, origin_lat, cell_km, shape) of a grid covering the points
+
+        The cell size grows beyond cell_km when the area would need more
+        than max_cells cells.
+        """
+        cell_km = cell_km or Config.HUFF_CELL_KM
+        max_cells = max_cells or Config.HUFF_MAX_CELLS
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+
+        origin_lat = np.nanmin(lats) - margin_km / KM_PER_DEGREE_LAT
+        # Same projection as DemandGrid.project
+        km_per_degree_lon = KM_PER_DEGREE_LON_EQUATOR * np.cos(np.radians(origin_lat))
+        origin_lon = np.nanmin(lons) - margin_km / km_per_degree_lon
+        width_km = (np.nanmax(lons) - np.nanmin(lons)) * km_per_degree_lon + 2 * margin_km
+        height_km = (np.nanmax(lats) - np.nanmin(lats)) * KM_PER_DEGREE_LAT + 2 * margin_km
+
+        cell_km = max(cell_km, np.sqrt(width_km * height_km / max_cells))
+        shape = (int(np.ceil(height_km / cell_km)), int(np.ceil(width_km / cell_km)))
+        return origin_lon, origin_lat, cell_km, shape
+
+    @classmethod
+    def from_districts(cls, lons, lats, densities, origin_lon: float, origin_lat: float,
+                       cell_km: float, shape: tuple, radius_km: float = None,
+                       neighbors: int = 4) -> 'DemandGrid':
+        """
+        Rasterize district population density
+
+        Each cell gets the inverse-distance-weighted density of its nearest
+        district centroids; cells farther than radius_km from every
+        centroid get none.
+
+        Args:
+            lons, lats: District centroid coordinates
+            densities: District population density (people/km²)
+            origin_lon, origin_lat, cell_km, shape: Grid geometry (see covering)
+            radius_km: Reach of a district centroid (None = Config.HUFF_DISTRICT_RADIUS_KM)
+            neighbors: Centroids interpolated per cell
+        """
+        from scipy.spatial import cKDTree
+
+        radius_km = radius_km or Config.HUFF_DISTRICT_RADIUS_KM
+        densities = np.asarray(densities, dtype=np.float64)
+        grid = cls(origin_lon, origin_lat, cell_km, np.zeros(shape))
+        if len(densities) == 0:
+            return grid
+
+        cx, cy = grid.project(lons, lats)
+        tree = cKDTree(np.column_stack((cx, cy)))
+        k = min(neighbors, len(densities))
+
+        # Row by row keeps the (cells, k) temporaries at one grid row
+        columns_km = (np.arange(shape[1]) + 0.5) * cell_km
+        for row in range(shape[0]):
+            points = np.column_stack((columns_km, np.full(shape[1], (row + 0.5) * cell_km)))
+            dist, idx = tree.query(points, k=k, distance_upper_bound=radius_km)
+            dist, idx = dist.reshape(shape[1], k), idx.reshape(shape[1], k)
+            found = idx < len(densities)
+            weight = np.where(found, 1.0 / np.maximum(dist, cell_km / 2) ** 2, 0.0)
+            total = weight.sum(axis=1)
+            value = (weight * densities[np.where(found, idx, 0)]).sum(axis=1)
+            grid.demand[row] = np.divide(value, total, out=np.zeros(shape[1]), where=total > 0)
+
+        grid.demand *= cell_km * cell_km
+        return grid
+
+
+class HuffModel:
+    """
+    Captured demand of candidate sites against fixed competitors
+
+    Args:
+        grid: Demand grid
+        competitor_lons, competitor_lats: Competitor store locations
+        competitor_attractiveness: Competitor attractiveness (e.g. floor area)
+        decay: Distance decay exponent (None = Config.HUFF_DISTANCE_DECAY)
+        cutoff_km: Radius of the cells a store can draw from (None = Config.HUFF_CUTOFF_KM)
+        min_distance_km: Distance floor (None = Config.HUFF_MIN_DISTANCE_KM)
+        block_pairs: Max (store, cell) pairs per block (None = Config.HUFF_BLOCK_PAIRS)
+    """
+
+    def __init__(self, grid: DemandGrid, competitor_lons=(), competitor_lats=(),
+                 competitor_attractiveness=(), decay: float = None, cutoff_km: float = None,
+                 min_distance_km: float = None, block_pairs: int = None):
+        self.grid = grid
+        self.decay = Config.HUFF_DISTANCE_DECAY if decay is None else decay
+        self.cutoff_km = cutoff_km or Config.HUFF_CUTOFF_KM
+        self.min_distance_km = Config.HUFF_MIN_DISTANCE_KM if min_distance_km is None else min_distance_km
+        self.block_pairs = block_pairs or Config.HUFF_BLOCK_PAIRS
+
+        # Offsets of every cell whose centre can lie within the cutoff of a
+        # point inside the centre cell
+        reach = int(np.ceil(self.cutoff_km / grid.cell_km)) + 1
+        di, dj = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+        keep = (np.maximum(np.abs(di) - 0.5, 0) ** 2 + np.maximum(np.abs(dj) - 0.5, 0) ** 2) \
+            * grid.cell_km ** 2 <= self.cutoff_km ** 2
+        di, dj = di[keep], dj[keep]
+
+        # Demand and competition live in a copy of the grid padded by
+        # `reach` empty cells on every side, so stencil cells never fall
+        # outside the arrays and need no bounds checks
+        rows_n, columns_n = grid.shape
+        self._reach = reach
+        self._padded_columns = columns_n + 2 * reach
+        self._stencil = di * self._padded_columns + dj
+        self._stencil_dx = dj * grid.cell_km
+        self._stencil_dy = di * grid.cell_km
+        padded = np.zeros((rows_n + 2 * reach, self._padded_columns))
+        padded[reach:reach + rows_n, reach:reach + columns_n] = grid.demand
+        self._demand = padded.ravel()
+
+        self._competition = np.zeros(self._demand.size)
+        x, y, attractiveness, _ = self._located(competitor_lons, competitor_lats,
+                                                competitor_attractiveness)
+        for block in self._blocks(len(attractiveness)):
+            cells, utility = self._utilities(x[block], y[block], attractiveness[block])
+            self._competition += np.bincount(cells.ravel(), weights=utility.ravel(),
+                                             minlength=self._competition.size)
+
+    @property
+    def stencil_size(self) -> int:
+        return len(self._stencil)
+
+    @property
+    def competition(self) -> np.ndarray:
+        """(n_cells,) summed competitor utility of every grid cell"""
+        rows_n, columns_n = self.grid.shape
+        padded = self._competition.reshape(-1, self._padded_columns)
+        return padded[self._reach:self._reach + rows_n, self._reach:self._reach + columns_n].ravel()
+
+    def _located(self, lons, lats, attractiveness) -> tuple:
+        """Projected (x, y, attractiveness, positions) of stores with known values"""
+        x, y = self.grid.project(lons, lats)
+        attractiveness = np.asarray(attractiveness, dtype=np.float64)
+        positions = np.flatnonzero(np.isfinite(x) & np.isfinite(y) & np.isfinite(attractiveness))
+        return x[positions], y[positions], attractiveness[positions], positions
+
+    def _blocks(self, n: int):
+        size = max(1, self.block_pairs // self.stencil_size)
+        for start in range(0, n, size):
+            yield slice(start, min(start + size, n))
+
+    def _utilities(self, x: np.ndarray, y: np.ndarray, attractiveness: np.ndarray) -> tuple:
+        """
+        (cells, utility) of a block of stores: (b, stencil) flat indices into
+        the padded grid and utilities, 0 beyond the cutoff
+        """
+        rows_n, columns_n = self.grid.shape
+        cell = self.grid.cell_km
+        # Stores off the grid use the nearest edge cell; their distances stay
+        # exact, so far-away cells just fall outside the cutoff
+        row = np.clip(np.floor(y / cell), 0, rows_n - 1).astype(np.int64)
+        column = np.clip(np.floor(x / cell), 0, columns_n - 1).astype(np.int64)
+
+        dx = self._stencil_dx + ((column + 0.5) * cell - x)[:, None]
+        dy = self._stencil_dy + ((row + 0.5) * cell - y)[:, None]
+        dx *= dx
+        dy *= dy
+        distance_sq = dx
+        distance_sq += dy
+        outside = distance_sq > self.cutoff_km ** 2
+
+        # Squared distances: no square root, and no power for decay 2
+        utility = np.maximum(distance_sq, self.min_distance_km ** 2, out=distance_sq)
+        if self.decay == 2:
+            np.reciprocal(utility, out=utility)
+        else:
+            np.power(utility, -self.decay / 2, out=utility)
+        utility *= attractiveness[:, None]
+        utility[outside] = 0.0
+
+        base = (row + self._reach) * self._padded_columns + column + self._reach
+        return base[:, None] + self._stencil, utility
+
+    def capture(self, lons, lats, attractiveness) -> np.ndarray:
+        """
+        Expected demand each candidate captures if it opens alone
+
+        Args:
+            lons, lats: (n,) candidate locations (NaN = unknown, captures 0)
+            attractiveness: (n,) candidate attractiveness
+
+        Returns:
+            (n,) captured demand (people)
+        """
+        x, y, attractiveness, positions = self._located(lons, lats, attractiveness)
+
+        result = np.zeros(len(np.atleast_1d(lons)))
+        for block in self._blocks(len(positions)):
+            cells, utility = self._utilities(x[block], y[block], attractiveness[block])
+            total = self._competition[cells]
+            total += utility
+            # Share of each cell's demand; cells beyond the cutoff stay 0
+            np.divide(utility, total, out=utility, where=utility > 0)
+            utility *= self._demand[cells]
+            result[positions[block]] = utility.sum(axis=1)
+        return result
@@ -0,0 +1,81 @@
+"""
+Per-worker counters and gauges, served at /api/metrics
+
+Kept dependency-free (no pandas/NumPy) so the metrics endpoint answers as
+cheaply as the health probes. Under gunicorn every worker has its own
+counters; the response names the worker's pid.
+"""
+import threading
+
+
+class Metrics:
+    """Thread-safe named counters with optional labels, plus gauges"""
+
+    def __init__(self):
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1, **labels):
+        """Add `amount` to the counter `name` with the given labels"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_gauge(self, name: str, read):
+        """Report the number returned by `read()` as the gauge `name`"""
+        with self._lock:
+            self._gauges[name] = read
+
+    def _read_gauges(self) -> list:
+        with self._lock:
+            gauges = sorted(self._gauges.items())
+        return [(name, read()) for name, read in gauges]
+
+    def value(self, name: str, **labels) -> int:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self) -> dict:
+        """
+        Current values
+
+        Returns:
+            {name: value} for unlabelled counters and
+            {name: {"label=value,...": value}} for labelled ones; gauges
+            are unlabelled
+        """
+        with self._lock:
+            items = list(self._counters.items())
+
+        result = {}
+        for (name, labels), value in sorted(items):
+            if not labels:
+                result[name] = value
+            else:
+                label_text = ','.join(f"{k}={v}" for k, v in labels)
+                result.setdefault(name, {})[label_text] = value
+        result.update(self._read_gauges())
+        return result
+
+    def render_prometheus(self, prefix: str = 'mcdm_') -> str:
+        """Counters and gauges in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._counters.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), value in items:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{metric}{{{label_text}}} {value}" if labels else f"{metric} {value}")
+        for name, value in self._read_gauges():
+            lines.append(f"# TYPE {prefix + name} gauge")
+            lines.append(f"{prefix + name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,121 @@
+"""
+Immutable rank/percentile index over the scores of one analysis batch
+
+Every query is a binary search over sorted arrays:
+- scores sorted ascending (counts of higher/lower scores, score ranges)
+- site ids sorted ascending with each site's position in the ranking
+"""
+import numpy as np
+
+
+class RankIndex:
+    """
+    Sorted score arrays of a batch
+
+    Positions are 0-based indices into the ranking (best first, ties in
+    site_id order); ranks are competition ranks (tied scores share the best
+    rank), matching rank_position of a global analysis.
+
+    Args:
+        site_ids: (n,) site id of every result
+        scores: (n,) score of every result, higher is better
+        site_codes: (n,) site code of every result (optional)
+    """
+
+    def __init__(self, site_ids, scores, site_codes=None):
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Ranking order: score descending, then site_id ascending
+        order = np.lexsort((site_ids, -scores))
+        self.ranked_site_ids = site_ids[order]
+        self.ranked_scores = scores[order]
+        self.ranked_site_codes = None if site_codes is None else np.asarray(site_codes, dtype=object)[order]
+
+        self.ascending_scores = self.ranked_scores[::-1].copy()
+
+        # site_id -> position lookup via binary search
+        id_order = np.argsort(self.ranked_site_ids, kind='stable')
+        self._sorted_ids = self.ranked_site_ids[id_order]
+        self._position_of_sorted_id = id_order
+
+        # Prefix sums of the ascending scores for range averages
+        self._prefix_sum = np.concatenate(([0.0], np.cumsum(self.ascending_scores)))
+
+    def __len__(self) -> int:
+        return len(self.ranked_scores)
+
+    def position(self, site_id: int) -> int:
+        """Position of a site in the ranking, or None if it is not in the batch"""
+        i = np.searchsorted(self._sorted_ids, site_id)
+        if i == len(self._sorted_ids) or self._sorted_ids[i] != site_id:
+            return None
+        return int(self._position_of_sorted_id[i])
+
+    def count_above(self, score: float) -> int:
+        """Number of results scoring strictly higher than `score`"""
+        return len(self) - int(np.searchsorted(self.ascending_scores, score, side='right'))
+
+    def count_at_most(self, score: float) -> int:
+        """Number of results scoring `score` or lower"""
+        return int(np.searchsorted(self.ascending_scores, score, side='right'))
+
+    def rank_of_score(self, score: float) -> int:
+        """Competition rank (1 = best) of a score"""
+        return self.count_above(score) + 1
+
+    def competition_ranks(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """Competition rank of every ranking position in [start, stop) (default: all)"""
+        scores = self.ranked_scores[start:stop]
+        return len(self) - np.searchsorted(self.ascending_scores, scores, side='right') + 1
+
+    def percentile_of_score(self, score: float) -> float:
+        """Percentage of results scoring `score` or lower (100 = best)"""
+        return 100.0 * self.count_at_most(score) / len(self)
+
+    def score_range(self, min_score: float, max_score: float) -> tuple:
+        """
+        Positions of the results with min_score <= score <= max_score
+
+        Returns:
+            Tuple (start, stop) of ranking positions; the range is empty
+            when start == stop
+        """
+        n = len(self)
+        low = int(np.searchsorted(self.ascending_scores, min_score, side='left'))
+        high = int(np.searchsorted(self.ascending_scores, max_score, side='right'))
+        high = max(high, low)
+        # Ascending indices [low, high) are ranking positions [n - high, n - low)
+        return n - high, n - low
+
+    def range_mean(self, start: int, stop: int) -> float:
+        """Mean score of the ranking positions [start, stop)"""
+        if stop <= start:
+            return None
+        n = len(self)
+        total = self._prefix_sum[n - start] - self._prefix_sum[n - stop]
+        return float(total / (stop - start))
+
+    def entry(self, position: int) -> dict:
+        """Site at a ranking position"""
+        score = float(self.ranked_scores[position])
+        return {
+            'position': position + 1,
+            'rank': self.rank_of_score(score),
+            'site_id': int(self.ranked_site_ids[position]),
+            'site_code': None if self.ranked_site_codes is None else self.ranked_site_codes[position],
+            'score': round(score, 6)
+        }
+
+    def columns(self, start: int, stop: int) -> dict:
+        """Sites at the ranking positions [start, stop) as {field: array} (fields of entry)"""
+        stop = max(stop, start)
+        codes = (np.full(stop - start, None, dtype=object) if self.ranked_site_codes is None
+                 else self.ranked_site_codes[start:stop])
+        return {
+            'position': np.arange(start + 1, stop + 1, dtype=np.int64),
+            'rank': self.competition_ranks(start, stop),
+            'site_id': self.ranked_site_ids[start:stop],
+            'site_code': codes,
+            'score': np.round(self.ranked_scores[start:stop], 6)
+        }
@@ -0,0 +1,130 @@
+"""
+Site-data shards (one city per MySQL schema/database or SQLite file)
+
+Shards are configured in Config.SHARD_DSNS as a comma-separated list of
+name=DSN pairs:
+
+    hcm=mysql://root:secret@db:3306/retail_dss_hcm,
+    hn=mysql://root:secret@db:3306/retail_dss_hn,
+    dn=sqlite:///data/shards/dn.db
+
+MySQL shards get their own small connection pool per worker; SQLite shards
+(meant for local testing) use the embedded backend's per-thread connections
+(utils/embedded_db.py), without creating a schema.
+"""
+from dataclasses import dataclass
+from urllib.parse import unquote, urlparse
+from config import Config
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SHARD_SCHEMES = ('mysql', 'sqlite')
+
+# Per-worker MySQL pools, keyed by shard name
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One shard: a name (e.g. the city code) and where its sites live"""
+    name: str
+    dsn: str
+
+    @property
+    def scheme(self) -> str:
+        return urlparse(self.dsn).scheme
+
+
+def parse_shards(spec: str) -> list:
+    """
+    Parse a SHARD_DSNS value
+
+    Args:
+        spec: Comma-separated name=DSN pairs (empty = no shards)
+
+    Returns:
+        List of Shard
+    """
+    shards = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, dsn = item.partition('=')
+        if not sep or not name.strip() or not dsn.strip():
+            raise ValueError(f"Invalid shard entry (expected name=dsn): {item}")
+        shard = Shard(name.strip(), dsn.strip())
+        if shard.scheme not in SHARD_SCHEMES:
+            raise ValueError(f"Unsupported shard DSN scheme: {shard.scheme}. Supported: {list(SHARD_SCHEMES)}")
+        if shard.name in (s.name for s in shards):
+            raise ValueError(f"Duplicate shard name: {shard.name}")
+        shards.append(shard)
+    return shards
+
+
+def configured_shards() -> list:
+    """Shards of Config.SHARD_DSNS"""
+    return parse_shards(Config.SHARD_DSNS)
+
+
+def _mysql_kwargs(shard: Shard) -> dict:
+    url = urlparse(shard.dsn)
+    return dict(
+        host=url.hostname or Config.DB_HOST,
+        port=url.port or Config.DB_PORT,
+        user=unquote(url.username) if url.username else Config.DB_USER,
+        password=unquote(url.password) if url.password else Config.DB_PASSWORD,
+        database=url.path.lstrip('/') or Config.DB_NAME,
+        charset=Config.DB_CHARSET
+    )
+
+
+def _sqlite_path(shard: Shard) -> str:
+    # sqlite:///relative.db -> relative.db, sqlite:////abs/path.db -> /abs/path.db
+    return shard.dsn[len('sqlite:///'):]
+
+
+def get_shard_connection(shard: Shard):
+    """
+    Open a DB-API connection to a shard; close() returns pooled ones
+    """
+    if shard.scheme == 'sqlite':
+        from utils.embedded_db import connect
+        return connect(_sqlite_path(shard), initialize=False)
+
+    import mysql.connector
+    from mysql.connector import errors, pooling
+
+    pool = _pools.get(shard.name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(shard.name)
+            if pool is None:
+                pool = pooling.MySQLConnectionPool(
+                    pool_name=f"{Config.DB_POOL_NAME}_{shard.name}",
+                    pool_size=Config.SHARD_POOL_SIZE,
+                    pool_reset_session=True,
+                    **_mysql_kwargs(shard)
+                )
+                _pools[shard.name] = pool
+                logger.info(f"Created connection pool for shard {shard.name} (size={Config.SHARD_POOL_SIZE})")
+
+    try:
+        return pool.get_connection()
+    except errors.PoolError:
+        logger.warning(f"Pool of shard {shard.name} exhausted, opening a dedicated connection")
+    return mysql.connector.connect(**_mysql_kwargs(shard))
+
+
+def reset_shard_pools():
+    """Drop the shard pools (after fork, like db_connector.reset_pool)"""
+    with _pools_lock:
+        for name, pool in _pools.items():
+            try:
+                pool._remove_connections()
+            except Exception as e:
+                logger.warning(f"Error closing connections of shard {name}: {e}")
+        _pools.clear()
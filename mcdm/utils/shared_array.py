@@ -0,0 +1,71 @@
+from multiprocessing import shared_memory
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SharedArray:
+    """
+    NumPy array backed by a multiprocessing.shared_memory segment
+
+    The owner creates the segment and passes `spec` (a small picklable dict)
+    to pool workers, which call `attach(spec)` to get a view of the same
+    memory instead of unpickling a copy of the data.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple,
+                 dtype, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def from_array(cls, source: np.ndarray) -> 'SharedArray':
+        """Copy `source` into a new shared segment owned by this process"""
+        source = np.ascontiguousarray(source)
+        shm = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        shared = cls(shm, source.shape, source.dtype, owner=True)
+        shared.array[...] = source
+        return shared
+
+    @classmethod
+    def empty(cls, shape: tuple, dtype=np.float64) -> 'SharedArray':
+        """Allocate an uninitialised shared array (e.g. for worker output)"""
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        return cls(shm, shape, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, spec: dict, readonly: bool = True) -> 'SharedArray':
+        """Attach to a segment created by another process"""
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        shared = cls(shm, tuple(spec['shape']), np.dtype(spec['dtype']), owner=False)
+        if readonly:
+            shared.array.flags.writeable = False
+        return shared
+
+    @property
+    def spec(self) -> dict:
+        """Picklable description used by `attach`"""
+        return {
+            'name': self._shm.name,
+            'shape': self.array.shape,
+            'dtype': self.array.dtype.str
+        }
+
+    def close(self):
+        """Detach; the owner also releases the segment"""
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
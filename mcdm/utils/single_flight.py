@@ -0,0 +1,87 @@
+"""
+Single-flight call coalescing
+
+Concurrent calls with the same key run the function once: the first caller
+executes it, later callers block until it finishes and receive the same
+result (or exception). Nothing is cached afterwards; a call that starts
+after the in-flight one completed executes again.
+
+Across requests and workers, an analysis carrying an Idempotency-Key that is
+still being computed is refused with AnalysisInProgress (HTTP 409), and one
+reused with different request parameters with IdempotencyKeyReused (HTTP 422).
+"""
+import threading
+
+
+class AnalysisInProgress(RuntimeError):
+    """The batch of an idempotency key is still being computed"""
+
+    def __init__(self, idempotency_key: str, retry_after: int = 1):
+        super().__init__(f"Analysis for Idempotency-Key {idempotency_key} is still in progress, retry later")
+        self.retry_after = retry_after
+
+
+class IdempotencyKeyReused(RuntimeError):
+    """An idempotency key sent again with different request parameters"""
+
+    def __init__(self, idempotency_key: str):
+        super().__init__(f"Idempotency-Key {idempotency_key} was already used with different request parameters")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key across the threads of a process"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn) -> tuple:
+        """
+        Run fn() unless a call with this key is already in flight
+
+        Args:
+            key: Hashable call key
+            fn: Zero-argument callable
+
+        Returns:
+            Tuple (result, shared), shared being True when the result came
+            from another caller's execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently executing"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,202 @@
+"""
+Site data shared by every worker process through memory-mapped files
+
+Unfiltered loads of potential_site are the same for every gunicorn worker,
+so instead of each worker reading the table into its own DataFrame, the
+first worker to see a new data version writes the sites once as a
+generation of .npy files and every worker maps them read-only. The pages
+live once in the OS page cache, whatever the number of workers.
+
+Layout under the store directory:
+
+    CURRENT                 name of the published generation
+    gen-000042/meta.json    data_version, key and column names
+    gen-000042/values.npy   (n_columns, n_sites) float64, NULL as NaN
+    gen-000042/<key>.npy    id and complete integer columns (int64), text
+                            columns (fixed-width str)
+    .lock                   flock held while a generation is written
+
+A generation is complete before CURRENT is replaced (os.replace), so
+readers see either the old or the new one. Old generations are removed
+after a swap; workers that still map them keep valid pages (Linux unlinks
+the file only when the last mapping goes away).
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+
+
+class SiteMatrix:
+    """
+    One generation of site data, as read-only NumPy views of the mapped files
+
+    Attributes:
+        generation: Generation directory name
+        data_version: DataService.get_data_version() of the data
+        keys: {name: (n_sites,) array} of id, the text and the complete
+            integer columns
+        columns: Numeric column names, in values row order
+        values: (n_columns, n_sites) float64 array
+    """
+
+    def __init__(self, path: str, generation: str):
+        directory = os.path.join(path, generation)
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        self.generation = generation
+        self.data_version = meta['data_version']
+        self.columns = meta['columns']
+        self.keys = {key: np.load(os.path.join(directory, f"{key}.npy"), mmap_mode='r')
+                     for key in meta['keys']}
+        self.values = np.load(os.path.join(directory, 'values.npy'), mmap_mode='r')
+        self._row = {column: j for j, column in enumerate(self.columns)}
+
+    def __len__(self) -> int:
+        return self.values.shape[1]
+
+    def column(self, name: str) -> np.ndarray:
+        """(n_sites,) view of one numeric or key column"""
+        if name in self.keys:
+            return self.keys[name]
+        return self.values[self._row[name]]
+
+
+class SiteMatrixStore:
+    """
+    Publishes and attaches SiteMatrix generations under one directory
+
+    Args:
+        path: Store directory (ideally on tmpfs, e.g. /dev/shm)
+        keep: Generations kept on disk, the published one included
+    """
+
+    def __init__(self, path: str, keep: int = 2):
+        self.path = path
+        self.keep = max(keep, 1)
+        self._attached = None
+        self._lock = threading.Lock()
+
+    def current(self) -> SiteMatrix:
+        """The published generation (None when nothing was published yet)"""
+        for attempt in range(3):
+            generation = self._published()
+            if generation is None:
+                return None
+
+            with self._lock:
+                if self._attached is not None and self._attached.generation == generation:
+                    return self._attached
+                try:
+                    self._attached = SiteMatrix(self.path, generation)
+                    return self._attached
+                except FileNotFoundError:
+                    # Removed by newer swaps between reading CURRENT and mapping it
+                    if attempt == 2:
+                        raise
+
+    def get(self, data_version: str, load) -> SiteMatrix:
+        """
+        The generation of `data_version`, publishing it if needed
+
+        Only one process writes a generation: the others wait on the store
+        lock and then attach what it published.
+
+        Args:
+            data_version: Current DataService.get_data_version()
+            load: Callable returning (keys, columns, values, data_version)
+                of a new generation (see publish)
+
+        Returns:
+            SiteMatrix; its data_version may differ from the requested one
+            when the data changed again while it was being loaded
+        """
+        matrix = self.current()
+        if matrix is not None and matrix.data_version == data_version:
+            return matrix
+
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, LOCK_FILE), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                matrix = self.current()
+                if matrix is not None and matrix.data_version == data_version:
+                    return matrix
+                keys, columns, values, version = load()
+                self.publish(version, keys, columns, values)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return self.current()
+
+    def publish(self, data_version: str, keys: dict, columns: list, values: np.ndarray):
+        """
+        Write a new generation and make it the current one
+
+        Call with the store lock held (see get). Old generations are removed
+        before writing, so with keep >= 2 the store never holds more than
+        `keep` generations, the one being written included. A failed write
+        (e.g. ENOSPC on a full tmpfs) removes its staging directory and
+        raises the OSError.
+
+        Args:
+            data_version: Version of the data written
+            keys: {name: (n_sites,) array} of id, text and integer columns
+            columns: Numeric column names
+            values: (n_columns, n_sites) float64 array
+        """
+        generations = self._generations()
+        number = int(generations[-1].split('-')[1]) + 1 if generations else 1
+        generation = f"gen-{number:06d}"
+        # Make room first, keeping the published generation (readers still
+        # mapping a removed one keep valid pages)
+        published = self._published()
+        for old in generations[:-max(self.keep - 1, 1)]:
+            if old != published:
+                shutil.rmtree(os.path.join(self.path, old), ignore_errors=True)
+
+        staging = os.path.join(self.path, f".{generation}")
+        # Left over when a writer died mid-way
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            os.makedirs(staging)
+            for key, array in keys.items():
+                np.save(os.path.join(staging, f"{key}.npy"), np.asarray(array))
+            np.save(os.path.join(staging, 'values.npy'), np.ascontiguousarray(values, dtype=np.float64))
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump({'data_version': data_version, 'keys': list(keys), 'columns': list(columns)}, f)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        os.rename(staging, os.path.join(self.path, generation))
+
+        pointer = os.path.join(self.path, f".{CURRENT_FILE}")
+        with open(pointer, 'w') as f:
+            f.write(generation)
+        os.replace(pointer, os.path.join(self.path, CURRENT_FILE))
+        logger.info(f"Published site matrix {generation} ({values.shape[1]} sites, "
+                    f"data version {data_version})")
+
+        for old in self._generations()[:-self.keep]:
+            shutil.rmtree(os.path.join(self.path, old), ignore_errors=True)
+
+    def _published(self) -> str:
+        """Name of the generation CURRENT points to (None when there is none)"""
+        try:
+            with open(os.path.join(self.path, CURRENT_FILE)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _generations(self) -> list:
+        """Published generation names, oldest first"""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if name.startswith('gen-'))
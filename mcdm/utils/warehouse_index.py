@@ -0,0 +1,200 @@
+"""
+Nearest-warehouse index over depot locations
+
+Depots are kept in a KD-tree of 3-D unit vectors: the straight-line (chord)
+distance between unit vectors grows with the great-circle distance, so the
+tree's nearest neighbour is the nearest depot by haversine distance, and a
+bulk query over all sites runs in O(n log m).
+
+Distances come from a WarehouseDistance: great-circle by default, or a road
+distance matrix. Road distances are not a metric the tree can search, so
+the nearest depot by road is picked among the Config.WAREHOUSE_ROAD_CANDIDATES
+nearest depots by great-circle distance.
+"""
+import numpy as np
+from config import Config
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vectors(lons, lats) -> np.ndarray:
+    """(n, 3) unit vectors of longitude/latitude pairs in degrees"""
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord) -> np.ndarray:
+    """Great-circle distance in km of a chord length between unit vectors"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+def haversine_km(lons, lats, lon, lat) -> np.ndarray:
+    """Great-circle distance in km from every (lons, lats) point to (lon, lat)"""
+    lon1, lat1 = np.radians(np.asarray(lons, dtype=np.float64)), np.radians(np.asarray(lats, dtype=np.float64))
+    lon2, lat2 = np.radians(lon), np.radians(lat)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class WarehouseDistance:
+    """Site-to-depot distance: the great-circle distance itself"""
+    name = 'haversine'
+    # Great-circle nearest depots to evaluate per site
+    candidates = 1
+
+    def distances(self, site_ids: np.ndarray, warehouse_ids: np.ndarray,
+                  great_circle_km: np.ndarray) -> np.ndarray:
+        """
+        Distances of site/depot pairs
+
+        Args:
+            site_ids: Site id of every pair (broadcastable to great_circle_km)
+            warehouse_ids: Warehouse id of every pair
+            great_circle_km: Great-circle distance of every pair
+
+        Returns:
+            Distance in km of every pair
+        """
+        return great_circle_km
+
+
+class RoadDistanceMatrix(WarehouseDistance):
+    """
+    Road distances from a precomputed site x depot matrix
+
+    Pairs missing from the matrix (new sites, planned depots) use the
+    great-circle distance times a circuity factor.
+
+    Args:
+        site_ids: (s,) site ids of the matrix rows
+        warehouse_ids: (m,) warehouse ids of the matrix columns
+        matrix: (s, m) road distances in km
+        circuity: Road/great-circle ratio for pairs not in the matrix
+        candidates: Great-circle nearest depots to evaluate per site
+    """
+    name = 'road'
+
+    def __init__(self, site_ids=(), warehouse_ids=(), matrix=None,
+                 circuity: float = None, candidates: int = None):
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        warehouse_ids = np.asarray(warehouse_ids, dtype=np.int64)
+        self._site_order = np.argsort(site_ids)
+        self._sorted_site_ids = site_ids[self._site_order]
+        self._warehouse_order = np.argsort(warehouse_ids)
+        self._sorted_warehouse_ids = warehouse_ids[self._warehouse_order]
+        self.matrix = (np.empty((len(site_ids), len(warehouse_ids))) if matrix is None
+                       else np.asarray(matrix))
+        self.circuity = Config.WAREHOUSE_ROAD_CIRCUITY if circuity is None else circuity
+        self.candidates = Config.WAREHOUSE_ROAD_CANDIDATES if candidates is None else candidates
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RoadDistanceMatrix':
+        """Load a .npz file with site_ids, warehouse_ids and distances arrays"""
+        data = np.load(path)
+        return cls(data['site_ids'], data['warehouse_ids'], data['distances'])
+
+    @staticmethod
+    def _lookup(sorted_ids: np.ndarray, order: np.ndarray, ids: np.ndarray) -> tuple:
+        """(positions, found mask) of ids in the matrix axis"""
+        if len(sorted_ids) == 0:
+            return np.zeros(ids.shape, dtype=np.int64), np.zeros(ids.shape, dtype=bool)
+        i = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return order[i], sorted_ids[i] == ids
+
+    def distances(self, site_ids, warehouse_ids, great_circle_km) -> np.ndarray:
+        site_ids, warehouse_ids = np.broadcast_arrays(
+            np.asarray(site_ids, dtype=np.int64), np.asarray(warehouse_ids, dtype=np.int64))
+        rows, has_row = self._lookup(self._sorted_site_ids, self._site_order, site_ids)
+        columns, has_column = self._lookup(self._sorted_warehouse_ids, self._warehouse_order, warehouse_ids)
+        found = has_row & has_column
+
+        result = np.asarray(great_circle_km, dtype=np.float64) * self.circuity
+        result[found] = self.matrix[rows[found], columns[found]]
+        return result
+
+
+_road_matrices = {}
+
+
+def get_warehouse_distance(name: str = None) -> WarehouseDistance:
+    """
+    Look up a distance method by name (None = Config.WAREHOUSE_DISTANCE_METRIC)
+
+    'road' uses the matrix at Config.WAREHOUSE_ROAD_MATRIX_PATH (loaded once
+    per worker), or the circuity factor alone when no path is configured.
+    """
+    name = (name or Config.WAREHOUSE_DISTANCE_METRIC).lower()
+    if name == 'haversine':
+        return WarehouseDistance()
+    if name == 'road':
+        path = Config.WAREHOUSE_ROAD_MATRIX_PATH
+        if not path:
+            return RoadDistanceMatrix()
+        if path not in _road_matrices:
+            _road_matrices[path] = RoadDistanceMatrix.from_file(path)
+        return _road_matrices[path]
+    raise ValueError(f"Unknown warehouse distance: {name}. "
+                     f"Supported: {Config.SUPPORTED_WAREHOUSE_DISTANCES}")
+
+
+class WarehouseIndex:
+    """
+    KD-tree over depot locations
+
+    Args:
+        warehouse_ids: (m,) warehouse ids
+        lons: (m,) longitudes (x_coordinate) in degrees
+        lats: (m,) latitudes (y_coordinate) in degrees
+    """
+
+    def __init__(self, warehouse_ids, lons, lats):
+        from scipy.spatial import cKDTree
+
+        self.warehouse_ids = np.asarray(warehouse_ids, dtype=np.int64)
+        if len(self.warehouse_ids) == 0:
+            raise ValueError("No warehouses to index")
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self._tree = cKDTree(unit_vectors(self.lons, self.lats))
+
+    def __len__(self) -> int:
+        return len(self.warehouse_ids)
+
+    def nearest(self, site_ids, lons, lats, distance: WarehouseDistance = None) -> tuple:
+        """
+        Nearest depot of every site
+
+        Args:
+            site_ids: (n,) site ids (used by road distance lookups)
+            lons: (n,) site longitudes in degrees
+            lats: (n,) site latitudes in degrees
+            distance: Distance method (None = great-circle)
+
+        Returns:
+            Tuple ((n,) warehouse ids, (n,) distances in km)
+        """
+        distance = distance or WarehouseDistance()
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        k = min(distance.candidates, len(self))
+
+        chords, positions = self._tree.query(unit_vectors(lons, lats), k=k, workers=-1)
+        if k == 1:
+            chords, positions = chords[:, None], positions[:, None]
+
+        candidate_ids = self.warehouse_ids[positions]
+        km = distance.distances(site_ids[:, None], candidate_ids, chord_to_km(chords))
+        best = np.argmin(km, axis=1)
+        rows = np.arange(len(site_ids))
+        return candidate_ids[rows, best], km[rows, best]
+
+    @staticmethod
+    def distances_to(warehouse_id: int, lon: float, lat: float, site_ids, lons, lats,
+                     distance: WarehouseDistance = None) -> np.ndarray:
+        """(n,) distance in km from every site to one (e.g. planned) depot"""
+        distance = distance or WarehouseDistance()
+        great_circle = haversine_km(lons, lats, lon, lat)
+        return distance.distances(np.asarray(site_ids, dtype=np.int64),
+                                  np.full(len(great_circle), warehouse_id, dtype=np.int64),
+                                  great_circle)
@@ -6,8 +6,14 @@ SET NAMES utf8mb4;
 SET CHARACTER SET utf8mb4;
 
 -- Drop existing tables if they exist (theo thứ tự phụ thuộc)
+-- Giữ đồng bộ với mcdm/utils/embedded_schema.sql (bản SQLite)
+DROP TABLE IF EXISTS ranking_snapshot;
+DROP TABLE IF EXISTS ranking_snapshot_meta;
+DROP TABLE IF EXISTS analysis_batch;
 DROP TABLE IF EXISTS evaluation_result;
 DROP TABLE IF EXISTS potential_site;
+DROP TABLE IF EXISTS warehouse;
+DROP TABLE IF EXISTS competitor_store;
 DROP TABLE IF EXISTS expert_criteria_config;
 DROP TABLE IF EXISTS district;
 DROP TABLE IF EXISTS users;
@@ -64,6 +70,7 @@ CREATE TABLE expert_criteria_config (
     weight_front_width DOUBLE NOT NULL DEFAULT 0.10 COMMENT 'Trọng số mặt tiền (Benefit)',
     weight_traffic_score DOUBLE NOT NULL DEFAULT 0.15 COMMENT 'Trọng số lưu lượng giao thông (Benefit)',
     weight_population_density DOUBLE NOT NULL DEFAULT 0.10 COMMENT 'Trọng số mật độ dân cư (Benefit)',
+    weight_market_capture DOUBLE NOT NULL DEFAULT 0 COMMENT 'Trọng số lượng khách thu hút theo mô hình Huff (Benefit)',
     
     -- Metadata
     is_active BOOLEAN DEFAULT FALSE COMMENT 'Cấu hình đang được sử dụng',
@@ -75,7 +82,8 @@ CREATE TABLE expert_criteria_config (
     CONSTRAINT chk_weights_sum CHECK (
         ROUND(weight_rent_cost + weight_renovation_cost + weight_competitor_count + 
               weight_warehouse_distance + weight_floor_area + weight_front_width + 
-              weight_traffic_score + weight_population_density, 2) = 1.0
+              weight_traffic_score + weight_population_density +
+              weight_market_capture, 2) = 1.0
     ),
     
     INDEX idx_active_config (is_active)
@@ -83,7 +91,43 @@ CREATE TABLE expert_criteria_config (
 COMMENT='Bảng cấu hình trọng số chuyên gia';
 
 -- ============================================================================
--- 4. POTENTIAL SITE TABLE (CẬP NHẬT - BỎ CÁC TRƯỜNG KẾT QUẢ TOPSIS)
+-- 4. WAREHOUSE TABLE
+-- Vị trí các kho/điểm phân phối; distance_to_warehouse của mỗi địa điểm là
+-- khoảng cách đến kho gần nhất (xem mcdm/services/warehouse_service.py)
+-- ============================================================================
+CREATE TABLE warehouse (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    code VARCHAR(50) NOT NULL UNIQUE COMMENT 'Mã kho (VD: KHO-TB)',
+    name VARCHAR(255) NOT NULL COMMENT 'Tên kho',
+    x_coordinate DOUBLE NOT NULL COMMENT 'Kinh độ',
+    y_coordinate DOUBLE NOT NULL COMMENT 'Vĩ độ',
+    is_active BOOLEAN DEFAULT TRUE COMMENT 'Kho đang hoạt động',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    INDEX idx_warehouse_active (is_active)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Bảng vị trí các kho phân phối';
+
+-- ============================================================================
+-- 5. COMPETITOR STORE TABLE
+-- Cửa hàng đối thủ đã biết vị trí; dùng trong mô hình Huff để ước lượng
+-- lượng khách mỗi địa điểm thu hút được (xem mcdm/utils/huff.py)
+-- ============================================================================
+CREATE TABLE competitor_store (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(255) NOT NULL COMMENT 'Tên cửa hàng',
+    brand VARCHAR(100) COMMENT 'Thương hiệu',
+    x_coordinate DOUBLE NOT NULL COMMENT 'Kinh độ',
+    y_coordinate DOUBLE NOT NULL COMMENT 'Vĩ độ',
+    floor_area DOUBLE NOT NULL COMMENT 'Diện tích sàn (m²), độ hấp dẫn trong mô hình Huff',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Bảng vị trí cửa hàng đối thủ';
+
+-- ============================================================================
+-- 6. POTENTIAL SITE TABLE (CẬP NHẬT - BỎ CÁC TRƯỜNG KẾT QUẢ TOPSIS)
 -- Bảng chính lưu trữ dữ liệu các địa điểm ứng viên - CHỈ CHỨA DỮ LIỆU ĐẦU VÀO
 -- ============================================================================
 CREATE TABLE potential_site (
@@ -102,7 +146,8 @@ CREATE TABLE potential_site (
     rent_cost DOUBLE NOT NULL COMMENT 'Giá thuê hàng tháng (triệu VND)',
     renovation_cost DOUBLE NOT NULL COMMENT 'Chi phí sửa chữa/setup ban đầu (triệu VND)',
     competitor_count INT NOT NULL COMMENT 'Số lượng đối thủ trong bán kính 500m',
-    distance_to_warehouse DOUBLE NOT NULL COMMENT 'Khoảng cách đến kho trung tâm (km)',
+    distance_to_warehouse DOUBLE NOT NULL COMMENT 'Khoảng cách đến kho gần nhất (km)',
+    nearest_warehouse_id BIGINT NULL COMMENT 'Kho gần nhất (NULL = chưa tính từ bảng warehouse)',
     
     -- ========================================================================
     -- NHÓM BENEFIT CRITERIA (Càng cao càng tốt)
@@ -111,6 +156,18 @@ CREATE TABLE potential_site (
     front_width DOUBLE NOT NULL COMMENT 'Chiều rộng mặt tiền (m)',
     traffic_score INT NOT NULL COMMENT 'Điểm lưu lượng giao thông (1-10)',
     population_density DOUBLE NOT NULL COMMENT 'Mật độ dân cư bán kính 500m (người/km²)',
+    market_capture DOUBLE NOT NULL DEFAULT 0 COMMENT 'Lượng khách ước tính thu hút được (mô hình Huff, người)',
+    
+    -- ========================================================================
+    -- KHOẢNG ƯỚC LƯỢNG (tùy chọn, dùng cho Fuzzy TOPSIS)
+    -- NULL = dùng độ lệch mặc định FUZZY_SPREAD
+    -- ========================================================================
+    renovation_cost_lower DOUBLE NULL COMMENT 'Cận dưới chi phí sửa chữa (triệu VND)',
+    renovation_cost_upper DOUBLE NULL COMMENT 'Cận trên chi phí sửa chữa (triệu VND)',
+    traffic_score_lower DOUBLE NULL COMMENT 'Cận dưới điểm lưu lượng giao thông',
+    traffic_score_upper DOUBLE NULL COMMENT 'Cận trên điểm lưu lượng giao thông',
+    population_density_lower DOUBLE NULL COMMENT 'Cận dưới mật độ dân cư (người/km²)',
+    population_density_upper DOUBLE NULL COMMENT 'Cận trên mật độ dân cư (người/km²)',
     
     -- ========================================================================
     -- THUỘC TÍNH BỔ SUNG
@@ -127,14 +184,18 @@ CREATE TABLE potential_site (
     notes TEXT COMMENT 'Ghi chú bổ sung',
     
     FOREIGN KEY (district_id) REFERENCES district(id),
+    FOREIGN KEY (nearest_warehouse_id) REFERENCES warehouse(id) ON DELETE SET NULL,
     
     INDEX idx_district (district_id),
-    INDEX idx_status (status)
+    -- Bộ lọc đẩy xuống SQL của load_sites (status = 'ACTIVE' luôn có mặt)
+    INDEX idx_status_district (status, district_id),
+    INDEX idx_status_rent (status, rent_cost),
+    INDEX idx_status_parking_district (status, has_parking, district_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Bảng lưu trữ các địa điểm ứng viên (chỉ dữ liệu đầu vào)';
 
 -- ============================================================================
--- 5. EVALUATION RESULT TABLE (MỚI)
+-- 7. EVALUATION RESULT TABLE (MỚI)
 -- Bảng lưu trữ kết quả phân tích MCDM cho từng lần chạy
 -- ============================================================================
 CREATE TABLE evaluation_result (
@@ -154,6 +215,7 @@ CREATE TABLE evaluation_result (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Thời điểm phân tích',
     execution_time_ms BIGINT COMMENT 'Thời gian thực thi (milliseconds)',
     batch_id VARCHAR(100) COMMENT 'ID của batch phân tích (để group các kết quả cùng lần chạy)',
+    group_key VARCHAR(100) NULL COMMENT 'Nhóm xếp hạng (VD: district_id) khi phân tích theo nhóm',
     
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
     FOREIGN KEY (config_id) REFERENCES expert_criteria_config(id),
@@ -161,14 +223,71 @@ CREATE TABLE evaluation_result (
     
     INDEX idx_user_id (user_id),
     INDEX idx_config_id (config_id),
-    INDEX idx_site_id (site_id),
+    INDEX idx_site_created (site_id, created_at DESC, id DESC),
     INDEX idx_batch_id (batch_id),
+    INDEX idx_batch_group_rank (batch_id, group_key, rank_position),
     INDEX idx_rank (rank_position),
     INDEX idx_created_at (created_at DESC),
     INDEX idx_score (topsis_score DESC)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Bảng lưu trữ kết quả phân tích MCDM';
 
+-- ============================================================================
+-- 8. ANALYSIS BATCH TABLE
+-- Thông tin từng batch phân tích; request_key cho phép các worker dùng chung
+-- kết quả của các yêu cầu phân tích giống hệt nhau chạy đồng thời.
+-- Kết quả được ghi dưới trạng thái PENDING (chưa hiển thị) và công bố bằng
+-- một lần cập nhật status = 'PUBLISHED'; batch PENDING bị bỏ dở được dọn
+-- định kỳ (xem mcdm/services/batch_sweeper.py). idempotency_key cho phép
+-- gọi lại /analyze an toàn sau timeout.
+-- ============================================================================
+CREATE TABLE analysis_batch (
+    batch_id VARCHAR(100) PRIMARY KEY COMMENT 'ID của batch (khớp evaluation_result.batch_id)',
+    request_key CHAR(40) NULL COMMENT 'SHA-1 của tham số yêu cầu và phiên bản dữ liệu (chỉ tham số khi có idempotency_key)',
+    idempotency_key VARCHAR(100) NULL COMMENT 'Khóa Idempotency-Key do client gửi',
+    status VARCHAR(20) NOT NULL DEFAULT 'PUBLISHED' COMMENT 'PENDING: đang ghi, chưa hiển thị; PUBLISHED: đã công bố; DISCARDED: đang xóa',
+    algorithm_used VARCHAR(50) NOT NULL COMMENT 'Thuật toán được sử dụng',
+    config_id BIGINT NULL COMMENT 'Cấu hình trọng số được sử dụng',
+    response_json LONGTEXT COMMENT 'Kết quả trả về cho client (JSON)',
+    full_ranking TINYINT(1) NOT NULL DEFAULT 1 COMMENT '1: xếp hạng toàn cục mọi site; 0: xếp hạng theo nhóm hoặc chỉ lưu top N',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Thời điểm tạo batch',
+    published_at DATETIME(6) NULL COMMENT 'Thời điểm công bố batch',
+    
+    UNIQUE KEY uq_idempotency_key (idempotency_key),
+    INDEX idx_request_key (request_key, created_at),
+    INDEX idx_status_created (status, created_at),
+    INDEX idx_status_published (status, published_at),
+    INDEX idx_full_ranking_published (full_ranking, status, published_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Bảng thông tin batch phân tích';
+
+-- ============================================================================
+-- 9. RANKING SNAPSHOT TABLES
+-- Bảng xếp hạng tính sẵn cho mọi cấu hình, cập nhật khi potential_site hoặc
+-- expert_criteria_config thay đổi (xem mcdm/services/snapshot_service.py)
+-- ============================================================================
+CREATE TABLE ranking_snapshot_meta (
+    config_id BIGINT PRIMARY KEY COMMENT 'Cấu hình trọng số',
+    site_version VARCHAR(100) NOT NULL COMMENT 'Phiên bản dữ liệu potential_site lúc tính',
+    config_version VARCHAR(100) NOT NULL COMMENT 'Phiên bản expert_criteria_config lúc tính',
+    algorithm_used VARCHAR(50) NOT NULL COMMENT 'Thuật toán dùng để xếp hạng',
+    normalization VARCHAR(20) NOT NULL COMMENT 'Phương pháp chuẩn hóa',
+    site_count INT NOT NULL COMMENT 'Số địa điểm được xếp hạng',
+    refreshed_at DATETIME NOT NULL COMMENT 'Thời điểm tính snapshot'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Thông tin phiên bản của từng bảng xếp hạng tính sẵn';
+
+CREATE TABLE ranking_snapshot (
+    config_id BIGINT NOT NULL COMMENT 'Cấu hình trọng số',
+    site_id BIGINT NOT NULL COMMENT 'Địa điểm',
+    score DOUBLE NOT NULL COMMENT 'Điểm (0-1, càng cao càng tốt)',
+    rank_position INT NOT NULL COMMENT 'Thứ hạng theo cấu hình',
+    
+    PRIMARY KEY (config_id, site_id),
+    INDEX idx_config_rank (config_id, rank_position)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Bảng xếp hạng tính sẵn theo cấu hình';
+
 -- ============================================================================
 -- SAMPLE DATA
 -- ============================================================================
@@ -192,6 +311,19 @@ INSERT INTO district (name, x_coordinate, y_coordinate, population_density) VALU
 ('Quận 10', 106.6683, 10.7724, 30000),
 ('Quận 11', 106.6431, 10.7645, 27000);
 
+-- Sample Warehouses
+INSERT INTO warehouse (code, name, x_coordinate, y_coordinate) VALUES
+('KHO-TB', 'Kho Trung Tâm Tân Bình', 106.6520, 10.8010),
+('KHO-Q7', 'Kho Quận 7', 106.7160, 10.7290);
+
+-- Sample Competitor Stores
+INSERT INTO competitor_store (name, brand, x_coordinate, y_coordinate, floor_area) VALUES
+('Co.opXtra Quận 1', 'Co.op', 106.6990, 10.7740, 350),
+('WinMart Quận 3', 'WinMart', 106.6850, 10.7820, 220),
+('Bách Hóa Xanh Quận 5', 'Bách Hóa Xanh', 106.6640, 10.7560, 120),
+('WinMart+ Quận 7', 'WinMart', 106.7200, 10.7370, 90),
+('Co.op Food Quận 10', 'Co.op', 106.6690, 10.7710, 110);
+
 -- Sample Expert Criteria Configs
 INSERT INTO expert_criteria_config (
     strategy_name, description,